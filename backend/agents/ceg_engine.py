@@ -30,7 +30,6 @@ Restrições intercausas (notação do artigo):
   M (Mascaradas)         — máscara entre EFEITOS (um efeito mascara outro)
 """
 from __future__ import annotations
-from itertools import product
 from typing import Any, Dict, List, Optional
 
 
@@ -135,6 +134,114 @@ def _effect_mask(effects_val: Dict[str, bool], constraints: List[dict]) -> Dict[
     return out
 
 
+# ─────────────────────────────────────────────────────────────
+# Tabelas-verdade como bitsets (int do Python)
+# ─────────────────────────────────────────────────────────────
+# Para as n causas envolvidas num efeito, a atribuição k (0 ≤ k < 2^n) segue a
+# ordem de product([True, False], repeat=n): a causa j é verdadeira em k sse o
+# bit (n-1-j) de k é 0. Uma função booleana vira um int de 2^n bits (bit k =
+# valor em k); and/or/not viram &, |, ^ALL — cada expressão é avaliada UMA vez
+# para todas as atribuições, em vez de recursão de dicts por combinação.
+
+# Acima disto (combinações que ativam UM efeito), a tabela passa a usar a
+# cobertura por cubos (ver _cubes) em vez de listar cada combinação.
+MAX_EXPANDED_COLUMNS = 256
+
+
+def _var_table(j: int, n: int) -> int:
+    """Tabela-verdade da j-ésima causa envolvida (de n)."""
+    run = 1 << (n - 1 - j)             # tamanho do bloco True (e do False)
+    table, width = (1 << run) - 1, 2 * run
+    total = 1 << n
+    while width < total:
+        table |= table << width
+        width *= 2
+    return table
+
+
+def _compile_expr(expr: Any, tables: Dict[str, int], all_ones: int) -> int:
+    """Espelha eval_expr, mas sobre tabelas-verdade inteiras."""
+    if isinstance(expr, str):
+        return tables.get(expr, 0)
+    if not isinstance(expr, dict):
+        return 0
+    op = expr.get("op")
+    if op == "not":
+        return all_ones ^ _compile_expr(expr.get("arg"), tables, all_ones)
+    if op == "and":
+        out = all_ones
+        for a in expr.get("args", []):
+            out &= _compile_expr(a, tables, all_ones)
+        return out
+    if op == "or":
+        out = 0
+        for a in expr.get("args", []):
+            out |= _compile_expr(a, tables, all_ones)
+        return out
+    if op in ("id", "identity"):
+        return _compile_expr(expr.get("arg"), tables, all_ones)
+    return 0
+
+
+def _constraints_mask(constraints: List[dict], cause_ids: List[str],
+                      tables: Dict[str, int], all_ones: int) -> int:
+    """Espelha _cause_constraints_ok: atribuições (causas não envolvidas = False)
+    que respeitam as restrições S/E/O/C."""
+    known = set(cause_ids)
+    mask = all_ones
+    for c in constraints or []:
+        t = (c.get("type") or "").upper()
+        cs = [tables.get(x, 0) for x in c.get("causes", []) if x in known]
+        if not cs or t not in ("E", "O", "S", "C"):
+            continue
+        if t in ("E", "O"):
+            one, two = 0, 0            # "≥1 verdadeira", "≥2 verdadeiras"
+            for v in cs:
+                two |= one & v
+                one |= v
+            mask &= (all_ones ^ two) if t == "E" else (one & (all_ones ^ two))
+        elif t == "S":
+            all_true, all_false = all_ones, all_ones
+            for v in cs:
+                all_true &= v
+                all_false &= all_ones ^ v
+            mask &= all_true | all_false
+        else:  # C
+            rest = all_ones
+            for v in cs[1:]:
+                rest &= v
+            mask &= (all_ones ^ cs[0]) | rest
+    return mask
+
+
+def _minterms(on: int, n: int):
+    """Atribuições (tuplas de bool) do on-set, na ordem de product()."""
+    while on:
+        low = on & -on
+        k = low.bit_length() - 1
+        yield tuple(not (k >> (n - 1 - j)) & 1 for j in range(n))
+        on ^= low
+
+
+def _cubes(on: int, n: int, depth: int = 0, prefix: tuple = ()):
+    """Cobertura do on-set por cubos disjuntos (caminhos da BDD reduzida, ramo
+    True primeiro): variável cujas duas metades coincidem, ou subárvore toda 1,
+    vira don't-care (None). Mantém a ordem de product()."""
+    if not on:
+        return
+    size = 1 << (n - depth)
+    if on == (1 << size) - 1:
+        yield prefix + (None,) * (n - depth)
+        return
+    half = size >> 1
+    when_true, when_false = on & ((1 << half) - 1), on >> half
+    if when_true == when_false:
+        yield from _cubes(when_true, n, depth + 1, prefix + (None,))
+        return
+    yield from _cubes(when_true, n, depth + 1, prefix + (True,))
+    yield from _cubes(when_false, n, depth + 1, prefix + (False,))
+
+
 # ─────────────────────────────────────────────────────────────
 # Geração da tabela de decisão (passo 2 do método)
 # ─────────────────────────────────────────────────────────────
@@ -143,6 +250,12 @@ def build_decision_table(ceg: dict) -> List[dict]:
     na sua expressão) que o ativam, respeitando as restrições. Causas não
     envolvidas ficam como 'X' (don't-care). Cada combinação vira uma coluna.
 
+    A expressão do efeito e as restrições são compiladas uma vez em tabelas-verdade
+    (bitsets) sobre as causas envolvidas; o on-set resultante é percorrido na mesma
+    ordem da enumeração exaustiva. Se um efeito tiver mais de MAX_EXPANDED_COLUMNS
+    combinações, as combinações são agrupadas em cubos (causas envolvidas que não
+    importam naquele ramo também viram 'X').
+
     Retorna lista de colunas:
       {"target": "eX", "causes": {cid: True|False|"X"}, "effects": {eid: bool}}
     """
@@ -161,15 +274,15 @@ def build_decision_table(ceg: dict) -> List[dict]:
         involved = [c for c in cause_ids if c in expr_causes(expr)]
         if not involved:
             continue
-        # enumera só as causas envolvidas; demais = don't-care
-        for combo in product([True, False], repeat=len(involved)):
-            partial = dict(zip(involved, combo))
-            # completa as não-envolvidas como False só para avaliar restrições/efeitos
-            full = {c: partial.get(c, False) for c in cause_ids}
-            if not _cause_constraints_ok(full, constraints):
-                continue
-            if not eval_expr(expr, full):
-                continue  # combinação não ativa o efeito
+        n = len(involved)
+        all_ones = (1 << (1 << n)) - 1
+        tables = {c: _var_table(j, n) for j, c in enumerate(involved)}
+        on = _compile_expr(expr, tables, all_ones) & _constraints_mask(constraints, cause_ids, tables, all_ones)
+        if not on:
+            continue
+        combos = _minterms(on, n) if bin(on).count("1") <= MAX_EXPANDED_COLUMNS else _cubes(on, n)
+        for combo in combos:
+            partial = {c: v for c, v in zip(involved, combo) if v is not None}
             # efeitos com lógica de 3 valores: don't-care = None (indeterminado).
             # Assim um efeito só marca 1 se for definitivamente verdadeiro com as
             # causas SETADAS — evita coativação espúria (fiel ao método).
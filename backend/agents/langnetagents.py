@@ -36,6 +36,15 @@ from .langnetstate import (
     log_task_error
 )
 from .langnettools import create_langnet_tools
+from .langnetcache import get_llm_cache, is_cacheable_response, make_cache_key
+from .langnetscheduler import execute_task_dag
+from .langnetstream import delta_callback, notify_done, notify_event
+from .langnetcheckpoint import (
+    start_checkpointing,
+    save_checkpoint,
+    load_checkpoint,
+    get_checkpoint_info
+)
 
 
 # ============================================================================
@@ -98,7 +107,8 @@ def _safe_format_description(template: str, mapping: Dict[str, Any]) -> str:
     return _re.sub(r"\{([A-Za-z_][A-Za-z0-9_]*)\}", _repl, template)
 
 
-def _direct_llm_complete(description: str, expected_output: str = "", system: str = "") -> str:
+def _direct_llm_complete(description: str, expected_output: str = "", system: str = "",
+                         on_delta: Optional[Callable[[str], None]] = None) -> str:
     """Chamada DIRETA ao LM Studio (openai SDK) — via primária para tasks SEM tools.
     O CrewAI + litellm/httpx estola no transporte de respostas LONGAS do modelo local
     (recebe parte e trava, ex.: 33KB de 57KB), causando 'hang' de dezenas de minutos.
@@ -107,7 +117,9 @@ def _direct_llm_complete(description: str, expected_output: str = "", system: st
     `system`: persona do agente (role/goal/backstory) — SEM ela o modelo tende a ignorar
     os dados reais e preencher templates com conteúdo genérico. Replica o system prompt
     que o CrewAI enviaria, preservando a fidelidade ao domínio.
-    Reusa a MESMA descrição já formatada e devolve o texto cru p/ o output_func processar."""
+    Reusa a MESMA descrição já formatada e devolve o texto cru p/ o output_func processar.
+    `on_delta`: recebe cada pedaço assim que chega (progresso ao vivo no WebSocket);
+    se levantar exceção (ex.: GenerationAborted), o stream é fechado e ela propaga."""
     import os as _os
     from openai import OpenAI as _OpenAI
     base = _os.getenv("LMSTUDIO_API_BASE", "http://192.168.1.115:1234/v1")
@@ -132,22 +144,63 @@ def _direct_llm_complete(description: str, expected_output: str = "", system: st
         stream=True,
     )
     parts = []
-    for chunk in stream:
-        try:
-            delta = chunk.choices[0].delta.content
+    try:
+        for chunk in stream:
+            try:
+                delta = chunk.choices[0].delta.content
+            except (IndexError, AttributeError):
+                continue
             if delta:
                 parts.append(delta)
-        except (IndexError, AttributeError):
-            continue
+                if on_delta:
+                    on_delta(delta)
+    finally:
+        # Fecha a conexão se o consumidor abortou no meio (o servidor para de gerar)
+        close = getattr(stream, "close", None)
+        if close:
+            try:
+                close()
+            except Exception:
+                pass
     return "".join(parts)
 
 
+def _agent_system_prompt(agent: Any) -> str:
+    """Persona do agente (role/goal/backstory) no formato que o CrewAI enviaria como system."""
+    try:
+        _role = getattr(agent, "role", "") or ""
+        _goal = getattr(agent, "goal", "") or ""
+        _back = getattr(agent, "backstory", "") or ""
+        _parts_sys = []
+        if _role: _parts_sys.append(f"You are {_role.strip()}.")
+        if _back: _parts_sys.append(_back.strip())
+        if _goal: _parts_sys.append(f"Your personal goal: {_goal.strip()}")
+        _parts_sys.append("Baseie-se ESTRITAMENTE nos dados fornecidos (documento, requisitos, contexto). NÃO invente conteúdo genérico nem substitua o domínio real por um template padrão.")
+        return "\n\n".join(_parts_sys)
+    except Exception:
+        return ""
+
+
+def _llm_cache_identity(agent: Any, use_direct: bool) -> tuple:
+    """(provider, modelo, temperatura) efetivos da chamada — parte da chave do cache."""
+    provider = (os.getenv("LLM_PROVIDER", "openai") or "").lower()
+    if use_direct:
+        return provider, os.getenv("LMSTUDIO_MODEL_NAME", "qwen2.5-coder-32b-instruct"), 0.2
+    llm = getattr(agent, "llm", None)
+    model = getattr(llm, "model", None) or getattr(llm, "model_name", None) or provider
+    temperature = getattr(llm, "temperature", None)
+    return provider, str(model), temperature if isinstance(temperature, (int, float)) else None
+
+
 class _DirectResult:
     """Imita o CrewOutput (atributo .raw) para o output_func consumir o fallback direto."""
     def __init__(self, raw: str):
         self.raw = raw
         self.json_dict = None
 
+    def __str__(self) -> str:
+        return self.raw
+
 
 def get_llm(use_deepseek: bool = False):
     """
@@ -1963,6 +2016,19 @@ def design_petri_net_output_func(state: LangNetFullState, result: Any) -> LangNe
 
     # Validação estrutural — emite warnings se detectarmos antipatterns
     petri_warnings = _validate_petri_net_topology(adapted)
+    # Análise comportamental (cobertura limitada): deadlocks/lugares ilimitados
+    # aparecem aqui, antes da geração de código
+    if adapted.get("lugares"):
+        try:
+            from agents.langnetpetri import analyze_petri_net, behavior_warnings
+            analysis = analyze_petri_net(
+                adapted,
+                max_states=int(os.getenv("LANGNET_PETRI_MAX_STATES", "2000")),
+                time_limit=float(os.getenv("LANGNET_PETRI_TIME_LIMIT", "2")),
+            )
+            petri_warnings += behavior_warnings(analysis)
+        except Exception as e:
+            print(f"[PETRI WARN] análise de alcançabilidade falhou: {e}")
     if petri_warnings:
         print(f"[PETRI WARN] {len(petri_warnings)} aviso(s) de topologia:")
         for w in petri_warnings:
@@ -1992,76 +2058,9 @@ def _validate_petri_net_topology(net: Dict[str, Any]) -> List[str]:
     if not isinstance(net, dict):
         return ["invalid_structure: petri_net não é um dict"]
 
-    places = net.get("lugares", []) or []
-    transitions = net.get("transicoes", []) or []
-    arcs = net.get("arcos", []) or []
-    warnings: List[str] = []
-
-    place_ids = {p.get("id") for p in places if isinstance(p, dict)}
-    trans_ids = {t.get("id") for t in transitions if isinstance(t, dict)}
-
-    # 1) Dead transitions (sem entrada OU sem saída)
-    for t in transitions:
-        if not isinstance(t, dict):
-            continue
-        tid = t.get("id")
-        ins = [a for a in arcs if a.get("destino") == tid]
-        outs = [a for a in arcs if a.get("origem") == tid]
-        if not ins and not outs:
-            warnings.append(f"dead_transition: {tid} sem nenhum arco (entrada nem saída)")
-        elif not ins:
-            warnings.append(f"dead_transition: {tid} sem arco de entrada (fonte). Aceitável só se for T_start saindo de P0.")
-        elif not outs:
-            warnings.append(f"dead_transition: {tid} sem arco de saída (sumidouro)")
-
-    # 2) Massive fan-out: transição com >3 saídas paralelas
-    for t in transitions:
-        tid = t.get("id") if isinstance(t, dict) else None
-        if not tid:
-            continue
-        outs = [a for a in arcs if a.get("origem") == tid]
-        if len(outs) > 3:
-            dest_names = [str(a.get("destino")) for a in outs[:6]]
-            warnings.append(
-                f"massive_fanout: {tid} dispara {len(outs)} places em paralelo — provavelmente "
-                f"esconde dependências sequenciais. Destinos: {', '.join(dest_names)}"
-            )
-
-    # 3) Branching sem guards: transição com múltiplas saídas (de mesma origem) sem guards
-    # Detecta: 1 place A → várias transições T_x, T_y — se todas guards vazias é fan-out
-    # (não branching real)
-    for p in places:
-        pid = p.get("id") if isinstance(p, dict) else None
-        if not pid:
-            continue
-        # Transições alimentadas só por esse lugar
-        feeding = [a.get("destino") for a in arcs if a.get("origem") == pid and a.get("destino") in trans_ids]
-        if len(feeding) >= 2:
-            # Verifica se TODAS têm guard vazio
-            empty_guards = 0
-            for tid in feeding:
-                t = next((x for x in transitions if isinstance(x, dict) and x.get("id") == tid), None)
-                if t and not (t.get("guard") or "").strip():
-                    empty_guards += 1
-            if empty_guards == len(feeding):
-                warnings.append(
-                    f"branch_no_guards: {pid} alimenta {len(feeding)} transições "
-                    f"({', '.join(feeding)}) e nenhuma tem guard — vai disparar todas (concorrência)"
-                )
-
-    # 4) Orphan places
-    referenced_in_arcs = {a.get("origem") for a in arcs} | {a.get("destino") for a in arcs}
-    for p in places:
-        pid = p.get("id") if isinstance(p, dict) else None
-        if pid and pid not in referenced_in_arcs:
-            warnings.append(f"orphan_place: {pid} não tem nenhum arco — não pode receber nem ceder tokens")
-
-    # 5) No start token
-    has_start = any((p.get("tokens") or 0) > 0 for p in places if isinstance(p, dict))
-    if not has_start:
-        warnings.append("no_start_token: nenhum lugar inicia com tokens>0 — a Petri Net é inerte")
-
-    return warnings
+    # índices montados uma vez (langnetpetri) — tempo linear no nº de arcos
+    from agents.langnetpetri import PetriNet
+    return PetriNet.from_dict(net).topology_warnings()
 
 
 def generate_yaml_output_func(state: LangNetFullState, result: Any) -> LangNetFullState:
@@ -2135,16 +2134,18 @@ try {{
   const ws = new WebSocket(`ws://localhost:${{PORT}}`);
   const result = await new Promise((resolve, reject) => {{
     const t = setTimeout(() => {{ ws.close(); reject(new Error('timeout')); }}, TIMEOUT_MS);
+    const requestId = Date.now().toString(36) + Math.random().toString(36).slice(2, 8);
     ws.onopen = () => ws.send(JSON.stringify({{
       type: 'execute_task',
-      data: {{ task_name: TASK_NAME, input_data: output }}
+      data: {{ task_name: TASK_NAME, input_data: output, request_id: requestId }}
     }}));
     ws.onmessage = (e) => {{
       const r = JSON.parse(e.data);
+      if (r.data && r.data.request_id && r.data.request_id !== requestId) return;
       if (r.type === 'task_completed' || r.type === 'task_result') {{
         clearTimeout(t); ws.close();
         resolve((r.data && r.data.result) || r.data || {{}});
-      }} else if (r.type === 'error') {{
+      }} else if (r.type === 'error' || r.type === 'task_rejected' || r.type === 'task_cancelled') {{
         clearTimeout(t); ws.close();
         reject(new Error((r.data && r.data.error) || 'task error'));
       }}
@@ -2448,13 +2449,20 @@ if __name__ == "__main__":
 def _template_websocket_server_py(ws_port: int) -> str:
     return f'''"""
 WebSocket server compatível com o padrão visualtasksexec.
-Recebe {{"type":"execute_task", "data":{{"task_name", "input_data"}}}}
-e emite task_start / verbose / task_completed / error.
+Recebe {{"type":"execute_task", "data":{{"task_name", "input_data", "request_id"?}}}}
+e emite task_start / verbose / task_completed / error (todas com o request_id).
+Cada task roda como asyncio.Task própria: várias tasks da MESMA conexão andam em
+paralelo; {{"type":"cancel_task", "data":{{"request_id"}}}} cancela uma delas.
 """
 import asyncio
+import contextvars
 import json
 import os
+import threading
+import time
 import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, Dict
 
@@ -2550,6 +2558,7 @@ def _load_yaml(path: str) -> Dict[str, Any]:
 
 AGENTS_CONFIG = _load_yaml("agents.yaml")
 TASKS_CONFIG = _load_yaml("tasks.yaml")
+_CONFIG_FILES = ("agents.yaml", "tasks.yaml")
 
 
 TOOL_REGISTRY = getattr(tools_module, "TOOL_REGISTRY", {{}})
@@ -2566,12 +2575,20 @@ TASK_TOOLS = getattr(adapters_module, "TASK_TOOLS", {{}})
 AGENT_TOOLS = getattr(adapters_module, "AGENT_TOOLS", {{}})
 
 
+_TOOLS_CACHE: Dict[tuple, list] = {{}}
+
+
 def _resolve_tools(names):
     """Converte lista de nomes em instâncias de tool via TOOL_REGISTRY.
 
     Tool referenciada mas AUSENTE do registry NÃO é descartada em silêncio (isso faria o
     agente achar que a ação externa foi feita). Vira uma tool 'não configurada' que FALHA
-    EXPLÍCITO ao ser chamada — instruindo a configurar via MCP. Nunca finge sucesso."""
+    EXPLÍCITO ao ser chamada — instruindo a configurar via MCP. Nunca finge sucesso.
+    Resolvido uma vez por lista de nomes (cache invalidado junto com os agentes)."""
+    key = tuple(names or [])
+    cached = _TOOLS_CACHE.get(key)
+    if cached is not None:
+        return list(cached)
     out = []
     for name in names or []:
         inst = TOOL_REGISTRY.get(name)
@@ -2583,7 +2600,8 @@ def _resolve_tools(names):
             except Exception:
                 continue
         out.append(inst)
-    return out
+    _TOOLS_CACHE[key] = out
+    return list(out)
 
 
 def _agent_for_task(task_id: str) -> str:
@@ -2633,7 +2651,98 @@ def _build_task(task_id: str, agent: Agent, description: str) -> Task:
     )
 
 
+# ─── Cache de agentes ──────────────────────────────────────────────────────
+# Agent (e suas tools) é construído UMA vez por processo, no 1º uso, e reaproveitado.
+# Um Agent não atende duas kickoffs ao mesmo tempo (o Crew amarra estado nele), então
+# cada agent_id tem um pool: a task pega um livre ou constrói mais um, e devolve no fim.
+# agents.yaml/tasks.yaml alterados (mtime) → configs recarregadas e pools descartados.
+# O Crew NÃO é reaproveitado: carrega a Task com a descrição desta requisição.
+_AGENT_POOLS: Dict[str, list] = {{}}
+_CACHE_LOCK = threading.Lock()
+_GENERATION = 0
+STATS = {{"agents_built": 0, "agent_reuses": 0, "config_reloads": 0,
+         "build_ms": 0.0, "llm_ms": 0.0, "deterministic_ms": 0.0}}
+
+
+def _config_mtimes() -> Dict[str, Any]:
+    out = {{}}
+    for path in _CONFIG_FILES:
+        try:
+            out[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            out[path] = None
+    return out
+
+
+_CONFIG_MTIMES = _config_mtimes()
+
+
+def _reload_config_if_changed() -> None:
+    global _CONFIG_MTIMES, _GENERATION
+    current = _config_mtimes()
+    if current == _CONFIG_MTIMES:
+        return
+    with _CACHE_LOCK:
+        if current == _CONFIG_MTIMES:
+            return
+        try:
+            agents_cfg, tasks_cfg = _load_yaml("agents.yaml"), _load_yaml("tasks.yaml")
+        except Exception as exc:  # YAML no meio de uma edição: mantém o que está em uso
+            print(f"[ws] recarga de agents.yaml/tasks.yaml falhou ({{exc}}) — mantendo config atual")
+            return
+        AGENTS_CONFIG.clear()
+        AGENTS_CONFIG.update(agents_cfg)
+        TASKS_CONFIG.clear()
+        TASKS_CONFIG.update(tasks_cfg)
+        _AGENT_POOLS.clear()
+        _TOOLS_CACHE.clear()
+        _GENERATION += 1
+        _CONFIG_MTIMES = current
+        STATS["config_reloads"] += 1
+    print("[ws] agents.yaml/tasks.yaml alterados — agentes serão reconstruídos")
+
+
+def _acquire_agent(agent_id: str):
+    """(agent, geração, ms de construção — 0 se veio do pool)."""
+    with _CACHE_LOCK:
+        gen = _GENERATION
+        pool = _AGENT_POOLS.get(agent_id)
+        if pool:
+            STATS["agent_reuses"] += 1
+            return pool.pop(), gen, 0.0
+    t0 = time.perf_counter()
+    agent = _build_agent(agent_id)
+    build_ms = (time.perf_counter() - t0) * 1000
+    with _CACHE_LOCK:
+        STATS["agents_built"] += 1
+        STATS["build_ms"] += build_ms
+    return agent, gen, build_ms
+
+
+def _release_agent(agent_id: str, agent: Agent, gen: int) -> None:
+    with _CACHE_LOCK:
+        if gen == _GENERATION:  # agente de config antiga não volta ao pool
+            _AGENT_POOLS.setdefault(agent_id, []).append(agent)
+
+
+# ─── Concorrência ──────────────────────────────────────────────────────────
+# crew.kickoff e as funções determinísticas rodam num pool LIMITADO (TASK_WORKERS),
+# não no executor default (ilimitado). Backpressure: cada conexão aceita até
+# MAX_PENDING_TASKS tasks em andamento e o servidor até MAX_QUEUED_TASKS no total;
+# acima disso a task é recusada com task_rejected (o cliente tenta de novo depois).
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "4"))
+MAX_PENDING_TASKS = int(os.getenv("MAX_PENDING_TASKS", "16"))
+MAX_QUEUED_TASKS = int(os.getenv("MAX_QUEUED_TASKS", "64"))
+_EXECUTOR = ThreadPoolExecutor(max_workers=TASK_WORKERS, thread_name_prefix="task")
+_INFLIGHT = 0
+# request_id da task corrente — cada asyncio.Task tem o seu (contexto copiado na criação)
+_REQUEST_ID: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+
+
 async def _send(ws, msg_type: str, data: Any) -> None:
+    _rid = _REQUEST_ID.get()
+    if _rid is not None and isinstance(data, dict) and "request_id" not in data:
+        data = {{**data, "request_id": _rid}}
     # default=str serializa datetime/date/Decimal/UUID vindos do banco (SELECT *).
     await ws.send(json.dumps({{
         "type": msg_type,
@@ -2644,6 +2753,7 @@ async def _send(ws, msg_type: str, data: Any) -> None:
 
 async def _execute_task(ws, task_name: str, input_data: Dict[str, Any]) -> None:
     await _send(ws, "task_start", {{"task_name": task_name, "input_data": input_data}})
+    _reload_config_if_changed()
 
     # VERIFICAÇÃO (Inserção B / Fase 4): PRÉ-condição — o chamador deve fornecer os inputs
     # obrigatórios de contexto (FKs). Falta -> ERRO CLARO e cedo, sem executar/persistir.
@@ -2669,7 +2779,11 @@ async def _execute_task(ws, task_name: str, input_data: Dict[str, Any]) -> None:
         try:
             payload = input_data if isinstance(input_data, dict) else {{}}
             loop = asyncio.get_running_loop()
-            det_result = await loop.run_in_executor(None, det_fn, payload)
+            _t0 = time.perf_counter()
+            det_result = await loop.run_in_executor(_EXECUTOR, det_fn, payload)
+            _det_ms = (time.perf_counter() - _t0) * 1000
+            with _CACHE_LOCK:
+                STATS["deterministic_ms"] += _det_ms
             # VERIFICAÇÃO (Inserção B): PÓS-condição — a linha criada liga ao contexto CERTO.
             _vf = getattr(adapters_module, "_run_verifications", None)
             _fails = _vf(det_result, input_data, _verif) if (callable(_vf) and _verif) else []
@@ -2677,7 +2791,8 @@ async def _execute_task(ws, task_name: str, input_data: Dict[str, Any]) -> None:
                 await _send(ws, "error", {{"task_name": task_name,
                     "error": "verificação (pós) falhou: " + ", ".join(_fails), "verif_falha": _fails}})
                 return
-            await _send(ws, "task_completed", {{"task_name": task_name, "result": det_result}})
+            await _send(ws, "task_completed", {{"task_name": task_name, "result": det_result,
+                                                "timings": {{"deterministic_ms": round(_det_ms, 1)}}}})
         except Exception as _exc:
             await _send(ws, "error", {{"task_name": task_name, "error": str(_exc), "traceback": traceback.format_exc()}})
         return
@@ -2692,8 +2807,11 @@ async def _execute_task(ws, task_name: str, input_data: Dict[str, Any]) -> None:
         await _send(ws, "error", {{"task_name": task_name, "error": "task sem agente vinculado"}})
         return
 
+    _lease = None
+    _timings = {{"build_ms": 0.0, "llm_ms": 0.0, "deterministic_ms": 0.0}}
     try:
-        agent = _build_agent(agent_id)
+        agent, _gen, _timings["build_ms"] = _acquire_agent(agent_id)
+        _lease = (agent_id, agent, _gen)
 
         # Aplica input_func (extrai dados de input_data → kwargs)
         input_fn = getattr(adapters_module, f"{{task_name}}_input_func", None)
@@ -2751,7 +2869,9 @@ async def _execute_task(ws, task_name: str, input_data: Dict[str, Any]) -> None:
         crew = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=False)
 
         loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(None, crew.kickoff)
+        _t0 = time.perf_counter()
+        result = await loop.run_in_executor(_EXECUTOR, crew.kickoff)
+        _timings["llm_ms"] += (time.perf_counter() - _t0) * 1000
 
         raw = getattr(result, "raw", None) or str(result)
 
@@ -2778,8 +2898,10 @@ async def _execute_task(ws, task_name: str, input_data: Dict[str, Any]) -> None:
                          + ", ".join(_schema.get("required", [])) + ". Não escreva nada fora do JSON.")
                 try:
                     _t2 = _build_task(task_name, agent, description + _hint)
+                    _t0 = time.perf_counter()
                     _r2 = await loop.run_in_executor(
-                        None, Crew(agents=[agent], tasks=[_t2], process=Process.sequential, verbose=False).kickoff)
+                        _EXECUTOR, Crew(agents=[agent], tasks=[_t2], process=Process.sequential, verbose=False).kickoff)
+                    _timings["llm_ms"] += (time.perf_counter() - _t0) * 1000
                     _obj, _missing = _c2s(getattr(_r2, "raw", None) or str(_r2), _schema)
                 except Exception:
                     pass
@@ -2809,7 +2931,9 @@ async def _execute_task(ws, task_name: str, input_data: Dict[str, Any]) -> None:
                 _merged = dict(_base_in)
                 _merged.update(_reasoned)
                 _det_loop = asyncio.get_running_loop()
-                _det_res = await _det_loop.run_in_executor(None, det_fn, _merged)
+                _t0 = time.perf_counter()
+                _det_res = await _det_loop.run_in_executor(_EXECUTOR, det_fn, _merged)
+                _timings["deterministic_ms"] += (time.perf_counter() - _t0) * 1000
                 if isinstance(_det_res, dict):
                     if _det_res.get("status") == "erro":
                         await _send(ws, "error", {{"task_name": task_name,
@@ -2831,31 +2955,100 @@ async def _execute_task(ws, task_name: str, input_data: Dict[str, Any]) -> None:
                 "error": "verificação (pós) falhou: " + ", ".join(_fails), "verif_falha": _fails}})
             return
 
-        await _send(ws, "task_completed", {{"task_name": task_name, "result": parsed}})
+        with _CACHE_LOCK:
+            STATS["llm_ms"] += _timings["llm_ms"]
+            STATS["deterministic_ms"] += _timings["deterministic_ms"]
+        print(f"[ws] {{task_name}}: construção {{_timings['build_ms']:.0f}} ms, "
+              f"LLM {{_timings['llm_ms']:.0f}} ms, determinístico {{_timings['deterministic_ms']:.0f}} ms")
+        await _send(ws, "task_completed", {{"task_name": task_name, "result": parsed,
+                                            "timings": {{k: round(v, 1) for k, v in _timings.items()}}}})
+    except asyncio.CancelledError:
+        # kickoff cancelado pode seguir rodando no pool com este agente: não devolve ao pool
+        _lease = None
+        raise
     except Exception as exc:
         await _send(ws, "error", {{"task_name": task_name, "error": str(exc), "traceback": traceback.format_exc()}})
+    finally:
+        if _lease is not None:
+            _release_agent(*_lease)
 
 
-async def _handle_client(ws):
-    await _send(ws, "connected", {{"available_tasks": list(TASKS_CONFIG.keys())}})
-    async for message in ws:
-        try:
-            payload = json.loads(message)
-        except json.JSONDecodeError:
-            await _send(ws, "error", {{"error": "invalid JSON"}})
-            continue
+async def _run_request(ws, request_id: str, task_name: str, input_data: Dict[str, Any]) -> None:
+    _REQUEST_ID.set(request_id)
+    try:
+        await _execute_task(ws, task_name, input_data)
+    except websockets.ConnectionClosed:
+        pass
 
-        msg_type = payload.get("type")
-        data = payload.get("data") or {{}}
 
-        if msg_type == "execute_task":
-            await _execute_task(ws, data.get("task_name"), data.get("input_data") or {{}})
-        elif msg_type == "ping":
-            await _send(ws, "pong", {{"timestamp": datetime.utcnow().isoformat()}})
-        elif msg_type == "get_task_info":
-            await _send(ws, "task_info", {{"tasks": list(TASKS_CONFIG.keys())}})
-        else:
-            await _send(ws, "error", {{"error": f"unknown message type: {{msg_type}}"}})
+def _request_done(running: Dict[str, asyncio.Task], request_id: str, task: asyncio.Task) -> None:
+    global _INFLIGHT
+    _INFLIGHT -= 1
+    if running.get(request_id) is task:
+        del running[request_id]
+
+
+async def _handle_client(ws):
+    global _INFLIGHT
+    running: Dict[str, asyncio.Task] = {{}}
+    await _send(ws, "connected", {{"available_tasks": list(TASKS_CONFIG.keys()),
+                                  "max_pending_tasks": MAX_PENDING_TASKS}})
+    try:
+        async for message in ws:
+            try:
+                payload = json.loads(message)
+            except json.JSONDecodeError:
+                await _send(ws, "error", {{"error": "invalid JSON"}})
+                continue
+
+            msg_type = payload.get("type")
+            data = payload.get("data") or {{}}
+
+            if msg_type == "execute_task":
+                request_id = str(data.get("request_id") or uuid.uuid4())
+                task_name = data.get("task_name")
+                if request_id in running:
+                    await _send(ws, "error", {{"task_name": task_name, "request_id": request_id,
+                                              "error": "request_id já em execução"}})
+                elif len(running) >= MAX_PENDING_TASKS or _INFLIGHT >= MAX_QUEUED_TASKS:
+                    await _send(ws, "task_rejected", {{"task_name": task_name, "request_id": request_id,
+                                                      "error": "servidor ocupado — tente novamente",
+                                                      "retry_after": 2}})
+                else:
+                    _INFLIGHT += 1
+                    task = asyncio.create_task(
+                        _run_request(ws, request_id, task_name, data.get("input_data") or {{}}),
+                        name=str(task_name))
+                    running[request_id] = task
+                    task.add_done_callback(lambda t, rid=request_id: _request_done(running, rid, t))
+            elif msg_type == "cancel_task":
+                request_id = str(data.get("request_id"))
+                task = running.pop(request_id, None)
+                if task:
+                    # O que ainda não começou não roda mais (inclusive a persistência
+                    # determinística pós-kickoff e passos ainda na fila do pool). Um passo JÁ
+                    # rodando no pool não é interrompível: o kickoff termina e o resultado é
+                    # descartado; um det_fn termina e o que ele gravou continua gravado.
+                    task.cancel()
+                    await _send(ws, "task_cancelled", {{"task_name": task.get_name(), "request_id": request_id}})
+                else:
+                    await _send(ws, "error", {{"request_id": data.get("request_id"),
+                                              "error": "request_id desconhecido ou já concluído"}})
+            elif msg_type == "ping":
+                await _send(ws, "pong", {{"timestamp": datetime.utcnow().isoformat()}})
+            elif msg_type == "get_task_info":
+                with _CACHE_LOCK:  # retrato consistente (as threads do pool atualizam sob o lock)
+                    _stats = {{k: round(v, 1) for k, v in STATS.items()}}
+                    _stats["pooled_agents"] = {{k: len(v) for k, v in _AGENT_POOLS.items()}}
+                await _send(ws, "task_info", {{"tasks": list(TASKS_CONFIG.keys()),
+                                              "running": list(running.keys()),
+                                              "stats": _stats}})
+            else:
+                await _send(ws, "error", {{"error": f"unknown message type: {{msg_type}}"}})
+    finally:
+        # Conexão caiu: ninguém vai receber o resultado — cancela o que está pendente.
+        for task in list(running.values()):
+            task.cancel()
 
 
 async def run_websocket_server(host: str = "localhost", port: int = {ws_port}):
@@ -5444,6 +5637,102 @@ def _strip_std_mock_tools(tools_py: str) -> str:
     return out
 
 
+# Runtime de ws-server/mcp_tools.py: sessões MCP persistentes por servidor num event loop
+# dedicado (thread daemon) — o handshake initialize é feito uma vez, não a cada chamada de tool.
+# Sessão parada há mais de MCP_SESSION_IDLE_SECONDS é fechada; se a sessão cair no meio de
+# uma chamada, reconecta e tenta uma vez.
+_MCP_SESSION_RUNTIME = '''_LOOP = None
+_LOOP_LOCK = threading.Lock()
+_SESSIONS = {}  # (url, transport, headers) -> {"session", "closing", "task", "last"}
+_LOCKS = {}
+_IDLE = float(os.getenv("MCP_SESSION_IDLE_SECONDS", "300"))
+
+def _loop():
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, daemon=True, name="mcp-sessions").start()
+    return _LOOP
+
+async def _open(url, transport, headers):
+    """Abre a sessão numa task dona dos contextos (fecha ao sinalizar `closing`)."""
+    ready = asyncio.get_running_loop().create_future()
+    closing = asyncio.Event()
+    async def _owner():
+        from mcp import ClientSession
+        try:
+            if (transport or "sse") == "http":
+                from mcp.client.streamable_http import streamablehttp_client as _cli
+            else:
+                from mcp.client.sse import sse_client as _cli
+            async with _cli(url, headers=headers) as streams:
+                async with ClientSession(streams[0], streams[1]) as s:
+                    await s.initialize()
+                    if not ready.done():
+                        ready.set_result(s)
+                    await closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+        finally:
+            if not ready.done():
+                ready.set_exception(RuntimeError("sessão MCP encerrada"))
+    task = asyncio.ensure_future(_owner())
+    try:
+        session = await asyncio.wait_for(asyncio.shield(ready), 60)
+    except Exception:
+        closing.set()
+        raise
+    return {"session": session, "closing": closing, "task": task, "last": time.monotonic()}
+
+_DEAD_ERRORS = ("ClosedResourceError", "BrokenResourceError", "EndOfStream")
+
+def _session_dead(e, exc):
+    """Sessão morta: task dona encerrada ou erro de conexão/recurso fechado."""
+    return (e["task"].done() or isinstance(exc, (ConnectionError, EOFError))
+            or type(exc).__name__ in _DEAD_ERRORS)
+
+async def _call_async(url, transport, headers, tool, args):
+    key = (url, transport or "sse", json.dumps(headers or {}, sort_keys=True))
+    now = time.monotonic()
+    for k, e in list(_SESSIONS.items()):
+        if e["task"].done() or now - e["last"] > _IDLE:
+            _SESSIONS.pop(k, None)
+            e["closing"].set()
+    for attempt in (1, 2):
+        async with _LOCKS.setdefault(key, asyncio.Lock()):
+            e = _SESSIONS.get(key)
+            if e is None:
+                e = _SESSIONS[key] = await _open(url, transport, headers)
+        try:
+            res = await e["session"].call_tool(tool, args or {})
+            e["last"] = time.monotonic()
+            return "\\n".join(getattr(c, "text", None) or str(c) for c in res.content)
+        except Exception as exc:
+            # Erro da própria tool (sessão viva) sobe já: não repete chamadas não idempotentes
+            if attempt == 2 or not _session_dead(e, exc):
+                raise
+            if _SESSIONS.get(key) is e:
+                _SESSIONS.pop(key, None)
+            e["closing"].set()
+
+def _mcp_call(url, transport, tool, cred_env, args):
+    """Chama uma tool MCP e devolve o texto do resultado."""
+    headers = None
+    raw = os.getenv(cred_env)
+    if raw:
+        try: headers = json.loads(raw)
+        except Exception: headers = None
+    try:
+        fut = asyncio.run_coroutine_threadsafe(_call_async(url, transport, headers, tool, args), _loop())
+        return fut.result(timeout=float(os.getenv("MCP_CALL_TIMEOUT", "300")))
+    except Exception as e:
+        return json.dumps({"mcp_error": str(e)})
+
+'''
+
+
 def _generate_mcp_tools_py(assignments: list) -> str:
     """Emite ws-server/mcp_tools.py: um BaseTool CrewAI por tool MCP atribuída, que chama
     a ferramenta no servidor MCP via cliente `mcp` (SSE/HTTP). Registra em MCP_TOOLS."""
@@ -5467,39 +5756,15 @@ def _generate_mcp_tools_py(assignments: list) -> str:
         registry.append(f'    {json.dumps(tname)}: {cls}(),')
     return (
         '"""Tools MCP (Model Context Protocol) — auto-gerado pelo LangNet (F2 Fase 3).\n'
-        'Cada tool chama uma ferramenta de um servidor MCP via cliente `mcp` (SSE/HTTP).\n'
+        'Cada tool chama uma ferramenta de um servidor MCP via cliente `mcp` (SSE/HTTP),\n'
+        'reaproveitando a sessão do servidor (loop dedicado em thread; despejo por ociosidade).\n'
         'Credenciais (se houver) vêm de variáveis de ambiente MCP_CRED_<id> (JSON de headers)."""\n'
-        'import os, json, asyncio\n'
+        'import os, json, asyncio, threading, time\n'
         'from pydantic import BaseModel, ConfigDict\n'
         'from crewai.tools import BaseTool\n\n'
         'class _MCPArgs(BaseModel):\n'
         '    model_config = ConfigDict(extra="allow")\n\n'
-        'def _mcp_call(url, transport, tool, cred_env, args):\n'
-        '    """Chama uma tool MCP e devolve o texto do resultado."""\n'
-        '    headers = None\n'
-        '    raw = os.getenv(cred_env)\n'
-        '    if raw:\n'
-        '        try: headers = json.loads(raw)\n'
-        '        except Exception: headers = None\n'
-        '    async def _c():\n'
-        '        from mcp import ClientSession\n'
-        '        if (transport or "sse") == "http":\n'
-        '            from mcp.client.streamable_http import streamablehttp_client as _cli\n'
-        '            async with _cli(url, headers=headers) as (r, w, _):\n'
-        '                return await _run_call(r, w, tool, args)\n'
-        '        from mcp.client.sse import sse_client\n'
-        '        async with sse_client(url, headers=headers) as (r, w):\n'
-        '            return await _run_call(r, w, tool, args)\n'
-        '    try:\n'
-        '        return asyncio.run(_c())\n'
-        '    except Exception as e:\n'
-        '        return json.dumps({"mcp_error": str(e)})\n\n'
-        'async def _run_call(read, write, tool, args):\n'
-        '    from mcp import ClientSession\n'
-        '    async with ClientSession(read, write) as s:\n'
-        '        await s.initialize()\n'
-        '        res = await s.call_tool(tool, args or {})\n'
-        '        return "\\n".join(getattr(c, "text", None) or str(c) for c in res.content)\n\n'
+        + _MCP_SESSION_RUNTIME
         + "\n".join(classes) + "\n\n"
         + "MCP_TOOLS = {\n" + "\n".join(registry) + "\n}\n"
     )
@@ -6579,12 +6844,14 @@ def _template_ws_client(ws_port: int) -> str:
         '    let ws;\n'
         '    try { ws = new WebSocket(WS_URL); } catch (e) { reject(e); return; }\n'
         '    const timer = setTimeout(() => { try { ws.close(); } catch (e) {} reject(new Error("timeout")); }, 300000);\n'
-        '    ws.onopen = () => ws.send(JSON.stringify({ type: "execute_task", data: { task_name: taskName, input_data: inputData || {} } }));\n'
+        '    const requestId = Date.now().toString(36) + Math.random().toString(36).slice(2, 8);\n'
+        '    ws.onopen = () => ws.send(JSON.stringify({ type: "execute_task", data: { task_name: taskName, input_data: inputData || {}, request_id: requestId } }));\n'
         '    ws.onmessage = (ev) => {\n'
         '      let m; try { m = JSON.parse(ev.data); } catch (e) { return; }\n'
+        '      if (m.data && m.data.request_id && m.data.request_id !== requestId) return;\n'
         '      if (m.type === "task_completed" || m.type === "task_result") {\n'
         '        clearTimeout(timer); ws.close(); resolve(m.data && m.data.result !== undefined ? m.data.result : (m.data || {}));\n'
-        '      } else if (m.type === "error") {\n'
+        '      } else if (m.type === "error" || m.type === "task_rejected" || m.type === "task_cancelled") {\n'
         '        clearTimeout(timer); ws.close(); reject(new Error((m.data && m.data.error) || "erro na task"));\n'
         '      }\n'
         '    };\n'
@@ -8330,19 +8597,21 @@ TASK_REGISTRY = {
         "input_func": analyze_document_input_func,
         "output_func": analyze_document_output_func,
         "requires": [],
-        "produces": ["document_content", "document_structure", "document_metadata"],
+        "produces": ["document_content", "document_structure", "document_metadata", "document_analysis_json"],
         "agent": AGENTS["document_analyst"],
         "tools": [LANGNET_TOOLS["document_reader"]],
-        "phase": "document_analysis"
+        "phase": "document_analysis",
+        "map_reduce": "analysis"  # conteúdo grande → MAP por trechos + merge (langnetmapreduce)
     },
     "extract_requirements": {
         "input_func": extract_requirements_input_func,
         "output_func": extract_requirements_output_func,
-        "requires": ["document_content"],
+        "requires": ["document_content", "document_analysis_json"],
         "produces": ["requirements_json", "requirements_data"],
         "agent": AGENTS["requirements_engineer"],
         "tools": [],
-        "phase": "requirements_extraction"
+        "phase": "requirements_extraction",
+        "map_reduce": "requirements"
     },
     "research_additional_info": {
         "input_func": research_additional_info_input_func,
@@ -8353,9 +8622,11 @@ TASK_REGISTRY = {
         "tools": [
             LANGNET_TOOLS["serpapi_search"],  # DuckDuckGo for general searches
             LANGNET_TOOLS["tavily_search"],   # Tavily for deep research
-            LANGNET_TOOLS["serper_search"]    # Google for specific/regulatory info
+            LANGNET_TOOLS["serper_search"],   # Google for specific/regulatory info
+            LANGNET_TOOLS["multi_search"]     # many queries × engines concurrently
         ],
-        "phase": "requirements_extraction"
+        "phase": "requirements_extraction",
+        "cache": False  # pesquisa web ao vivo — resultado muda com o tempo
     },
     "enrich_requirements": {
         "input_func": enrich_requirements_input_func,
@@ -8378,8 +8649,8 @@ TASK_REGISTRY = {
     "generate_document": {
         "input_func": generate_document_input_func,
         "output_func": generate_document_output_func,
-        "requires": ["enriched_requirements", "quality_validation"],
-        "produces": ["requirements_document_md", "validation_data"],
+        "requires": ["enriched_requirements", "quality_validation", "research_findings_json"],
+        "produces": ["requirements_document_md", "validation_data", "document_metadata"],
         "agent": AGENTS["requirements_validator"],
         "tools": [],
         "phase": "requirements_extraction"
@@ -8470,9 +8741,11 @@ TASK_REGISTRY = {
         "tools": [
             LANGNET_TOOLS["tavily_search"],
             LANGNET_TOOLS["serpapi_search"],
-            LANGNET_TOOLS["serper_search"]
+            LANGNET_TOOLS["serper_search"],
+            LANGNET_TOOLS["multi_search"]
         ],
-        "phase": "specification_generation"
+        "phase": "specification_generation",
+        "cache": False  # pesquisa web ao vivo — resultado muda com o tempo
     },
     "compose_spec_use_cases": {
         "input_func": compose_spec_use_cases_input_func,
@@ -8535,6 +8808,104 @@ TASK_REGISTRY = {
 # EXECUTOR FUNCTIONS
 # ============================================================================
 
+def _publish_task_outcome(
+    task_name: str,
+    state: LangNetFullState,
+    errors_before: int
+) -> None:
+    """Evento task_completed/task_failed + progresso para o canal de streaming."""
+    channel = state.get("stream_channel")
+    if not channel:
+        return
+    errors = state.get("errors") or []
+    if len(errors) > errors_before:
+        last = errors[-1]
+        notify_event(channel, {
+            "type": "task_failed",
+            "task": task_name,
+            "error": last.get("error_message", last.get("error")) if isinstance(last, dict) else str(last),
+            "timestamp": datetime.now().isoformat()
+        })
+    else:
+        completed = next(
+            (log for log in reversed(state.get("execution_log") or [])
+             if log.get("task") == task_name and log.get("status") == "completed"),
+            {}
+        )
+        notify_event(channel, {
+            "type": "task_completed",
+            "task": task_name,
+            "output_preview": completed.get("output_preview", ""),
+            "timestamp": datetime.now().isoformat()
+        })
+    notify_event(channel, {
+        "type": "progress",
+        "percentage": state.get("progress_percentage", 0.0),
+        "completed_tasks": state.get("completed_tasks", 0),
+        "total_tasks": state.get("total_tasks", 0),
+        "current_task": task_name,
+        "current_phase": state.get("current_phase")
+    })
+
+
+_MAP_REDUCE_OUTPUT_KEYS = {"analysis": "document_analysis_json", "requirements": "requirements_json"}
+
+
+def _execute_map_reduce(
+    task_name: str,
+    context_state: LangNetFullState,
+    groups: List[str],
+    verbose_callback: Optional[Callable[[str], None]] = None
+) -> str:
+    """MAP: roda a task em cada trecho do conteúdo, em paralelo (LANGNET_MAP_WORKERS);
+    REDUCE: funde e deduplica as saídas (langnetmapreduce). Retorna o JSON fundido.
+    Trechos que falham ou não devolvem JSON são registrados em map_reduce.failed_groups;
+    se nenhum trecho der certo, levanta."""
+    import copy
+    from concurrent.futures import ThreadPoolExecutor
+    from .langnetmapreduce import MAP_WORKERS, group_header, reduce_results
+
+    kind = TASK_REGISTRY[task_name]["map_reduce"]
+    output_key = _MAP_REDUCE_OUTPUT_KEYS[kind]
+    channel = context_state.get("stream_channel")
+    total = len(groups)
+    print(f"[MAP-REDUCE] '{task_name}': {len(context_state.get('document_content', ''))} chars "
+          f"→ {total} trechos ({MAP_WORKERS} em paralelo)")
+    if verbose_callback:
+        verbose_callback(f"Map-reduce: {task_name} em {total} trechos")
+
+    # Sem stream_channel nos sub-estados: deltas de vários trechos intercalados não fazem
+    # sentido no chat, e cada trecho publicaria task_started/task_completed próprios.
+    base = copy.deepcopy({k: v for k, v in context_state.items() if k != "document_content"})
+    base.pop("stream_channel", None)
+    base["_map_group"] = True
+
+    def _map(index: int, content: str) -> str:
+        sub = copy.deepcopy(base)
+        sub["document_content"] = group_header(index, total) + content
+        sub["errors"] = []
+        sub_state = execute_task_with_context(task_name, sub)
+        notify_event(channel, {
+            "type": "map_progress",
+            "task": task_name,
+            "group": index,
+            "groups": total,
+            "ok": not sub_state.get("errors"),
+            "timestamp": datetime.now().isoformat()
+        })
+        return "" if sub_state.get("errors") else (sub_state.get(output_key) or "")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(MAP_WORKERS, total))) as pool:
+        outputs = list(pool.map(lambda args: _map(*args), enumerate(groups, 1)))
+
+    merged, failed = reduce_results(kind, outputs, repair=_repair_json)
+    if not merged:
+        raise RuntimeError(f"map-reduce de '{task_name}': nenhum dos {total} trechos retornou JSON válido")
+    merged["map_reduce"] = {"groups": total, "failed_groups": failed}
+    print(f"[MAP-REDUCE] '{task_name}': merge de {total - len(failed)}/{total} trechos")
+    return json.dumps(merged, ensure_ascii=False)
+
+
 def execute_task_with_context(
     task_name: str,
     context_state: LangNetFullState,
@@ -8557,8 +8928,16 @@ def execute_task_with_context(
     task_config = TASK_REGISTRY[task_name]
 
     # Log task start
+    # log_task_* fazem append in-place: conta os erros antes para saber o desfecho
+    _errors_before = len(context_state.get("errors") or [])
     context_state = log_task_start(context_state, task_name)
     context_state["current_phase"] = task_config["phase"]
+    notify_event(context_state.get("stream_channel"), {
+        "type": "task_started",
+        "task": task_name,
+        "phase": task_config["phase"],
+        "timestamp": datetime.now().isoformat()
+    })
 
     if verbose_callback:
         verbose_callback(f"Starting task: {task_name}")
@@ -8575,12 +8954,25 @@ def execute_task_with_context(
                 print(f"\n{'='*80}")
                 print(f"[VALIDATION ERROR] {error_msg}")
                 print(f"{'='*80}\n")
-                return {
+                failed_state = {
                     **context_state,
                     "errors": context_state.get("errors", []) + [error_msg],
                     "status": "failed",
                     "last_error": error_msg
                 }
+                _publish_task_outcome(task_name, failed_state, _errors_before)
+                return failed_state
+
+        # Conteúdo que não cabe num prompt: MAP por trechos em paralelo + REDUCE
+        # determinístico, em vez de mandar tudo (e ter a resposta truncada).
+        if task_config.get("map_reduce") and not context_state.get("_map_group"):
+            from .langnetmapreduce import split_document_groups
+            groups = split_document_groups(context_state.get("document_content", ""))
+            if groups:
+                merged_json = _execute_map_reduce(task_name, context_state, groups, verbose_callback)
+                updated_context = task_config["output_func"](context_state, merged_json)
+                _publish_task_outcome(task_name, updated_context, _errors_before)
+                return updated_context
 
         if verbose_callback:
             verbose_callback(f"Task input: {json.dumps(task_input, indent=2)[:200]}")
@@ -8693,9 +9085,26 @@ def execute_task_with_context(
                 return crew.executar(inputs={})
             raise AttributeError(f"Team object has neither 'kickoff' nor 'executar' method: {type(crew).__name__}")
 
+        _provider_now = (os.getenv("LLM_PROVIDER", "openai") or "").lower()
+        _use_direct = _provider_now == "lmstudio" and not tools_list
+
+        # Cache de respostas (endereçado por conteúdo): mesma descrição + persona + modelo
+        # → mesma resposta. Re-execuções/retries do pipeline não pagam a chamada de novo.
+        _cache = get_llm_cache()
+        _cache_key = None
+        if _cache.enabled and task_config.get("cache", True) and context_state.get("llm_cache", True):
+            _c_provider, _c_model, _c_temp = _llm_cache_identity(agent, _use_direct)
+            _cache_key = make_cache_key(_c_provider, _c_model, _agent_system_prompt(agent),
+                                        task_description, task_expected_output, _c_temp)
+        _cached = _cache.get(_cache_key) if _cache_key else None
+
         try:
-            _provider_now = (os.getenv("LLM_PROVIDER", "openai") or "").lower()
-            if _provider_now == "lmstudio" and not tools_list:
+            if _cached is not None:
+                print(f"[LLM-CACHE] HIT '{task_name}' — {len(_cached)} chars (key={_cache_key[:12]})")
+                if verbose_callback:
+                    verbose_callback(f"Cache hit: {task_name}")
+                result = _DirectResult(_cached)
+            elif _use_direct:
                 # Task SEM tools no LLM local: via DIRETA em streaming — evita o estol do
                 # litellm/httpx do CrewAI em respostas LONGAS (recebe parte e trava). Tasks
                 # COM tools seguem pelo CrewAI (precisam da orquestração de tool-calling).
@@ -8703,20 +9112,11 @@ def execute_task_with_context(
                 # Persona do agente (role/goal/backstory) como system prompt — replica o que o
                 # CrewAI enviaria. SEM ela, o modelo ignora os dados reais (ex.: fluxo agêntico
                 # do domínio) e preenche o template com conteúdo genérico/CRUD.
-                _sys = ""
-                try:
-                    _role = getattr(agent, "role", "") or ""
-                    _goal = getattr(agent, "goal", "") or ""
-                    _back = getattr(agent, "backstory", "") or ""
-                    _parts_sys = []
-                    if _role: _parts_sys.append(f"You are {_role.strip()}.")
-                    if _back: _parts_sys.append(_back.strip())
-                    if _goal: _parts_sys.append(f"Your personal goal: {_goal.strip()}")
-                    _parts_sys.append("Baseie-se ESTRITAMENTE nos dados fornecidos (documento, requisitos, contexto). NÃO invente conteúdo genérico nem substitua o domínio real por um template padrão.")
-                    _sys = "\n\n".join(_parts_sys)
-                except Exception:
-                    _sys = ""
-                _direct = _direct_llm_complete(task_description, task_expected_output, system=_sys)
+                _sys = _agent_system_prompt(agent)
+                _stream_channel = context_state.get("stream_channel")
+                _direct = _direct_llm_complete(task_description, task_expected_output, system=_sys,
+                                               on_delta=delta_callback(_stream_channel, task_name))
+                notify_done(_stream_channel, task_name, _direct or "")
                 if not _direct or len(_direct) < 20:
                     print(f"[DIRECT] resposta curta/vazia ({len(_direct or '')} chars) — tentando CrewAI")
                     result = _run_crew()
@@ -8731,7 +9131,9 @@ def execute_task_with_context(
             print(f"[FALLBACK-DBG] crew levantou em '{task_name}': type={type(_kick_err).__name__} provider={_provider!r} msg={_msg[:120]!r}")
             if _provider == "lmstudio" and ("None or empty" in _msg or "Invalid response from LLM" in _msg or "empty" in _msg.lower()):
                 print(f"[FALLBACK] CrewAI vazio em '{task_name}' — usando chamada DIRETA ao LM Studio")
-                _direct = _direct_llm_complete(task_description, task_expected_output)
+                _direct = _direct_llm_complete(task_description, task_expected_output,
+                                               on_delta=delta_callback(context_state.get("stream_channel"), task_name))
+                notify_done(context_state.get("stream_channel"), task_name, _direct or "")
                 if not _direct or len(_direct) < 20:
                     raise
                 print(f"[FALLBACK] chamada direta OK — {len(_direct)} chars")
@@ -8760,9 +9162,18 @@ def execute_task_with_context(
         # 4. Update context state
         updated_context = task_config["output_func"](context_state, result)
 
+        # Só cacheia resposta válida (JSON quando a task pede JSON) que o output_func aceitou
+        # sem registrar erro novo — senão um retry repetiria exatamente a mesma saída ruim.
+        if _cache_key and _cached is None:
+            _raw = getattr(result, "raw", None)
+            if (is_cacheable_response(_raw, task_expected_output)
+                    and len(updated_context.get("errors", []) or []) == len(context_state.get("errors", []) or [])):
+                _cache.put(_cache_key, _raw, task_name=task_name)
+
         if verbose_callback:
             verbose_callback(f"Task completed: {task_name}")
 
+        _publish_task_outcome(task_name, updated_context, _errors_before)
         return updated_context
 
     except Exception as e:
@@ -8782,7 +9193,60 @@ def execute_task_with_context(
         print(full_traceback)
         print(f"{'='*80}\n")
 
-        return log_task_error(context_state, task_name, e)
+        failed_state = log_task_error(context_state, task_name, e)
+        _publish_task_outcome(task_name, failed_state, _errors_before)
+        return failed_state
+
+
+# Ordem do pipeline completo (NOW WITH 12 TASKS!)
+FULL_PIPELINE_TASKS = [
+    "analyze_document",
+    "extract_requirements",
+    "research_additional_info",  # Web research
+    "enrich_requirements",      # NEW: Validate completeness + AI suggestions (replaces validate_requirements)
+    "validate_quality",          # NEW: Quality validation + gap analysis
+    "generate_document",         # NEW: Generate final markdown document
+    "generate_specification",
+    "suggest_agents",
+    "decompose_tasks",
+    "design_petri_net",
+    "generate_yaml_files",
+    "generate_python_code"
+]
+
+
+def _run_pipeline_tasks(
+    state: LangNetFullState,
+    pipeline_tasks: List[str],
+    verbose_callback: Optional[Callable[[str], None]] = None,
+    execution_id: Optional[str] = None,
+    max_workers: Optional[int] = None
+) -> LangNetFullState:
+    """Executa as tasks pelo escalonador de dependências; com execution_id, grava
+    checkpoint após cada task concluída (na ordem original)."""
+    def _checkpoint(task_name: str, task_state: LangNetFullState) -> None:
+        if not execution_id:
+            return
+        try:
+            save_checkpoint(execution_id, task_name, task_state)
+        except Exception as _ck_err:
+            # Checkpoint é best-effort — falha de disco não derruba o pipeline
+            print(f"[CHECKPOINT] falha ao gravar '{task_name}': {_ck_err}")
+
+    state = execute_task_dag(
+        pipeline_tasks,
+        state,
+        execute_task_with_context,
+        TASK_REGISTRY,
+        max_workers=max_workers,
+        verbose_callback=verbose_callback,
+        on_task_done=_checkpoint
+    )
+
+    # Mark completion
+    state["completed_at"] = datetime.now().isoformat()
+
+    return state
 
 
 def execute_full_pipeline(
@@ -8791,7 +9255,10 @@ def execute_full_pipeline(
     document_path: str,
     framework_choice: str = "crewai",
     additional_instructions: str = "",
-    verbose_callback: Optional[Callable[[str], None]] = None
+    verbose_callback: Optional[Callable[[str], None]] = None,
+    execution_id: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    stream_channel: Optional[str] = None
 ) -> LangNetFullState:
     """
     Execute the complete LangNet pipeline
@@ -8809,6 +9276,12 @@ def execute_full_pipeline(
         framework_choice: Target framework (crewai, autogen, langgraph)
         additional_instructions: Custom instructions from user
         verbose_callback: Optional callback for progress updates
+        execution_id: If given, state is checkpointed after each task so the
+            run can be continued with resume_full_pipeline()
+        max_workers: Concurrent tasks for independent steps (default:
+            LANGNET_TASK_WORKERS, 1 = strictly sequential)
+        stream_channel: Name of a registered stream sink (see langnetstream)
+            that receives LLM deltas and task events
 
     Returns:
         Final context state with all results
@@ -8822,39 +9295,74 @@ def execute_full_pipeline(
         additional_instructions=additional_instructions
     )
 
-    # Define execution order (NOW WITH 12 TASKS!)
-    pipeline_tasks = [
-        "analyze_document",
-        "extract_requirements",
-        "research_additional_info",  # Web research
-        "enrich_requirements",      # NEW: Validate completeness + AI suggestions (replaces validate_requirements)
-        "validate_quality",          # NEW: Quality validation + gap analysis
-        "generate_document",         # NEW: Generate final markdown document
-        "generate_specification",
-        "suggest_agents",
-        "decompose_tasks",
-        "design_petri_net",
-        "generate_yaml_files",
-        "generate_python_code"
-    ]
+    if execution_id:
+        start_checkpointing(execution_id, FULL_PIPELINE_TASKS, params={
+            "project_id": project_id,
+            "document_id": document_id,
+            "document_path": document_path,
+            "framework_choice": framework_choice,
+            "additional_instructions": additional_instructions,
+        })
+    if stream_channel:
+        state["stream_channel"] = stream_channel
+
+    return _run_pipeline_tasks(state, FULL_PIPELINE_TASKS, verbose_callback, execution_id, max_workers)
+
+
+def resume_full_pipeline(
+    execution_id: str,
+    verbose_callback: Optional[Callable[[str], None]] = None,
+    max_workers: Optional[int] = None,
+    stream_channel: Optional[str] = None
+) -> LangNetFullState:
+    """
+    Resume a checkpointed full pipeline from the first task not yet completed
 
-    # Execute each task sequentially
-    for task_name in pipeline_tasks:
-        if verbose_callback:
-            verbose_callback(f"\n{'='*60}\nExecuting: {task_name}\n{'='*60}")
+    Args:
+        execution_id: Execution whose checkpoints should be used
+        verbose_callback: Optional callback for progress updates
+        max_workers: Concurrent tasks for independent steps
+        stream_channel: Name of a registered stream sink (see langnetstream)
 
-        state = execute_task_with_context(task_name, state, verbose_callback)
+    Returns:
+        Final context state with all results
+    """
+    info = get_checkpoint_info(execution_id)
+    if not info:
+        raise ValueError(f"No checkpoints found for execution '{execution_id}'")
 
-        # Check for errors
-        if state.get("errors") and len(state["errors"]) > 0:
-            if verbose_callback:
-                verbose_callback(f"Pipeline stopped due to error in {task_name}")
-            break
+    pipeline_tasks = info.get("tasks") or FULL_PIPELINE_TASKS
+    next_task = info.get("next_task")
+    state = load_checkpoint(execution_id)
 
-    # Mark completion
-    state["completed_at"] = datetime.now().isoformat()
+    if state is None:
+        # Nenhuma task concluída — recomeça do zero com os mesmos parâmetros
+        if verbose_callback:
+            verbose_callback("No completed task in checkpoint — restarting pipeline")
+        return execute_full_pipeline(
+            **(info.get("params") or {}),
+            verbose_callback=verbose_callback,
+            execution_id=execution_id,
+            max_workers=max_workers,
+            stream_channel=stream_channel
+        )
 
-    return state
+    if next_task is None:
+        if verbose_callback:
+            verbose_callback("Pipeline already completed — nothing to resume")
+        return state
+
+    remaining = pipeline_tasks[pipeline_tasks.index(next_task):]
+    if verbose_callback:
+        verbose_callback(f"Resuming after '{info.get('last_task')}' — {len(remaining)} task(s) left")
+
+    state["resumed_from"] = info.get("last_task")
+    state["completed_at"] = None
+    # O canal gravado no checkpoint é o da execução anterior
+    state.pop("stream_channel", None)
+    if stream_channel:
+        state["stream_channel"] = stream_channel
+    return _run_pipeline_tasks(state, remaining, verbose_callback, execution_id, max_workers)
 
 
 # Note: init_full_state is imported from langnetstate.py
@@ -8876,7 +9384,9 @@ def execute_document_analysis_workflow(
     document_type: str = "pdf",
     use_deepseek: bool = False,
     document_content: str = "",
-    enable_web_research: bool = True
+    enable_web_research: bool = True,
+    max_workers: Optional[int] = None,
+    stream_channel: Optional[str] = None
 ) -> LangNetFullState:
     """
     Execute only document analysis workflow
@@ -8893,6 +9403,9 @@ def execute_document_analysis_workflow(
         use_deepseek: If True, uses DeepSeek LLM; if False, uses OpenAI GPT-4
         document_content: Pre-extracted and chunked document content (optional)
         enable_web_research: If True, enables web research for additional context (default: True)
+        max_workers: Concurrent tasks for independent steps (default: LANGNET_TASK_WORKERS)
+        stream_channel: Name of a registered stream sink (see langnetstream) that
+            receives LLM output deltas while each task is generating
 
     Returns:
         Final state with requirements document
@@ -8926,6 +9439,8 @@ def execute_document_analysis_workflow(
 
     # Add DeepSeek flag to state
     state["use_deepseek"] = use_deepseek
+    if stream_channel:
+        state["stream_channel"] = stream_channel
 
     print(f"\n{'='*80}")
     print(f"[PHASE 2] About to execute analyze_document task")
@@ -8933,20 +9448,28 @@ def execute_document_analysis_workflow(
     print(f"{'='*80}\n")
 
     # Execute workflow tasks
-    state = execute_task_with_context("analyze_document", state)
-    state = execute_task_with_context("extract_requirements", state)
+    workflow_tasks = ["analyze_document", "extract_requirements"]
 
     # Web research task (can be enabled/disabled via parameter)
     if enable_web_research:
         print(f"\n🌐 Web research HABILITADA - Buscando best practices e padrões da indústria...")
-        state = execute_task_with_context("research_additional_info", state)
+        workflow_tasks.append("research_additional_info")
     else:
         print(f"\n⏭️  Web research DESABILITADA - Pulando pesquisa complementar...")
 
     # Dividido em 3 tasks para reduzir tamanho do prompt e evitar timeouts
-    state = execute_task_with_context("enrich_requirements", state)
-    state = execute_task_with_context("validate_quality", state)
-    state = execute_task_with_context("generate_document", state)
+    workflow_tasks += ["enrich_requirements", "validate_quality", "generate_document"]
+
+    # Sem parar no erro (comportamento histórico deste workflow): cada task segue
+    # com o que houver no estado.
+    state = execute_task_dag(
+        workflow_tasks,
+        state,
+        execute_task_with_context,
+        TASK_REGISTRY,
+        max_workers=max_workers,
+        stop_on_error=False
+    )
 
     return state
 
@@ -8976,7 +9499,8 @@ def execute_specification_workflow(
     target_audience: str = "mixed",
     use_deepseek: bool = False,
     wireframe_format: str = 'ascii',
-    verbose_callback: Optional[Callable[[str], None]] = None
+    verbose_callback: Optional[Callable[[str], None]] = None,
+    max_workers: Optional[int] = None
 ) -> LangNetFullState:
     """
     Execute the multi-step specification generation workflow following Generative Computing principles.
@@ -9002,6 +9526,7 @@ def execute_specification_workflow(
         target_audience: Target audience ("technical", "business", "mixed")
         use_deepseek: If True, uses DeepSeek LLM; if False, uses configured LLM
         verbose_callback: Optional callback for progress updates
+        max_workers: Concurrent tasks for independent steps (default: LANGNET_TASK_WORKERS)
 
     Returns:
         Final state with specification document in spec_document_md
@@ -9043,25 +9568,12 @@ def execute_specification_workflow(
         "render_final_specification"          # Step 9: Formatter - render final document
     ]
 
-    # Execute each task sequentially
-    for i, task_name in enumerate(spec_pipeline_tasks, 1):
-        if verbose_callback:
-            verbose_callback(f"\n[Step {i}/9] Executing: {task_name}")
-
+    # Log intermediate progress (chamado na ordem original, após cada task concluída)
+    def _log_spec_step(task_name: str, state: LangNetFullState) -> None:
+        i = spec_pipeline_tasks.index(task_name) + 1
         print(f"\n{'='*80}")
-        print(f"[SPECIFICATION] Step {i}/9: {task_name}")
+        print(f"[SPECIFICATION] Step {i}/9 done: {task_name}")
         print(f"{'='*80}\n")
-
-        state = execute_task_with_context(task_name, state, verbose_callback)
-
-        # Check for errors
-        if state.get("errors") and len(state["errors"]) > 0:
-            print(f"\n⚠️  [SPECIFICATION] Pipeline stopped due to error in {task_name}")
-            if verbose_callback:
-                verbose_callback(f"Pipeline stopped due to error in {task_name}")
-            break
-
-        # Log intermediate progress
         if verbose_callback:
             if task_name == "classify_specification_intent":
                 verbose_callback(f"   Intent: {state.get('spec_intent', 'N/A')}, Scope: {state.get('spec_scope', 'N/A')}")
@@ -9083,6 +9595,20 @@ def execute_specification_workflow(
             elif task_name == "render_final_specification":
                 verbose_callback(f"   Final status: {state.get('spec_status', 'N/A')}")
 
+    # Tasks independentes (ex.: research_specification_context e compose_spec_use_cases,
+    # ambas só dependem de spec_entities_json) podem rodar em paralelo com max_workers > 1
+    state = execute_task_dag(
+        spec_pipeline_tasks,
+        state,
+        execute_task_with_context,
+        TASK_REGISTRY,
+        max_workers=max_workers,
+        verbose_callback=verbose_callback,
+        on_task_done=_log_spec_step
+    )
+    if state.get("errors") and len(state["errors"]) > 0:
+        print(f"\n⚠️  [SPECIFICATION] Pipeline stopped due to error in {state['errors'][-1].get('task')}")
+
     # Mark completion
     state["completed_at"] = datetime.now().isoformat()
 
@@ -0,0 +1,176 @@
+"""
+LangNet — Cache persistente de respostas de LLM (endereçado por conteúdo).
+
+Cada chamada de `execute_task_with_context` reenvia ao provider a descrição já
+formatada da task. Em re-execuções (retry após falha mais adiante no pipeline,
+rodar de novo pela UI) a MESMA descrição, com a MESMA persona e o MESMO modelo,
+chega ao LLM — e num 32B local isso custa 10+ min por task.
+
+A chave é o SHA-256 de (provider, modelo, persona/system, descrição formatada,
+expected_output, temperatura): qualquer mudança no documento, nas instruções ou
+no agente gera outra chave, então não há invalidação manual a fazer.
+
+Backend: SQLite num arquivo local (~/.langnet-cache/llm/responses.sqlite3), via
+o armazenamento compartilhado de langnetkvstore, com
+  - TTL por entrada (LANGNET_LLM_CACHE_TTL, segundos; 0 = sem expiração)
+  - teto de tamanho com despejo LRU por último acesso (LANGNET_LLM_CACHE_MAX_MB)
+  - contadores de hit/miss/write/eviction em memória (stats()).
+
+Desligar globalmente: LANGNET_LLM_CACHE=0. Por task: "cache": False no
+TASK_REGISTRY. Por execução: state["llm_cache"] = False.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .langnetkvstore import SQLiteKVStore
+
+
+_DEFAULT_CACHE_PATH = Path.home() / ".langnet-cache" / "llm" / "responses.sqlite3"
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    system: str,
+    description: str,
+    expected_output: str,
+    temperature: Optional[float],
+) -> str:
+    """Hash estável do conteúdo que determina a resposta do LLM."""
+    payload = json.dumps(
+        {
+            "provider": (provider or "").lower(),
+            "model": model or "",
+            "system": system or "",
+            "description": description or "",
+            "expected_output": expected_output or "",
+            "temperature": None if temperature is None else round(float(temperature), 4),
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*\n(.*?)\n?```\s*$", re.DOTALL | re.IGNORECASE)
+
+
+def is_cacheable_response(response: Optional[str], expected_output: str = "") -> bool:
+    """Só vale cachear resposta utilizável: não-trivial e, se a task pede JSON, JSON válido.
+
+    Os output_funcs engolem JSON quebrado (guardam {"error": ...} sem registrar erro no
+    estado) — sem esta checagem um retry repetiria a mesma saída ruim vinda do cache."""
+    if not isinstance(response, str) or len(response.strip()) < 20:
+        return False
+    if "JSON" in (expected_output or "").upper():
+        # cercas ```json são tiradas pelos output_funcs antes do parse: não invalidam a resposta
+        fence = _FENCE_RE.match(response)
+        try:
+            json.loads(fence.group(1) if fence else response)
+        except (ValueError, TypeError):
+            return False
+    return True
+
+
+class LLMResponseCache:
+    """Cache chave→texto em SQLite, com TTL e despejo LRU por tamanho total."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl_seconds: int = 7 * 24 * 3600,
+        max_bytes: int = 512 * 1024 * 1024,
+        enabled: bool = True,
+    ):
+        self.path = Path(path) if path else _DEFAULT_CACHE_PATH
+        self.ttl_seconds = int(ttl_seconds)
+        self.max_bytes = int(max_bytes)
+        self.enabled = enabled
+        self._store = SQLiteKVStore(self.path, "llm_responses", {"task_name": "TEXT"}, tag="LLM-CACHE")
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0}
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for name, n in deltas.items():
+                self._counters[name] += n
+
+    def get(self, key: str) -> Optional[str]:
+        """Resposta cacheada ou None (miss/expirada). Atualiza o último acesso (LRU)."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        row = self._store.get(key)
+        if row is None:
+            self._count(misses=1)
+            return None
+        response, created_at = row
+        if self.ttl_seconds > 0 and now - created_at > self.ttl_seconds:
+            self._store.delete(key)
+            self._count(expired=1, misses=1)
+            return None
+        self._store.touch(key, now)
+        self._count(hits=1)
+        return response
+
+    def put(self, key: str, response: str, task_name: str = "") -> None:
+        """Grava (ou substitui) a resposta e aplica o teto de tamanho."""
+        if not self.enabled or not response:
+            return
+        if self.max_bytes and len(response.encode("utf-8")) > self.max_bytes:
+            return
+        if not self._store.put(key, response, task_name=task_name):
+            return
+        expired, evicted = self._store.prune(self.ttl_seconds, self.max_bytes)
+        self._count(writes=1, expired=expired, evictions=evicted)
+
+    def invalidate(self, key: str) -> None:
+        self._store.delete(key)
+
+    def clear(self) -> int:
+        """Esvazia o cache. Retorna quantas entradas foram removidas."""
+        return self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores do processo + ocupação atual do arquivo."""
+        with self._lock:
+            counters = dict(self._counters)
+        entries, total, _ = self._store.summary() if self.enabled else (0, 0, {})
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "enabled": self.enabled,
+            "path": str(self.path),
+        }
+
+
+_CACHE: Optional[LLMResponseCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Instância única do processo, configurada por variáveis de ambiente."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = LLMResponseCache(
+                    path=Path(os.getenv("LANGNET_LLM_CACHE_PATH", str(_DEFAULT_CACHE_PATH))),
+                    ttl_seconds=int(os.getenv("LANGNET_LLM_CACHE_TTL", str(7 * 24 * 3600))),
+                    max_bytes=int(float(os.getenv("LANGNET_LLM_CACHE_MAX_MB", "512")) * 1024 * 1024),
+                    enabled=os.getenv("LANGNET_LLM_CACHE", "1").lower() not in ("0", "false", "no", "off"),
+                )
+    return _CACHE
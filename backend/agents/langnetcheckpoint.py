@@ -0,0 +1,135 @@
+"""
+LangNet — Checkpoints de execução do pipeline (retomada após falha).
+
+`execute_full_pipeline` roda 12 tasks em sequência e, ao primeiro erro, para —
+o LangNetFullState só existia em memória, então uma falha em `design_petri_net`
+obrigava a refazer `analyze_document` → `decompose_tasks` (horas de LLM local).
+
+Aqui, após cada task concluída SEM erro, o estado completo é gravado comprimido
+(gzip + JSON) em:
+
+    ~/.langnet-cache/checkpoints/<execution_id>/<NN>_<task_name>.json.gz
+
+mais um manifest.json com a ordem das tasks e as já concluídas. A retomada
+carrega o último checkpoint e continua da task seguinte.
+
+Diretório configurável por LANGNET_CHECKPOINT_DIR.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+CHECKPOINT_ROOT = Path(os.environ.get(
+    "LANGNET_CHECKPOINT_DIR",
+    str(Path.home() / ".langnet-cache" / "checkpoints"),
+))
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def _execution_dir(execution_id: str) -> Path:
+    if not execution_id or not _SAFE_ID.match(execution_id):
+        raise ValueError(f"execution_id inválido para checkpoint: {execution_id!r}")
+    return CHECKPOINT_ROOT / execution_id
+
+
+def _read_manifest(exec_dir: Path) -> Dict[str, Any]:
+    path = exec_dir / "manifest.json"
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _write_manifest(exec_dir: Path, manifest: Dict[str, Any]) -> None:
+    tmp = exec_dir / "manifest.json.tmp"
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(exec_dir / "manifest.json")
+
+
+def start_checkpointing(execution_id: str, pipeline_tasks: List[str], params: Optional[Dict[str, Any]] = None) -> None:
+    """Cria (ou reaproveita) o diretório da execução e registra a ordem das tasks."""
+    exec_dir = _execution_dir(execution_id)
+    exec_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(exec_dir)
+    manifest.setdefault("execution_id", execution_id)
+    manifest.setdefault("created_at", datetime.now().isoformat())
+    manifest.setdefault("completed", [])
+    manifest["tasks"] = list(pipeline_tasks)
+    if params is not None:
+        manifest["params"] = params
+    manifest["updated_at"] = datetime.now().isoformat()
+    _write_manifest(exec_dir, manifest)
+
+
+def save_checkpoint(execution_id: str, task_name: str, state: Dict[str, Any]) -> Path:
+    """Grava o estado após `task_name` (gzip, escrita atômica) e atualiza o manifest."""
+    exec_dir = _execution_dir(execution_id)
+    exec_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(exec_dir)
+    tasks = manifest.get("tasks") or []
+    idx = tasks.index(task_name) if task_name in tasks else len(manifest.get("completed", []))
+    path = exec_dir / f"{idx:02d}_{task_name}.json.gz"
+    tmp = path.with_suffix(".tmp")
+    payload = json.dumps(state, ensure_ascii=False, default=str).encode("utf-8")
+    with gzip.open(tmp, "wb", compresslevel=6) as f:
+        f.write(payload)
+    tmp.replace(path)
+
+    completed = [t for t in manifest.get("completed", []) if t != task_name]
+    completed.append(task_name)
+    manifest["completed"] = completed
+    manifest["last_task"] = task_name
+    manifest["updated_at"] = datetime.now().isoformat()
+    _write_manifest(exec_dir, manifest)
+    print(f"[CHECKPOINT] {execution_id[:8]} · {task_name} → {path.name} "
+          f"({len(payload)} → {path.stat().st_size} bytes)")
+    return path
+
+
+def load_checkpoint(execution_id: str, task_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Estado gravado após `task_name` (default: a última task concluída)."""
+    exec_dir = _execution_dir(execution_id)
+    manifest = _read_manifest(exec_dir)
+    task_name = task_name or manifest.get("last_task")
+    if not task_name:
+        return None
+    matches = sorted(exec_dir.glob(f"*_{task_name}.json.gz"))
+    if not matches:
+        return None
+    with gzip.open(matches[-1], "rb") as f:
+        return json.loads(f.read().decode("utf-8"))
+
+
+def get_checkpoint_info(execution_id: str) -> Dict[str, Any]:
+    """Manifest + próxima task a executar (None se o pipeline já terminou)."""
+    exec_dir = _execution_dir(execution_id)
+    manifest = _read_manifest(exec_dir)
+    if not manifest:
+        return {}
+    tasks = manifest.get("tasks") or []
+    completed = set(manifest.get("completed") or [])
+    manifest["next_task"] = next((t for t in tasks if t not in completed), None)
+    manifest["files"] = [
+        {"name": p.name, "size_bytes": p.stat().st_size}
+        for p in sorted(exec_dir.glob("*.json.gz"))
+    ]
+    return manifest
+
+
+def delete_checkpoints(execution_id: str) -> bool:
+    exec_dir = _execution_dir(execution_id)
+    if not exec_dir.exists():
+        return False
+    shutil.rmtree(exec_dir, ignore_errors=True)
+    return True
@@ -65,6 +65,7 @@ def load_project_artifacts(project_id: str, get_db_connection) -> Dict[str, Any]
         cur = conn.cursor(dictionary=True)
         try:
             cur.execute("SELECT ui_spec_json FROM ui_spec_sessions WHERE project_id=%s "
+                        "AND status NOT IN ('generating', 'failed') "
                         "ORDER BY created_at DESC LIMIT 1", (project_id,))
             row = cur.fetchone()
             if row and row.get("ui_spec_json"):
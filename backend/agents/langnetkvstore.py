@@ -0,0 +1,175 @@
+"""
+LangNet — Armazenamento chave→valor em SQLite compartilhado pelos caches locais.
+
+O cache de respostas de LLM (langnetcache) e o de resultados de busca
+(langnetsearchcache) guardam a mesma coisa: um texto por chave, com data de
+criação, último acesso, tamanho e contagem de hits. Este módulo concentra o que
+é comum aos dois — conexão (WAL), lock, criação/migração do schema, TTL,
+despejo LRU por tamanho e ocupação — para que a política de cada cache (o que
+é hit, stale ou miss; o que pode ser gravado) fique no próprio módulo.
+
+Erros de SQLite nunca sobem: são impressos com a tag do cache e a operação
+devolve o valor neutro (miss, False, 0) — cache indisponível não quebra o fluxo.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Colunas que toda tabela de cache tem, além da chave e das colunas próprias.
+# DEFAULTs permitem acrescentá-las com ALTER TABLE em arquivos de versões antigas.
+_BASE_COLUMNS = {
+    "response": "TEXT NOT NULL DEFAULT ''",
+    "size_bytes": "INTEGER NOT NULL DEFAULT 0",
+    "created_at": "REAL NOT NULL DEFAULT 0",
+    "last_access": "REAL NOT NULL DEFAULT 0",
+    "hit_count": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+class SQLiteKVStore:
+    """Tabela `table` num arquivo SQLite: key → response + colunas extras."""
+
+    def __init__(self, path: Path, table: str, columns: Optional[Dict[str, str]] = None, tag: str = "CACHE"):
+        self.path = Path(path)
+        self.table = table
+        self.columns = dict(columns or {})
+        self.tag = tag
+        self.lock = threading.Lock()
+        self._ready = False
+
+    # ── infraestrutura ──────────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = {**self.columns, **_BASE_COLUMNS}
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, "
+                + ", ".join(f"{name} {decl}" for name, decl in columns.items())
+                + ")"
+            )
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+            for name, decl in _BASE_COLUMNS.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE {self.table} ADD COLUMN {name} {decl}")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_access ON {self.table}(last_access)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_created ON {self.table}(created_at)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def _run(self, action: str, default: Any, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Executa `fn` numa conexão sob o lock; erro de SQLite → `default`."""
+        with self.lock:
+            try:
+                conn = self._connect()
+            except sqlite3.Error as e:
+                print(f"[{self.tag}] indisponível ({e}) — seguindo sem cache")
+                return default
+            try:
+                result = fn(conn)
+                conn.commit()
+                return result
+            except sqlite3.Error as e:
+                print(f"[{self.tag}] erro de {action} ({e})")
+                return default
+            finally:
+                conn.close()
+
+    # ── API ─────────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """(response, created_at) ou None (ausente ou erro de leitura)."""
+        return self._run("leitura", None, lambda conn: conn.execute(
+            f"SELECT response, created_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone())
+
+    def touch(self, key: str, now: Optional[float] = None) -> None:
+        """Registra um hit: último acesso (LRU) e contagem."""
+        self._run("escrita", None, lambda conn: conn.execute(
+            f"UPDATE {self.table} SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?",
+            (time.time() if now is None else now, key),
+        ))
+
+    def delete(self, key: str) -> None:
+        self._run("escrita", None, lambda conn: conn.execute(
+            f"DELETE FROM {self.table} WHERE key = ?", (key,)
+        ))
+
+    def put(self, key: str, response: str, **columns: Any) -> bool:
+        """Grava (ou substitui) a entrada. True se gravou."""
+        now = time.time()
+        values = {
+            "key": key,
+            **columns,
+            "response": response,
+            "size_bytes": len(response.encode("utf-8")),
+            "created_at": now,
+            "last_access": now,
+            "hit_count": 0,
+        }
+        sql = (
+            f"INSERT OR REPLACE INTO {self.table} ({', '.join(values)})"
+            f" VALUES ({', '.join('?' for _ in values)})"
+        )
+
+        def _put(conn: sqlite3.Connection) -> bool:
+            conn.execute(sql, tuple(values.values()))
+            return True
+
+        return self._run("escrita", False, _put)
+
+    def prune(self, ttl_seconds: int = 0, max_bytes: int = 0) -> Tuple[int, int]:
+        """Remove entradas mais velhas que o TTL e, se passar do teto, as menos
+        recentemente usadas. Retorna (expiradas, despejadas)."""
+
+        def _prune(conn: sqlite3.Connection) -> Tuple[int, int]:
+            expired = 0
+            if ttl_seconds > 0:
+                cur = conn.execute(
+                    f"DELETE FROM {self.table} WHERE created_at < ?", (time.time() - ttl_seconds,)
+                )
+                expired = max(cur.rowcount, 0)
+            if not max_bytes:
+                return expired, 0
+            total = conn.execute(f"SELECT COALESCE(SUM(size_bytes), 0) FROM {self.table}").fetchone()[0]
+            if total <= max_bytes:
+                return expired, 0
+            excess = total - max_bytes
+            victims = []
+            for key, size in conn.execute(f"SELECT key, size_bytes FROM {self.table} ORDER BY last_access ASC"):
+                victims.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+            return expired, len(victims)
+
+        return self._run("limpeza", (0, 0), _prune)
+
+    def clear(self) -> int:
+        """Esvazia a tabela. Retorna quantas entradas foram removidas."""
+        return self._run("escrita", 0, lambda conn: max(conn.execute(f"DELETE FROM {self.table}").rowcount, 0))
+
+    def summary(self, group_by: Optional[str] = None) -> Tuple[int, int, Dict[str, int]]:
+        """(entradas, bytes, entradas por valor de `group_by`) — ocupação atual."""
+
+        def _summary(conn: sqlite3.Connection) -> Tuple[int, int, Dict[str, int]]:
+            entries, total = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM {self.table}"
+            ).fetchone()
+            groups: Dict[str, int] = {}
+            if group_by:
+                groups = dict(conn.execute(
+                    f"SELECT {group_by}, COUNT(*) FROM {self.table} GROUP BY {group_by}"
+                ).fetchall())
+            return entries, total, groups
+
+        return self._run("leitura", (0, 0, {}), _summary)
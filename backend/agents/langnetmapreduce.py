@@ -0,0 +1,314 @@
+"""
+LangNet — Execução map-reduce de analyze_document / extract_requirements.
+
+O conteúdo de TODOS os documentos chegava como um único ``document_content`` a
+cada uma dessas tasks: em editais de centenas de páginas o prompt estoura o
+contexto e a resposta volta truncada (``finish_reason == 'length'``) sem aviso.
+
+Aqui:
+  - ``split_document_groups`` quebra o conteúdo nos limites que o router já marca
+    (cabeçalho ``DOCUMENT:`` de cada arquivo e separador ``---CHUNK---``) e empacota
+    os pedaços em grupos de até LANGNET_MAP_GROUP_TOKENS tokens — cada grupo leva o
+    nome do documento de origem. Só entra em map-reduce acima de
+    LANGNET_MAP_REDUCE_TOKENS (abaixo disso o fluxo é o de sempre);
+  - o MAP (em langnetagents) roda a mesma task por grupo, em paralelo;
+  - o REDUCE é determinístico (sem nova chamada ao LLM): ``merge_requirements``
+    une as listas, deduplica requisitos por ID e por similaridade do texto
+    (Jaccard das palavras normalizadas ≥ LANGNET_MAP_SIMILARITY) e renumera os IDs;
+    ``merge_analysis`` une a análise documental.
+
+Desligar: LANGNET_MAP_REDUCE=0.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .langnetsearchcache import normalize_query
+
+MAP_REDUCE_ENABLED = os.getenv("LANGNET_MAP_REDUCE", "1").lower() not in ("0", "false", "no", "off")
+MAP_REDUCE_MIN_TOKENS = int(os.getenv("LANGNET_MAP_REDUCE_TOKENS", "24000"))
+MAP_GROUP_TOKENS = int(os.getenv("LANGNET_MAP_GROUP_TOKENS", "12000"))
+MAP_WORKERS = int(os.getenv("LANGNET_MAP_WORKERS", "4"))
+SIMILARITY_THRESHOLD = float(os.getenv("LANGNET_MAP_SIMILARITY", "0.6"))
+
+_DOC_HEADER = re.compile(r"\n*={20,}\nDOCUMENT: (?P<name>[^\n]*)\n={20,}\n*")
+_CHUNK_SEP = "---CHUNK---"
+
+
+# ── MAP: divisão do conteúdo ────────────────────────────────────────────
+
+def _count_tokens(text: str) -> int:
+    from utils.chunking import get_token_counter
+    return get_token_counter()(text)
+
+
+def _document_units(content: str) -> List[Tuple[str, str]]:
+    """(documento, pedaço) na ordem original, respeitando arquivos e chunks."""
+    units: List[Tuple[str, str]] = []
+    headers = list(_DOC_HEADER.finditer(content))
+    spans = []
+    if not headers:
+        spans.append(("", content))
+    else:
+        if content[:headers[0].start()].strip():
+            spans.append(("", content[:headers[0].start()]))
+        for i, h in enumerate(headers):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
+            spans.append((h.group("name").strip(), content[h.end():end]))
+    for name, body in spans:
+        for piece in body.split(_CHUNK_SEP):
+            if piece.strip():
+                units.append((name, piece.strip()))
+    return units
+
+
+def split_document_groups(
+    content: str,
+    group_tokens: Optional[int] = None,
+    min_tokens: Optional[int] = None,
+) -> List[str]:
+    """
+    Grupos de conteúdo para o MAP; lista vazia quando o conteúdo cabe num prompt
+    (ou o map-reduce está desligado).
+    """
+    group_tokens = group_tokens or MAP_GROUP_TOKENS
+    min_tokens = MAP_REDUCE_MIN_TOKENS if min_tokens is None else min_tokens
+    if not MAP_REDUCE_ENABLED or not content or _count_tokens(content) <= min_tokens:
+        return []
+
+    from utils.chunking import chunk_document
+
+    units: List[Tuple[str, str, int]] = []
+    for name, text in _document_units(content):
+        tokens = _count_tokens(text)
+        if tokens <= group_tokens:
+            units.append((name, text, tokens))
+        else:
+            for c in chunk_document(text, max_tokens=group_tokens):
+                units.append((name, c.text, c.tokens))
+
+    groups: List[List[Tuple[str, str]]] = []
+    current: List[Tuple[str, str]] = []
+    used = 0
+    for name, text, tokens in units:
+        if current and used + tokens > group_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append((name, text))
+        used += tokens
+    if current:
+        groups.append(current)
+    if len(groups) <= 1:
+        return []
+
+    rendered = []
+    for group in groups:
+        parts, last = [], None
+        for name, text in group:
+            if name and name != last:
+                parts.append(f"{'=' * 80}\nDOCUMENT: {name}\n{'=' * 80}")
+                last = name
+            parts.append(text)
+        rendered.append("\n\n".join(parts))
+    return rendered
+
+
+def group_header(index: int, total: int) -> str:
+    """Aviso no topo do conteúdo de cada grupo do MAP."""
+    return (f"[TRECHO {index}/{total} DO CONTEÚDO — os demais trechos são processados em paralelo; "
+            f"extraia somente o que consta NESTE trecho]\n\n")
+
+
+# ── REDUCE ──────────────────────────────────────────────────────────────
+
+def parse_llm_json(text: Any, repair: Optional[Callable[[str], Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+    """Objeto JSON da resposta do LLM (tolerante a cercas ```json e texto ao redor)."""
+    if isinstance(text, dict):
+        return text
+    text = (text or "").strip()
+    fence = re.search(r"```(?:json)?\s*\n(.*?)\n```", text, re.DOTALL)
+    if fence:
+        text = fence.group(1)
+    try:
+        parsed = json.loads(text)
+        return parsed if isinstance(parsed, dict) else None
+    except (json.JSONDecodeError, TypeError):
+        pass
+    start, end = text.find("{"), text.rfind("}")
+    if 0 <= start < end:
+        try:
+            parsed = json.loads(text[start:end + 1])
+            if isinstance(parsed, dict):
+                return parsed
+        except json.JSONDecodeError:
+            pass
+    if repair is not None:
+        parsed = repair(text)
+        return parsed or None
+    return None
+
+
+def _words(text: Any) -> frozenset:
+    return frozenset(normalize_query(text if isinstance(text, str) else json.dumps(text, ensure_ascii=False)).split())
+
+
+def _similar(a: frozenset, b: frozenset, threshold: float) -> bool:
+    if not a or not b:
+        return False
+    return len(a & b) / len(a | b) >= threshold
+
+
+def _item_text(item: Any) -> str:
+    if isinstance(item, dict):
+        for key in ("description", "name", "rule", "title", "term"):
+            if item.get(key):
+                return str(item[key])
+        return json.dumps(item, ensure_ascii=False, sort_keys=True)
+    return str(item)
+
+
+_PRIORITY = {"high": 3, "alta": 3, "medium": 2, "média": 2, "media": 2, "low": 1, "baixa": 1}
+
+
+def _merge_item(kept: Dict[str, Any], other: Dict[str, Any]) -> None:
+    """Funde ``other`` em ``kept`` (evidências somadas, maior prioridade, campos faltantes)."""
+    for key, value in other.items():
+        if key in ("id",) or value in (None, "", [], {}):
+            continue
+        current = kept.get(key)
+        if current in (None, "", [], {}):
+            kept[key] = value
+        elif key in ("evidence", "rationale") and isinstance(value, str) and value not in current:
+            kept[key] = f"{current} | {value}"
+        elif key == "priority":
+            if _PRIORITY.get(str(value).lower(), 0) > _PRIORITY.get(str(current).lower(), 0):
+                kept[key] = value
+        elif isinstance(current, list) and isinstance(value, list):
+            kept[key] = current + [v for v in value if v not in current]
+
+
+def dedupe_items(items: List[Any], threshold: Optional[float] = None, by_id: bool = True) -> List[Any]:
+    """Remove duplicatas por ID igual (quando o texto também se parece) e por
+    similaridade do texto principal, fundindo os campos das repetidas."""
+    threshold = SIMILARITY_THRESHOLD if threshold is None else threshold
+    out: List[Any] = []
+    signatures: List[frozenset] = []
+    for item in items:
+        words = _words(_item_text(item))
+        match = None
+        for i, kept in enumerate(out):
+            same_id = (by_id and isinstance(item, dict) and isinstance(kept, dict)
+                       and item.get("id") and item.get("id") == kept.get("id"))
+            # IDs colidem entre grupos (cada grupo numera do FR-001): só é o mesmo
+            # requisito se o texto também for parecido.
+            if _similar(words, signatures[i], threshold if not same_id else threshold / 2) or (
+                    not words and same_id):
+                match = i
+                break
+        if match is None:
+            out.append(dict(item) if isinstance(item, dict) else item)
+            signatures.append(words)
+        elif isinstance(item, dict) and isinstance(out[match], dict):
+            _merge_item(out[match], item)
+    return out
+
+
+def _renumber(items: List[Dict[str, Any]], prefix: str) -> None:
+    for n, item in enumerate(items, 1):
+        if isinstance(item, dict):
+            item["id"] = f"{prefix}-{n:03d}"
+
+
+def _merge_values(values: List[Any]) -> Any:
+    """União genérica: listas concatenadas e deduplicadas, dicts fundidos recursivamente,
+    strings: a mais frequente (empate → a primeira), ignorando 'Not specified'/'not mentioned'."""
+    values = [v for v in values if v not in (None, "", [], {})]
+    if not values:
+        return None
+    if all(isinstance(v, list) for v in values):
+        merged: List[Any] = []
+        for v in values:
+            merged.extend(v)
+        return dedupe_items(merged, threshold=0.9, by_id=False)
+    if all(isinstance(v, dict) for v in values):
+        keys: List[str] = []
+        for v in values:
+            keys.extend(k for k in v if k not in keys)
+        return {k: _merge_values([v.get(k) for v in values]) for k in keys}
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return values[0]
+    informative = [v for v in values if str(v).strip().lower() not in ("not specified", "not mentioned", "n/a")]
+    pool = informative or values
+    return Counter(map(str, pool)).most_common(1)[0][0] if all(isinstance(v, str) for v in pool) else pool[0]
+
+
+def merge_requirements(partials: List[Dict[str, Any]], max_queries: int = 15) -> Dict[str, Any]:
+    """REDUCE de extract_requirements: une e deduplica os JSON de cada grupo."""
+    merged: Dict[str, Any] = {}
+    keys: List[str] = []
+    for p in partials:
+        keys.extend(k for k in p if k not in keys)
+    for key in keys:
+        values = [p.get(key) for p in partials]
+        if key in ("functional_requirements", "non_functional_requirements"):
+            items = [i for v in values if isinstance(v, list) for i in v]
+            merged[key] = dedupe_items(items)
+            _renumber(merged[key], "FR" if key.startswith("functional") else "NFR")
+        elif key == "web_research_queries":
+            queries, seen = [], set()
+            for v in values:
+                for q in v or []:
+                    sig = _words(q)
+                    if sig not in seen:
+                        seen.add(sig)
+                        queries.append(q)
+            merged[key] = queries[:max_queries]
+        else:
+            merged[key] = _merge_values(values)
+    return merged
+
+
+def merge_analysis(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """REDUCE de analyze_document: une a análise de cada grupo."""
+    if len(partials) == 1:
+        return dict(partials[0])
+    merged: Dict[str, Any] = {}
+    keys: List[str] = []
+    for p in partials:
+        keys.extend(k for k in p if k not in keys)
+    for key in keys:
+        values = [p.get(key) for p in partials]
+        if key == "words_processed":
+            merged[key] = sum(v for v in values if isinstance(v, int) and not isinstance(v, bool))
+        elif key == "extraction_status":
+            merged[key] = "success" if "success" in values else _merge_values(values)
+        elif key == "synthesis":
+            # cada grupo viu só um trecho: junta as sínteses distintas
+            merged[key] = {
+                k: "\n".join(dict.fromkeys(str(v[k]) for v in values if isinstance(v, dict) and v.get(k)))
+                for k in dict.fromkeys(k for v in values if isinstance(v, dict) for k in v)
+            }
+        else:
+            merged[key] = _merge_values(values)
+    return merged
+
+
+def reduce_results(kind: str, raw_outputs: List[str],
+                   repair: Optional[Callable[[str], Dict[str, Any]]] = None) -> Tuple[Dict[str, Any], List[int]]:
+    """Faz o parse das saídas do MAP e aplica o merge de ``kind`` ('analysis' |
+    'requirements'). Retorna (merged, índices 1-based dos grupos sem JSON válido)."""
+    partials, failed = [], []
+    for i, raw in enumerate(raw_outputs, 1):
+        parsed = parse_llm_json(raw, repair=repair)
+        if parsed and "error" not in parsed:
+            partials.append(parsed)
+        else:
+            failed.append(i)
+    if not partials:
+        return {}, failed
+    merged = merge_requirements(partials) if kind == "requirements" else merge_analysis(partials)
+    return merged, failed
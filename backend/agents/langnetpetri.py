@@ -0,0 +1,269 @@
+"""
+LangNet — Modelo indexado de Rede de Petri + análise estrutural/comportamental.
+
+A rede gerada (dict com `lugares`/`transicoes`/`arcos`, ver _adapt_petri_net) é
+indexada UMA vez: pré/pós-condições de cada transição (incidência esparsa) e
+arcos por origem/destino. Sobre isso:
+
+- topology_warnings(): os mesmos avisos de _validate_petri_net_topology, em tempo
+  linear (antes, cada transição/lugar varria a lista inteira de arcos);
+- explore(): árvore de cobertura (Karp–Miller) com hashing de marcações — dá
+  alcançabilidade, limitação por lugar (ω = ilimitado), deadlocks e transições
+  mortas, com limites de estados/tempo configuráveis.
+
+Guards não são interpretados: toda transição habilitada pode disparar (sobre-
+aproximação — um deadlock encontrado aqui é real na estrutura da rede; um
+caminho alcançável pode estar bloqueado por guard na execução).
+"""
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+OMEGA = math.inf
+
+Marking = Tuple[float, ...]
+
+
+class PetriNet:
+    """Rede de Petri indexada (lugares/transições por posição, incidência esparsa)."""
+
+    def __init__(self, net: Dict[str, Any]):
+        self.places = [p for p in (net.get("lugares") or []) if isinstance(p, dict)]
+        self.transitions = [t for t in (net.get("transicoes") or []) if isinstance(t, dict)]
+        self.arcs = [a for a in (net.get("arcos") or []) if isinstance(a, dict)]
+
+        self.place_index: Dict[Any, int] = {}
+        for i, p in enumerate(self.places):
+            self.place_index.setdefault(p.get("id"), i)
+        self.trans_index: Dict[Any, int] = {}
+        for i, t in enumerate(self.transitions):
+            self.trans_index.setdefault(t.get("id"), i)
+
+        # arcos por origem/destino (na ordem original da lista)
+        self.arcs_from: Dict[Any, List[dict]] = {}
+        self.arcs_to: Dict[Any, List[dict]] = {}
+        for a in self.arcs:
+            self.arcs_from.setdefault(a.get("origem"), []).append(a)
+            self.arcs_to.setdefault(a.get("destino"), []).append(a)
+
+        # incidência: pre[t] / post[t] = {índice do lugar: peso}
+        self.pre: List[Dict[int, int]] = [{} for _ in self.transitions]
+        self.post: List[Dict[int, int]] = [{} for _ in self.transitions]
+        for a in self.arcs:
+            src, dst = a.get("origem"), a.get("destino")
+            weight = _weight(a)
+            if src in self.place_index and dst in self.trans_index:
+                pre = self.pre[self.trans_index[dst]]
+                pre[self.place_index[src]] = pre.get(self.place_index[src], 0) + weight
+            elif src in self.trans_index and dst in self.place_index:
+                post = self.post[self.trans_index[src]]
+                post[self.place_index[dst]] = post.get(self.place_index[dst], 0) + weight
+
+    @classmethod
+    def from_dict(cls, net: Dict[str, Any]) -> "PetriNet":
+        return cls(net if isinstance(net, dict) else {})
+
+    def initial_marking(self) -> Marking:
+        return tuple(int(p.get("tokens") or 0) for p in self.places)
+
+    # ── topologia ──────────────────────────────────────────────────────
+
+    def topology_warnings(self) -> List[str]:
+        """Antipatterns da rede gerada — ver _validate_petri_net_topology."""
+        warnings: List[str] = []
+
+        # 1) Dead transitions (sem entrada OU sem saída)
+        for t in self.transitions:
+            tid = t.get("id")
+            ins = self.arcs_to.get(tid, [])
+            outs = self.arcs_from.get(tid, [])
+            if not ins and not outs:
+                warnings.append(f"dead_transition: {tid} sem nenhum arco (entrada nem saída)")
+            elif not ins:
+                warnings.append(f"dead_transition: {tid} sem arco de entrada (fonte). Aceitável só se for T_start saindo de P0.")
+            elif not outs:
+                warnings.append(f"dead_transition: {tid} sem arco de saída (sumidouro)")
+
+        # 2) Massive fan-out: transição com >3 saídas paralelas
+        for t in self.transitions:
+            tid = t.get("id")
+            if not tid:
+                continue
+            outs = self.arcs_from.get(tid, [])
+            if len(outs) > 3:
+                dest_names = [str(a.get("destino")) for a in outs[:6]]
+                warnings.append(
+                    f"massive_fanout: {tid} dispara {len(outs)} places em paralelo — provavelmente "
+                    f"esconde dependências sequenciais. Destinos: {', '.join(dest_names)}"
+                )
+
+        # 3) Branching sem guards: um lugar alimentando várias transições, todas sem guard
+        for p in self.places:
+            pid = p.get("id")
+            if not pid:
+                continue
+            feeding = [a.get("destino") for a in self.arcs_from.get(pid, [])
+                       if a.get("destino") in self.trans_index]
+            if len(feeding) >= 2:
+                empty_guards = sum(
+                    1 for tid in feeding
+                    if not (self.transitions[self.trans_index[tid]].get("guard") or "").strip()
+                )
+                if empty_guards == len(feeding):
+                    warnings.append(
+                        f"branch_no_guards: {pid} alimenta {len(feeding)} transições "
+                        f"({', '.join(feeding)}) e nenhuma tem guard — vai disparar todas (concorrência)"
+                    )
+
+        # 4) Orphan places
+        for p in self.places:
+            pid = p.get("id")
+            if pid and pid not in self.arcs_from and pid not in self.arcs_to:
+                warnings.append(f"orphan_place: {pid} não tem nenhum arco — não pode receber nem ceder tokens")
+
+        # 5) No start token
+        if not any((p.get("tokens") or 0) > 0 for p in self.places):
+            warnings.append("no_start_token: nenhum lugar inicia com tokens>0 — a Petri Net é inerte")
+
+        return warnings
+
+    # ── comportamento ──────────────────────────────────────────────────
+
+    def enabled(self, marking: Marking) -> List[int]:
+        return [t for t, pre in enumerate(self.pre)
+                if all(marking[p] >= w for p, w in pre.items())]
+
+    def fire(self, marking: Marking, t: int) -> Marking:
+        m = list(marking)
+        for p, w in self.pre[t].items():
+            m[p] -= w
+        for p, w in self.post[t].items():
+            m[p] += w
+        return tuple(m)
+
+    def explore(self, max_states: int = 5000, time_limit: float = 5.0) -> Dict[str, Any]:
+        """Árvore de cobertura (Karp–Miller) em largura, com hashing de marcações.
+
+        Uma marcação que cobre estritamente um ANCESTRAL no caminho ganha ω nos
+        lugares que cresceram (rede ilimitada ali). Para em `max_states`
+        marcações distintas ou `time_limit` segundos (truncated=True).
+        """
+        start = time.monotonic()
+        initial = self.initial_marking()
+        seen: Dict[Marking, int] = {initial: 0}
+        parent: List[int] = [-1]
+        markings: List[Marking] = [initial]
+        queue = deque([0])
+        fired = [False] * len(self.transitions)
+        dead: List[Marking] = []
+        truncated = False
+        edges = 0
+
+        while queue:
+            if len(markings) >= max_states or time.monotonic() - start > time_limit:
+                truncated = True
+                break
+            node = queue.popleft()
+            marking = markings[node]
+            enabled = self.enabled(marking)
+            if not enabled:
+                dead.append(marking)
+                continue
+            for t in enabled:
+                fired[t] = True
+                edges += 1
+                succ = self._accelerate(self.fire(marking, t), node, markings, parent)
+                if succ not in seen:
+                    seen[succ] = len(markings)
+                    markings.append(succ)
+                    parent.append(node)
+                    queue.append(len(markings) - 1)
+
+        bounds = [0.0] * len(self.places)
+        for m in markings:
+            for i, v in enumerate(m):
+                if v > bounds[i]:
+                    bounds[i] = v
+
+        sinks = {i for i, p in enumerate(self.places) if not self.arcs_from.get(p.get("id"))}
+        deadlocks, terminal = [], []
+        for m in dead:
+            marked = [i for i, v in enumerate(m) if v]
+            # término legítimo: só restam tokens em lugares finais (sem saída)
+            (terminal if all(i in sinks for i in marked) else deadlocks).append(m)
+
+        return {
+            "states": len(markings),
+            "edges": edges,
+            "truncated": truncated,
+            "bounded": all(b != OMEGA for b in bounds) if not truncated else None,
+            "safe": all(b <= 1 for b in bounds) if not truncated else None,
+            "place_bounds": {self.places[i].get("id"): _fmt(b) for i, b in enumerate(bounds)},
+            "deadlocks": [self._describe(m) for m in deadlocks[:20]],
+            "deadlock_count": len(deadlocks),
+            "terminal_markings": [self._describe(m) for m in terminal[:20]],
+            "dead_transitions": [] if truncated else
+                [t.get("id") for i, t in enumerate(self.transitions) if not fired[i]],
+            "elapsed_ms": round((time.monotonic() - start) * 1000, 1),
+        }
+
+    @staticmethod
+    def _accelerate(succ: Marking, node: int, markings: List[Marking], parent: List[int]) -> Marking:
+        """ω nos lugares onde `succ` cobre estritamente algum ancestral."""
+        m = list(succ)
+        anc = node
+        while anc >= 0:
+            a = markings[anc]
+            if all(x >= y for x, y in zip(m, a)) and any(x > y for x, y in zip(m, a)):
+                for i, (x, y) in enumerate(zip(m, a)):
+                    if x > y:
+                        m[i] = OMEGA
+            anc = parent[anc]
+        return tuple(m)
+
+    def _describe(self, marking: Marking) -> Dict[str, Any]:
+        return {self.places[i].get("id"): _fmt(v) for i, v in enumerate(marking) if v}
+
+
+def _weight(arc: dict) -> int:
+    try:
+        return max(1, int(arc.get("peso") or 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def _fmt(v: float) -> Any:
+    return "ω" if v == OMEGA else int(v)
+
+
+def analyze_petri_net(net: Dict[str, Any], max_states: int = 5000, time_limit: float = 5.0) -> Dict[str, Any]:
+    """Topologia + exploração de estados de uma rede no formato do editor."""
+    pn = PetriNet.from_dict(net)
+    return {
+        "summary": {
+            "places": len(pn.places),
+            "transitions": len(pn.transitions),
+            "arcs": len(pn.arcs),
+        },
+        "topology_warnings": pn.topology_warnings(),
+        "reachability": pn.explore(max_states=max_states, time_limit=time_limit),
+    }
+
+
+def behavior_warnings(analysis: Dict[str, Any]) -> List[str]:
+    """Avisos (mesmo formato de topology_warnings) a partir de explore()."""
+    r = analysis.get("reachability") or {}
+    warnings: List[str] = []
+    for m in r.get("deadlocks", [])[:5]:
+        places = ", ".join(f"{k}={v}" for k, v in m.items())
+        warnings.append(f"deadlock: marcação alcançável sem transição habilitada ({places})")
+    unbounded = [k for k, v in (r.get("place_bounds") or {}).items() if v == "ω"]
+    if unbounded:
+        warnings.append(f"unbounded_place: tokens crescem sem limite em {', '.join(unbounded[:10])}")
+    if r.get("dead_transitions"):
+        warnings.append(f"never_enabled: transições nunca habilitadas a partir da marcação inicial: "
+                        f"{', '.join(str(t) for t in r['dead_transitions'][:10])}")
+    return warnings
@@ -0,0 +1,344 @@
+"""
+LangNet Render — serviço de renderização HTML → PNG dos mockups de UI.
+
+Antes: cada tela subia um Chromium novo (``sync_playwright()`` + ``launch``),
+esperava 1200 ms fixos e fechava — 30 telas ≈ 1–2 min só de startup. Aqui:
+
+  - UM navegador de vida longa, numa thread própria com event loop asyncio
+    (a API sync do Playwright não atravessa threads; a async numa thread dedicada
+    atende chamadas de qualquer thread do backend);
+  - pool de páginas quentes (LANGNET_RENDER_CONCURRENCY, default 4), cada uma no
+    seu contexto; página reciclada a cada LANGNET_RENDER_RECYCLE renders;
+  - fila de renders: ``render_many`` dispara várias telas e o pool processa em
+    paralelo;
+  - prontidão em vez de sleep fixo: load → fontes prontas → DOM parado por
+    LANGNET_RENDER_QUIET_MS (o Tailwind CDN injeta o CSS via JS após o load) →
+    dois frames; teto LANGNET_RENDER_MAX_WAIT_MS;
+  - cache de PNG por hash de conteúdo (HTML + largura) em disco
+    (~/.langnet-cache/mockups, LANGNET_RENDER_CACHE_DIR; até
+    LANGNET_RENDER_CACHE_MAX arquivos): mockup inalterado nunca re-renderiza;
+  - navegador fechado após LANGNET_RENDER_IDLE_SECONDS sem uso (reabre sob demanda).
+
+Sem Playwright instalado (ou se o navegador não sobe), ``render`` devolve None —
+mesmo contrato do render antigo.
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import base64
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Optional
+
+_DEFAULT_CACHE_DIR = Path.home() / ".langnet-cache" / "mockups"
+
+# Resolve quando o DOM fica QUIET ms sem mutações (Tailwind CDN já aplicou o CSS).
+_READY_JS = """(quiet) => new Promise(resolve => {
+  const finish = () => requestAnimationFrame(() => requestAnimationFrame(() => resolve(true)));
+  const fonts = (document.fonts && document.fonts.ready) || Promise.resolve();
+  fonts.then(() => {
+    let timer = setTimeout(() => { obs.disconnect(); finish(); }, quiet);
+    const obs = new MutationObserver(() => {
+      clearTimeout(timer);
+      timer = setTimeout(() => { obs.disconnect(); finish(); }, quiet);
+    });
+    obs.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+  });
+})"""
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def mockup_cache_key(html: str, width: int) -> str:
+    return hashlib.sha256(f"{width}\n{html}".encode("utf-8")).hexdigest()
+
+
+def _data_uri(png: bytes) -> str:
+    return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+
+
+class MockupRenderer:
+    """Navegador headless compartilhado + pool de páginas + cache de PNG."""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        cache_dir: Optional[Path] = None,
+        cache_max: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+    ):
+        self.concurrency = max(1, concurrency or _env_int("LANGNET_RENDER_CONCURRENCY", 4))
+        self.cache_dir = Path(cache_dir or os.getenv("LANGNET_RENDER_CACHE_DIR", str(_DEFAULT_CACHE_DIR)))
+        self.cache_max = cache_max or _env_int("LANGNET_RENDER_CACHE_MAX", 500)
+        self.idle_seconds = idle_seconds or float(os.getenv("LANGNET_RENDER_IDLE_SECONDS", "300"))
+        self.quiet_ms = _env_int("LANGNET_RENDER_QUIET_MS", 150)
+        self.max_wait_ms = _env_int("LANGNET_RENDER_MAX_WAIT_MS", 5000)
+        self.recycle_after = _env_int("LANGNET_RENDER_RECYCLE", 50)
+        self.cache_enabled = os.getenv("LANGNET_RENDER_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._playwright = None
+        self._browser = None
+        self._pages: Optional[asyncio.Queue] = None
+        self._page_uses: Dict[int, int] = {}
+        self._starting: Optional[asyncio.Lock] = None
+        self._last_used = time.monotonic()
+        self._active = 0  # renders em curso (páginas retiradas da fila ou aguardando uma)
+        self._unavailable: Optional[str] = None
+        self._counters = {"renders": 0, "cache_hits": 0, "failures": 0, "browser_starts": 0}
+
+    # ── cache ───────────────────────────────────────────────────────────
+
+    def _cache_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.png"
+
+    def cache_get(self, key: str) -> Optional[bytes]:
+        if not self.cache_enabled:
+            return None
+        try:
+            path = self._cache_path(key)
+            png = path.read_bytes()
+            os.utime(path)  # LRU pela mtime
+            return png
+        except OSError:
+            return None
+
+    def cache_put(self, key: str, png: bytes) -> None:
+        if not self.cache_enabled:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self._cache_path(key).with_suffix(".tmp")
+            tmp.write_bytes(png)
+            tmp.replace(self._cache_path(key))
+            files = sorted(self.cache_dir.glob("*.png"), key=lambda p: p.stat().st_mtime)
+            for old in files[:max(0, len(files) - self.cache_max)]:
+                old.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"[RENDER] cache indisponível ({e})")
+
+    # ── loop/navegador ──────────────────────────────────────────────────
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, daemon=True,
+                                                name="langnet-render")
+                self._thread.start()
+                asyncio.run_coroutine_threadsafe(self._reap_idle(), self._loop)
+            return self._loop
+
+    async def _ensure_browser(self) -> bool:
+        if self._browser is not None and self._browser.is_connected():
+            return True
+        if self._starting is None:
+            self._starting = asyncio.Lock()
+        async with self._starting:
+            if self._browser is not None and self._browser.is_connected():
+                return True
+            try:
+                from playwright.async_api import async_playwright
+            except Exception as e:
+                self._unavailable = f"Playwright indisponível: {e}"
+                print(f"[UI_SPEC] {self._unavailable}")
+                return False
+            await self._close_browser()
+            self._playwright = await async_playwright().start()
+            try:
+                self._browser = await self._playwright.chromium.launch(args=["--no-sandbox"])
+            except Exception:
+                await self._close_browser()  # não deixa o driver do Playwright órfão
+                raise
+            self._last_used = time.monotonic()
+            self._pages = asyncio.Queue()
+            for _ in range(self.concurrency):
+                self._pages.put_nowait(await self._new_page())
+            self._counters["browser_starts"] += 1
+            print(f"[RENDER] navegador pronto ({self.concurrency} páginas quentes)")
+            return True
+
+    async def _new_page(self):
+        context = await self._browser.new_context(viewport={"width": 960, "height": 800})
+        page = await context.new_page()
+        self._page_uses[id(page)] = 0
+        return page
+
+    async def _recycle(self, page):
+        self._page_uses.pop(id(page), None)
+        try:
+            await page.context.close()
+        except Exception:
+            pass
+        return await self._new_page()
+
+    async def _close_browser(self) -> None:
+        browser, pw = self._browser, self._playwright
+        self._browser = self._playwright = None
+        self._pages = None
+        self._page_uses.clear()
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+        if pw is not None:
+            try:
+                await pw.stop()
+            except Exception:
+                pass
+
+    async def _reap_idle(self) -> None:
+        while True:
+            await asyncio.sleep(max(5.0, min(self.idle_seconds / 2, 60.0)))
+            if (self._browser is not None and not self._active
+                    and time.monotonic() - self._last_used > self.idle_seconds):
+                print("[RENDER] navegador ocioso — fechando")
+                await self._close_browser()
+
+    async def _render_async(self, html: str, width: int) -> Optional[bytes]:
+        self._last_used = time.monotonic()
+        self._active += 1
+        try:
+            return await self._render_page(html, width)
+        finally:
+            self._active -= 1
+            self._last_used = time.monotonic()
+
+    async def _render_page(self, html: str, width: int) -> Optional[bytes]:
+        if not await self._ensure_browser():
+            return None
+        pages = self._pages
+        page = await pages.get()
+        broken = False
+        try:
+            await page.set_viewport_size({"width": width, "height": 800})
+            await page.set_content(html, wait_until="load", timeout=30000)
+            try:
+                await asyncio.wait_for(page.evaluate(_READY_JS, self.quiet_ms), self.max_wait_ms / 1000)
+            except asyncio.TimeoutError:
+                pass  # página "viva" (animação contínua): segue com o que já pintou
+            return await page.screenshot(full_page=True)
+        except Exception:
+            broken = True
+            raise
+        finally:
+            uses = self._page_uses.get(id(page), 0) + 1
+            self._page_uses[id(page)] = uses
+            if pages is self._pages:
+                if broken or uses >= self.recycle_after:
+                    try:
+                        page = await self._recycle(page)
+                    except Exception:
+                        page = None
+                if page is not None:
+                    pages.put_nowait(page)
+
+    # ── API ─────────────────────────────────────────────────────────────
+
+    def submit(self, html: str, width: int = 960) -> Future:
+        """Enfileira um render; o Future resolve para data URI (ou None)."""
+        key = mockup_cache_key(html, width)
+        cached = self.cache_get(key)
+        if cached is not None or self._unavailable:
+            done: Future = Future()
+            if cached is not None:
+                self._counters["cache_hits"] += 1
+                done.set_result(_data_uri(cached))
+            else:
+                done.set_result(None)
+            return done
+
+        async def _job():
+            try:
+                png = await self._render_async(html, width)
+            except Exception as e:
+                self._counters["failures"] += 1
+                print(f"[UI_SPEC] render falhou: {e}")
+                return None
+            if png is None:
+                return None
+            self._counters["renders"] += 1
+            self.cache_put(key, png)
+            return _data_uri(png)
+
+        return asyncio.run_coroutine_threadsafe(_job(), self._ensure_loop())
+
+    def render(self, html: str, width: int = 960, timeout: float = 120) -> Optional[str]:
+        if not html:
+            return None
+        try:
+            return self.submit(html, width).result(timeout=timeout)
+        except Exception as e:
+            print(f"[UI_SPEC] render falhou: {e}")
+            return None
+
+    def render_many(self, htmls: Dict[str, str], width: int = 960, timeout: float = 300) -> Dict[str, str]:
+        """Renderiza várias telas em paralelo (HTMLs iguais são renderizados uma vez).
+        Retorna {chave: data_uri} só com as que deram certo."""
+        futures: Dict[str, Future] = {}
+        by_html: Dict[str, Future] = {}
+        for key, html in htmls.items():
+            if not html:
+                continue
+            if html not in by_html:
+                by_html[html] = self.submit(html, width)
+            futures[key] = by_html[html]
+        out: Dict[str, str] = {}
+        deadline = time.monotonic() + timeout
+        for key, fut in futures.items():
+            try:
+                uri = fut.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                print(f"[UI_SPEC] render de {key} falhou: {e}")
+                continue
+            if uri:
+                out[key] = uri
+        return out
+
+    def close(self) -> None:
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_browser(), loop).result(timeout=10)
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            **self._counters,
+            "browser_running": self._browser is not None,
+            "concurrency": self.concurrency,
+            "cache_dir": str(self.cache_dir),
+            "unavailable": self._unavailable,
+        }
+
+
+_RENDERER: Optional[MockupRenderer] = None
+_RENDERER_LOCK = threading.Lock()
+
+
+def get_renderer() -> MockupRenderer:
+    """Instância única do processo."""
+    global _RENDERER
+    if _RENDERER is None:
+        with _RENDERER_LOCK:
+            if _RENDERER is None:
+                _RENDERER = MockupRenderer()
+                atexit.register(_RENDERER.close)
+    return _RENDERER
+
+
+def render_many(htmls: Dict[str, str], width: int = 960) -> Dict[str, str]:
+    return get_renderer().render_many(htmls, width)
+
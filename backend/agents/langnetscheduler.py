@@ -0,0 +1,167 @@
+"""
+LangNet — Escalonador de tasks por dependência (DAG) sobre o TASK_REGISTRY.
+
+Os pipelines rodavam as tasks estritamente na ordem da lista, mesmo quando duas
+delas leem/escrevem chaves disjuntas do estado (ex.: `design_petri_net` e
+`generate_yaml_files` só dependem de agents_data/tasks_data; no pipeline de
+especificação, `research_specification_context` e `compose_spec_use_cases` só
+dependem de spec_entities_json).
+
+O grafo é derivado das chaves declaradas em cada entrada do registry:
+  - leitura-após-escrita:  B.requires ∩ A.produces  → A antes de B
+  - escrita-após-escrita:  B.produces ∩ A.produces  → A antes de B
+  - escrita-após-leitura:  B.produces ∩ A.requires  → A antes de B
+(A = task anterior na lista original). Assim cada task enxerga exatamente o que
+enxergaria na execução sequencial.
+
+Execução em ONDAS (níveis topológicos): as tasks de uma onda rodam em paralelo
+num pool limitado, cada uma sobre uma cópia profunda do estado; os deltas são
+mesclados na ORDEM ORIGINAL da lista — resultado determinístico, independente
+de qual thread terminou primeiro. Se uma task da onda falhar, as posteriores
+(na ordem original) são descartadas, como no `break` sequencial.
+
+Workers: LANGNET_TASK_WORKERS (default 1 = sequencial, igual ao comportamento
+anterior — um LLM local de GPU única não ganha nada com concorrência).
+"""
+from __future__ import annotations
+
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+
+
+# Chaves de controle que TODA task altera — mescladas por regra própria, não
+# entram no grafo de dependências.
+_LOG_KEYS = ("execution_log", "errors", "warnings")
+_COUNTER_KEYS = ("completed_tasks", "failed_tasks")
+
+
+def default_max_workers() -> int:
+    try:
+        return max(1, int(os.getenv("LANGNET_TASK_WORKERS", "1")))
+    except ValueError:
+        return 1
+
+
+def build_task_graph(task_names: List[str], registry: Dict[str, Dict[str, Any]]) -> Dict[str, Set[str]]:
+    """task → conjunto de tasks (da mesma lista) que precisam terminar antes."""
+    deps: Dict[str, Set[str]] = {t: set() for t in task_names}
+    for j, later in enumerate(task_names):
+        reads_b = set(registry[later].get("requires", []))
+        writes_b = set(registry[later].get("produces", []))
+        for earlier in task_names[:j]:
+            reads_a = set(registry[earlier].get("requires", []))
+            writes_a = set(registry[earlier].get("produces", []))
+            if (reads_b & writes_a) or (writes_b & writes_a) or (writes_b & reads_a):
+                deps[later].add(earlier)
+    return deps
+
+
+def plan_waves(task_names: List[str], registry: Dict[str, Dict[str, Any]]) -> List[List[str]]:
+    """Níveis topológicos; dentro de cada nível, mantém a ordem original."""
+    deps = build_task_graph(task_names, registry)
+    level: Dict[str, int] = {}
+    for t in task_names:  # a lista já é uma ordem topológica válida
+        level[t] = 1 + max((level[d] for d in deps[t]), default=-1)
+    waves: List[List[str]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+    for t in task_names:
+        waves[level[t]].append(t)
+    return waves
+
+
+def _merge_delta(merged: Dict[str, Any], snapshot: Dict[str, Any], result: Dict[str, Any]) -> None:
+    """Aplica em `merged` o que a task mudou em relação ao `snapshot` que recebeu."""
+    for key in _LOG_KEYS:
+        before = snapshot.get(key) or []
+        after = result.get(key) or []
+        if len(after) > len(before):
+            merged[key] = list(merged.get(key) or []) + list(after[len(before):])
+    for key in _COUNTER_KEYS:
+        delta = (result.get(key) or 0) - (snapshot.get(key) or 0)
+        if delta:
+            merged[key] = (merged.get(key) or 0) + delta
+    skip = set(_LOG_KEYS) | set(_COUNTER_KEYS)
+    for key, value in result.items():
+        if key in skip:
+            continue
+        if key not in snapshot or snapshot[key] != value:
+            merged[key] = value
+    total = merged.get("total_tasks") or 1
+    merged["progress_percentage"] = (merged.get("completed_tasks", 0) / total) * 100
+
+
+def execute_task_dag(
+    task_names: List[str],
+    state: Dict[str, Any],
+    execute_fn: Callable[[str, Dict[str, Any], Optional[Callable[[str], None]]], Dict[str, Any]],
+    registry: Dict[str, Dict[str, Any]],
+    max_workers: Optional[int] = None,
+    verbose_callback: Optional[Callable[[str], None]] = None,
+    on_task_done: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    stop_on_error: bool = True,
+) -> Dict[str, Any]:
+    """
+    Executa `task_names` respeitando as dependências declaradas no registry.
+
+    Args:
+        task_names: Tasks na ordem sequencial de referência
+        state: Estado inicial
+        execute_fn: Executor de uma task (execute_task_with_context)
+        registry: TASK_REGISTRY (requires/produces de cada task)
+        max_workers: Tamanho do pool; 1 = sequencial
+        verbose_callback: Callback de progresso
+        on_task_done: Chamado após o delta de cada task bem-sucedida ser mesclado
+            (ordem original) — usado para checkpoint/log intermediário
+        stop_on_error: Para no primeiro erro (como o `break` dos pipelines);
+            False segue adiante, como execute_document_analysis_workflow
+
+    Returns:
+        Estado final
+    """
+    workers = max_workers or default_max_workers()
+    waves = [[t] for t in task_names] if workers <= 1 else plan_waves(task_names, registry)
+    if workers > 1 and verbose_callback:
+        verbose_callback("Execution plan: " + " → ".join("[" + ", ".join(w) + "]" for w in waves))
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="langnet-task") if workers > 1 else None
+    try:
+        for wave in waves:
+            for task_name in wave:
+                if verbose_callback:
+                    verbose_callback(f"\n{'='*60}\nExecuting: {task_name}\n{'='*60}")
+
+            if pool is None or len(wave) == 1:
+                # log_task_* fazem append IN-PLACE — conta os erros antes de executar
+                errors_before = len(state.get("errors") or [])
+                state = execute_fn(wave[0], state, verbose_callback)
+                if len(state.get("errors") or []) > errors_before:
+                    if not stop_on_error:
+                        continue
+                    if verbose_callback:
+                        verbose_callback(f"Pipeline stopped due to error in {wave[0]}")
+                    return state
+                if on_task_done:
+                    on_task_done(wave[0], state)
+                continue
+
+            # Cada task recebe sua própria cópia; `base` fica intacta para o diff
+            base = copy.deepcopy(state)
+            futures = {t: pool.submit(execute_fn, t, copy.deepcopy(base), verbose_callback) for t in wave}
+            # Mescla na ordem ORIGINAL (não na de término) — determinístico
+            for task_name in wave:
+                result = futures[task_name].result()
+                _merge_delta(state, base, result)
+                if len(result.get("errors") or []) > len(base.get("errors") or []):
+                    if not stop_on_error:
+                        continue
+                    if verbose_callback:
+                        verbose_callback(f"Pipeline stopped due to error in {task_name}")
+                    return state
+                if on_task_done:
+                    on_task_done(task_name, state)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    return state
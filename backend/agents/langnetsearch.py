@@ -0,0 +1,400 @@
+"""
+LangNet — Cliente HTTP compartilhado para as ferramentas de busca web.
+
+SerperSearchTool / SerpAPISearchTool / TavilySearchTool abriam uma conexão
+`requests` nova por chamada (handshake TLS a cada query) e o `_arun` só chamava
+o `_run` bloqueante. Aqui:
+
+- um `httpx.Client` (caminho síncrono, usado pelo CrewAI) e um
+  `httpx.AsyncClient` por event loop, ambos com pool + keep-alive e HTTP/2
+  quando o pacote `h2` estiver instalado;
+- a montagem do request e o parse da resposta de cada engine ficam num só lugar
+  (ENGINES), compartilhados pelos dois caminhos — o JSON devolvido às tools é o
+  mesmo de antes;
+- `multi_search`: várias queries × várias engines em paralelo, resultados
+  mesclados e deduplicados por URL;
+- antes de qualquer request, o cache de resultados (langnetsearchcache).
+
+Limites do pool: LANGNET_HTTP_MAX_CONNECTIONS (default 20) e
+LANGNET_HTTP_KEEPALIVE (default 10).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+try:
+    import httpx
+except ImportError:  # dependência opcional — cai para `requests`
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+
+_MAX_CONNECTIONS = int(os.getenv("LANGNET_HTTP_MAX_CONNECTIONS", "20"))
+_MAX_KEEPALIVE = int(os.getenv("LANGNET_HTTP_KEEPALIVE", "10"))
+
+_sync_client = None
+_sync_lock = threading.Lock()
+# AsyncClient fica preso ao loop em que foi criado
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def _limits():
+    return httpx.Limits(max_connections=_MAX_CONNECTIONS, max_keepalive_connections=_MAX_KEEPALIVE)
+
+
+def get_sync_client():
+    global _sync_client
+    if _sync_client is None:
+        with _sync_lock:
+            if _sync_client is None:
+                _sync_client = httpx.Client(limits=_limits(), http2=_HTTP2)
+    return _sync_client
+
+
+def get_async_client():
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(limits=_limits(), http2=_HTTP2)
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_clients() -> None:
+    """Fecha o cliente assíncrono do loop atual (shutdown)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# ============================================================================
+# ENGINES — request + parse (compartilhados entre sync e async)
+# ============================================================================
+
+class SearchError(Exception):
+    """Falha de configuração/resposta de uma engine (vira {"success": False})."""
+
+
+def _serper_request(query: str, num_results: int = 10, **_) -> Tuple[str, str, Dict[str, Any]]:
+    api_key = os.getenv("SERPER_API_KEY")
+    if not api_key:
+        raise SearchError("SERPER_API_KEY not configured")
+    return "POST", "https://google.serper.dev/search", {
+        "content": json.dumps({"q": query, "num": num_results}),
+        "headers": {"X-API-KEY": api_key, "Content-Type": "application/json"},
+        "timeout": 10,
+    }
+
+
+def _serper_parse(data: dict, query: str, num_results: int = 10, **_) -> Dict[str, Any]:
+    results = []
+    for item in data.get("organic", [])[:num_results]:
+        results.append({
+            "title": item.get("title", ""),
+            "link": item.get("link", ""),
+            "snippet": item.get("snippet", ""),
+            "position": item.get("position", 0)
+        })
+    return {
+        "success": True,
+        "query": query,
+        "total_results": len(results),
+        "results": results,
+        "search_metadata": {
+            "engine": "google",
+            "api": "serper"
+        }
+    }
+
+
+def _serpapi_request(query: str, num_results: int = 10, search_engine: str = "duckduckgo", **_):
+    api_key = os.getenv("SERPAPI_API_KEY")
+    if not api_key:
+        raise SearchError("SERPAPI_API_KEY not configured")
+    return "GET", "https://serpapi.com/search", {
+        "params": {"q": query, "engine": search_engine, "api_key": api_key, "num": num_results},
+        "timeout": 10,
+    }
+
+
+def _serpapi_parse(data: dict, query: str, num_results: int = 10, search_engine: str = "duckduckgo", **_):
+    results = []
+    for item in data.get("organic_results", [])[:num_results]:
+        results.append({
+            "title": item.get("title", ""),
+            "link": item.get("link", ""),
+            "snippet": item.get("snippet", ""),
+            "position": item.get("position", 0),
+            "displayed_link": item.get("displayed_link", "")
+        })
+    return {
+        "success": True,
+        "query": query,
+        "search_engine": search_engine,
+        "total_results": len(results),
+        "results": results,
+        "search_metadata": data.get("search_metadata", {})
+    }
+
+
+def _tavily_request(query: str, search_depth: str = "basic", max_results: int = 5, **_):
+    api_key = os.getenv("TAVILY_API_KEY")
+    if not api_key:
+        raise SearchError("TAVILY_API_KEY not configured")
+    return "POST", "https://api.tavily.com/search", {
+        "json": {
+            "api_key": api_key,
+            "query": query,
+            "search_depth": search_depth,  # "basic" or "advanced"
+            "max_results": max_results,
+            "include_answer": True,
+            "include_raw_content": False
+        },
+        "timeout": 30,
+    }
+
+
+def _tavily_parse(data: dict, query: str, search_depth: str = "basic", max_results: int = 5, **_):
+    results = []
+    for item in data.get("results", [])[:max_results]:
+        results.append({
+            "title": item.get("title", ""),
+            "url": item.get("url", ""),
+            "content": item.get("content", ""),
+            "score": item.get("score", 0.0),
+            "published_date": item.get("published_date", "")
+        })
+    return {
+        "success": True,
+        "query": query,
+        "search_depth": search_depth,
+        "answer": data.get("answer", ""),  # AI-generated summary
+        "total_results": len(results),
+        "results": results,
+        "search_metadata": {
+            "engine": "tavily",
+            "response_time": data.get("response_time", 0)
+        }
+    }
+
+
+ENGINES = {
+    "serper": (_serper_request, _serper_parse),
+    "serpapi": (_serpapi_request, _serpapi_parse),
+    "tavily": (_tavily_request, _tavily_parse),
+}
+
+
+def _error(engine: str, query: str, exc: Exception, **kwargs) -> Dict[str, Any]:
+    out = {"success": False, "error": str(exc), "query": query}
+    if engine == "serpapi":
+        out["search_engine"] = kwargs.get("search_engine", "duckduckgo")
+    elif engine == "tavily":
+        out["search_depth"] = kwargs.get("search_depth", "basic")
+    return out
+
+
+def _fetch_sync(engine: str, query: str, **kwargs) -> Dict[str, Any]:
+    """Busca numa engine pelo cliente síncrono compartilhado (sem cache)."""
+    build, parse = ENGINES[engine]
+    try:
+        method, url, req = build(query, **kwargs)
+        if httpx is None:
+            import requests
+            if "content" in req:
+                req["data"] = req.pop("content")
+            response = requests.request(method, url, **req)
+        else:
+            response = get_sync_client().request(method, url, **req)
+        response.raise_for_status()
+        return parse(response.json(), query, **kwargs)
+    except SearchError as e:
+        return {"success": False, "error": str(e)}
+    except Exception as e:
+        return _error(engine, query, e, **kwargs)
+
+
+async def _fetch_async(engine: str, query: str, **kwargs) -> Dict[str, Any]:
+    """Busca numa engine sem bloquear o loop (AsyncClient do loop corrente, sem cache)."""
+    if httpx is None:
+        return await asyncio.to_thread(_fetch_sync, engine, query, **kwargs)
+    build, parse = ENGINES[engine]
+    try:
+        method, url, req = build(query, **kwargs)
+        response = await get_async_client().request(method, url, **req)
+        response.raise_for_status()
+        return parse(response.json(), query, **kwargs)
+    except SearchError as e:
+        return {"success": False, "error": str(e)}
+    except Exception as e:
+        return _error(engine, query, e, **kwargs)
+
+
+# ============================================================================
+# CACHE (langnetsearchcache) — consultado antes de qualquer request
+# ============================================================================
+
+# Defaults de cada engine: `search("serper", q)` e `search("serper", q,
+# num_results=10)` precisam cair na mesma chave
+_PARAM_DEFAULTS = {
+    "serper": {"num_results": 10},
+    "serpapi": {"num_results": 10, "search_engine": "duckduckgo"},
+    "tavily": {"search_depth": "basic", "max_results": 5},
+}
+
+
+def _cache_lookup(engine: str, query: str, kwargs: Dict[str, Any]):
+    from agents.langnetsearchcache import get_search_cache, make_search_key
+
+    cache = get_search_cache()
+    key = make_search_key(engine, query, {**_PARAM_DEFAULTS[engine], **kwargs})
+    cached, state = cache.lookup(engine, key)
+    if state == "stale" and cache.begin_refresh(key):
+        # stale-while-revalidate: devolve o vencido já, busca o novo em segundo plano
+        threading.Thread(
+            target=_refresh, args=(cache, key, engine, query, kwargs), daemon=True
+        ).start()
+    if cached is not None:
+        cached = {**cached, "query": query, "cache": state}
+    return cache, key, cached
+
+
+def _refresh(cache, key: str, engine: str, query: str, kwargs: Dict[str, Any]) -> None:
+    try:
+        cache.put(engine, query, key, _fetch_sync(engine, query, **kwargs))
+    finally:
+        cache.end_refresh(key)
+
+
+def search_sync(engine: str, query: str, **kwargs) -> Dict[str, Any]:
+    """Busca numa engine: cache (fresco ou stale) ou cliente síncrono compartilhado."""
+    cache, key, cached = _cache_lookup(engine, query, kwargs)
+    if cached is not None:
+        return cached
+    response = _fetch_sync(engine, query, **kwargs)
+    cache.put(engine, query, key, response)
+    return response
+
+
+async def search_async(engine: str, query: str, **kwargs) -> Dict[str, Any]:
+    """Busca numa engine sem bloquear o loop: cache ou AsyncClient do loop corrente."""
+    cache, key, cached = await asyncio.to_thread(_cache_lookup, engine, query, kwargs)
+    if cached is not None:
+        return cached
+    response = await _fetch_async(engine, query, **kwargs)
+    await asyncio.to_thread(cache.put, engine, query, key, response)
+    return response
+
+
+# ============================================================================
+# FAN-OUT
+# ============================================================================
+
+def normalize_url(url: str) -> str:
+    """Chave de deduplicação: sem esquema/www/fragmento/barra final."""
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return urlunsplit(("", host, parts.path.rstrip("/"), parts.query, ""))
+
+
+def merge_results(responses: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Mescla respostas (engine, json) — primeira ocorrência de cada URL vence,
+    na ordem das respostas; `sources` lista todas as engines que a devolveram."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for engine, resp in responses:
+        if not resp.get("success"):
+            continue
+        for item in resp.get("results", []):
+            url = item.get("link") or item.get("url") or ""
+            key = normalize_url(url) or f"{engine}:{len(merged)}"
+            if key in merged:
+                if engine not in merged[key]["sources"]:
+                    merged[key]["sources"].append(engine)
+                continue
+            merged[key] = {
+                "title": item.get("title", ""),
+                "url": url,
+                "snippet": item.get("snippet") or item.get("content", ""),
+                "query": resp.get("query", ""),
+                "sources": [engine],
+            }
+    return list(merged.values())
+
+
+def configured_engines() -> List[str]:
+    keys = {"serper": "SERPER_API_KEY", "serpapi": "SERPAPI_API_KEY", "tavily": "TAVILY_API_KEY"}
+    return [e for e, k in keys.items() if os.getenv(k)]
+
+
+async def multi_search(
+    queries: List[str],
+    engines: Optional[List[str]] = None,
+    num_results: int = 10,
+) -> Dict[str, Any]:
+    """Todas as combinações query × engine em paralelo; resultados deduplicados por URL."""
+    engines = [e for e in (engines or configured_engines()) if e in ENGINES]
+    if not engines:
+        return {"success": False, "error": "no search engine configured"}
+
+    jobs = []
+    for query in queries:
+        for engine in engines:
+            kwargs = {"max_results": num_results} if engine == "tavily" else {"num_results": num_results}
+            jobs.append((engine, query, search_async(engine, query, **kwargs)))
+    responses = await asyncio.gather(*(coro for _, _, coro in jobs))
+    pairs = [(engine, {"query": query, **resp}) for (engine, query, _), resp in zip(jobs, responses)]
+
+    results = merge_results(pairs)
+    return {
+        "success": any(r.get("success") for _, r in pairs),
+        "queries": queries,
+        "engines": engines,
+        "total_results": len(results),
+        "results": results,
+        "answers": [r["answer"] for _, r in pairs if r.get("answer")],
+        "errors": [{"engine": e, "query": r.get("query"), "error": r.get("error")}
+                   for e, r in pairs if not r.get("success")],
+    }
+
+
+def run_sync(coro):
+    """Executa uma corrotina a partir de código síncrono (CrewAI chama `_run`).
+    Dentro de um loop já rodando, usa uma thread própria para não reentrar.
+    O AsyncClient do loop temporário é fechado junto com ele."""
+    async def _scoped():
+        try:
+            return await coro
+        finally:
+            await aclose_clients()
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_scoped())
+    box: Dict[str, Any] = {}
+
+    def _target():
+        try:
+            box["value"] = asyncio.run(_scoped())
+        except BaseException as e:  # noqa: BLE001
+            box["error"] = e
+
+    t = threading.Thread(target=_target, daemon=True)
+    t.start()
+    t.join()
+    if "error" in box:
+        raise box["error"]
+    return box["value"]
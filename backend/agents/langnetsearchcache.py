@@ -0,0 +1,190 @@
+"""
+LangNet — Cache persistente de resultados de busca web (Serper/SerpAPI/Tavily).
+
+As mesmas pesquisas regulatórias e de boas práticas ("LGPD requisitos",
+"PCI-DSS compliance e-commerce", docs de frameworks) são reenviadas a cada
+projeto — latência e cota de API pagas de novo. A chave aqui é a query
+NORMALIZADA (minúsculas, sem acentos/pontuação/stopwords, palavras ordenadas) +
+engine + parâmetros que mudam o resultado (nº de resultados, engine do SerpAPI,
+profundidade do Tavily): "Requisitos da LGPD" e "lgpd requisitos" caem na mesma
+entrada.
+
+Backend: SQLite local (~/.langnet-cache/search/results.sqlite3), no mesmo
+armazenamento do cache de LLM (langnetkvstore), com:
+  - TTL por engine: LANGNET_SEARCH_TTL_<ENGINE> (segundos; default serper/serpapi
+    1 dia, tavily 7 dias);
+  - stale-while-revalidate: até LANGNET_SEARCH_STALE (default 7 dias) além do
+    TTL, a entrada vencida é devolvida na hora e revalidada em segundo plano;
+  - contadores hit/stale/miss/refresh em memória (stats()).
+
+Só respostas com success=True são gravadas. Desligar: LANGNET_SEARCH_CACHE=0.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .langnetkvstore import SQLiteKVStore
+
+
+_DEFAULT_CACHE_PATH = Path.home() / ".langnet-cache" / "search" / "results.sqlite3"
+
+_DEFAULT_TTLS = {"serper": 24 * 3600, "serpapi": 24 * 3600, "tavily": 7 * 24 * 3600}
+
+# Palavras sem peso na busca (pt/en). Negações ficam de fora de propósito —
+# "sem autenticação" ≠ "autenticação".
+_STOPWORDS = frozenset("""
+a o as os um uma uns umas de do da dos das em no na nos nas por pelo pela pelos
+pelas para pra com e ou que se ao aos à às como sobre entre sua seu suas seus
+the an of in on at to for with and or by from as is are be into about its
+""".split())
+
+_WORD = re.compile(r"[a-z0-9]+(?:[.\-+#][a-z0-9]+)*\+*#?")
+
+
+def normalize_query(query: str) -> str:
+    """Forma canônica: minúsculas, sem acentos, sem stopwords, palavras ordenadas."""
+    text = unicodedata.normalize("NFKD", query or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    words = {w for w in _WORD.findall(text) if w not in _STOPWORDS}
+    return " ".join(sorted(words))
+
+
+def make_search_key(engine: str, query: str, params: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        {"engine": engine, "query": normalize_query(query), "params": params},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchResultCache:
+    """Cache chave→JSON de resultado em SQLite, com TTL por engine e janela stale."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttls: Optional[Dict[str, int]] = None,
+        stale_seconds: int = 7 * 24 * 3600,
+        enabled: bool = True,
+    ):
+        self.path = Path(path) if path else _DEFAULT_CACHE_PATH
+        self.ttls = {**_DEFAULT_TTLS, **(ttls or {})}
+        self.stale_seconds = int(stale_seconds)
+        self.enabled = enabled
+        self._store = SQLiteKVStore(
+            self.path,
+            "search_results",
+            {"engine": "TEXT NOT NULL", "normalized_query": "TEXT NOT NULL"},
+            tag="SEARCH-CACHE",
+        )
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "writes": 0, "refreshes": 0}
+        self._refreshing: set = set()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def lookup(self, engine: str, key: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """(resposta, estado) — estado ∈ {"hit", "stale", "miss"}."""
+        if not self.enabled:
+            return None, "miss"
+        now = time.time()
+        ttl = self.ttls.get(engine, _DEFAULT_TTLS["serper"])
+        row = self._store.get(key)
+        if row is None:
+            self._count("misses")
+            return None, "miss"
+        response, created_at = row
+        age = now - created_at
+        if age > ttl + self.stale_seconds:
+            self._store.delete(key)
+            self._count("misses")
+            return None, "miss"
+        try:
+            cached = json.loads(response)
+        except json.JSONDecodeError as e:
+            print(f"[SEARCH-CACHE] erro de leitura ({e}) — tratado como miss")
+            self._count("misses")
+            return None, "miss"
+        self._store.touch(key, now)
+        state = "hit" if age <= ttl else "stale"
+        self._count("hits" if state == "hit" else "stale_hits")
+        return cached, state
+
+    def put(self, engine: str, query: str, key: str, response: Dict[str, Any]) -> None:
+        if not self.enabled or not response.get("success"):
+            return
+        if self._store.put(
+            key,
+            json.dumps(response, ensure_ascii=False),
+            engine=engine,
+            normalized_query=normalize_query(query),
+        ):
+            self._count("writes")
+
+    def begin_refresh(self, key: str) -> bool:
+        """Reserva a revalidação de `key` (uma por vez por entrada)."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self._counters["refreshes"] += 1
+            return True
+
+    def end_refresh(self, key: str) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def clear(self) -> int:
+        """Esvazia o cache. Retorna quantas entradas foram removidas."""
+        return self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores do processo + entradas por engine."""
+        with self._lock:
+            counters = dict(self._counters)
+        entries, total, per_engine = self._store.summary(group_by="engine") if self.enabled else (0, 0, {})
+        lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": round((counters["hits"] + counters["stale_hits"]) / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "entries_per_engine": per_engine,
+            "size_bytes": total,
+            "ttl_seconds": self.ttls,
+            "stale_seconds": self.stale_seconds,
+            "enabled": self.enabled,
+            "path": str(self.path),
+        }
+
+
+_CACHE: Optional[SearchResultCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_search_cache() -> SearchResultCache:
+    """Instância única do processo, configurada por variáveis de ambiente."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = SearchResultCache(
+                    path=Path(os.getenv("LANGNET_SEARCH_CACHE_PATH", str(_DEFAULT_CACHE_PATH))),
+                    ttls={
+                        engine: int(os.getenv(f"LANGNET_SEARCH_TTL_{engine.upper()}", str(ttl)))
+                        for engine, ttl in _DEFAULT_TTLS.items()
+                    },
+                    stale_seconds=int(os.getenv("LANGNET_SEARCH_STALE", str(7 * 24 * 3600))),
+                    enabled=os.getenv("LANGNET_SEARCH_CACHE", "1").lower() not in ("0", "false", "no", "off"),
+                )
+    return _CACHE
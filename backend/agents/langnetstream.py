@@ -0,0 +1,75 @@
+"""
+LangNet — Canal de streaming de tokens das tasks para a camada de transporte.
+
+As tasks rodam em threads de trabalho (asyncio.to_thread / pool do escalonador),
+longe do event loop e do ConnectionManager. O estado (LangNetFullState) é
+copiado entre tasks, então ele carrega só o NOME do canal
+(`state["stream_channel"]`, normalmente o execution_id); o consumidor real fica
+registrado aqui e é procurado pelo nome na hora da chamada ao LLM.
+
+Um sink é qualquer objeto com:
+  - delta(task_name, text)      → chamado a cada pedaço recebido do LLM
+  - done(task_name, full_text)  → chamado ao fim da geração
+  - event(message)              → opcional; eventos de ciclo de vida da task
+                                  (task_started, progress, task_completed, ...)
+
+Para abortar uma geração em andamento o sink levanta GenerationAborted dentro
+de delta(); o stream HTTP é fechado e a task falha com essa exceção.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class GenerationAborted(Exception):
+    """Geração interrompida a pedido do usuário."""
+
+
+_SINKS: Dict[str, Any] = {}
+_SINKS_LOCK = threading.Lock()
+
+
+def register_stream_sink(channel: str, sink: Any) -> None:
+    with _SINKS_LOCK:
+        _SINKS[channel] = sink
+
+
+def unregister_stream_sink(channel: str) -> None:
+    with _SINKS_LOCK:
+        _SINKS.pop(channel, None)
+
+
+def get_stream_sink(channel: Optional[str]) -> Optional[Any]:
+    if not channel:
+        return None
+    with _SINKS_LOCK:
+        return _SINKS.get(channel)
+
+
+def delta_callback(channel: Optional[str], task_name: str) -> Optional[Callable[[str], None]]:
+    """Callback de delta já ligado à task, ou None se não há ninguém ouvindo."""
+    sink = get_stream_sink(channel)
+    if sink is None:
+        return None
+    return lambda text: sink.delta(task_name, text)
+
+
+def notify_done(channel: Optional[str], task_name: str, full_text: str) -> None:
+    sink = get_stream_sink(channel)
+    if sink is not None:
+        try:
+            sink.done(task_name, full_text)
+        except Exception as e:
+            print(f"[STREAM] sink.done falhou em '{task_name}': {e}")
+
+
+def notify_event(channel: Optional[str], message: Dict[str, Any]) -> None:
+    """Encaminha um evento de task ao sink do canal (se houver e se suportar)."""
+    sink = get_stream_sink(channel)
+    handler = getattr(sink, "event", None)
+    if handler is not None:
+        try:
+            handler(message)
+        except Exception as e:
+            print(f"[STREAM] sink.event falhou ({message.get('type')}): {e}")
@@ -9,6 +9,8 @@ from typing import Dict, Any, List, Optional
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from .langnetsearch import multi_search, run_sync, search_async, search_sync
+
 
 # Tool for reading and parsing documents
 class DocumentReaderToolInput(BaseModel):
@@ -357,64 +359,12 @@ class SerperSearchTool(BaseTool):
     args_schema: type[BaseModel] = SerperSearchToolInput
 
     def _run(self, query: str, num_results: int = 10) -> str:
-        """Execute web search"""
-        try:
-            import os
-            import requests
-
-            api_key = os.getenv("SERPER_API_KEY")
-            if not api_key:
-                return json.dumps({
-                    "success": False,
-                    "error": "SERPER_API_KEY not configured"
-                })
-
-            url = "https://google.serper.dev/search"
-            payload = json.dumps({
-                "q": query,
-                "num": num_results
-            })
-            headers = {
-                'X-API-KEY': api_key,
-                'Content-Type': 'application/json'
-            }
-
-            response = requests.post(url, headers=headers, data=payload, timeout=10)
-            response.raise_for_status()
-
-            data = response.json()
-
-            # Extract organic results
-            results = []
-            for item in data.get("organic", [])[:num_results]:
-                results.append({
-                    "title": item.get("title", ""),
-                    "link": item.get("link", ""),
-                    "snippet": item.get("snippet", ""),
-                    "position": item.get("position", 0)
-                })
-
-            return json.dumps({
-                "success": True,
-                "query": query,
-                "total_results": len(results),
-                "results": results,
-                "search_metadata": {
-                    "engine": "google",
-                    "api": "serper"
-                }
-            })
-
-        except Exception as e:
-            return json.dumps({
-                "success": False,
-                "error": str(e),
-                "query": query
-            })
+        """Execute web search (shared pooled client)"""
+        return json.dumps(search_sync("serper", query, num_results=num_results))
 
     async def _arun(self, query: str, num_results: int = 10) -> str:
-        """Async version"""
-        return self._run(query, num_results)
+        """Async version (non-blocking, pooled)"""
+        return json.dumps(await search_async("serper", query, num_results=num_results))
 
 
 class SerpAPISearchToolInput(BaseModel):
@@ -460,62 +410,12 @@ class SerpAPISearchTool(BaseTool):
     args_schema: type[BaseModel] = SerpAPISearchToolInput
 
     def _run(self, query: str, num_results: int = 10, search_engine: str = "duckduckgo") -> str:
-        """Execute web search"""
-        try:
-            import os
-            import requests
-
-            api_key = os.getenv("SERPAPI_API_KEY")
-            if not api_key:
-                return json.dumps({
-                    "success": False,
-                    "error": "SERPAPI_API_KEY not configured"
-                })
-
-            url = "https://serpapi.com/search"
-            params = {
-                "q": query,
-                "engine": search_engine,
-                "api_key": api_key,
-                "num": num_results
-            }
-
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-
-            data = response.json()
-
-            # Extract organic results
-            results = []
-            for item in data.get("organic_results", [])[:num_results]:
-                results.append({
-                    "title": item.get("title", ""),
-                    "link": item.get("link", ""),
-                    "snippet": item.get("snippet", ""),
-                    "position": item.get("position", 0),
-                    "displayed_link": item.get("displayed_link", "")
-                })
-
-            return json.dumps({
-                "success": True,
-                "query": query,
-                "search_engine": search_engine,
-                "total_results": len(results),
-                "results": results,
-                "search_metadata": data.get("search_metadata", {})
-            })
-
-        except Exception as e:
-            return json.dumps({
-                "success": False,
-                "error": str(e),
-                "query": query,
-                "search_engine": search_engine
-            })
+        """Execute web search (shared pooled client)"""
+        return json.dumps(search_sync("serpapi", query, num_results=num_results, search_engine=search_engine))
 
     async def _arun(self, query: str, num_results: int = 10, search_engine: str = "duckduckgo") -> str:
-        """Async version"""
-        return self._run(query, num_results, search_engine)
+        """Async version (non-blocking, pooled)"""
+        return json.dumps(await search_async("serpapi", query, num_results=num_results, search_engine=search_engine))
 
 
 class TavilySearchToolInput(BaseModel):
@@ -561,68 +461,52 @@ class TavilySearchTool(BaseTool):
     args_schema: type[BaseModel] = TavilySearchToolInput
 
     def _run(self, query: str, search_depth: str = "basic", max_results: int = 5) -> str:
-        """Execute Tavily deep search"""
-        try:
-            import os
-            import requests
+        """Execute Tavily deep search (shared pooled client)"""
+        return json.dumps(search_sync("tavily", query, search_depth=search_depth, max_results=max_results))
 
-            api_key = os.getenv("TAVILY_API_KEY")
-            if not api_key:
-                return json.dumps({
-                    "success": False,
-                    "error": "TAVILY_API_KEY not configured"
-                })
+    async def _arun(self, query: str, search_depth: str = "basic", max_results: int = 5) -> str:
+        """Async version (non-blocking, pooled)"""
+        return json.dumps(await search_async("tavily", query, search_depth=search_depth, max_results=max_results))
 
-            url = "https://api.tavily.com/search"
-            payload = {
-                "api_key": api_key,
-                "query": query,
-                "search_depth": search_depth,  # "basic" or "advanced"
-                "max_results": max_results,
-                "include_answer": True,
-                "include_raw_content": False
-            }
 
-            response = requests.post(url, json=payload, timeout=30)
-            response.raise_for_status()
+class MultiSearchToolInput(BaseModel):
+    """Input schema for MultiSearchTool"""
+    queries: List[str] = Field(description="One or more search queries")
+    engines: Optional[List[str]] = Field(
+        default=None,
+        description="Engines to use: serper, serpapi, tavily (default: all configured)"
+    )
+    num_results: int = Field(default=5, description="Results per query per engine")
 
-            data = response.json()
 
-            # Extract results
-            results = []
-            for item in data.get("results", [])[:max_results]:
-                results.append({
-                    "title": item.get("title", ""),
-                    "url": item.get("url", ""),
-                    "content": item.get("content", ""),
-                    "score": item.get("score", 0.0),
-                    "published_date": item.get("published_date", "")
-                })
+class MultiSearchTool(BaseTool):
+    """
+    🌐 Multi Search - Sends SEVERAL queries to SEVERAL engines at once:
+    - All query × engine requests run concurrently over a pooled HTTP client
+    - Results are merged and deduplicated by URL (with the engines that found each one)
 
-            return json.dumps({
-                "success": True,
-                "query": query,
-                "search_depth": search_depth,
-                "answer": data.get("answer", ""),  # AI-generated summary
-                "total_results": len(results),
-                "results": results,
-                "search_metadata": {
-                    "engine": "tavily",
-                    "response_time": data.get("response_time", 0)
-                }
-            })
+    WHEN TO USE: Researching many topics/requirements in one step
+    BEST FOR: Batch research, cross-checking sources across engines
+    """
+    name: str = "multi_search"
+    description: str = """
+    🌐 Multi Search - Runs MANY queries on MANY engines concurrently:
+    - Use instead of calling serper/serpapi/tavily one query at a time
+    - Results merged and deduplicated by URL
 
-        except Exception as e:
-            return json.dumps({
-                "success": False,
-                "error": str(e),
-                "query": query,
-                "search_depth": search_depth
-            })
+    Input: queries (list of str), engines (optional list: serper, serpapi, tavily),
+           num_results (int, default=5)
+    Returns: JSON with merged results (title, url, snippet, query, sources)
+    """
+    args_schema: type[BaseModel] = MultiSearchToolInput
 
-    async def _arun(self, query: str, search_depth: str = "basic", max_results: int = 5) -> str:
+    def _run(self, queries: List[str], engines: Optional[List[str]] = None, num_results: int = 5) -> str:
+        """Execute the concurrent fan-out"""
+        return json.dumps(run_sync(multi_search(queries, engines, num_results)))
+
+    async def _arun(self, queries: List[str], engines: Optional[List[str]] = None, num_results: int = 5) -> str:
         """Async version"""
-        return self._run(query, search_depth, max_results)
+        return json.dumps(await multi_search(queries, engines, num_results))
 
 
 # Factory function to create all tools
@@ -642,7 +526,8 @@ def create_langnet_tools() -> Dict[str, BaseTool]:
         "yaml_validator": YAMLValidatorTool(),
         "serper_search": SerperSearchTool(),
         "serpapi_search": SerpAPISearchTool(),
-        "tavily_search": TavilySearchTool()
+        "tavily_search": TavilySearchTool(),
+        "multi_search": MultiSearchTool()
     }
 
 
@@ -656,5 +541,7 @@ __all__ = [
     "YAMLValidatorTool",
     "SerperSearchTool",
     "SerpAPISearchTool",
+    "TavilySearchTool",
+    "MultiSearchTool",
     "create_langnet_tools"
 ]
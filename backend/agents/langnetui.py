@@ -5,17 +5,18 @@ Consome a Especificação Funcional (UCs + wireframes) + schema_sql do Data Mode
 e produz, por tela:
   - estrutura JSON (rota, entidade, componentes ligados ao schema, ações)
   - mockup HTML/CSS standalone
-  - PNG do mockup (render headless via Playwright) para revisão visual
+  - PNG do mockup (render headless via Playwright, pool em langnetrender) para revisão visual
 
 Espelha o padrão de agents/langnetdatamodel.py (LLM CrewAI, provider-agnóstico).
-Geração chunked: 1 tela por chamada LLM.
+Geração chunked: 1 tela por chamada LLM, telas geradas em paralelo (limite de
+concorrência no LLM) e remontadas na ordem dos UCs.
 """
 from __future__ import annotations
 
-import base64
 import json
 import os
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional
 
 from prompts.generate_ui_spec import (
     parse_uc_blocks, parse_schema_tables, select_relevant_tables,
@@ -176,28 +177,19 @@ def _call_llm(prompt: str) -> str:
 # ────────────────────────────────────────────────────────────────────────
 def render_html_to_png_b64(html: str, width: int = 960) -> Optional[str]:
     """Renderiza um HTML standalone em PNG e devolve como data URI base64.
-    Retorna None se o Playwright não estiver disponível ou falhar."""
+    Usa o renderer compartilhado (navegador quente + cache por hash — ver
+    agents/langnetrender.py). Retorna None se o Playwright não estiver disponível
+    ou falhar."""
     if not html:
         return None
-    try:
-        from playwright.sync_api import sync_playwright
-    except Exception as e:
-        print(f"[UI_SPEC] Playwright indisponível: {e}")
-        return None
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(args=["--no-sandbox"])
-            page = browser.new_page(viewport={"width": width, "height": 800})
-            page.set_content(html, wait_until="networkidle")
-            # Tailwind CDN (JIT) processa as classes via JS após o load — dá um
-            # tempo pra pintar antes de tirar o screenshot.
-            page.wait_for_timeout(1200)
-            png = page.screenshot(full_page=True)
-            browser.close()
-        return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
-    except Exception as e:
-        print(f"[UI_SPEC] render falhou: {e}")
-        return None
+    from agents.langnetrender import get_renderer
+    return get_renderer().render(html, width)
+
+
+def render_many_html_to_png_b64(htmls: Dict[str, str], width: int = 960) -> Dict[str, str]:
+    """Renderiza várias telas em paralelo no pool do renderer. {id: html} → {id: data_uri}."""
+    from agents.langnetrender import get_renderer
+    return get_renderer().render_many(htmls, width)
 
 
 # ────────────────────────────────────────────────────────────────────────
@@ -335,14 +327,70 @@ def _derive_nav_items(ucs: List[Dict[str, str]], max_items: int = 6) -> str:
     return ", ".join(labels)
 
 
+def _generate_screen_with_retries(uc: Dict[str, str], sub_schema: str, project_name: str,
+                                  nav_items: Optional[str], attempts: int) -> tuple:
+    """Retry POR TELA em volta de ``_generate_one_screen`` (que já faz 1 retry de
+    formato): cobre também exceções do provider (timeout, 429, 5xx) com backoff
+    linear. Retorna (screen|None, erro|None) — uma tela ruim não derruba as demais."""
+    backoff = float(os.getenv("LANGNET_UI_SPEC_RETRY_BACKOFF", "2"))
+    error: Optional[str] = None
+    for attempt in range(1, max(1, attempts) + 1):
+        try:
+            screen = _generate_one_screen(uc, sub_schema, project_name, nav_items)
+            if screen:
+                return screen, None
+            error = "JSON inválido"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        if attempt < attempts:
+            print(f"[UI_SPEC] {uc.get('id')} tentativa {attempt}/{attempts} falhou ({error})")
+            time.sleep(backoff * attempt)
+    return None, error
+
+
+def _postprocess_screen(screen: Dict[str, Any], uc: Dict[str, str], tables: Dict[str, str],
+                        cols_by_table: Dict[str, list], fks: Dict[str, Dict[str, str]]) -> None:
+    """Pós-processamento determinístico de uma tela gerada (sem LLM)."""
+    # P2: anula bindTo inventado (fora do schema) — zero vínculo quebrado.
+    _sanitize_screen_binds(screen, cols_by_table)
+    # P3: campos FK viram select (dropdown da entidade referenciada).
+    _mark_fk_selects(screen, fks)
+    # Tipo de tela derivado da INTENÇÃO do UC (fonte: comportamento).
+    screen["kind"] = derive_screen_kind(uc)
+    _align_layout_to_kind(screen)
+    # CONSISTÊNCIA protótipo↔código: só telas de LISTAGEM de entidade recebem o
+    # mockup de CRUD CONVENCIONAL determinístico. Telas de criar/editar/aprovar
+    # NÃO são forçadas a tabela — respeitam o verbo do UC (evita over-CRUD).
+    _ent = screen.get("entity")
+    if _ent and _ent in tables and screen["kind"] == "list":
+        screen["layout"] = "table"
+        screen["mockup_html"] = _crud_mockup_html(
+            screen.get("name") or _ent, _ent, tables[_ent])
+
+
 def execute_ui_spec_workflow(
     specification_document: str,
     schema_sql: str = "",
     render_png: bool = True,
     project_name: str = "Sistema",
+    max_concurrency: Optional[int] = None,
+    max_attempts: Optional[int] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
 ) -> Dict[str, Any]:
     """Gera a UI Spec inteira (todas as telas) a partir da spec + schema.
 
+    As telas são independentes (1 UC → 1 chamada LLM), então são geradas em
+    paralelo com no máximo ``max_concurrency`` chamadas simultâneas ao LLM
+    (LANGNET_UI_SPEC_CONCURRENCY, default 4; 1 = sequencial). Cada tela tem até
+    ``max_attempts`` tentativas (LANGNET_UI_SPEC_RETRIES, default 2). O PNG de
+    cada tela entra na fila do renderer assim que ela fica pronta. O resultado é
+    remontado na ordem dos UCs, independente da ordem de conclusão.
+
+    ``on_progress``, se dado, é chamado (na thread do chamador) a cada tela
+    concluída com um resultado PARCIAL no mesmo formato do retorno + ``done``/
+    ``total`` — permite persistir e exibir as telas conforme ficam prontas.
+    Falhas no callback são ignoradas.
+
     Retorna:
       {
         "ui_spec": {screens, navigation, action_map},
@@ -351,76 +399,101 @@ def execute_ui_spec_workflow(
         "generation_log": "..."
       }
     """
-    import re as _re  # noqa
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
     ucs = parse_uc_blocks(specification_document)
     tables = parse_schema_tables(schema_sql) if schema_sql else {}
     cols_by_table = schema_columns(schema_sql) if schema_sql else {}
     fks = schema_fks(schema_sql) if schema_sql else {}
     nav_items = _derive_nav_items(ucs)
+    total = len(ucs)
+    workers = max(1, max_concurrency or int(os.getenv("LANGNET_UI_SPEC_CONCURRENCY", "4")))
+    attempts = max(1, max_attempts or int(os.getenv("LANGNET_UI_SPEC_RETRIES", "2")))
 
-    log_lines: List[str] = [f"UCs: {len(ucs)}, tabelas: {len(tables)}"]
-    screens: List[Dict[str, Any]] = []
-    mockups: Dict[str, str] = {}
-    action_map: Dict[str, Dict[str, str]] = {}
-
-    for idx, uc in enumerate(ucs, 1):
+    def _build(idx: int, uc: Dict[str, str]) -> tuple:
         picked = select_relevant_tables(uc, tables)
         sub_schema = build_sub_schema(picked, tables)
-        screen = _generate_one_screen(uc, sub_schema, project_name, nav_items)
-        if not screen:
-            log_lines.append(f"[{idx}/{len(ucs)}] {uc.get('id')} FALHOU")
-            print(f"[UI_SPEC] [{idx}/{len(ucs)}] {uc.get('id')} falhou")
-            continue
-
-        # P2: anula bindTo inventado (fora do schema) — zero vínculo quebrado.
-        _sanitize_screen_binds(screen, cols_by_table)
-        # P3: campos FK viram select (dropdown da entidade referenciada).
-        _mark_fk_selects(screen, fks)
-        # Tipo de tela derivado da INTENÇÃO do UC (fonte: comportamento).
-        screen["kind"] = derive_screen_kind(uc)
-        _align_layout_to_kind(screen)
-        # CONSISTÊNCIA protótipo↔código: só telas de LISTAGEM de entidade recebem o
-        # mockup de CRUD CONVENCIONAL determinístico. Telas de criar/editar/aprovar
-        # NÃO são forçadas a tabela — respeitam o verbo do UC (evita over-CRUD).
-        _ent = screen.get("entity")
-        if _ent and _ent in tables and screen["kind"] == "list":
-            screen["layout"] = "table"
-            screen["mockup_html"] = _crud_mockup_html(
-                screen.get("name") or _ent, _ent, tables[_ent])
-
-        # Separa o HTML pesado do PNG
-        html = screen.get("mockup_html", "")
-        if render_png and html:
-            png = render_html_to_png_b64(html)
-            if png:
-                mockups[screen["id"]] = png
-
-        # action_map: agrega ações task/crud
-        for act in (screen.get("actions") or []):
-            tgt = act.get("target")
-            kind = act.get("kind")
-            if tgt and kind in ("task", "crud"):
-                action_map[tgt] = {"kind": kind, "screen": screen["id"]}
-
-        screens.append(screen)
-        log_lines.append(
-            f"[{idx}/{len(ucs)}] {uc.get('id')} → {screen.get('id')} "
-            f"({len(screen.get('components', []))} comps, png={'sim' if screen['id'] in mockups else 'nao'})"
-        )
-        print(f"[UI_SPEC] {log_lines[-1]}")
-
-    navigation = _build_navigation(screens)
-    ui_spec = {
-        "screens": screens,
-        "navigation": navigation,
-        "action_map": action_map,
-    }
-    return {
-        "ui_spec": ui_spec,
-        "mockups": mockups,
-        "screens_count": len(screens),
-        "generation_log": "\n".join(log_lines),
-    }
+        screen, error = _generate_screen_with_retries(uc, sub_schema, project_name, nav_items, attempts)
+        if screen:
+            _postprocess_screen(screen, uc, tables, cols_by_table, fks)
+        return screen, error
+
+    results: Dict[int, tuple] = {}          # idx → (uc, screen|None, erro|None)
+    png_by_html: Dict[str, Any] = {}        # html → Future do renderer (HTML igual renderiza 1x)
+    renderer = None
+    if render_png:
+        from agents.langnetrender import get_renderer
+        renderer = get_renderer()
+
+    def _assemble(final: bool) -> Dict[str, Any]:
+        log_lines: List[str] = [f"UCs: {total}, tabelas: {len(tables)}"]
+        if workers > 1:
+            log_lines[0] += f", concorrência: {min(workers, max(1, total))}"
+        screens: List[Dict[str, Any]] = []
+        mockups: Dict[str, str] = {}
+        action_map: Dict[str, Dict[str, str]] = {}
+        for idx in sorted(results):
+            uc, screen, error = results[idx]
+            if not screen:
+                log_lines.append(f"[{idx}/{total}] {uc.get('id')} FALHOU"
+                                 + (f" ({error})" if error and final else ""))
+                continue
+            html = screen.get("mockup_html", "")
+            fut = png_by_html.get(html) if html else None
+            if fut is not None and (final or fut.done()):
+                try:
+                    uri = fut.result(timeout=300)
+                except Exception as e:
+                    print(f"[UI_SPEC] render de {screen['id']} falhou: {e}")
+                    uri = None
+                if uri:
+                    mockups[screen["id"]] = uri
+            # action_map: agrega ações task/crud
+            for act in (screen.get("actions") or []):
+                tgt = act.get("target")
+                kind = act.get("kind")
+                if tgt and kind in ("task", "crud"):
+                    action_map[tgt] = {"kind": kind, "screen": screen["id"]}
+            screens.append(screen)
+            line = (f"[{idx}/{total}] {uc.get('id')} → {screen.get('id')} "
+                    f"({len(screen.get('components', []))} comps")
+            log_lines.append(line + (f", png={'sim' if screen['id'] in mockups else 'nao'})"
+                                     if final else ")"))
+        return {
+            "ui_spec": {
+                "screens": screens,
+                "navigation": _build_navigation(screens),
+                "action_map": action_map,
+            },
+            "mockups": mockups,
+            "screens_count": len(screens),
+            "generation_log": "\n".join(log_lines),
+        }
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ui-spec") as pool:
+        futures = {pool.submit(_build, idx, uc): (idx, uc) for idx, uc in enumerate(ucs, 1)}
+        for fut in as_completed(futures):
+            idx, uc = futures[fut]
+            try:
+                screen, error = fut.result()
+            except Exception as e:
+                screen, error = None, str(e) or type(e).__name__
+            results[idx] = (uc, screen, error)
+            if not screen:
+                print(f"[UI_SPEC] [{idx}/{total}] {uc.get('id')} falhou ({error})")
+            else:
+                html = screen.get("mockup_html", "")
+                if renderer is not None and html and html not in png_by_html:
+                    png_by_html[html] = renderer.submit(html)
+                print(f"[UI_SPEC] [{idx}/{total}] {uc.get('id')} → {screen.get('id')} "
+                      f"({len(results)}/{total} concluídas)")
+            if on_progress is not None:
+                try:
+                    on_progress({**_assemble(final=False), "done": len(results), "total": total})
+                except Exception as e:  # noqa: BLE001 — progresso nunca quebra a geração
+                    print(f"[UI_SPEC] on_progress falhou (ignorado): {e}")
+
+    return _assemble(final=True)
 
 
 def regenerate_one_screen_from_spec(
@@ -452,18 +525,10 @@ def regenerate_one_screen_from_spec(
     if not screen:
         raise RuntimeError(f"regeneração da tela do {uc_id} não retornou JSON válido")
 
-    # P2: anula bindTo inventado (fora do schema). P3: FK vira select.
-    _sanitize_screen_binds(screen, schema_columns(schema_sql) if schema_sql else {})
-    _mark_fk_selects(screen, schema_fks(schema_sql) if schema_sql else {})
-    # Consistência protótipo↔código igual ao workflow: só LISTAGEM de entidade vira
-    # CRUD-tabela determinístico (usa a intenção do UC, não 'agêntico ou não').
-    screen["kind"] = derive_screen_kind(uc)
-    _align_layout_to_kind(screen)
-    _ent = screen.get("entity")
-    if _ent and _ent in tables and screen["kind"] == "list":
-        screen["layout"] = "table"
-        screen["mockup_html"] = _crud_mockup_html(
-            screen.get("name") or _ent, _ent, tables[_ent])
+    # Mesmo pós-processamento do workflow (P2/P3, kind, CRUD-tabela só em LISTAGEM).
+    _postprocess_screen(screen, uc, tables,
+                        schema_columns(schema_sql) if schema_sql else {},
+                        schema_fks(schema_sql) if schema_sql else {})
 
     # Garante o vínculo do UC de origem na tela regenerada.
     ucs = screen.get("uc") or []
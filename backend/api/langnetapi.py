@@ -6,12 +6,14 @@ from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+import asyncio
 import json
 import uuid
 
 # Import LangNet components
 from agents.langnetagents import (
     execute_full_pipeline,
+    resume_full_pipeline,
     execute_document_analysis_workflow,
     execute_agent_design_workflow,
     execute_task_with_context,
@@ -19,7 +21,9 @@ from agents.langnetagents import (
 )
 from agents.langnetstate import LangNetFullState
 from app.dependencies import get_current_user
-from app.database import get_db_connection
+from app.database import bulk_insert, get_db_connection
+from agents.langnetstream import register_stream_sink, unregister_stream_sink
+from api.langnetwebsocket import LLMStreamFanout, publish_execution_finished
 
 
 router = APIRouter(prefix="/api/langnet", tags=["langnet"])
@@ -93,6 +97,24 @@ class ExecutionResultResponse(BaseModel):
     errors: List[Dict[str, Any]]
 
 
+def _open_execution_stream(execution_id: str) -> LLMStreamFanout:
+    """Liga o canal de streaming da execução ao WebSocket (chamar no event loop)."""
+    fanout = LLMStreamFanout(execution_id, asyncio.get_running_loop()).start()
+    register_stream_sink(execution_id, fanout)
+    return fanout
+
+
+def _close_execution_stream(execution_id: str, fanout: LLMStreamFanout) -> None:
+    """Chamado na thread de trabalho ao fim da execução: esvazia o fanout e
+    publica o evento terminal (execution_completed/failed) — nessa ordem."""
+    unregister_stream_sink(execution_id)
+    try:
+        asyncio.run_coroutine_threadsafe(fanout.aclose(), fanout.loop).result(timeout=10)
+    except Exception as e:
+        print(f"[{execution_id}] stream close failed: {e}")
+    publish_execution_finished(execution_id)
+
+
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
@@ -125,6 +147,8 @@ async def execute_full_pipeline_endpoint(
         "error": None
     }
 
+    fanout = _open_execution_stream(execution_id)
+
     # Execute in background
     def run_pipeline():
         try:
@@ -136,7 +160,9 @@ async def execute_full_pipeline_endpoint(
                 document_id=request.document_id,
                 document_path=request.document_path,
                 framework_choice=request.framework_choice,
-                verbose_callback=verbose_callback
+                verbose_callback=verbose_callback,
+                execution_id=execution_id,
+                stream_channel=execution_id
             )
 
             EXECUTIONS[execution_id]["status"] = "completed"
@@ -147,6 +173,8 @@ async def execute_full_pipeline_endpoint(
             EXECUTIONS[execution_id]["status"] = "failed"
             EXECUTIONS[execution_id]["error"] = str(e)
             EXECUTIONS[execution_id]["completed_at"] = datetime.now().isoformat()
+        finally:
+            _close_execution_stream(execution_id, fanout)
 
     background_tasks.add_task(run_pipeline)
 
@@ -158,6 +186,111 @@ async def execute_full_pipeline_endpoint(
     )
 
 
+@router.post("/execution/{execution_id}/resume", response_model=ExecutionResponse)
+async def resume_execution_endpoint(
+    execution_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Resume a failed or interrupted full pipeline from its last checkpoint
+
+    Tasks already completed are not executed again
+    """
+    from agents.langnetcheckpoint import get_checkpoint_info
+
+    try:
+        info = get_checkpoint_info(execution_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not info:
+        raise HTTPException(status_code=404, detail="No checkpoints found for this execution")
+
+    if EXECUTIONS.get(execution_id, {}).get("status") == "running":
+        raise HTTPException(status_code=409, detail="Execution is still running")
+
+    EXECUTIONS[execution_id] = {
+        "status": "running",
+        "started_at": datetime.now().isoformat(),
+        "completed_at": None,
+        "state": None,
+        "error": None
+    }
+
+    fanout = _open_execution_stream(execution_id)
+
+    def run_resume():
+        try:
+            def verbose_callback(message: str):
+                print(f"[{execution_id}] {message}")
+
+            result = resume_full_pipeline(
+                execution_id,
+                verbose_callback=verbose_callback,
+                stream_channel=execution_id
+            )
+
+            EXECUTIONS[execution_id]["status"] = "failed" if result.get("errors") else "completed"
+            EXECUTIONS[execution_id]["completed_at"] = datetime.now().isoformat()
+            EXECUTIONS[execution_id]["state"] = result
+
+        except Exception as e:
+            EXECUTIONS[execution_id]["status"] = "failed"
+            EXECUTIONS[execution_id]["error"] = str(e)
+            EXECUTIONS[execution_id]["completed_at"] = datetime.now().isoformat()
+        finally:
+            _close_execution_stream(execution_id, fanout)
+
+    background_tasks.add_task(run_resume)
+
+    return ExecutionResponse(
+        execution_id=execution_id,
+        status="running",
+        message=f"Pipeline resumed at {info.get('next_task') or 'end'}",
+        started_at=EXECUTIONS[execution_id]["started_at"]
+    )
+
+
+@router.post("/execution/{execution_id}/abort-generation")
+async def abort_generation_endpoint(
+    execution_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Abort the LLM generation currently streaming for an execution
+
+    The running task fails with GenerationAborted; nothing else is cancelled
+    """
+    from agents.langnetstream import get_stream_sink
+
+    sink = get_stream_sink(execution_id)
+    if sink is None or not hasattr(sink, "abort"):
+        raise HTTPException(status_code=404, detail="No streaming generation for this execution")
+    sink.abort()
+    return {"message": "Abort requested", "execution_id": execution_id}
+
+
+@router.get("/execution/{execution_id}/checkpoints")
+async def get_execution_checkpoints(
+    execution_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    List checkpoints saved for an execution
+
+    Returns task order, completed tasks and the next task to run
+    """
+    from agents.langnetcheckpoint import get_checkpoint_info
+
+    try:
+        info = get_checkpoint_info(execution_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not info:
+        raise HTTPException(status_code=404, detail="No checkpoints found for this execution")
+    return info
+
+
 @router.get("/execution/{execution_id}/status", response_model=ExecutionStatusResponse)
 async def get_execution_status(execution_id: str):
     """
@@ -233,6 +366,8 @@ async def analyze_document_endpoint(
         "error": None
     }
 
+    fanout = _open_execution_stream(execution_id)
+
     def run_analysis():
         try:
             # Get document info from database to extract path
@@ -249,7 +384,8 @@ async def analyze_document_endpoint(
                 document_id=request.document_id,
                 document_path=document_path,
                 additional_instructions=request.additional_instructions or "",
-                enable_web_research=request.enable_web_research
+                enable_web_research=request.enable_web_research,
+                stream_channel=execution_id
             )
             EXECUTIONS[execution_id]["status"] = "completed"
             EXECUTIONS[execution_id]["completed_at"] = datetime.now().isoformat()
@@ -258,6 +394,8 @@ async def analyze_document_endpoint(
             EXECUTIONS[execution_id]["status"] = "failed"
             EXECUTIONS[execution_id]["error"] = str(e)
             EXECUTIONS[execution_id]["completed_at"] = datetime.now().isoformat()
+        finally:
+            _close_execution_stream(execution_id, fanout)
 
     background_tasks.add_task(run_analysis)
 
@@ -303,6 +441,8 @@ async def design_agents_endpoint(
             EXECUTIONS[execution_id]["status"] = "failed"
             EXECUTIONS[execution_id]["error"] = str(e)
             EXECUTIONS[execution_id]["completed_at"] = datetime.now().isoformat()
+        finally:
+            publish_execution_finished(execution_id)
 
     background_tasks.add_task(run_design)
 
@@ -386,6 +526,56 @@ async def list_available_agents(current_user: dict = Depends(get_current_user)):
     return {"agents": agents}
 
 
+@router.get("/cache/stats")
+async def get_llm_cache_stats(current_user: dict = Depends(get_current_user)):
+    """
+    LLM response cache statistics
+
+    Returns hit/miss counters, entry count and disk usage
+    """
+    from agents.langnetcache import get_llm_cache
+
+    return get_llm_cache().stats()
+
+
+@router.delete("/cache")
+async def clear_llm_cache(current_user: dict = Depends(get_current_user)):
+    """
+    Clear the LLM response cache
+
+    Forces every task to call the LLM again on the next run
+    """
+    from agents.langnetcache import get_llm_cache
+
+    removed = get_llm_cache().clear()
+    return {"message": "LLM cache cleared", "removed": removed}
+
+
+@router.get("/cache/search/stats")
+async def get_search_cache_stats(current_user: dict = Depends(get_current_user)):
+    """
+    Web search result cache statistics
+
+    Returns hit/stale/miss counters, hit rate and entries per engine
+    """
+    from agents.langnetsearchcache import get_search_cache
+
+    return get_search_cache().stats()
+
+
+@router.delete("/cache/search")
+async def clear_search_cache(current_user: dict = Depends(get_current_user)):
+    """
+    Clear the web search result cache
+
+    Forces Serper/SerpAPI/Tavily to be queried again
+    """
+    from agents.langnetsearchcache import get_search_cache
+
+    removed = get_search_cache().clear()
+    return {"message": "Search cache cleared", "removed": removed}
+
+
 @router.delete("/execution/{execution_id}")
 async def delete_execution(
     execution_id: str,
@@ -394,12 +584,18 @@ async def delete_execution(
     """
     Delete execution data
 
-    Clears execution from memory
+    Clears execution from memory and removes its checkpoints
     """
+    from agents.langnetcheckpoint import delete_checkpoints
+
     if execution_id not in EXECUTIONS:
         raise HTTPException(status_code=404, detail="Execution not found")
 
     del EXECUTIONS[execution_id]
+    try:
+        delete_checkpoints(execution_id)
+    except ValueError:
+        pass
 
     return {"message": "Execution deleted successfully"}
 
@@ -425,20 +621,15 @@ async def save_execution_results(
     state = execution["state"]
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Save agents
+        project_id = state["project_id"]
         agents_data = state.get("agents_data", [])
-        for agent in agents_data:
-            cursor.execute("""
-                INSERT INTO agents (
-                    id, project_id, agent_id, name, role, goal, backstory,
-                    tools, verbose, allow_delegation, status
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
+        tasks_data = state.get("tasks_data", [])
+
+        # Re-salvar a mesma execução atualiza (UNIQUE project_id+agent_id / task_id)
+        agent_rows = [
+            (
                 str(uuid.uuid4()),
-                state["project_id"],
+                project_id,
                 agent.get("agent_id", agent["name"]),
                 agent["name"],
                 agent["role"],
@@ -448,75 +639,81 @@ async def save_execution_results(
                 agent.get("verbose", True),
                 agent.get("allow_delegation", False),
                 "active"
-            ))
-
-        # Save tasks
-        tasks_data = state.get("tasks_data", [])
-        for task in tasks_data:
-            cursor.execute("""
-                INSERT INTO tasks (
-                    id, project_id, task_id, name, description,
-                    expected_output, tools, async_execution
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
+            )
+            for agent in agents_data
+        ]
+        task_rows = [
+            (
                 str(uuid.uuid4()),
-                state["project_id"],
+                project_id,
                 task.get("task_id", task["name"]),
                 task["name"],
                 task["description"],
                 task.get("expected_output", ""),
                 json.dumps(task.get("tools", [])),
                 task.get("async_execution", False)
-            ))
-
-        # Save YAML files
-        if state.get("agents_yaml"):
-            cursor.execute("""
-                INSERT INTO yaml_files (
-                    id, project_id, file_type, filename, content, version
-                ) VALUES (%s, %s, %s, %s, %s, %s)
-            """, (
-                str(uuid.uuid4()),
-                state["project_id"],
-                "agents",
-                "agents.yaml",
-                state["agents_yaml"],
-                "1.0"
-            ))
-
-        if state.get("tasks_yaml"):
-            cursor.execute("""
-                INSERT INTO yaml_files (
-                    id, project_id, file_type, filename, content, version
-                ) VALUES (%s, %s, %s, %s, %s, %s)
-            """, (
-                str(uuid.uuid4()),
-                state["project_id"],
-                "tasks",
-                "tasks.yaml",
-                state["tasks_yaml"],
-                "1.0"
-            ))
-
-        # Save generated code
-        if state.get("generated_code"):
-            cursor.execute("""
-                INSERT INTO code_generations (
-                    id, project_id, framework, code_content,
-                    additional_files, requirements
-                ) VALUES (%s, %s, %s, %s, %s, %s)
-            """, (
-                str(uuid.uuid4()),
-                state["project_id"],
-                state.get("framework_choice", "crewai"),
-                state["generated_code"],
-                json.dumps(state.get("generated_files", {})),
-                state.get("requirements_txt", "")
-            ))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+            )
+            for task in tasks_data
+        ]
+        yaml_rows = [
+            (str(uuid.uuid4()), project_id, file_type, filename, state[key], "1.0")
+            for key, file_type, filename in (
+                ("agents_yaml", "agents", "agents.yaml"),
+                ("tasks_yaml", "tasks", "tasks.yaml"),
+            )
+            if state.get(key)
+        ]
+
+        # Uma transação; cada lista vira um INSERT multi-linha (por chunk)
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            bulk_insert(
+                cursor, "agents",
+                ["id", "project_id", "agent_id", "name", "role", "goal", "backstory",
+                 "tools", "verbose", "allow_delegation", "status"],
+                agent_rows,
+                update_columns=["name", "role", "goal", "backstory", "tools",
+                                "verbose", "allow_delegation", "status"],
+            )
+            bulk_insert(
+                cursor, "tasks",
+                ["id", "project_id", "task_id", "name", "description",
+                 "expected_output", "tools", "async_execution"],
+                task_rows,
+                update_columns=["name", "description", "expected_output", "tools", "async_execution"],
+            )
+
+            # yaml_files não tem chave única — substitui os arquivos do projeto
+            if yaml_rows:
+                filenames = [row[3] for row in yaml_rows]
+                cursor.execute(
+                    f"DELETE FROM yaml_files WHERE project_id = %s AND filename IN ({', '.join(['%s'] * len(filenames))})",
+                    (project_id, *filenames),
+                )
+                bulk_insert(
+                    cursor, "yaml_files",
+                    ["id", "project_id", "file_type", "filename", "content", "version"],
+                    yaml_rows,
+                )
+
+            # Save generated code
+            if state.get("generated_code"):
+                cursor.execute("""
+                    INSERT INTO code_generations (
+                        id, project_id, framework, code_content,
+                        additional_files, requirements
+                    ) VALUES (%s, %s, %s, %s, %s, %s)
+                """, (
+                    str(uuid.uuid4()),
+                    project_id,
+                    state.get("framework_choice", "crewai"),
+                    state["generated_code"],
+                    json.dumps(state.get("generated_files", {})),
+                    state.get("requirements_txt", "")
+                ))
+
+            conn.commit()
+            cursor.close()
 
         return {
             "success": True,
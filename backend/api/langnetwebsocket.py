@@ -3,49 +3,261 @@ LangNet WebSocket Handler
 Real-time streaming of execution progress
 """
 from fastapi import WebSocket, WebSocketDisconnect, Depends
-from typing import Dict, Set
+from typing import Any, Dict, List, Optional, Set
 import json
 import asyncio
+import threading
 from datetime import datetime
 
 from app.dependencies import get_current_user
 
 
-# Active WebSocket connections
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+# Tipos de evento que encerram o stream de uma execução
+_TERMINAL_TYPES = ("execution_completed", "execution_failed")
 
-    async def connect(self, execution_id: str, websocket: WebSocket):
-        await websocket.accept()
-        if execution_id not in self.active_connections:
-            self.active_connections[execution_id] = set()
-        self.active_connections[execution_id].add(websocket)
 
-    def disconnect(self, execution_id: str, websocket: WebSocket):
-        if execution_id in self.active_connections:
-            self.active_connections[execution_id].discard(websocket)
-            if not self.active_connections[execution_id]:
-                del self.active_connections[execution_id]
+class ExecutionEventBus:
+    """
+    Pub/sub por execução: os produtores publicam eventos, cada WebSocket aguarda
+    na sua fila (sem polling do EXECUTIONS).
 
-    async def send_message(self, execution_id: str, message: dict):
-        if execution_id in self.active_connections:
-            dead_connections = set()
-            for connection in self.active_connections[execution_id]:
+    - Cada evento é serializado UMA vez (json.dumps) e o mesmo texto vai para todos
+      os espectadores daquela execução.
+    - Filas limitadas (`queue_size`) com política drop-oldest: um cliente lento
+      perde eventos antigos (deltas/progresso), nunca trava o produtor.
+    - publish() roda no event loop; publish_threadsafe() serve às threads de
+      trabalho (pipelines em BackgroundTasks / asyncio.to_thread).
+    """
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.dropped = 0
+
+    def _bind_loop(self) -> None:
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+
+    def subscribe(self, execution_id: str) -> asyncio.Queue:
+        self._bind_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(execution_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, execution_id: str, queue: asyncio.Queue) -> None:
+        subs = self._subscribers.get(execution_id)
+        if subs is None:
+            return
+        subs.discard(queue)
+        if not subs:
+            del self._subscribers[execution_id]
+
+    def subscriber_count(self, execution_id: str) -> int:
+        return len(self._subscribers.get(execution_id, ()))
+
+    def publish(self, execution_id: str, message: dict) -> int:
+        """Entrega `message` a todos os assinantes; retorna quantos receberam."""
+        self._bind_loop()
+        subs = self._subscribers.get(execution_id)
+        if not subs:
+            return 0
+        item = (message.get("type"), json.dumps(message, ensure_ascii=False, default=str))
+        for queue in subs:
+            if queue.full():
                 try:
-                    await connection.send_json(message)
-                except Exception:
-                    dead_connections.add(connection)
+                    queue.get_nowait()  # drop-oldest
+                    self.dropped += 1
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(item)
+        return len(subs)
+
+    def publish_threadsafe(self, execution_id: str, message: dict) -> None:
+        """publish() a partir de uma thread fora do event loop."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # ninguém se conectou ainda — quem chegar depois recebe o snapshot
+        loop.call_soon_threadsafe(self.publish, execution_id, message)
+
+
+event_bus = ExecutionEventBus()
+
 
-            # Clean up dead connections
-            for connection in dead_connections:
-                self.active_connections[execution_id].discard(connection)
+class ConnectionManager:
+    """Fachada de publicação usada pelos produtores (documents router, fanout)."""
+
+    def __init__(self, bus: ExecutionEventBus):
+        self.bus = bus
+
+    async def send_message(self, execution_id: str, message: dict):
+        self.bus.publish(execution_id, message)
 
     async def broadcast(self, execution_id: str, message: dict):
         await self.send_message(execution_id, message)
 
 
-manager = ConnectionManager()
+manager = ConnectionManager(event_bus)
+
+
+def _progress_message(state: Dict[str, Any]) -> dict:
+    return {
+        "type": "progress",
+        "percentage": state.get("progress_percentage", 0.0),
+        "completed_tasks": state.get("completed_tasks", 0),
+        "total_tasks": state.get("total_tasks", 9),
+        "current_task": state.get("current_task"),
+        "current_phase": state.get("current_phase")
+    }
+
+
+def _terminal_message(execution_id: str, execution: Dict[str, Any]) -> dict:
+    state = execution.get("state") or {}
+    if execution["status"] == "completed":
+        return {
+            "type": "execution_completed",
+            "execution_id": execution_id,
+            "result_summary": {
+                "agents_generated": len(state.get("agents_data", [])),
+                "tasks_generated": len(state.get("tasks_data", [])),
+                "has_yaml": bool(state.get("agents_yaml")),
+                "has_code": bool(state.get("generated_code"))
+            },
+            "timestamp": execution.get("completed_at")
+        }
+    return {
+        "type": "execution_failed",
+        "execution_id": execution_id,
+        "error": execution.get("error", "Unknown error"),
+        "timestamp": execution.get("completed_at")
+    }
+
+
+def publish_execution_finished(execution_id: str) -> None:
+    """Publica o evento terminal de uma execução já marcada completed/failed
+    no EXECUTIONS. Pode ser chamado de threads de trabalho."""
+    from api.langnetapi import EXECUTIONS
+
+    execution = EXECUTIONS.get(execution_id)
+    if execution and execution.get("status") in ("completed", "failed"):
+        event_bus.publish_threadsafe(execution_id, _terminal_message(execution_id, execution))
+
+
+class LLMStreamFanout:
+    """
+    Sink de streaming (ver agents.langnetstream) que leva os deltas do LLM e os
+    eventos de task para os assinantes de uma execução no event_bus.
+
+    delta() é chamado na thread da task; só acumula num buffer (sob lock). Uma
+    corrotina no event loop esvazia o buffer a cada `flush_interval` (ou antes,
+    quando passa de `max_batch_chars`) e envia UM frame por task com todo o texto
+    acumulado — milhares de tokens/s viram poucos frames/s.
+
+    Mensagens:
+    - {"type": "llm_delta", "task": "...", "text": "...", "seq": n, "chars_total": n}
+    - {"type": "llm_completed", "task": "...", "chars_total": n}
+    - eventos de task repassados por event() (task_started, progress, ...)
+    """
+
+    def __init__(self, execution_id: str, loop: asyncio.AbstractEventLoop,
+                 flush_interval: float = 0.25, max_batch_chars: int = 2048):
+        self.execution_id = execution_id
+        self.loop = loop
+        self.flush_interval = flush_interval
+        self.max_batch_chars = max_batch_chars
+        self._lock = threading.Lock()
+        self._buffers: Dict[str, List[str]] = {}
+        self._buffered_chars = 0
+        self._totals: Dict[str, int] = {}
+        self._seq = 0
+        self._aborted = False
+        self._queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._pump: Optional[asyncio.Task] = None
+
+    def start(self) -> "LLMStreamFanout":
+        self._pump = self.loop.create_task(self._run())
+        return self
+
+    # ── lado da thread da task ──────────────────────────────────────────
+
+    def delta(self, task_name: str, text: str) -> None:
+        if self._aborted:
+            from agents.langnetstream import GenerationAborted
+            self._aborted = False  # vale só para a geração em andamento
+            raise GenerationAborted(f"Generation of '{task_name}' aborted by user")
+        with self._lock:
+            self._buffers.setdefault(task_name, []).append(text)
+            self._buffered_chars += len(text)
+            self._totals[task_name] = self._totals.get(task_name, 0) + len(text)
+            wake = self._buffered_chars >= self.max_batch_chars
+        if wake:
+            self.loop.call_soon_threadsafe(self._queue.put_nowait, None)
+
+    def done(self, task_name: str, full_text: str) -> None:
+        self._aborted = False  # geração terminou antes de ver o abort: não vaza para a próxima
+        self.loop.call_soon_threadsafe(self._queue.put_nowait, {
+            "type": "llm_completed",
+            "task": task_name,
+            "chars_total": len(full_text),
+        })
+
+    def event(self, message: dict) -> None:
+        """Evento de task; passa pela mesma fila dos deltas, então a ordem se mantém."""
+        if message.get("type") == "task_started":
+            self._aborted = False  # abort pendente de uma task anterior não vale para esta
+        self.loop.call_soon_threadsafe(self._queue.put_nowait, message)
+
+    def abort(self) -> None:
+        """A próxima chamada a delta() interrompe a geração em andamento.
+
+        O pedido expira no fim da geração (done) ou no início da task seguinte."""
+        self._aborted = True
+
+    # ── lado do event loop ──────────────────────────────────────────────
+
+    def _take_batches(self) -> List[dict]:
+        with self._lock:
+            buffers, self._buffers, self._buffered_chars = self._buffers, {}, 0
+            batches = []
+            for task_name, parts in buffers.items():
+                self._seq += 1
+                batches.append({
+                    "type": "llm_delta",
+                    "task": task_name,
+                    "text": "".join(parts),
+                    "seq": self._seq,
+                    "chars_total": self._totals.get(task_name, 0),
+                })
+        return batches
+
+    async def _run(self) -> None:
+        closing = False
+        while not closing:
+            try:
+                msg = await asyncio.wait_for(self._queue.get(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                msg = None
+            for batch in self._take_batches():
+                await manager.send_message(self.execution_id, batch)
+            if msg is _FANOUT_CLOSE:
+                closing = True
+            elif msg:
+                await manager.send_message(self.execution_id, msg)
+
+    async def aclose(self) -> None:
+        """Envia o que restou no buffer e encerra a corrotina de envio."""
+        if self._pump is None:
+            return
+        self._queue.put_nowait(_FANOUT_CLOSE)
+        try:
+            await self._pump
+        finally:
+            self._pump = None
+
+
+_FANOUT_CLOSE = object()
 
 
 async def websocket_endpoint(websocket: WebSocket, execution_id: str):
@@ -55,13 +267,18 @@ async def websocket_endpoint(websocket: WebSocket, execution_id: str):
     Messages sent:
     - {"type": "connected", "execution_id": "..."}
     - {"type": "task_started", "task": "...", "phase": "..."}
-    - {"type": "task_progress", "task": "...", "progress": 45.5}
-    - {"type": "task_completed", "task": "...", "output": "..."}
+    - {"type": "progress", "percentage": 45.5, ...}
+    - {"type": "task_completed", "task": "...", "output_preview": "..."}
     - {"type": "task_failed", "task": "...", "error": "..."}
+    - {"type": "llm_delta", "task": "...", "text": "...", "seq": 1}
+    - {"type": "llm_completed", "task": "...", "chars_total": 1234}
     - {"type": "execution_completed", "result": {...}}
     - {"type": "execution_failed", "error": "..."}
     """
-    await manager.connect(execution_id, websocket)
+    await websocket.accept()
+    # Assina ANTES de ler o snapshot: um evento publicado entre as duas coisas
+    # fica na fila em vez de se perder.
+    queue = event_bus.subscribe(execution_id)
 
     try:
         # Send connection confirmation
@@ -74,89 +291,36 @@ async def websocket_endpoint(websocket: WebSocket, execution_id: str):
         # Import here to avoid circular dependency
         from api.langnetapi import EXECUTIONS
 
-        # Stream execution updates
-        last_log_count = 0
-        while True:
-            if execution_id not in EXECUTIONS:
-                await websocket.send_json({
-                    "type": "error",
-                    "message": "Execution not found"
-                })
-                break
+        execution = EXECUTIONS.get(execution_id)
+        if execution is None:
+            await websocket.send_json({
+                "type": "error",
+                "message": "Execution not found"
+            })
+            return
 
-            execution = EXECUTIONS[execution_id]
-            state = execution.get("state", {})
-
-            # Send execution log updates
-            execution_log = state.get("execution_log", [])
-            if len(execution_log) > last_log_count:
-                new_logs = execution_log[last_log_count:]
-                for log in new_logs:
-                    if log["status"] == "started":
-                        await websocket.send_json({
-                            "type": "task_started",
-                            "task": log["task"],
-                            "phase": log.get("phase"),
-                            "timestamp": log["timestamp"]
-                        })
-                    elif log["status"] == "completed":
-                        await websocket.send_json({
-                            "type": "task_completed",
-                            "task": log["task"],
-                            "output_preview": log.get("output_preview", ""),
-                            "timestamp": log["timestamp"]
-                        })
-                    elif log["status"] == "failed":
-                        await websocket.send_json({
-                            "type": "task_failed",
-                            "task": log["task"],
-                            "timestamp": log["timestamp"]
-                        })
-
-                last_log_count = len(execution_log)
-
-            # Send progress update
-            if state.get("progress_percentage") is not None:
-                await websocket.send_json({
-                    "type": "progress",
-                    "percentage": state["progress_percentage"],
-                    "completed_tasks": state.get("completed_tasks", 0),
-                    "total_tasks": state.get("total_tasks", 9),
-                    "current_task": state.get("current_task"),
-                    "current_phase": state.get("current_phase")
-                })
+        # Snapshot para quem conecta no meio (ou depois) da execução
+        await websocket.send_json(_progress_message(execution.get("state") or {}))
+        if execution["status"] in ["completed", "failed"]:
+            await websocket.send_json(_terminal_message(execution_id, execution))
+            return
 
-            # Check if execution finished
-            if execution["status"] in ["completed", "failed"]:
-                if execution["status"] == "completed":
-                    await websocket.send_json({
-                        "type": "execution_completed",
-                        "execution_id": execution_id,
-                        "result_summary": {
-                            "agents_generated": len(state.get("agents_data", [])),
-                            "tasks_generated": len(state.get("tasks_data", [])),
-                            "has_yaml": bool(state.get("agents_yaml")),
-                            "has_code": bool(state.get("generated_code"))
-                        },
-                        "timestamp": execution.get("completed_at")
-                    })
-                else:
-                    await websocket.send_json({
-                        "type": "execution_failed",
-                        "execution_id": execution_id,
-                        "error": execution.get("error", "Unknown error"),
-                        "timestamp": execution.get("completed_at")
-                    })
+        # Stream execution updates — aguarda eventos, sem polling
+        while True:
+            msg_type, text = await queue.get()
+            await websocket.send_text(text)
+            if msg_type in _TERMINAL_TYPES:
                 break
 
-            # Wait before next update
-            await asyncio.sleep(1)
-
     except WebSocketDisconnect:
-        manager.disconnect(execution_id, websocket)
+        pass
     except Exception as e:
-        await websocket.send_json({
-            "type": "error",
-            "message": str(e)
-        })
-        manager.disconnect(execution_id, websocket)
+        try:
+            await websocket.send_json({
+                "type": "error",
+                "message": str(e)
+            })
+        except Exception:
+            pass
+    finally:
+        event_bus.unsubscribe(execution_id, queue)
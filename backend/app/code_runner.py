@@ -7,20 +7,29 @@ Pipeline ao iniciar um run:
 2. Escreve arquivos da sessão lá dentro
 3. Valida que o env conda ``langnet`` existe
 4. Checa deps faltantes (pip dry-run) e instala APENAS o que falta NO env langnet
+   — requirements com fingerprint já satisfeito pulam o dry-run; wheels ficam em
+   ~/.langnet-cache/pip/wheels (LANGNET_DEPS_CACHE) para reinstalar offline
 5. Sobe ``conda env python main.py`` em background
-6. Stream stdout/stderr para buffer em memória + asyncio.Queue (consumido pelo WS)
+6. Stream stdout/stderr para ring buffer em memória (linhas com número de
+   sequência) + frames em lote para os subscribers do WS
 
 Não cria venv local — usa /home/pasteurjr/miniconda3/envs/langnet/bin/python.
 
 Cada run mantém: status (preparing|installing|running|stopped|crashed),
-exit_code, stdout (lista de linhas), processo Popen, queue de novas linhas
-para WS subscribers.
+exit_code, stdout (``LineBuffer``: capacidade fixa, seq monotônica), processo
+Popen e os subscribers do WS. Linhas não viram um frame cada: ficam pendentes e
+são entregues em lote (a cada LANGNET_RUN_LOG_BATCH_MS ou LANGNET_RUN_LOG_BATCH_LINES
+linhas, o que vier antes) como ``{"type": "lines", "seq": N, "data": [...]}``.
+Cada subscriber tem seu cursor de seq — reconexão retoma de onde parou.
 """
 
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import os
+import re
 import shutil
 import signal
 import subprocess
@@ -28,15 +37,19 @@ import sys
 import threading
 import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 
 RUNS_ROOT = Path(os.environ.get("LANGNET_RUNS_ROOT", "/tmp/langnet-runs"))
 PIP_TIMEOUT_SECONDS = 600  # 10 min para instalar deps faltantes
-MAX_STDOUT_LINES = 5000     # buffer cap (linhas anteriores ficam — só limita memória)
+MAX_STDOUT_LINES = int(os.environ.get("LANGNET_RUN_LOG_LINES", "5000"))  # capacidade do ring buffer
+LOG_BATCH_SECONDS = int(os.environ.get("LANGNET_RUN_LOG_BATCH_MS", "50")) / 1000
+LOG_BATCH_MAX_LINES = int(os.environ.get("LANGNET_RUN_LOG_BATCH_LINES", "200"))
+WS_BACKLOG_LINES = 500      # linhas reenviadas numa conexão nova (sem ?since=)
 
 # Localiza o conda env "langnet". Se LANGNET_CONDA_ENV apontar para outro path, respeita.
 CONDA_ENV_PATH = Path(os.environ.get(
@@ -56,6 +69,45 @@ def env_exists() -> bool:
     return _conda_bin("python").exists()
 
 
+class LineBuffer:
+    """Ring buffer de linhas com número de sequência monotônico.
+
+    ``append`` é O(1) (deque com maxlen): ao lotar, a linha mais antiga sai.
+    A linha de seq ``n`` fica disponível enquanto ``first_seq <= n < next_seq``.
+    """
+
+    def __init__(self, capacity: int = MAX_STDOUT_LINES):
+        self._lines: Deque[str] = deque(maxlen=max(1, capacity))
+        self.next_seq = 0
+
+    @property
+    def first_seq(self) -> int:
+        return self.next_seq - len(self._lines)
+
+    def append(self, line: str) -> int:
+        self._lines.append(line)
+        self.next_seq += 1
+        return self.next_seq - 1
+
+    def since(self, seq: int, limit: Optional[int] = None) -> Tuple[int, List[str]]:
+        """(seq da primeira linha devolvida, linhas a partir de ``seq``). Se ``seq``
+        já saiu do buffer, começa na mais antiga disponível."""
+        start = max(seq, self.first_seq)
+        offset = start - self.first_seq
+        stop = len(self._lines) if limit is None else min(len(self._lines), offset + limit)
+        if offset >= stop:
+            return start, []
+        if offset == 0 and stop == len(self._lines):
+            return start, list(self._lines)
+        return start, [self._lines[i] for i in range(offset, stop)]
+
+    def tail(self, n: int) -> List[str]:
+        return self.since(self.next_seq - n)[1]
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+
 @dataclass
 class CodeRun:
     """Estado de uma execução subprocess do código gerado."""
@@ -67,10 +119,23 @@ class CodeRun:
     finished_at: str = ""
     exit_code: Optional[int] = None
     process: Optional[subprocess.Popen] = None
-    stdout_lines: List[str] = field(default_factory=list)
-    _subscribers: List[asyncio.Queue] = field(default_factory=list)
+    log: LineBuffer = field(default_factory=LineBuffer)
+    _subscribers: Dict[asyncio.Queue, int] = field(default_factory=dict)   # fila → próximo seq
     _lock: threading.Lock = field(default_factory=threading.Lock)
     _main_loop: Optional[asyncio.AbstractEventLoop] = None
+    _flush_scheduled: bool = False
+    _flush_urgent: bool = False
+    _pending: int = 0
+
+    @property
+    def stdout_lines(self) -> List[str]:
+        """Cópia das linhas em buffer (compat — prefira ``tail``)."""
+        with self._lock:
+            return self.log.since(self.log.first_seq)[1]
+
+    def tail(self, n: int) -> List[str]:
+        with self._lock:
+            return self.log.tail(n)
 
     def to_public(self) -> Dict[str, Any]:
         return {
@@ -81,39 +146,77 @@ class CodeRun:
             "finished_at": self.finished_at,
             "exit_code": self.exit_code,
             "work_dir": str(self.work_dir),
-            "total_lines": len(self.stdout_lines),
+            "total_lines": len(self.log),
+            "next_seq": self.log.next_seq,
         }
 
     def append_line(self, line: str) -> None:
-        """Append + broadcast para subscribers do WS (thread-safe)."""
+        """Append no ring buffer + agenda flush em lote para o WS (thread-safe).
+
+        No máximo UM callback por janela de LOG_BATCH_SECONDS vai para o loop,
+        não um por linha por subscriber; com LOG_BATCH_MAX_LINES pendentes o
+        flush é antecipado."""
         with self._lock:
-            self.stdout_lines.append(line)
-            if len(self.stdout_lines) > MAX_STDOUT_LINES:
-                # Drop oldest, mantém os últimos MAX_STDOUT_LINES
-                drop = len(self.stdout_lines) - MAX_STDOUT_LINES
-                self.stdout_lines = self.stdout_lines[drop:]
-            subs = list(self._subscribers)
-        loop = self._main_loop
-        if loop is None:
-            return
-        for q in subs:
-            try:
-                loop.call_soon_threadsafe(q.put_nowait, {"type": "line", "data": line})
-            except Exception:
-                pass
+            self.log.append(line)
+            loop = self._main_loop
+            if loop is None or not self._subscribers:
+                return
+            self._pending += 1
+            urgent = self._pending >= LOG_BATCH_MAX_LINES and not self._flush_urgent
+            schedule = not self._flush_scheduled
+            self._flush_scheduled = True
+            if urgent:
+                self._flush_urgent = True
+        try:
+            if urgent:
+                loop.call_soon_threadsafe(self._flush)
+            elif schedule:
+                loop.call_soon_threadsafe(loop.call_later, LOG_BATCH_SECONDS, self._flush)
+        except RuntimeError:
+            pass  # loop fechado (shutdown)
+
+    def _flush(self) -> None:
+        """Roda no loop: entrega a cada subscriber as linhas desde o seu cursor,
+        em frames de até LOG_BATCH_MAX_LINES. Fila cheia → cursor não avança
+        (a linha não se perde, a menos que saia do ring buffer)."""
+        with self._lock:
+            self._flush_scheduled = self._flush_urgent = False
+            self._pending = 0
+            for q, cursor in list(self._subscribers.items()):
+                while cursor < self.log.next_seq and not q.full():
+                    start, lines = self.log.since(cursor, LOG_BATCH_MAX_LINES)
+                    frame: Dict[str, Any] = {"type": "lines", "seq": start, "data": lines}
+                    if start > cursor:
+                        frame["dropped"] = start - cursor
+                    q.put_nowait(frame)
+                    cursor = start + len(lines)
+                self._subscribers[q] = cursor
+                if cursor < self.log.next_seq and not self._flush_scheduled:
+                    # subscriber lento: tenta de novo na próxima janela
+                    self._flush_scheduled = True
+                    self._main_loop.call_later(LOG_BATCH_SECONDS, self._flush)
 
     def broadcast_status(self) -> None:
-        """Avisa subscribers de mudança de status."""
+        """Avisa subscribers de mudança de status (depois das linhas pendentes)."""
         loop = self._main_loop
         if loop is None:
             return
-        with self._lock:
-            subs = list(self._subscribers)
-        for q in subs:
-            try:
-                loop.call_soon_threadsafe(q.put_nowait, {"type": "status", "data": self.to_public()})
-            except Exception:
-                pass
+        payload = {"type": "status", "data": self.to_public()}
+
+        def _deliver() -> None:
+            self._flush()
+            with self._lock:
+                subs = list(self._subscribers)
+            for q in subs:
+                try:
+                    q.put_nowait(payload)
+                except asyncio.QueueFull:
+                    pass
+
+        try:
+            loop.call_soon_threadsafe(_deliver)
+        except RuntimeError:
+            pass
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -160,9 +263,111 @@ def _stream_pipe(run: CodeRun, pipe, prefix: str = "") -> None:
             pass
 
 
-def _check_missing_deps(req_file: Path, run: CodeRun) -> List[str]:
+# Cache de ambiente de deps — requirements já satisfeitos no env langnet não
+# repetem o pip dry-run; wheels ficam num wheelhouse local para reinstalar offline.
+_DEPS_CACHE_DIR = Path(os.environ.get(
+    "LANGNET_DEPS_CACHE",
+    str(Path.home() / ".langnet-cache" / "pip"),
+))
+_WHEELHOUSE = _DEPS_CACHE_DIR / "wheels"
+_DEPS_STATE_FILE = _DEPS_CACHE_DIR / "satisfied.json"
+_DEPS_STATE_MAX = 200
+PIP_WARM_WORKERS = int(os.environ.get("LANGNET_PIP_WORKERS", "4"))
+_DEPS_LOCK = threading.Lock()
+
+
+_REQ_INCLUDE_RE = re.compile(r"^(--requirement|--constraint|-r|-c)\s*=?\s*(\S.*)$")
+_REQ_NAME_RE = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)(.*)$")
+
+
+def _normalize_requirement_line(line: str) -> str:
+    """Só o NOME do pacote é normalizado (PEP 503: minúsculas, ``-_.`` → ``-``);
+    versão, URL e marcadores seguem como estão — podem ser case-sensitive."""
+    line = " ".join(line.split())
+    if line.startswith(("-", ".", "/", "~")) or "://" in line.split(" ", 1)[0]:
+        return line  # opção do pip, caminho local ou URL direta
+    m = _REQ_NAME_RE.match(line)
+    if not m:
+        return line
+    return re.sub(r"[-_.]+", "-", m.group(1)).lower() + m.group(2)
+
+
+def _normalize_requirements(req_file: Path, _seen: Optional[set] = None, prefix: str = "") -> List[str]:
+    """Linhas efetivas do requirements (sem comentários/brancos; arquivos de ``-r`` e
+    ``-c`` expandidos — o conteúdo deles entra no hash), normalizadas e ordenadas:
+    a mesma lista com outra ordem/espaços dá o mesmo hash."""
+    _seen = _seen if _seen is not None else set()
+    if req_file in _seen:
+        return []
+    _seen.add(req_file)
+    if not req_file.exists():
+        return [f"{prefix}missing:{req_file.name}"]  # arquivo que aparecer depois muda o hash
+    out: List[str] = []
+    for raw in req_file.read_text(encoding="utf-8", errors="replace").splitlines():
+        line = raw.split(" #", 1)[0].strip()
+        if not line or line.startswith("#"):
+            continue
+        inc = _REQ_INCLUDE_RE.match(line)
+        if inc:
+            # constraints só restringem versões: marcadas para não se confundirem com requisitos
+            sub = prefix + ("-c " if inc.group(1) in ("-c", "--constraint") else "")
+            out.extend(_normalize_requirements(req_file.parent / inc.group(2).strip(), _seen, sub))
+            continue
+        out.append(prefix + _normalize_requirement_line(line))
+    return sorted(set(out))
+
+
+def _env_stamp() -> str:
+    """Marca do estado do env langnet: mtime do site-packages (muda a cada
+    install/uninstall, inclusive manual). Registro com stamp diferente não vale."""
+    sub = "Lib" if os.name == "nt" else "lib"
+    for sp in sorted((CONDA_ENV_PATH / sub).glob("python*/site-packages")) or [CONDA_ENV_PATH / sub / "site-packages"]:
+        try:
+            return str(sp.stat().st_mtime_ns)
+        except OSError:
+            continue
+    return "unknown"
+
+
+def requirements_fingerprint(req_file: Path) -> str:
+    payload = "\n".join([str(CONDA_ENV_PATH), *_normalize_requirements(req_file)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _load_deps_state() -> Dict[str, Any]:
+    try:
+        return json.loads(_DEPS_STATE_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def deps_satisfied(fingerprint: str) -> bool:
+    with _DEPS_LOCK:
+        entry = _load_deps_state().get(fingerprint)
+    return bool(entry) and entry.get("env_stamp") == _env_stamp()
+
+
+def mark_deps_satisfied(fingerprint: str) -> None:
+    """Registra que o env (no estado atual) satisfaz o fingerprint. Best-effort."""
+    with _DEPS_LOCK:
+        state = _load_deps_state()
+        state[fingerprint] = {"env_stamp": _env_stamp(), "at": datetime.utcnow().isoformat()}
+        if len(state) > _DEPS_STATE_MAX:
+            for old in sorted(state, key=lambda k: state[k].get("at", ""))[:len(state) - _DEPS_STATE_MAX]:
+                state.pop(old, None)
+        try:
+            _DEPS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = _DEPS_STATE_FILE.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state, indent=1), encoding="utf-8")
+            tmp.replace(_DEPS_STATE_FILE)
+        except OSError:
+            pass
+
+
+def _check_missing_deps(req_file: Path, run: CodeRun) -> Optional[List[str]]:
     """Roda `pip install --dry-run -r requirements.txt` no env langnet e
-    retorna a lista de pacotes que SERIAM instalados (vazio = todos OK)."""
+    retorna a lista de pacotes que SERIAM instalados (vazio = todos OK;
+    None = dry-run falhou, estado desconhecido)."""
     if not req_file.exists():
         return []
     pip = _conda_bin("pip")
@@ -186,16 +391,58 @@ def _check_missing_deps(req_file: Path, run: CodeRun) -> List[str]:
         return missing
     except Exception as exc:  # noqa: BLE001
         run.append_line(f"[runner] WARN: pip dry-run falhou ({exc}); assumindo deps OK")
-        return []
+        return None
+
+
+def _pinned(token: str) -> str:
+    """Token do dry-run (``langchain-core-0.1.2``) → ``langchain-core==0.1.2``."""
+    name, _, version = token.rpartition("-")
+    return f"{name}=={version}" if name and version[:1].isdigit() else token
+
+
+def _warm_wheelhouse(missing: List[str], run: CodeRun) -> bool:
+    """Baixa/constrói em paralelo os wheels dos pacotes faltantes (com deps) no
+    wheelhouse local. True se todos ficaram disponíveis (install pode ser offline)."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    pip = _conda_bin("pip")
+    _WHEELHOUSE.mkdir(parents=True, exist_ok=True)
+
+    def _one(spec: str) -> bool:
+        try:
+            proc = subprocess.run(
+                [str(pip), "wheel", "--quiet", "--wheel-dir", str(_WHEELHOUSE),
+                 "--find-links", str(_WHEELHOUSE), spec],
+                capture_output=True, text=True, timeout=PIP_TIMEOUT_SECONDS,
+            )
+        except Exception as exc:  # noqa: BLE001
+            run.append_line(f"[pip:wheel] {spec}: {exc}")
+            return False
+        if proc.returncode != 0:
+            tail = ((proc.stderr or proc.stdout or "").strip().splitlines() or ["?"])[-1]
+            run.append_line(f"[pip:wheel] {spec} falhou: {tail[:200]}")
+            return False
+        return True
+
+    specs = [_pinned(t) for t in missing]
+    run.append_line(f"[runner] pré-aquecendo {len(specs)} wheel(s) em {_WHEELHOUSE} "
+                    f"({min(PIP_WARM_WORKERS, len(specs))} em paralelo)")
+    with ThreadPoolExecutor(max_workers=max(1, min(PIP_WARM_WORKERS, len(specs)))) as pool:
+        return all(pool.map(_one, specs))
 
 
-def _install_missing(req_file: Path, run: CodeRun) -> bool:
-    """Instala deps faltantes NO env langnet (não cria venv local)."""
+def _install_missing(req_file: Path, run: CodeRun, offline: bool = False) -> bool:
+    """Instala deps faltantes NO env langnet (não cria venv local), preferindo os
+    wheels do wheelhouse; ``offline`` (todos os wheels aquecidos) dispensa o índice."""
     pip = _conda_bin("pip")
-    run.append_line(f"[runner] pip install --upgrade -r requirements.txt (env=langnet)")
+    cmd = [str(pip), "install", "--find-links", str(_WHEELHOUSE), "-r", str(req_file)]
+    if offline:
+        cmd.insert(2, "--no-index")
+    run.append_line(f"[runner] pip install -r requirements.txt (env=langnet"
+                    f"{', offline via wheelhouse' if offline else ''})")
     try:
         proc = subprocess.Popen(
-            [str(pip), "install", "--no-cache-dir", "-r", str(req_file)],
+            cmd,
             cwd=str(run.work_dir),
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
@@ -214,6 +461,30 @@ def _install_missing(req_file: Path, run: CodeRun) -> bool:
         return False
 
 
+def _ensure_deps(req_file: Path, run: CodeRun) -> bool:
+    """Garante as deps do requirements no env langnet. Fingerprint já satisfeito
+    (e env inalterado desde então) → nem roda o dry-run."""
+    fingerprint = requirements_fingerprint(req_file)
+    if deps_satisfied(fingerprint):
+        run.append_line(f"[runner] deps em cache (fingerprint {fingerprint[:12]}) — pulando pip ✓")
+        return True
+    missing = _check_missing_deps(req_file, run)
+    if missing:
+        run.append_line(f"[runner] {len(missing)} dep(s) faltando: {', '.join(missing[:10])}{'...' if len(missing) > 10 else ''}")
+        offline = _warm_wheelhouse(missing, run)
+        ok = _install_missing(req_file, run, offline=offline)
+        if not ok and offline:
+            run.append_line("[runner] install offline falhou — tentando com o índice")
+            ok = _install_missing(req_file, run)
+        if not ok:
+            return False
+    elif missing is not None:
+        run.append_line("[runner] todas as deps já estão no env langnet ✓")
+    if missing is not None:
+        mark_deps_satisfied(fingerprint)
+    return True
+
+
 def _load_env_file_into(env: dict, path: Path) -> None:
     """Carrega KEY=VALUE de um .env para o dict env. Ignora se arquivo não existe."""
     if not path.exists():
@@ -270,69 +541,205 @@ def _run_backend_service(run: "CodeRun", backend_dir: Path, parent_env: dict, si
         run.append_line(f"[backend] ERROR: {exc}")
 
 
-# Cache global de node_modules — instala uma vez, reusa em todos os runs
+# Cache global de node_modules, uma GERAÇÃO por conteúdo: <cache>/<hash>/node_modules,
+# com hash do package.json normalizado (+ lockfile). Várias gerações convivem (LRU por
+# orçamento de disco) — alternar entre projetos não reinstala nada.
 _FRONTEND_CACHE_DIR = Path(os.environ.get(
     "LANGNET_FRONTEND_CACHE",
     str(Path.home() / ".langnet-cache" / "frontend"),
 ))
+FRONTEND_CACHE_MAX_MB = int(os.environ.get("LANGNET_FRONTEND_CACHE_MAX_MB", "4096"))
+FRONTEND_CACHE_GENERATIONS = int(os.environ.get("LANGNET_FRONTEND_CACHE_GENERATIONS", "6"))
+# Campos do package.json que determinam o node_modules (nome/versão/scripts não).
+_PKG_DEP_FIELDS = ("dependencies", "devDependencies", "optionalDependencies",
+                   "peerDependencies", "overrides", "resolutions", "bundledDependencies")
+_FRONTEND_BUILD_LOCKS: Dict[str, threading.Lock] = {}
+_FRONTEND_LOCKS_GUARD = threading.Lock()
+
+
+def frontend_cache_key(pkg_json_text: str, lock_text: str = "") -> str:
+    """Hash do package.json normalizado (só campos de dependência, chaves
+    ordenadas) + lockfile. package.json inválido → hash do texto cru."""
+    try:
+        pkg = json.loads(pkg_json_text or "{}")
+        basis = json.dumps({k: pkg.get(k) for k in _PKG_DEP_FIELDS if pkg.get(k)},
+                           sort_keys=True, separators=(",", ":"))
+    except (ValueError, AttributeError):
+        basis = (pkg_json_text or "").strip()
+    h = hashlib.sha256(basis.encode("utf-8"))
+    if lock_text:
+        h.update(b"\0" + lock_text.strip().encode("utf-8"))
+    return h.hexdigest()[:20]
 
 
-def _ensure_frontend_cache(run: "CodeRun", template_pkg_json: str, npm_bin: Path, env: dict) -> bool:
-    """Garante que ~/.langnet-cache/frontend/node_modules existe.
+def _generation_dir(key: str) -> Path:
+    return _FRONTEND_CACHE_DIR / key
 
-    Se package.json mudou desde a última instalação, reinstala.
-    Retorna True se cache tá pronto.
-    """
-    cache_node_modules = _FRONTEND_CACHE_DIR / "node_modules"
-    cache_pkg_json = _FRONTEND_CACHE_DIR / "package.json"
 
-    _FRONTEND_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+def _generation_ready(key: str) -> bool:
+    gen = _generation_dir(key)
+    return (gen / ".ready").exists() and (gen / "node_modules").is_dir()
 
-    # Invalida cache se package.json mudou
-    same_pkg = cache_pkg_json.exists() and cache_pkg_json.read_text(encoding="utf-8").strip() == template_pkg_json.strip()
-    if cache_node_modules.exists() and same_pkg:
-        return True
-
-    # Reconstrói o cache
-    run.append_line(f"[frontend:cache] populando cache em {_FRONTEND_CACHE_DIR}")
-    if cache_node_modules.exists():
-        run.append_line("[frontend:cache] invalidando cache antigo (package.json mudou)")
-        shutil.rmtree(cache_node_modules, ignore_errors=True)
-    cache_pkg_json.write_text(template_pkg_json, encoding="utf-8")
 
+def _touch_generation(key: str) -> None:
     try:
-        inst = subprocess.Popen(
-            [str(npm_bin), "install", "--legacy-peer-deps", "--silent", "--no-audit", "--no-fund"],
-            cwd=str(_FRONTEND_CACHE_DIR),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            env=env,
-            bufsize=1,
-            preexec_fn=os.setsid if os.name != "nt" else None,
-        )
-        for raw in iter(inst.stdout.readline, b""):
-            line = raw.decode("utf-8", errors="replace").rstrip("\n")
-            if line and not line.startswith("npm WARN"):
-                run.append_line(f"[frontend:cache] {line[:200]}")
+        os.utime(_generation_dir(key) / ".ready")  # LRU pela mtime
+    except OSError:
+        pass
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _dirs, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _evict_frontend_generations(keep: str, log) -> None:
+    """LRU: remove gerações mais antigas até caber no orçamento de disco e no
+    número máximo de gerações. Nunca remove ``keep`` (a recém-usada)."""
+    legacy = _FRONTEND_CACHE_DIR / "node_modules"
+    if legacy.exists():  # layout antigo de slot único
+        shutil.rmtree(legacy, ignore_errors=True)
+        (_FRONTEND_CACHE_DIR / "package.json").unlink(missing_ok=True)
+    gens = []
+    for gen in _FRONTEND_CACHE_DIR.iterdir():
+        if gen.name.startswith(".") and ".building-" in gen.name:
+            if time.time() - gen.stat().st_mtime > 24 * 3600:  # build interrompido
+                shutil.rmtree(gen, ignore_errors=True)
+            continue
+        ready = gen / ".ready"
+        if gen.is_dir() and ready.exists():
+            try:
+                size = int((gen / ".size").read_text())
+            except (OSError, ValueError):
+                size = 0
+            gens.append((ready.stat().st_mtime, gen, size))
+    gens.sort()
+    total = sum(size for _, _, size in gens)
+    budget = FRONTEND_CACHE_MAX_MB * 1024 * 1024
+    for _mtime, gen, size in gens:
+        if total <= budget and len(gens) <= FRONTEND_CACHE_GENERATIONS:
+            break
+        if gen.name == keep:
+            continue
+        log(f"[frontend:cache] removendo geração {gen.name} ({size // (1024 * 1024)} MB, LRU)")
+        shutil.rmtree(gen, ignore_errors=True)
+        gens = [g for g in gens if g[1] != gen]
+        total -= size
+
+
+def _build_frontend_generation(key: str, pkg_json_text: str, lock_text: str,
+                               npm_bin: Path, env: dict, log) -> bool:
+    """npm install num diretório temporário e rename atômico para <cache>/<key>.
+    Lock por chave: run e pré-aquecimento simultâneos não instalam duas vezes."""
+    with _FRONTEND_LOCKS_GUARD:
+        lock = _FRONTEND_BUILD_LOCKS.setdefault(key, threading.Lock())
+    with lock:
+        if _generation_ready(key):
+            return True
+        gen = _generation_dir(key)
+        tmp = _FRONTEND_CACHE_DIR / f".{key}.building-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        (tmp / "package.json").write_text(pkg_json_text, encoding="utf-8")
+        if lock_text:
+            (tmp / "package-lock.json").write_text(lock_text, encoding="utf-8")
+        log(f"[frontend:cache] populando geração {key}")
         try:
-            inst.stdout.close()
-        except Exception:
-            pass
-        rc = inst.wait()
-        if rc != 0:
-            run.append_line(f"[frontend:cache] FALHOU (code={rc})")
+            inst = subprocess.Popen(
+                [str(npm_bin), "install", "--legacy-peer-deps", "--silent", "--no-audit", "--no-fund"],
+                cwd=str(tmp),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                env=env,
+                bufsize=1,
+                preexec_fn=os.setsid if os.name != "nt" else None,
+            )
+            for raw in iter(inst.stdout.readline, b""):
+                line = raw.decode("utf-8", errors="replace").rstrip("\n")
+                if line and not line.startswith("npm WARN"):
+                    log(f"[frontend:cache] {line[:200]}")
+            try:
+                inst.stdout.close()
+            except Exception:
+                pass
+            rc = inst.wait()
+            if rc != 0:
+                log(f"[frontend:cache] FALHOU (code={rc})")
+                shutil.rmtree(tmp, ignore_errors=True)
+                return False
+            (tmp / ".size").write_text(str(_dir_size(tmp / "node_modules")))
+            (tmp / ".ready").touch()
+            shutil.rmtree(gen, ignore_errors=True)  # resto de build interrompido
+            tmp.rename(gen)
+        except Exception as exc:
+            log(f"[frontend:cache] ERROR: {exc}")
+            shutil.rmtree(tmp, ignore_errors=True)
             return False
-    except Exception as exc:
-        run.append_line(f"[frontend:cache] ERROR: {exc}")
-        return False
-
-    run.append_line("[frontend:cache] cache pronto ✓")
+    log(f"[frontend:cache] geração {key} pronta ✓")
+    try:
+        _evict_frontend_generations(key, log)
+    except OSError:
+        pass
     return True
 
 
-def _link_cache_into(frontend_dir: Path, run: "CodeRun") -> bool:
-    """Faz hardlink (cp -al) do cache de node_modules para o frontend do run."""
-    cache_nm = _FRONTEND_CACHE_DIR / "node_modules"
+def _ensure_frontend_cache(run: "CodeRun", template_pkg_json: str, npm_bin: Path, env: dict,
+                           lock_text: str = "") -> Optional[str]:
+    """Garante a geração do cache para este package.json (+ lockfile).
+
+    Retorna a chave da geração pronta (ou None se a instalação falhou)."""
+    _FRONTEND_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    key = frontend_cache_key(template_pkg_json, lock_text)
+    if _generation_ready(key):
+        _touch_generation(key)
+        return key
+    ok = _build_frontend_generation(key, template_pkg_json, lock_text, npm_bin, env, run.append_line)
+    return key if ok else None
+
+
+def prewarm_frontend_cache(files: List[Dict[str, Any]]) -> Optional[str]:
+    """Constrói em background a geração do cache para o frontend de um projeto
+    gerado (``files`` no formato da sessão), antes de alguém pedir o run.
+
+    Retorna a chave (ou None se não há frontend/node). Nunca lança."""
+    try:
+        by_path = {(f.get("path") or "").removeprefix("./"): f.get("content") or "" for f in files}
+        pkg = next((by_path[p] for p in ("frontend/package.json", "package.json") if p in by_path), None)
+        if not pkg:
+            return None
+        base = "frontend/" if "frontend/package.json" in by_path else ""
+        lock_text = by_path.get(f"{base}package-lock.json", "")
+        key = frontend_cache_key(pkg, lock_text)
+        if _generation_ready(key):
+            return key
+        node_bin = _find_node_bin()
+        npm_bin = node_bin.parent / "npm" if node_bin else None
+        if not npm_bin or not npm_bin.exists():
+            return None
+        env = os.environ.copy()
+        env["PATH"] = f"{node_bin.parent}:{env.get('PATH', '')}"
+        _FRONTEND_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        threading.Thread(
+            target=_build_frontend_generation,
+            args=(key, pkg, lock_text, npm_bin, env, print),
+            daemon=True,
+            name=f"frontend-prewarm-{key[:8]}",
+        ).start()
+        return key
+    except Exception as exc:  # noqa: BLE001 — pré-aquecimento é oportunista
+        print(f"[frontend:cache] pré-aquecimento ignorado: {exc}")
+        return None
+
+
+def _link_cache_into(frontend_dir: Path, run: "CodeRun", key: str) -> bool:
+    """Faz hardlink (cp -al) da geração ``key`` do cache para o frontend do run."""
+    cache_nm = _generation_dir(key) / "node_modules"
     dst_nm = frontend_dir / "node_modules"
     if dst_nm.exists():
         return True  # já tem node_modules local — não toca
@@ -347,7 +754,8 @@ def _link_cache_into(frontend_dir: Path, run: "CodeRun") -> bool:
             text=True,
         ).returncode
         if rc == 0:
-            run.append_line(f"[frontend:cache] hardlinked node_modules ({rc}) — pulando npm install")
+            _touch_generation(key)
+            run.append_line(f"[frontend:cache] hardlinked node_modules (geração {key}) — pulando npm install")
             return True
         run.append_line(f"[frontend:cache] cp -al falhou (rc={rc}) — fallback para npm install")
         return False
@@ -399,10 +807,12 @@ def _run_frontend_service(run: "CodeRun", frontend_dir: Path, parent_env: dict,
         # 1) Garante node_modules: usa cache global (hardlink) se possível.
         if not (frontend_dir / "node_modules").exists():
             pkg_json_text = (frontend_dir / "package.json").read_text(encoding="utf-8") if (frontend_dir / "package.json").exists() else ""
-            # 1a) Popula cache se ainda não existe (ou se package.json mudou)
-            cache_ok = _ensure_frontend_cache(run, pkg_json_text, npm_bin, env)
+            lock_file = frontend_dir / "package-lock.json"
+            lock_text = lock_file.read_text(encoding="utf-8") if lock_file.exists() else ""
+            # 1a) Geração do cache para este package.json (constrói se não existe)
+            cache_key = _ensure_frontend_cache(run, pkg_json_text, npm_bin, env, lock_text)
             # 1b) Hardlink cache → node_modules do run (instantâneo)
-            linked = cache_ok and _link_cache_into(frontend_dir, run)
+            linked = bool(cache_key) and _link_cache_into(frontend_dir, run, cache_key)
             if not linked:
                 run.append_line("[frontend] sem cache — npm install local (1-2 min)...")
                 inst = subprocess.Popen(
@@ -492,18 +902,12 @@ def _worker(run: CodeRun, files: List[Dict[str, Any]]) -> None:
         if req_file.exists():
             run.status = "installing"
             run.broadcast_status()
-            missing = _check_missing_deps(req_file, run)
-            if missing:
-                run.append_line(f"[runner] {len(missing)} dep(s) faltando: {', '.join(missing[:10])}{'...' if len(missing) > 10 else ''}")
-                ok = _install_missing(req_file, run)
-                if not ok:
-                    run.status = "crashed"
-                    run.exit_code = 1
-                    run.finished_at = datetime.utcnow().isoformat()
-                    run.broadcast_status()
-                    return
-            else:
-                run.append_line("[runner] todas as deps já estão no env langnet ✓")
+            if not _ensure_deps(req_file, run):
+                run.status = "crashed"
+                run.exit_code = 1
+                run.finished_at = datetime.utcnow().isoformat()
+                run.broadcast_status()
+                return
 
         # 3) Sobe python main.py
         main_py = run.work_dir / "main.py"
@@ -725,17 +1129,24 @@ def cleanup_run(run_id: str, remove_files: bool = False) -> None:
             pass
 
 
-def subscribe(run: CodeRun) -> asyncio.Queue:
-    """Adiciona uma fila de subscriber (consumida pelo WS handler)."""
+def subscribe(run: CodeRun, since: Optional[int] = None) -> asyncio.Queue:
+    """Adiciona uma fila de subscriber (consumida pelo WS handler).
+
+    Chamar de dentro do event loop. ``since``: seq da próxima linha desejada
+    (retomada após reconexão); sem ele, reenvia as últimas WS_BACKLOG_LINES.
+    O backlog sai pelo mesmo caminho em lote das linhas novas."""
     q: asyncio.Queue = asyncio.Queue(maxsize=2000)
     with run._lock:
-        run._subscribers.append(q)
+        if run._main_loop is None:
+            # start_run roda fora do loop (endpoint sync) — amarra no loop do WS
+            run._main_loop = asyncio.get_running_loop()
+        if since is None:
+            since = max(run.log.first_seq, run.log.next_seq - WS_BACKLOG_LINES)
+        run._subscribers[q] = max(0, min(since, run.log.next_seq))
+    run._flush()
     return q
 
 
 def unsubscribe(run: CodeRun, q: asyncio.Queue) -> None:
     with run._lock:
-        try:
-            run._subscribers.remove(q)
-        except ValueError:
-            pass
+        run._subscribers.pop(q, None)
@@ -9,6 +9,13 @@ import mysql.connector
 from mysql.connector import pooling, Error
 from dotenv import load_dotenv
 
+from app.versioning import (
+    CODE_GENERATION_VERSIONS,
+    get_version_row,
+    list_versions,
+    save_version,
+)
+
 # Load environment variables
 load_dotenv()
 
@@ -224,6 +231,68 @@ def execute_delete(query: str, params: tuple = None) -> int:
         return cursor.rowcount
 
 
+# Limites de um INSERT multi-linha: nº de linhas e tamanho aproximado do
+# statement (abaixo do max_allowed_packet do servidor)
+BULK_CHUNK_ROWS = int(os.getenv("DB_BULK_CHUNK_ROWS", "500"))
+BULK_MAX_BYTES = int(os.getenv("DB_BULK_MAX_BYTES", str(4 * 1024 * 1024)))
+
+
+def _chunk_rows(rows: list, chunk_rows: int, max_bytes: int):
+    chunk, size = [], 0
+    for row in rows:
+        row_size = sum(len(v) if isinstance(v, (str, bytes)) else 16 for v in row)
+        if chunk and (len(chunk) >= chunk_rows or size + row_size > max_bytes):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(row)
+        size += row_size
+    if chunk:
+        yield chunk
+
+
+def bulk_insert(
+    cursor,
+    table: str,
+    columns: list,
+    rows: list,
+    update_columns: list = None,
+    chunk_rows: int = None,
+    max_bytes: int = None,
+) -> int:
+    """
+    Insert many rows with multi-row VALUES statements (one round trip per chunk)
+
+    Does NOT commit — the caller owns the transaction, so a whole save stays
+    atomic.
+
+    Args:
+        cursor: Open cursor
+        table: Target table
+        columns: Column names, in the order of each row tuple
+        rows: List of tuples
+        update_columns: Columns refreshed on duplicate key (upsert); None = plain INSERT
+        chunk_rows: Max rows per statement (default DB_BULK_CHUNK_ROWS)
+        max_bytes: Approximate max statement size (default DB_BULK_MAX_BYTES)
+
+    Returns:
+        Number of statements executed
+    """
+    if not rows:
+        return 0
+    placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    head = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+    tail = ""
+    if update_columns:
+        tail = " ON DUPLICATE KEY UPDATE " + ", ".join(f"{c} = VALUES({c})" for c in update_columns)
+
+    statements = 0
+    for chunk in _chunk_rows(rows, chunk_rows or BULK_CHUNK_ROWS, max_bytes or BULK_MAX_BYTES):
+        params = [value for row in chunk for value in row]
+        cursor.execute(head + ", ".join([placeholder] * len(chunk)) + tail, params)
+        statements += 1
+    return statements
+
+
 def test_connection():
     """Test database connection"""
     try:
@@ -239,6 +308,154 @@ def test_connection():
         return False
 
 
+# ============================================================
+# KEYSET PAGINATION (chat histories)
+# ============================================================
+# LIMIT/OFFSET relê e descarta todas as linhas anteriores à página — sessões de
+# refinamento com milhares de mensagens ficavam mais lentas a cada página. O
+# cursor opaco carrega a posição (timestamp, id) da última linha entregue; a
+# próxima página começa logo depois dela, direto no índice
+# (session_id, timestamp, id) — migration 035.
+
+CHAT_TABLES = (
+    "chat_messages",
+    "specification_chat_messages",
+    "agent_task_spec_chat_messages",
+    "agents_yaml_chat_messages",
+    "tasks_yaml_chat_messages",
+    "code_generation_chat_messages",
+)
+
+
+def encode_page_cursor(timestamp, row_id: str) -> str:
+    """Opaque cursor for the (timestamp, id) position of a row"""
+    import base64
+
+    ts = timestamp.strftime("%Y-%m-%d %H:%M:%S.%f") if hasattr(timestamp, "strftime") else str(timestamp)
+    raw = json.dumps([ts, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_page_cursor(cursor: str) -> tuple:
+    """(timestamp, id) from a cursor; ValueError if it was not produced by encode_page_cursor"""
+    import base64
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(ts), str(row_id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+
+def build_chat_page_query(
+    table: str,
+    limit: int,
+    cursor: str = None,
+    newest_first: bool = False,
+    columns: str = "*",
+    filters: str = "",
+) -> tuple:
+    """
+    SQL for one keyset page of a chat table
+
+    The session id is the first placeholder, followed by the filter
+    placeholders, the cursor position (if any) and limit + 1 (the extra row
+    tells whether there is a next page).
+
+    Returns:
+        (query, cursor_params)
+    """
+    if table not in CHAT_TABLES:
+        raise ValueError(f"Unknown chat table: {table}")
+    op, order = ("<", "DESC") if newest_first else (">", "ASC")
+    query = f"SELECT {columns} FROM {table} WHERE session_id = %s{filters}"
+    cursor_params = ()
+    if cursor:
+        ts, row_id = decode_page_cursor(cursor)
+        query += f" AND (timestamp {op} %s OR (timestamp = %s AND id {op} %s))"
+        cursor_params = (ts, ts, row_id)
+    query += f" ORDER BY timestamp {order}, id {order} LIMIT %s"
+    return query, cursor_params
+
+
+def finish_chat_page(rows: list, limit: int, newest_first: bool = False, json_field: str = "metadata") -> dict:
+    """Trims the look-ahead row, parses JSON (raw text kept if it does not parse) and
+    returns rows in chronological order"""
+    rows = list(rows or [])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_page_cursor(rows[-1]["timestamp"], rows[-1]["id"]) if has_more and rows else None
+    for row in rows:
+        if row.get(json_field) and isinstance(row[json_field], str):
+            try:
+                row[json_field] = json.loads(row[json_field])
+            except Exception:
+                pass  # texto que não é JSON segue como string (não vira None)
+    if newest_first:
+        rows.reverse()
+    return {"messages": rows, "next_cursor": next_cursor, "has_more": has_more}
+
+
+def get_chat_page(
+    table: str,
+    session_id: str,
+    limit: int = 50,
+    cursor: str = None,
+    newest_first: bool = False,
+    columns: str = "*",
+    filters: str = "",
+    filter_params: tuple = (),
+    json_field: str = "metadata",
+) -> dict:
+    """
+    One page of a chat history, by cursor instead of OFFSET
+
+    Args:
+        table: One of CHAT_TABLES
+        session_id: Session whose messages are listed
+        limit: Page size
+        cursor: next_cursor of the previous page (None = first page)
+        newest_first: Page backwards from the most recent message (chat panels
+            that show "the last N"); rows are still returned oldest → newest
+        columns: Column projection
+        filters: Extra " AND ..." conditions
+        filter_params: Parameters for `filters`
+        json_field: Column holding JSON text to be parsed
+
+    Returns:
+        {"messages": [...], "next_cursor": str | None, "has_more": bool}
+    """
+    query, cursor_params = build_chat_page_query(table, limit, cursor, newest_first, columns, filters)
+    rows = execute_query(query, (session_id, *filter_params, *cursor_params, limit + 1), fetch_all=True)
+    return finish_chat_page(rows, limit, newest_first, json_field)
+
+
+def get_chat_messages_page(
+    session_id: str,
+    limit: int = 50,
+    cursor: str = None,
+    include_deleted: bool = False,
+    message_type: str = None
+) -> dict:
+    """Keyset-paginated variant of get_chat_messages"""
+    filters, params = "", []
+    if not include_deleted:
+        filters += " AND is_deleted = 0"
+    if message_type:
+        filters += " AND message_type = %s"
+        params.append(message_type)
+    return get_chat_page("chat_messages", session_id, limit, cursor, filters=filters, filter_params=tuple(params))
+
+
+# Colunas das listas de versões SEM o corpo do documento (LONGTEXT) — o
+# documento completo vem do endpoint da versão específica
+VERSION_SUMMARY_COLUMNS = (
+    "session_id, version, created_at, created_by, change_type, change_description, "
+    "section_changes, doc_size, review_notes, reviewed_by, reviewed_at, is_approved_version"
+)
+
+
 # ============================================================
 # CHAT MESSAGES CRUD OPERATIONS
 # ============================================================
@@ -745,12 +962,16 @@ def create_agent_task_spec_version(version_data: dict) -> None:
         cursor.execute(query, version_data)
 
 
-def get_agent_task_spec_versions(session_id: str) -> list:
-    """Get version history for an agent task specification session"""
+def get_agent_task_spec_versions(session_id: str, include_content: bool = True) -> list:
+    """Get version history for an agent task specification session
+
+    include_content=False omits the document body (list views)
+    """
     import json
 
-    query = """
-        SELECT * FROM agent_task_spec_version_history
+    columns = "*" if include_content else VERSION_SUMMARY_COLUMNS
+    query = f"""
+        SELECT {columns} FROM agent_task_spec_version_history
         WHERE session_id = %s
         ORDER BY version DESC
     """
@@ -922,9 +1143,10 @@ def create_agents_yaml_version(version_data: dict) -> None:
         cursor.execute(query, version_data)
 
 
-def get_agents_yaml_versions(session_id: str) -> list:
-    """Get all versions for an agents YAML session"""
-    query = "SELECT * FROM agents_yaml_version_history WHERE session_id = %s ORDER BY version DESC"
+def get_agents_yaml_versions(session_id: str, include_content: bool = True) -> list:
+    """Get all versions for an agents YAML session (include_content=False omits the YAML body)"""
+    columns = "*" if include_content else VERSION_SUMMARY_COLUMNS
+    query = f"SELECT {columns} FROM agents_yaml_version_history WHERE session_id = %s ORDER BY version DESC"
     return execute_query(query, (session_id,), fetch_all=True)
 
 
@@ -1055,9 +1277,10 @@ def create_tasks_yaml_version(version_data: dict) -> None:
         cursor.execute(query, version_data)
 
 
-def get_tasks_yaml_versions(session_id: str) -> list:
-    """Get all versions for a tasks YAML session"""
-    query = "SELECT * FROM tasks_yaml_version_history WHERE session_id = %s ORDER BY version DESC"
+def get_tasks_yaml_versions(session_id: str, include_content: bool = True) -> list:
+    """Get all versions for a tasks YAML session (include_content=False omits the YAML body)"""
+    columns = "*" if include_content else VERSION_SUMMARY_COLUMNS
+    query = f"SELECT {columns} FROM tasks_yaml_version_history WHERE session_id = %s ORDER BY version DESC"
     return execute_query(query, (session_id,), fetch_all=True)
 
 
@@ -1397,35 +1620,26 @@ def create_code_generation_version(version_data: dict) -> None:
         "change_description": version_data.get("change_description"),
         "total_files": int(version_data.get("total_files", 0)),
     }
-    query = """
-        INSERT INTO code_generation_version_history (
-            id, session_id, version, generated_files, created_by,
-            change_type, change_description, total_files
-        ) VALUES (
-            %(id)s, %(session_id)s, %(version)s, %(generated_files)s, %(created_by)s,
-            %(change_type)s, %(change_description)s, %(total_files)s
+    # keyframe ou delta contra a versão anterior (ver app/versioning.py)
+    with get_db_connection() as connection:
+        save_version(
+            CODE_GENERATION_VERSIONS,
+            connection,
+            params["session_id"],
+            params["version"],
+            {"generated_files": params["generated_files"]},
+            extra={k: params[k] for k in ("id", "created_by", "change_type",
+                                          "change_description", "total_files")},
         )
-    """
-    with get_db_cursor() as cursor:
-        cursor.execute(query, params)
+        connection.commit()
 
 
 def get_code_generation_versions(session_id: str) -> list:
-    rows = execute_query(
-        "SELECT id, version, change_type, change_description, total_files, created_at "
-        "FROM code_generation_version_history WHERE session_id = %s ORDER BY version DESC",
-        (session_id,),
-        fetch_all=True,
-    ) or []
-    return rows
+    return list_versions(CODE_GENERATION_VERSIONS, session_id) or []
 
 
 def get_code_generation_version(session_id: str, version: int) -> dict | None:
-    row = execute_query(
-        "SELECT * FROM code_generation_version_history WHERE session_id = %s AND version = %s LIMIT 1",
-        (session_id, version),
-        fetch_one=True,
-    )
+    row = get_version_row(CODE_GENERATION_VERSIONS, session_id, version)
     if not row:
         return None
     if isinstance(row.get("generated_files"), str):
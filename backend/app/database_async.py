@@ -0,0 +1,421 @@
+"""
+Async database access (aiomysql) — variante não-bloqueante de app.database
+
+Os routers são `async def`, mas app.database usa mysql.connector (bloqueante):
+uma query lenta no banco DDNS remoto travava o event loop do uvicorn para TODOS
+os usuários. Este módulo expõe o mesmo contrato em versão assíncrona:
+
+- pool aiomysql com health check (ping/reconnect) no checkout;
+- fallback para conexão DIRETA quando o pool está esgotado ou a conexão não
+  revive — mesma semântica de `_checkout_connection`;
+- timeout por statement (DB_STATEMENT_TIMEOUT): a conexão que estoura o prazo é
+  descartada (não volta ao pool com um resultado pendente);
+- helpers `*_async` para as leituras quentes (status de sessão, listas de
+  versões, histórico de chat).
+
+Sem aiomysql instalado — ou com a criação do pool falhando (banco fora do ar,
+credencial errada) — os helpers caem para as funções síncronas de app.database
+rodando em `asyncio.to_thread`: o loop continua livre e o erro não chega aos
+handlers. A criação do pool é tentada de novo a cada DB_ASYNC_POOL_RETRY segundos.
+"""
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Optional
+
+try:
+    import aiomysql
+except ImportError:  # dependência opcional
+    aiomysql = None
+
+from app import database
+from app.database import DB_CONFIG, VERSION_SUMMARY_COLUMNS, build_chat_page_query, finish_chat_page
+
+# Configuração do pool assíncrono (mesmo banco/credenciais do pool síncrono)
+ASYNC_DB_CONFIG = {
+    "host": DB_CONFIG["host"],
+    "port": DB_CONFIG["port"],
+    "user": DB_CONFIG["user"],
+    "password": DB_CONFIG["password"],
+    "db": DB_CONFIG["database"],
+    "charset": DB_CONFIG["charset"],
+    "autocommit": False,
+    "connect_timeout": DB_CONFIG["connection_timeout"],
+}
+
+ASYNC_POOL_CONFIG = {
+    **ASYNC_DB_CONFIG,
+    "minsize": int(os.getenv("DB_ASYNC_POOL_MIN", "1")),
+    "maxsize": int(os.getenv("DB_ASYNC_POOL_SIZE", "20")),
+    # DDNS remoto derruba conexões ociosas — recicla antes disso
+    "pool_recycle": int(os.getenv("DB_ASYNC_POOL_RECYCLE", "300")),
+}
+
+# Espera máxima por um slot do pool antes de degradar para conexão direta
+POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "5"))
+# Tempo máximo de uma statement (segundos; 0 = sem limite)
+STATEMENT_TIMEOUT = float(os.getenv("DB_STATEMENT_TIMEOUT", "30"))
+# Após falha na criação do pool, quanto tempo usar o caminho síncrono antes de tentar de novo
+POOL_RETRY_SECONDS = float(os.getenv("DB_ASYNC_POOL_RETRY", "30"))
+
+async_pool = None
+_pool_lock: Optional[asyncio.Lock] = None
+_pool_failed_at: Optional[float] = None
+
+
+async def init_async_db_pool():
+    """Initialize the async database connection pool"""
+    global async_pool
+    if aiomysql is None:
+        raise RuntimeError("aiomysql não está instalado")
+    try:
+        async_pool = await aiomysql.create_pool(**ASYNC_POOL_CONFIG)
+        print(f"✅ Async database pool initialized: {DB_CONFIG['database']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}")
+        return async_pool
+    except Exception as e:
+        print(f"❌ Error initializing async database pool: {e}")
+        raise
+
+
+async def get_async_db_pool():
+    """Get the async connection pool (created on first use)"""
+    global _pool_lock
+    if async_pool is None:
+        if _pool_lock is None:
+            _pool_lock = asyncio.Lock()
+        async with _pool_lock:
+            if async_pool is None:
+                await init_async_db_pool()
+    return async_pool
+
+
+async def _async_pool_ready() -> bool:
+    """True se o pool aiomysql está disponível (criando-o se preciso). Falha na
+    criação → False por POOL_RETRY_SECONDS, e o chamador usa o caminho síncrono."""
+    global _pool_failed_at
+    if aiomysql is None:
+        return False
+    if async_pool is not None:
+        return True
+    if _pool_failed_at is not None and time.monotonic() - _pool_failed_at < POOL_RETRY_SECONDS:
+        return False
+    try:
+        await get_async_db_pool()
+    except Exception as e:  # noqa: BLE001 — qualquer falha de conexão/config
+        _pool_failed_at = time.monotonic()
+        print(f"⚠️ Pool async indisponível ({e!r}); usando app.database em thread (fallback).")
+        return False
+    _pool_failed_at = None
+    return True
+
+
+async def close_async_db_pool():
+    """Close the async pool (application shutdown)"""
+    global async_pool
+    if async_pool is not None:
+        async_pool.close()
+        await async_pool.wait_closed()
+        async_pool = None
+
+
+async def _connect_direct():
+    conn = await aiomysql.connect(**ASYNC_DB_CONFIG)
+    conn._langnet_direct = True
+    return conn
+
+
+async def _checkout_connection_async():
+    """Versão assíncrona de `_checkout_connection`: conexão do pool revivida via
+    ping(reconnect); pool esgotado (timeout no acquire) ou conexão que não revive
+    → conexão DIRETA, marcada com _langnet_direct pra ser fechada no finally.
+    """
+    pool = await get_async_db_pool()
+    try:
+        conn = await asyncio.wait_for(pool.acquire(), timeout=POOL_ACQUIRE_TIMEOUT)
+    except Exception as e:  # noqa: BLE001 — inclui TimeoutError (pool exhausted)
+        print(f"⚠️ Pool async indisponível ({e!r}); usando conexão direta (fallback).")
+        return await _connect_direct()
+    try:
+        await conn.ping(reconnect=True)
+    except Exception:
+        # não deu pra reviver — descarta e abre uma direta saudável
+        conn.close()
+        pool.release(conn)
+        conn = await _connect_direct()
+    return conn
+
+
+def _release(conn) -> None:
+    """Devolve ao pool (ou fecha a direta). Conexão fechada é descartada pelo pool."""
+    if getattr(conn, "_langnet_direct", False):
+        conn.close()
+    elif async_pool is not None:
+        async_pool.release(conn)
+    else:
+        conn.close()
+
+
+@asynccontextmanager
+async def get_db_connection_async() -> AsyncGenerator:
+    """
+    Async context manager for database connections from pool
+
+    Usage:
+        async with get_db_connection_async() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute("SELECT * FROM users")
+                results = await cursor.fetchall()
+    """
+    connection = None
+    try:
+        connection = await _checkout_connection_async()
+        yield connection
+    except Exception as e:
+        if connection is not None and not connection.closed:
+            try:
+                await connection.rollback()
+            except Exception:
+                pass
+        print(f"❌ Database error: {e}")
+        raise
+    finally:
+        # SEMPRE devolve (ou fecha) — mesma regra do pool síncrono
+        if connection is not None:
+            try:
+                _release(connection)
+            except Exception:
+                pass
+
+
+async def _execute(cursor, connection, query: str, params) -> None:
+    """Executa com timeout; a conexão que estoura o prazo é fechada (o resultado
+    pendente no socket a tornaria inutilizável para o próximo usuário do pool)."""
+    if not STATEMENT_TIMEOUT:
+        await cursor.execute(query, params)
+        return
+    try:
+        await asyncio.wait_for(cursor.execute(query, params), timeout=STATEMENT_TIMEOUT)
+    except asyncio.TimeoutError:
+        connection.close()
+        raise TimeoutError(f"Statement excedeu {STATEMENT_TIMEOUT:.0f}s: {query.strip()[:80]}")
+
+
+async def execute_query_async(query: str, params: Any = None, fetch_one=False, fetch_all=False):
+    """
+    Execute a SELECT query and return results (async)
+
+    Same contract as app.database.execute_query
+    """
+    if not await _async_pool_ready():
+        return await asyncio.to_thread(
+            database.execute_query, query, params, fetch_one=fetch_one, fetch_all=fetch_all
+        )
+
+    async with get_db_connection_async() as connection:
+        async with connection.cursor(aiomysql.DictCursor) as cursor:
+            await _execute(cursor, connection, query, params or ())
+            if fetch_one:
+                result = await cursor.fetchone()
+            elif fetch_all:
+                result = list(await cursor.fetchall())
+            else:
+                result = None
+        await connection.commit()
+        return result
+
+
+async def execute_update_async(query: str, params: Any = None) -> int:
+    """
+    Execute an UPDATE/DELETE query and return the number of affected rows (async)
+    """
+    if not await _async_pool_ready():
+        return await asyncio.to_thread(database.execute_update, query, params)
+
+    async with get_db_connection_async() as connection:
+        async with connection.cursor() as cursor:
+            await _execute(cursor, connection, query, params or ())
+            rowcount = cursor.rowcount
+        await connection.commit()
+        return rowcount
+
+
+def _parse_json_field(rows: list, field: str = "metadata") -> list:
+    for row in rows:
+        if row.get(field) and isinstance(row[field], str):
+            try:
+                row[field] = json.loads(row[field])
+            except Exception:
+                row[field] = None
+    return rows
+
+
+# ════════════════════════════════════════════════════════════════
+# EXECUTION SESSIONS / CHAT MESSAGES
+# ════════════════════════════════════════════════════════════════
+
+async def get_execution_session_status_async(session_id: str) -> dict:
+    """Status + requirements document of an execution session"""
+    query = """
+        SELECT
+            id,
+            session_name,
+            project_id,
+            user_id,
+            requirements_document,
+            status,
+            started_at,
+            finished_at
+        FROM execution_sessions
+        WHERE id = %s
+    """
+    return await execute_query_async(query, (session_id,), fetch_one=True)
+
+
+async def get_chat_messages_async(
+    session_id: str,
+    limit: int = 50,
+    offset: int = 0,
+    include_deleted: bool = False,
+    message_type: str = None
+) -> list:
+    """Async variant of app.database.get_chat_messages"""
+    if not await _async_pool_ready():
+        return await asyncio.to_thread(
+            database.get_chat_messages, session_id, limit, offset, include_deleted, message_type
+        )
+
+    query = """
+        SELECT * FROM chat_messages
+        WHERE session_id = %s
+    """
+    params = [session_id]
+
+    if not include_deleted:
+        query += " AND is_deleted = 0"
+
+    if message_type:
+        query += " AND message_type = %s"
+        params.append(message_type)
+
+    query += " ORDER BY timestamp ASC LIMIT %s OFFSET %s"
+    params.extend([limit, offset])
+
+    messages = await execute_query_async(query, tuple(params), fetch_all=True)
+    return _parse_json_field(messages)
+
+
+async def get_chat_message_count_async(session_id: str, include_deleted: bool = False) -> int:
+    """Async variant of app.database.get_chat_message_count"""
+    query = "SELECT COUNT(*) as count FROM chat_messages WHERE session_id = %s"
+    if not include_deleted:
+        query += " AND is_deleted = 0"
+
+    result = await execute_query_async(query, (session_id,), fetch_one=True)
+    return result['count'] if result else 0
+
+
+async def get_chat_page_async(
+    table: str,
+    session_id: str,
+    limit: int = 50,
+    cursor: str = None,
+    newest_first: bool = False,
+    columns: str = "*",
+    filters: str = "",
+    filter_params: tuple = (),
+    json_field: str = "metadata",
+) -> dict:
+    """Async variant of app.database.get_chat_page (keyset pagination)"""
+    query, cursor_params = build_chat_page_query(table, limit, cursor, newest_first, columns, filters)
+    rows = await execute_query_async(
+        query, (session_id, *filter_params, *cursor_params, limit + 1), fetch_all=True
+    )
+    return finish_chat_page(rows, limit, newest_first, json_field)
+
+
+async def get_chat_messages_page_async(
+    session_id: str,
+    limit: int = 50,
+    cursor: str = None,
+    include_deleted: bool = False,
+    message_type: str = None
+) -> dict:
+    """Async variant of app.database.get_chat_messages_page"""
+    filters, params = "", []
+    if not include_deleted:
+        filters += " AND is_deleted = 0"
+    if message_type:
+        filters += " AND message_type = %s"
+        params.append(message_type)
+    return await get_chat_page_async(
+        "chat_messages", session_id, limit, cursor, filters=filters, filter_params=tuple(params)
+    )
+
+
+async def _get_recent_chat_messages_async(table: str, session_id: str, limit: int) -> list:
+    """Últimas `limit` mensagens de `table`, em ordem cronológica"""
+    query = f"""
+        SELECT * FROM {table}
+        WHERE session_id = %s
+        ORDER BY timestamp DESC
+        LIMIT %s
+    """
+    messages = await execute_query_async(query, (session_id, limit), fetch_all=True)
+    return list(reversed(_parse_json_field(messages)))
+
+
+# ════════════════════════════════════════════════════════════════
+# VERSION HISTORY / CHAT HISTORY (read endpoints)
+# ════════════════════════════════════════════════════════════════
+
+async def get_agent_task_spec_versions_async(session_id: str, include_content: bool = True) -> list:
+    """Async variant of app.database.get_agent_task_spec_versions"""
+    if not await _async_pool_ready():
+        return await asyncio.to_thread(database.get_agent_task_spec_versions, session_id, include_content)
+
+    columns = "*" if include_content else VERSION_SUMMARY_COLUMNS
+    query = f"""
+        SELECT {columns} FROM agent_task_spec_version_history
+        WHERE session_id = %s
+        ORDER BY version DESC
+    """
+    versions = await execute_query_async(query, (session_id,), fetch_all=True)
+    return _parse_json_field(versions, "section_changes")
+
+
+async def get_agent_task_spec_chat_messages_async(session_id: str, limit: int = 50) -> list:
+    """Async variant of app.database.get_agent_task_spec_chat_messages"""
+    if not await _async_pool_ready():
+        return await asyncio.to_thread(database.get_agent_task_spec_chat_messages, session_id, limit)
+    return await _get_recent_chat_messages_async("agent_task_spec_chat_messages", session_id, limit)
+
+
+async def get_agents_yaml_versions_async(session_id: str, include_content: bool = True) -> list:
+    """Async variant of app.database.get_agents_yaml_versions"""
+    columns = "*" if include_content else VERSION_SUMMARY_COLUMNS
+    query = f"SELECT {columns} FROM agents_yaml_version_history WHERE session_id = %s ORDER BY version DESC"
+    return await execute_query_async(query, (session_id,), fetch_all=True)
+
+
+async def get_agents_yaml_chat_messages_async(session_id: str, limit: int = 50) -> list:
+    """Async variant of app.database.get_agents_yaml_chat_messages"""
+    if not await _async_pool_ready():
+        return await asyncio.to_thread(database.get_agents_yaml_chat_messages, session_id, limit)
+    return await _get_recent_chat_messages_async("agents_yaml_chat_messages", session_id, limit)
+
+
+async def get_tasks_yaml_versions_async(session_id: str, include_content: bool = True) -> list:
+    """Async variant of app.database.get_tasks_yaml_versions"""
+    columns = "*" if include_content else VERSION_SUMMARY_COLUMNS
+    query = f"SELECT {columns} FROM tasks_yaml_version_history WHERE session_id = %s ORDER BY version DESC"
+    return await execute_query_async(query, (session_id,), fetch_all=True)
+
+
+async def get_tasks_yaml_chat_messages_async(session_id: str, limit: int = 50) -> list:
+    """Async variant of app.database.get_tasks_yaml_chat_messages"""
+    if not await _async_pool_ready():
+        return await asyncio.to_thread(database.get_tasks_yaml_chat_messages, session_id, limit)
+    return await _get_recent_chat_messages_async("tasks_yaml_chat_messages", session_id, limit)
+
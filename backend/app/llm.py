@@ -3,7 +3,7 @@ LLM Integration Module
 Supports OpenAI, DeepSeek, Anthropic, LM Studio
 """
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterator, AsyncIterator, Tuple
 from openai import OpenAI
 from anthropic import Anthropic
 from app.config import settings
@@ -78,7 +78,7 @@ class LLMClient:
         if self.provider in ["openai", "deepseek", "lmstudio", "claude_code"]:
             return self._complete_openai(prompt, system, temperature, max_tokens, model_override, **kwargs)
         elif self.provider == "anthropic":
-            return self._complete_anthropic(prompt, system, temperature, max_tokens, **kwargs)
+            return self._complete_anthropic(prompt, system, temperature, max_tokens, model_override, **kwargs)
 
     async def complete_async(
         self,
@@ -151,26 +151,14 @@ class LLMClient:
         # o transporte da resposta trava em ~33KB). O streaming mantém a conexão viva
         # (bytes fluindo) e recebe a resposta completa. Demais providers: não-streaming.
         if self.provider == "lmstudio":
-            _stream = self.client.chat.completions.create(
-                model=model_to_use,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                stream=True,
-                **extra_params,
-                **kwargs
-            )
             _parts = []
             finish_reason = None
-            for _chunk in _stream:
-                try:
-                    _ch = _chunk.choices[0]
-                    if _ch.delta and _ch.delta.content:
-                        _parts.append(_ch.delta.content)
-                    if _ch.finish_reason:
-                        finish_reason = _ch.finish_reason
-                except (IndexError, AttributeError):
-                    continue
+            for _delta, _finish in self._iter_openai_stream(messages, model_to_use, temperature,
+                                                             max_tokens, extra_params, **kwargs):
+                if _delta:
+                    _parts.append(_delta)
+                if _finish:
+                    finish_reason = _finish
             content = "".join(_parts)
         else:
             response = self.client.chat.completions.create(
@@ -185,18 +173,152 @@ class LLMClient:
             finish_reason = response.choices[0].finish_reason
             content = response.choices[0].message.content
 
+        self._report_finish(finish_reason, content, model_to_use, max_tokens)
+
+        return content
+
+    def _iter_openai_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        extra_params: Dict[str, Any],
+        **kwargs
+    ) -> Iterator[Tuple[str, Optional[str]]]:
+        """Itera (delta, finish_reason) de uma chamada OpenAI-compatible em streaming."""
+        _stream = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **extra_params,
+            **kwargs
+        )
+        for _chunk in _stream:
+            try:
+                _ch = _chunk.choices[0]
+                yield ((_ch.delta.content if _ch.delta else None) or "", _ch.finish_reason)
+            except (IndexError, AttributeError):
+                continue
+
+    def _report_finish(self, finish_reason: Optional[str], content: str, model: str, max_tokens: int) -> None:
+        """Loga o finish_reason e avisa truncamento (finish_reason == 'length')."""
         print(f"[LLM] finish_reason: {finish_reason}, output_length: {len(content)} chars")
 
         if finish_reason == 'length':
             print(f"⚠️⚠️⚠️ WARNING: LLM RESPONSE WAS TRUNCATED! ⚠️⚠️⚠️")
-            print(f"⚠️ Model: {model_to_use}, max_tokens: {max_tokens}")
+            print(f"⚠️ Model: {model}, max_tokens: {max_tokens}")
             print(f"⚠️ Output length: {len(content)} characters")
             print(f"⚠️ Last 200 chars: ...{content[-200:]}")
             print(f"⚠️ SOLUÇÃO: Reduzir tamanho do input ou aumentar max_tokens")
         elif finish_reason != 'stop':
             print(f"⚠️ WARNING: Unexpected finish_reason: {finish_reason}")
 
-        return content
+    def stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 8192,
+        model_override: Optional[str] = None,
+        **kwargs
+    ) -> Iterator[str]:
+        """
+        Generate completion from LLM yielding text deltas as they arrive
+
+        Args:
+            prompt: User prompt
+            system: System prompt (optional)
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            model_override: Override default model (optional)
+            **kwargs: Additional provider-specific parameters
+
+        Yields:
+            Text deltas (the concatenation equals complete()'s result)
+        """
+        model_to_use = model_override if model_override else self.model
+        parts: List[str] = []
+        finish_reason = None
+
+        if self.provider == "anthropic":
+            with self.client.messages.stream(
+                model=model_to_use,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=system if system else "",
+                messages=[{"role": "user", "content": prompt}],
+                **kwargs
+            ) as _stream:
+                for _text in _stream.text_stream:
+                    yield _text
+            return
+
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+        extra_params = {}
+        if self.provider == "deepseek" and "reasoner" in model_to_use.lower():
+            extra_params["extra_body"] = {"thinking": {"type": "enabled"}}
+
+        for _delta, _finish in self._iter_openai_stream(messages, model_to_use, temperature,
+                                                         max_tokens, extra_params, **kwargs):
+            if _finish:
+                finish_reason = _finish
+            if _delta:
+                parts.append(_delta)
+                yield _delta
+        self._report_finish(finish_reason, "".join(parts), model_to_use, max_tokens)
+
+    async def astream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 8192,
+        model_override: Optional[str] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Async generator over stream() — the blocking HTTP read runs in a thread
+
+        Closing the generator early (break / aclose) stops reading the
+        provider stream, which aborts the generation.
+        """
+        import asyncio
+        import threading
+
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        stop = threading.Event()
+        end = object()
+
+        def _produce():
+            try:
+                for _delta in self.stream(prompt, system, temperature, max_tokens, model_override, **kwargs):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, _delta)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, end)
+
+        producer = loop.run_in_executor(None, _produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is end:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            await producer
 
     def _complete_anthropic(
         self,
@@ -204,11 +326,12 @@ class LLMClient:
         system: Optional[str],
         temperature: float,
         max_tokens: int,
+        model_override: Optional[str] = None,
         **kwargs
     ) -> str:
         """Anthropic completion"""
         response = self.client.messages.create(
-            model=self.model,
+            model=model_override or self.model,
             max_tokens=max_tokens,
             temperature=temperature,
             system=system if system else "",
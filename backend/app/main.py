@@ -5,6 +5,8 @@ from fastapi import FastAPI, WebSocket, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import test_connection
+from app.database_async import close_async_db_pool
+from app.mcp_sessions import close_mcp_pool
 from app.routers import auth_router, users_router, projects_router, agents_router, tasks_router, documents_router
 from app.routers.chat import router as chat_router
 from app.routers.specification import router as specification_router
@@ -128,6 +130,9 @@ async def shutdown_event():
     print("🛑 Shutting down LangNet API")
     print("=" * 60)
 
+    await close_async_db_pool()
+    await close_mcp_pool()
+
 
 @app.get("/")
 def root():
@@ -166,6 +171,19 @@ async def cleanup_old_runs_on_startup():
         print(f"⚠️  Cleanup startup falhou (não-fatal): {exc}")
 
 
+@app.on_event("startup")
+async def mark_interrupted_ui_spec_generations():
+    """Geração de UI Spec não sobrevive a um reinício: sessões presas em 'generating'
+    viram 'failed'. Não bloqueia startup — silencioso em caso de erro."""
+    try:
+        from app.routers.ui_spec import mark_interrupted_generations
+        n = mark_interrupted_generations()
+        if n:
+            print(f"🧹 UI Spec: {n} geração(ões) interrompida(s) marcada(s) como 'failed'")
+    except Exception as exc:
+        print(f"⚠️  Limpeza de UI Spec em andamento falhou (não-fatal): {exc}")
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,348 @@
+"""
+Pool de sessões MCP (Model Context Protocol) + cache do catálogo de tools.
+
+Antes, cada teste/descoberta abria uma conexão nova — no caso stdio isso é um
+subprocesso inteiro (``npx -y ...``/``uvx ...``, segundos de cold start), e o
+handshake ``initialize`` era refeito a cada chamada. Aqui:
+
+  - sessões QUENTES por servidor, identificadas pela impressão digital da config
+    (transport + url + command + headers). Cada sessão vive numa task dona dos
+    contextos ``async with`` do cliente (anyio exige abrir/fechar na mesma task);
+  - despejo por ociosidade: LANGNET_MCP_IDLE_SECONDS (default 300);
+  - health check antes do reuso se a sessão ficou parada mais que
+    LANGNET_MCP_HEALTH_SECONDS (default 30): ``send_ping``; falhou → reconecta;
+  - cache de ``list_tools`` com TTL (LANGNET_MCP_CATALOG_TTL, default 600) e
+    invalidação VERSIONADA: ``invalidate()`` incrementa a versão da config e
+    qualquer entrada gravada com versão anterior deixa de valer;
+  - ``catalog_generation()``: contador global do processo, incrementado a cada
+    mudança de servidor/vínculo — os catálogos por projeto do router usam como
+    chave de validade.
+
+Sessões são do event loop que as criou (um pool por loop). Desligar o reuso:
+LANGNET_MCP_POOL=0 (cada chamada volta a abrir e fechar a sua conexão).
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+
+_IDLE_SECONDS = float(os.getenv("LANGNET_MCP_IDLE_SECONDS", "300"))
+_HEALTH_SECONDS = float(os.getenv("LANGNET_MCP_HEALTH_SECONDS", "30"))
+_CONNECT_TIMEOUT = float(os.getenv("LANGNET_MCP_CONNECT_TIMEOUT", "60"))
+_CATALOG_TTL = float(os.getenv("LANGNET_MCP_CATALOG_TTL", "600"))
+_POOL_ENABLED = os.getenv("LANGNET_MCP_POOL", "1").lower() not in ("0", "false", "no", "off")
+
+
+def server_fingerprint(transport: str, url: Optional[str], headers: Optional[dict],
+                       command: Optional[str] = None) -> str:
+    """Chave estável da config de conexão (segredos entram só no hash)."""
+    payload = json.dumps(
+        {"transport": (transport or "sse").lower(), "url": url or "",
+         "command": command or "", "headers": headers or {}},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _tool_dict(t) -> Dict[str, Any]:
+    return {
+        "name": t.name,
+        "description": t.description or "",
+        "input_schema": getattr(t, "inputSchema", None),
+    }
+
+
+@contextlib.asynccontextmanager
+async def open_client_session(transport: str, url: Optional[str], headers: Optional[dict],
+                              command: Optional[str] = None):
+    """Abre transporte + ClientSession já inicializada. Suporta sse/http (url) e
+    stdio (command)."""
+    from mcp import ClientSession
+    transport = (transport or "sse").lower()
+
+    @contextlib.asynccontextmanager
+    async def _session(read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            yield session
+
+    if transport == "stdio":
+        import shlex
+        from mcp import StdioServerParameters
+        from mcp.client.stdio import stdio_client
+        if not command:
+            raise ValueError("command é obrigatório para transporte stdio")
+        parts = shlex.split(command)
+        params = StdioServerParameters(command=parts[0], args=parts[1:], env=headers or None)
+        async with stdio_client(params) as (read, write):
+            async with _session(read, write) as session:
+                yield session
+        return
+    if not url:
+        raise ValueError("url do servidor MCP é obrigatória para sse/http")
+    if transport == "sse":
+        from mcp.client.sse import sse_client
+        async with sse_client(url, headers=headers or None) as (read, write):
+            async with _session(read, write) as session:
+                yield session
+    elif transport == "http":
+        from mcp.client.streamable_http import streamablehttp_client
+        async with streamablehttp_client(url, headers=headers or None) as (read, write, _):
+            async with _session(read, write) as session:
+                yield session
+    else:
+        raise ValueError(f"transporte '{transport}' não suportado (use sse, http ou stdio)")
+
+
+class _PooledSession:
+    """Uma sessão viva. A task ``_owner`` segura os contextos até ``close()``."""
+
+    def __init__(self, transport: str, url: Optional[str], headers: Optional[dict],
+                 command: Optional[str]):
+        self.config = (transport, url, headers, command)
+        self.session = None
+        self.error: Optional[BaseException] = None
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_checked = self.created_at
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, timeout: float) -> None:
+        self._task = asyncio.create_task(self._owner())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise TimeoutError(f"servidor MCP não respondeu ao initialize em {timeout:.0f}s")
+        if self.error is not None:
+            raise self.error
+
+    async def _owner(self) -> None:
+        try:
+            async with open_client_session(*self.config) as session:
+                self.session = session
+                self._ready.set()
+                await self._closing.wait()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            self.error = exc
+        finally:
+            self.session = None
+            self._ready.set()
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def close(self, timeout: float = 5.0) -> None:
+        self._closing.set()
+        task = self._task
+        if task is None or task.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+        except (asyncio.TimeoutError, Exception):  # noqa: BLE001
+            task.cancel()
+
+
+class MCPSessionPool:
+    """Sessões MCP reaproveitáveis + catálogo de tools cacheado (um pool por loop)."""
+
+    def __init__(self, idle_seconds: float = _IDLE_SECONDS, health_seconds: float = _HEALTH_SECONDS,
+                 connect_timeout: float = _CONNECT_TIMEOUT, catalog_ttl: float = _CATALOG_TTL,
+                 enabled: bool = _POOL_ENABLED):
+        self.idle_seconds = idle_seconds
+        self.health_seconds = health_seconds
+        self.connect_timeout = connect_timeout
+        self.catalog_ttl = catalog_ttl
+        self.enabled = enabled
+        self._sessions: Dict[str, _PooledSession] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._versions: Dict[str, int] = {}
+        self._catalog: Dict[str, Tuple[int, float, List[Dict[str, Any]]]] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self._counters = {"connects": 0, "reuses": 0, "reconnects": 0, "evictions": 0,
+                          "catalog_hits": 0, "catalog_misses": 0}
+
+    # ── sessões ─────────────────────────────────────────────────────────
+
+    async def _healthy(self, pooled: _PooledSession) -> bool:
+        if not pooled.alive:
+            return False
+        if time.monotonic() - pooled.last_checked < self.health_seconds:
+            return True
+        try:
+            await asyncio.wait_for(pooled.session.send_ping(), 10)
+            pooled.last_checked = time.monotonic()
+            return True
+        except Exception:  # noqa: BLE001
+            return False
+
+    async def _acquire(self, key: str, transport: str, url: Optional[str],
+                       headers: Optional[dict], command: Optional[str]) -> _PooledSession:
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            pooled = self._sessions.get(key)
+            if pooled is not None:
+                if await self._healthy(pooled):
+                    self._counters["reuses"] += 1
+                    pooled.last_used = time.monotonic()
+                    return pooled
+                self._counters["reconnects"] += 1
+                self._sessions.pop(key, None)
+                await pooled.close()
+            pooled = _PooledSession(transport, url, headers, command)
+            await pooled.start(self.connect_timeout)
+            self._counters["connects"] += 1
+            self._sessions[key] = pooled
+            self._ensure_reaper()
+            return pooled
+
+    async def _with_session(self, transport: str, url: Optional[str], headers: Optional[dict],
+                            command: Optional[str], fn):
+        """Executa ``fn(session)`` numa sessão do pool; se a sessão morreu no meio,
+        descarta e tenta uma vez numa nova."""
+        if not self.enabled:
+            async with open_client_session(transport, url, headers, command) as session:
+                return await fn(session)
+        key = server_fingerprint(transport, url, headers, command)
+        for attempt in (1, 2):
+            pooled = await self._acquire(key, transport, url, headers, command)
+            try:
+                result = await fn(pooled.session)
+                pooled.last_used = pooled.last_checked = time.monotonic()
+                return result
+            except Exception:
+                if pooled.alive or attempt == 2:
+                    raise
+                self._sessions.pop(key, None)
+                self._counters["reconnects"] += 1
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_loop())
+
+    async def _reap_loop(self) -> None:
+        interval = max(1.0, min(self.idle_seconds / 2, 60.0))
+        while self._sessions:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+    async def evict_idle(self) -> int:
+        """Fecha sessões paradas há mais de ``idle_seconds`` (ou já mortas)."""
+        now = time.monotonic()
+        stale = [k for k, p in self._sessions.items()
+                 if not p.alive or now - p.last_used > self.idle_seconds]
+        for key in stale:
+            pooled = self._sessions.pop(key, None)
+            if pooled is not None:
+                self._counters["evictions"] += 1
+                await pooled.close()
+        return len(stale)
+
+    # ── API ─────────────────────────────────────────────────────────────
+
+    async def list_tools(self, transport: str, url: Optional[str], headers: Optional[dict],
+                         command: Optional[str] = None, force: bool = False) -> List[Dict[str, Any]]:
+        """Tools do servidor, do cache se a entrada é da versão atual e está no TTL."""
+        key = server_fingerprint(transport, url, headers, command)
+        version = self._versions.get(key, 0)
+        entry = self._catalog.get(key)
+        if (not force and entry is not None and entry[0] == version
+                and time.monotonic() - entry[1] < self.catalog_ttl):
+            self._counters["catalog_hits"] += 1
+            return [dict(t) for t in entry[2]]
+        self._counters["catalog_misses"] += 1
+
+        async def _list(session):
+            res = await session.list_tools()
+            return [_tool_dict(t) for t in res.tools]
+
+        tools = await self._with_session(transport, url, headers, command, _list)
+        if self._versions.get(key, 0) == version:
+            self._catalog[key] = (version, time.monotonic(), tools)
+        return [dict(t) for t in tools]
+
+    async def call_tool(self, transport: str, url: Optional[str], headers: Optional[dict],
+                        tool: str, args: Optional[dict] = None, command: Optional[str] = None):
+        """Chama uma tool numa sessão reaproveitada. Devolve o CallToolResult do cliente."""
+        async def _call(session):
+            return await session.call_tool(tool, args or {})
+
+        return await self._with_session(transport, url, headers, command, _call)
+
+    async def invalidate(self, transport: str, url: Optional[str], headers: Optional[dict],
+                         command: Optional[str] = None, close: bool = False) -> None:
+        """Nova versão do catálogo da config; ``close=True`` também derruba a sessão."""
+        key = server_fingerprint(transport, url, headers, command)
+        self._versions[key] = self._versions.get(key, 0) + 1
+        self._catalog.pop(key, None)
+        bump_catalog_generation()
+        if close:
+            pooled = self._sessions.pop(key, None)
+            if pooled is not None:
+                await pooled.close()
+
+    async def close(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+        sessions, self._sessions = list(self._sessions.values()), {}
+        for pooled in sessions:
+            await pooled.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "open_sessions": sum(1 for p in self._sessions.values() if p.alive),
+            "cached_catalogs": len(self._catalog),
+            "catalog_generation": catalog_generation(),
+            "idle_seconds": self.idle_seconds,
+            "enabled": self.enabled,
+        }
+
+
+# ── instâncias ──────────────────────────────────────────────────────────
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MCPSessionPool]" = weakref.WeakKeyDictionary()
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def get_mcp_pool() -> MCPSessionPool:
+    """Pool do event loop atual (sessões anyio não atravessam loops)."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = MCPSessionPool()
+        _pools[loop] = pool
+    return pool
+
+
+async def close_mcp_pool() -> None:
+    """Fecha as sessões do loop atual (shutdown)."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+
+
+def catalog_generation() -> int:
+    return _generation
+
+
+def bump_catalog_generation() -> int:
+    """Invalida todo catálogo derivado (por projeto) gravado com geração anterior."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        return _generation
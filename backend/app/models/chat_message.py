@@ -76,3 +76,4 @@ class ChatMessageListResponse(BaseModel):
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None
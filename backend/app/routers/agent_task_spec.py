@@ -4,8 +4,8 @@ Agent Task Specification Router
 Endpoints para geração e refinamento de especificação de agentes/tarefas
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Response
+from typing import List, Optional
 import asyncio
 import uuid
 from datetime import datetime
@@ -34,6 +34,10 @@ from app.database import (
     get_db_connection,
     get_db_cursor
 )
+from app.database_async import (
+    get_agent_task_spec_versions_async,
+    get_chat_page_async
+)
 from app.llm import get_llm_response_async
 from app.dependencies import get_current_user
 from prompts.agent_task_spec_prompt import build_agent_task_spec_prompt
@@ -331,7 +335,7 @@ async def get_version_history(
 ):
     """Obtém histórico de versões"""
 
-    versions = get_agent_task_spec_versions(session_id)
+    versions = await get_agent_task_spec_versions_async(session_id)
 
     return [
         AgentTaskSpecVersionResponse(
@@ -348,11 +352,22 @@ async def get_version_history(
 @router.get("/{session_id}/chat-history", response_model=List[ChatMessageResponse])
 async def get_chat_history(
     session_id: str,
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Obtém histórico de chat"""
+    """Obtém histórico de chat (mais recentes primeiro; página anterior via X-Next-Cursor)"""
 
-    messages = get_agent_task_spec_chat_messages(session_id, limit=100)
+    try:
+        page = await get_chat_page_async(
+            "agent_task_spec_chat_messages", session_id, limit, cursor, newest_first=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    messages = page["messages"]
 
     return [
         ChatMessageResponse(
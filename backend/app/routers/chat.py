@@ -24,9 +24,16 @@ from app.database import (
     get_db_connection,
     get_previous_refinements
 )
+from app.database_async import (
+    get_chat_messages_async,
+    get_chat_messages_page_async,
+    get_chat_message_count_async,
+    get_execution_session_status_async
+)
 from app.dependencies import get_current_user
 from app.parsers import DocumentParser
-from utils.pdf_processor import process_pdf_for_agent, chunk_text
+from utils.chunking import DEFAULT_MAX_TOKENS, chunk_document
+from utils.pdf_processor import process_pdf_for_agent
 from agents.langnetagents import execute_document_analysis_workflow
 
 router = APIRouter(prefix="/chat", tags=["chat"])
@@ -66,23 +73,43 @@ async def list_messages(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     message_type: Optional[str] = Query(None),
-    include_deleted: bool = Query(False)
+    include_deleted: bool = Query(False),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page")
 ):
-    """List messages for a session with pagination"""
+    """List messages for a session with pagination
+
+    Pages are read by cursor (keyset on timestamp, id): start without `cursor`
+    and pass the returned `next_cursor` to get the next page. `page` > 1
+    without a cursor keeps the old OFFSET behaviour.
+    """
     try:
-        offset = (page - 1) * page_size
-        messages = get_chat_messages(
-            session_id=session_id,
-            limit=page_size + 1,
-            offset=offset,
-            include_deleted=include_deleted,
-            message_type=message_type
-        )
+        next_cursor = None
+        if cursor or page == 1:
+            try:
+                result = await get_chat_messages_page_async(
+                    session_id=session_id,
+                    limit=page_size,
+                    cursor=cursor,
+                    include_deleted=include_deleted,
+                    message_type=message_type
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            messages, has_more, next_cursor = result["messages"], result["has_more"], result["next_cursor"]
+        else:
+            offset = (page - 1) * page_size
+            messages = await get_chat_messages_async(
+                session_id=session_id,
+                limit=page_size + 1,
+                offset=offset,
+                include_deleted=include_deleted,
+                message_type=message_type
+            )
+            has_more = len(messages) > page_size
+            if has_more:
+                messages = messages[:-1]
         # print(f"📨 Found {len(messages)} messages for session {session_id}")  # COMMENTED TO REDUCE LOG SPAM
-        has_more = len(messages) > page_size
-        if has_more:
-            messages = messages[:-1]
-        total = get_chat_message_count(session_id, include_deleted)
+        total = await get_chat_message_count_async(session_id, include_deleted)
 
         # Convert messages to response objects one by one with error handling
         message_responses = []
@@ -100,8 +127,11 @@ async def list_messages(
             total=total,
             page=page,
             page_size=page_size,
-            has_more=has_more
+            has_more=has_more,
+            next_cursor=next_cursor
         )
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"❌ Error in list_messages: {e}")
@@ -182,23 +212,7 @@ async def get_session_status(
         Session status, requirements document, and metadata
     """
     try:
-        with get_db_connection() as db:
-            cursor = db.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT
-                    id,
-                    session_name,
-                    project_id,
-                    user_id,
-                    requirements_document,
-                    status,
-                    started_at,
-                    finished_at
-                FROM execution_sessions
-                WHERE id = %s
-            """, (session_id,))
-            session = cursor.fetchone()
-            cursor.close()
+        session = await get_execution_session_status_async(session_id)
 
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -297,10 +311,9 @@ async def execute_refinement_workflow(
                 try:
                     result = process_pdf_for_agent(
                         doc_path,
-                        max_pages=50,
-                        chunk_size=4000,
-                        chunk_overlap=400,
-                        max_chunks=None
+                        max_tokens=DEFAULT_MAX_TOKENS,
+                        max_chunks=None,
+                        keep_raw_text=False
                     )
                     doc_text = "\n\n---CHUNK---\n\n".join(result['formatted_chunks'])
                     word_count = result['stats']['raw_text_words']
@@ -324,7 +337,7 @@ async def execute_refinement_workflow(
 
                 # Apply chunking if text is long
                 if len(doc_text) > 30000:
-                    chunks = chunk_text(doc_text, max_chunk_size=4000, overlap=400)
+                    chunks = [c.text for c in chunk_document(doc_text, max_tokens=DEFAULT_MAX_TOKENS)]
                     doc_text = "\n\n---CHUNK---\n\n".join(
                         [f"[CHUNK {i+1}]\n{c}" for i, c in enumerate(chunks)]
                     )
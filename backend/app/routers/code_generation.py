@@ -26,7 +26,7 @@ from app.database import (
     get_code_generation_session,
     get_code_generation_version,
     get_code_generation_versions,
-    get_code_generation_chat_messages,
+    get_chat_page,
     get_agents_yaml_session,
     get_tasks_yaml_session,
     get_task_execution_flow_session,
@@ -275,6 +275,7 @@ async def generate_code(
             _cur.execute(
                 "SELECT id, ui_spec_json FROM ui_spec_sessions "
                 "WHERE project_id=%s AND ui_spec_json IS NOT NULL "
+                "AND status NOT IN ('generating', 'failed') "
                 "ORDER BY created_at DESC LIMIT 1",
                 (project_id,),
             )
@@ -369,6 +370,8 @@ async def generate_code(
             "total_files": len(files),
         }
     )
+    # node_modules do frontend gerado começa a ser montado já (antes do primeiro run)
+    code_runner.prewarm_frontend_cache(files)
     return {
         "session_id": session_id,
         "status": "completed",
@@ -443,6 +446,7 @@ def update_files(
             "total_files": len(request.files),
         }
     )
+    code_runner.prewarm_frontend_cache(request.files)
     return {"status": "ok", "version": new_version, "validation_warnings": warnings}
 
 
@@ -563,6 +567,7 @@ REGRAS:
             "total_files": len(new_files),
         }
     )
+    code_runner.prewarm_frontend_cache(new_files)
 
     save_code_generation_chat_message(
         {
@@ -603,9 +608,22 @@ def get_version(session_id: str, version: int, current_user: dict = Depends(get_
 
 
 @router.get("/{session_id}/chat-history")
-def chat_history(session_id: str, current_user: dict = Depends(get_current_user)):
-    msgs = get_code_generation_chat_messages(session_id)
-    return {"messages": msgs}
+def chat_history(
+    session_id: str,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """Histórico em ordem cronológica; próxima página via `next_cursor`."""
+    try:
+        page = get_chat_page(
+            "code_generation_chat_messages", session_id, limit, cursor,
+            columns="id, sender_type, message_text, message_data, message_type, timestamp",
+            json_field="message_data",
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {"messages": page["messages"], "has_more": page["has_more"], "next_cursor": page["next_cursor"]}
 
 
 # ════════════════════════════════════════════════════════════
@@ -633,7 +651,7 @@ def run_status(run_id: str, current_user: dict = Depends(get_current_user)):
     run = code_runner.get_run(run_id)
     if not run:
         raise HTTPException(404, "Run não encontrado")
-    return {**run.to_public(), "stdout_tail": run.stdout_lines[-300:]}
+    return {**run.to_public(), "stdout_tail": run.tail(300)}
 
 
 @router.post("/run/{run_id}/stop")
@@ -666,9 +684,11 @@ def cleanup_runs_endpoint(
 
 
 @router.websocket("/run/{run_id}/ws")
-async def run_ws(websocket: WebSocket, run_id: str, token: str = ""):
-    """Stream em tempo real do stdout do run.
-    Auth via query param ?token=... (não dá pra mandar header em WS browser)."""
+async def run_ws(websocket: WebSocket, run_id: str, token: str = "", since: Optional[int] = None):
+    """Stream em tempo real do stdout do run, em frames
+    ``{"type": "lines", "seq": N, "data": [...]}``.
+    Auth via query param ?token=... (não dá pra mandar header em WS browser).
+    ?since=<seq> retoma após reconexão (seq da próxima linha esperada)."""
     # Auth via query token
     try:
         from app.utils import decode_access_token
@@ -686,12 +706,9 @@ async def run_ws(websocket: WebSocket, run_id: str, token: str = ""):
         return
 
     await websocket.accept()
-    # Envia status atual + tail recente
+    # Envia status atual; o tail recente (ou o que faltou desde ?since=) vem em lote
     await websocket.send_json({"type": "status", "data": run.to_public()})
-    for line in run.stdout_lines[-500:]:
-        await websocket.send_json({"type": "line", "data": line})
-
-    q = code_runner.subscribe(run)
+    q = code_runner.subscribe(run, since=since)
     try:
         while True:
             msg = await q.get()
@@ -17,7 +17,8 @@ from app.parsers import DocumentParser
 from app.llm import get_llm_client
 from app.config import settings
 from agents.langnetagents import execute_document_analysis_workflow
-from api.langnetwebsocket import manager
+from api.langnetwebsocket import manager, LLMStreamFanout
+from agents.langnetstream import register_stream_sink, unregister_stream_sink
 from api.langnetapi import EXECUTIONS
 
 router = APIRouter(prefix="/documents", tags=["documents"])
@@ -58,7 +59,8 @@ async def execute_analysis_in_background(
         # Extract content from ALL documents WITH CHUNKING
         from app.parsers import DocumentParser
         from pathlib import Path
-        from utils.pdf_processor import process_pdf_for_agent, chunk_text
+        from utils.chunking import DEFAULT_MAX_TOKENS, chunk_document
+        from utils.pdf_processor import process_pdf_for_agent
 
         all_documents_info = []
         all_documents_content = ""
@@ -86,10 +88,9 @@ async def execute_analysis_in_background(
                     print(f"[PHASE 1] Using process_pdf_for_agent with chunking...")
                     result = process_pdf_for_agent(
                         doc_path,
-                        max_pages=50,
-                        chunk_size=4000,      # ~2500 words per chunk
-                        chunk_overlap=400,     # 10% overlap
-                        max_chunks=None        # Process all
+                        max_tokens=DEFAULT_MAX_TOKENS,  # blocos inteiros por orçamento de tokens
+                        max_chunks=None,       # Process all
+                        keep_raw_text=False
                     )
                     doc_text = "\n\n---CHUNK---\n\n".join(result['formatted_chunks'])
                     word_count = result['stats']['raw_text_words']
@@ -123,7 +124,7 @@ async def execute_analysis_in_background(
                 # Apply chunking if text is long (>30k chars = ~20k words)
                 if len(doc_text) > 30000:
                     print(f"[PHASE 1] Document is long ({len(doc_text)} chars), applying chunking...")
-                    chunks = chunk_text(doc_text, max_chunk_size=4000, overlap=400)
+                    chunks = [c.text for c in chunk_document(doc_text, max_tokens=DEFAULT_MAX_TOKENS)]
                     doc_text = "\n\n---CHUNK---\n\n".join(
                         [f"[CHUNK {i+1}]\n{c}" for i, c in enumerate(chunks)]
                     )
@@ -182,23 +183,32 @@ async def execute_analysis_in_background(
         print(f"[PHASE 1]   - project_description: {(instructions[:500] if instructions else 'Análise de documentos para geração de requisitos')[:100]}...")
         print(f"{'='*80}\n")
 
+        # Tokens do LLM vão ao vivo para o WebSocket da execução (em lotes)
+        stream_fanout = LLMStreamFanout(execution_id, asyncio.get_running_loop()).start()
+        register_stream_sink(execution_id, stream_fanout)
+
         # Execute LangNet workflow in thread pool (don't block async event loop)
         # This allows the workflow to run for 2-5 minutes without blocking
-        result_state = await asyncio.to_thread(
-            execute_document_analysis_workflow,
-            project_id=project_id,
-            document_id=primary_doc_id,
-            document_path=f"Multiple documents: {', '.join([d['filename'] for d in all_documents_info])}",
-            additional_instructions=instructions,
-            enable_web_research=use_web_research,
-            document_content=all_documents_content,  # Pass ALL documents content
-            document_type="multiple",
-            # Metadados do projeto para contexto dos agentes
-            project_name=f"Análise de Requisitos - Projeto {project_id}",
-            project_description=instructions[:500] if instructions else "Análise de documentos para geração de requisitos",
-            project_domain="",  # Será identificado pelos agentes a partir dos documentos
-            use_deepseek=False  # Regra do projeto: nunca DeepSeek cloud — usa LLM_PROVIDER (lmstudio)
-        )
+        try:
+            result_state = await asyncio.to_thread(
+                execute_document_analysis_workflow,
+                project_id=project_id,
+                document_id=primary_doc_id,
+                document_path=f"Multiple documents: {', '.join([d['filename'] for d in all_documents_info])}",
+                additional_instructions=instructions,
+                enable_web_research=use_web_research,
+                document_content=all_documents_content,  # Pass ALL documents content
+                document_type="multiple",
+                # Metadados do projeto para contexto dos agentes
+                project_name=f"Análise de Requisitos - Projeto {project_id}",
+                project_description=instructions[:500] if instructions else "Análise de documentos para geração de requisitos",
+                project_domain="",  # Será identificado pelos agentes a partir dos documentos
+                use_deepseek=False,  # Regra do projeto: nunca DeepSeek cloud — usa LLM_PROVIDER (lmstudio)
+                stream_channel=execution_id
+            )
+        finally:
+            unregister_stream_sink(execution_id)
+            await stream_fanout.aclose()
 
         # Extract requirements document
         print(f"\n{'='*80}")
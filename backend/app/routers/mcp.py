@@ -7,8 +7,13 @@ retornados em claro. Um servidor só fica 'ativo' após um teste bem-sucedido.
 
 Transportes suportados na Fase 1: sse (recomendado) e http (streamable). stdio fica
 para uma fase seguinte.
+
+Conexões passam pelo pool de sessões (app/mcp_sessions.py): sessões quentes por
+servidor e catálogo de tools cacheado com invalidação versionada.
 """
 import json
+import os
+import time
 import uuid
 from typing import Any, Dict, List, Optional
 
@@ -16,51 +21,29 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from app.database import get_db_connection
+from app.mcp_sessions import bump_catalog_generation, catalog_generation, get_mcp_pool
 from app.routers.auth import get_current_user
 
 router = APIRouter(prefix="/mcp", tags=["mcp"])
 
 
-# ── Descoberta via cliente MCP ──
+# ── Descoberta via cliente MCP (sessões do pool, catálogo cacheado) ──
 async def _discover_tools(transport: str, url: str, headers: Optional[dict],
-                          command: Optional[str] = None) -> List[Dict[str, Any]]:
-    """Conecta ao servidor MCP e lista suas ferramentas. Suporta sse/http (url) e
-    stdio (command). Levanta em caso de falha."""
-    from mcp import ClientSession
-    transport = (transport or "sse").lower()
-
-    async def _list(read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            res = await session.list_tools()
-            return [{
-                "name": t.name,
-                "description": t.description or "",
-                "input_schema": getattr(t, "inputSchema", None),
-            } for t in res.tools]
-
-    if transport == "stdio":
-        import shlex
-        from mcp import StdioServerParameters
-        from mcp.client.stdio import stdio_client
-        if not command:
-            raise ValueError("command é obrigatório para transporte stdio")
-        parts = shlex.split(command)
-        params = StdioServerParameters(command=parts[0], args=parts[1:], env=headers or None)
-        async with stdio_client(params) as (read, write):
-            return await _list(read, write)
-    if not url:
-        raise ValueError("url do servidor MCP é obrigatória para sse/http")
-    if transport == "sse":
-        from mcp.client.sse import sse_client
-        async with sse_client(url, headers=headers or None) as (read, write):
-            return await _list(read, write)
-    elif transport == "http":
-        from mcp.client.streamable_http import streamablehttp_client
-        async with streamablehttp_client(url, headers=headers or None) as (read, write, _):
-            return await _list(read, write)
-    else:
-        raise ValueError(f"transporte '{transport}' não suportado (use sse, http ou stdio)")
+                          command: Optional[str] = None, force: bool = False) -> List[Dict[str, Any]]:
+    """Lista as ferramentas do servidor MCP reaproveitando a sessão quente do pool.
+    Suporta sse/http (url) e stdio (command). ``force`` ignora o catálogo cacheado.
+    Levanta em caso de falha."""
+    return await get_mcp_pool().list_tools(transport, url, headers, command, force=force)
+
+
+def _row_headers(row: dict) -> dict:
+    headers = {}
+    if row.get("credentials_json"):
+        try:
+            headers = json.loads(row["credentials_json"])
+        except Exception:
+            headers = {}
+    return headers
 
 
 def _row_public(row: dict) -> dict:
@@ -108,7 +91,7 @@ class TestIn(BaseModel):
 @router.post("/test")
 async def test_connection(req: TestIn, current_user: dict = Depends(get_current_user)):
     try:
-        tools = await _discover_tools(req.transport, req.url or "", req.credentials, req.command)
+        tools = await _discover_tools(req.transport, req.url or "", req.credentials, req.command, force=True)
         return {"ok": True, "tools_count": len(tools),
                 "tools": [{"name": t["name"], "description": t["description"]} for t in tools],
                 "message": f"Conectado — {len(tools)} ferramenta(s) descoberta(s)."}
@@ -171,14 +154,10 @@ async def test_server(server_id: str, current_user: dict = Depends(get_current_u
         cur.close()
     if not row:
         raise HTTPException(404, "Servidor MCP não encontrado")
-    headers = {}
-    if row.get("credentials_json"):
-        try:
-            headers = json.loads(row["credentials_json"])
-        except Exception:
-            headers = {}
+    headers = _row_headers(row)
     try:
-        tools = await _discover_tools(row["transport"], row.get("url") or "", headers, row.get("command"))
+        tools = await _discover_tools(row["transport"], row.get("url") or "", headers, row.get("command"),
+                                      force=True)
         with get_db_connection() as conn:
             cur = conn.cursor()
             cur.execute(
@@ -186,6 +165,7 @@ async def test_server(server_id: str, current_user: dict = Depends(get_current_u
                 (json.dumps(tools, ensure_ascii=False), server_id),
             )
             conn.commit(); cur.close()
+        bump_catalog_generation()
         return {"ok": True, "status": "ativo", "tools_count": len(tools),
                 "tools": [{"name": t["name"], "description": t["description"]} for t in tools],
                 "message": f"Ativo — {len(tools)} ferramenta(s) descoberta(s)."}
@@ -195,19 +175,27 @@ async def test_server(server_id: str, current_user: dict = Depends(get_current_u
             cur.execute("UPDATE mcp_servers SET status='erro', last_error=%s WHERE id=%s",
                         (str(exc)[:500], server_id))
             conn.commit(); cur.close()
+        await get_mcp_pool().invalidate(row["transport"], row.get("url") or "", headers, row.get("command"),
+                                        close=True)
         return {"ok": False, "status": "erro", "error": str(exc)}
 
 
 # ── DELETE /mcp/servers/{id} ──
 @router.delete("/servers/{server_id}")
-def delete_server(server_id: str, current_user: dict = Depends(get_current_user)):
+async def delete_server(server_id: str, current_user: dict = Depends(get_current_user)):
     with get_db_connection() as conn:
-        cur = conn.cursor()
+        cur = conn.cursor(dictionary=True)
+        cur.execute("SELECT * FROM mcp_servers WHERE id=%s", (server_id,))
+        row = cur.fetchone()
         cur.execute("DELETE FROM mcp_servers WHERE id=%s", (server_id,))
         affected = cur.rowcount
         conn.commit(); cur.close()
     if not affected:
         raise HTTPException(404, "Servidor MCP não encontrado")
+    if row:
+        # Derruba a sessão quente (subprocesso stdio) e invalida catálogos derivados.
+        await get_mcp_pool().invalidate(row["transport"], row.get("url") or "", _row_headers(row),
+                                        row.get("command"), close=True)
     return {"status": "removido"}
 
 
@@ -293,6 +281,7 @@ def enable_server(project_id: str, server_id: str, current_user: dict = Depends(
             "INSERT INTO mcp_project_servers (project_id, mcp_server_id, enabled) VALUES (%s,%s,1) "
             "ON DUPLICATE KEY UPDATE enabled=1", (project_id, server_id))
         conn.commit(); cur.close()
+    bump_catalog_generation()
     return {"status": "habilitado"}
 
 
@@ -303,19 +292,37 @@ def disable_server(project_id: str, server_id: str, current_user: dict = Depends
         cur.execute("UPDATE mcp_project_servers SET enabled=0 WHERE project_id=%s AND mcp_server_id=%s",
                     (project_id, server_id))
         conn.commit(); cur.close()
+    bump_catalog_generation()
     return {"status": "desabilitado"}
 
 
-@router.get("/project/{project_id}/tools")
-def project_tools(project_id: str, current_user: dict = Depends(get_current_user)):
-    """Catálogo de tools MCP disponíveis ao projeto (dos servidores ativos habilitados)."""
+# Catálogo por projeto: project_id -> (geração, instante, [(tool, tokens)]). Vale enquanto a
+# geração global não mudar (teste/remoção de servidor, habilitar/desabilitar) e dentro do TTL
+# — o TTL cobre alterações feitas por outro processo direto no banco.
+_PROJECT_TOOLS_TTL = float(os.getenv("LANGNET_MCP_PROJECT_CACHE_TTL", "60"))
+_project_tools_cache: Dict[str, tuple] = {}
+
+
+def _project_tool_catalog(project_id: str):
+    gen = catalog_generation()
+    hit = _project_tools_cache.get(project_id)
+    if hit and hit[0] == gen and time.monotonic() - hit[1] < _PROJECT_TOOLS_TTL:
+        return hit[2]
     out = []
     for s in _project_enabled_servers(project_id):
         caps = json.loads(s["capabilities_json"]) if s.get("capabilities_json") else []
         for t in caps:
-            out.append({"mcp_server_id": s["id"], "server_name": s["name"],
-                        "tool_name": t.get("name"), "description": t.get("description", "")})
-    return {"tools": out}
+            tool = {"mcp_server_id": s["id"], "server_name": s["name"],
+                    "tool_name": t.get("name"), "description": t.get("description", "")}
+            out.append((tool, _tokens((tool["tool_name"] or "") + " " + (tool["description"] or ""))))
+    _project_tools_cache[project_id] = (gen, time.monotonic(), out)
+    return out
+
+
+@router.get("/project/{project_id}/tools")
+def project_tools(project_id: str, current_user: dict = Depends(get_current_user)):
+    """Catálogo de tools MCP disponíveis ao projeto (dos servidores ativos habilitados)."""
+    return {"tools": [dict(t) for t, _ in _project_tool_catalog(project_id)]}
 
 
 @router.get("/project/{project_id}/agents")
@@ -368,12 +375,11 @@ def suggest_agent_tools(project_id: str, current_user: dict = Depends(get_curren
     """Sugere (heurística por sobreposição de tokens) quais tools MCP combinam com cada agente,
     casando role+goal do agente com nome+descrição da tool. Não persiste — retorna sugestões."""
     agents = _project_agents(project_id)
-    tools = project_tools(project_id, current_user)["tools"]
+    tools = _project_tool_catalog(project_id)
     suggestions = []
     for ag in agents:
         atok = _tokens(ag["role"] + " " + ag["goal"] + " " + ag["agent_id"])
-        for t in tools:
-            ttok = _tokens((t["tool_name"] or "") + " " + (t["description"] or ""))
+        for t, ttok in tools:
             shared = atok & ttok
             if len(shared) >= 1:
                 suggestions.append({
@@ -19,6 +19,13 @@ from app.database import (
     get_db_connection,
 )
 from app.routers.auth import get_current_user
+from app.versioning import (
+    PETRI_NET_VERSIONS,
+    get_version_row,
+    list_versions,
+    load_version,
+    save_version,
+)
 
 router = APIRouter(prefix="/petri-net", tags=["petri-net"])
 
@@ -41,6 +48,13 @@ class ApprovePetriNetRequest(BaseModel):
     version: Optional[int] = None
 
 
+class AnalyzePetriNetRequest(BaseModel):
+    # Rede ainda não salva no editor; ausente → usa a de project_data
+    petri_net: Optional[dict] = None
+    max_states: int = 5000
+    time_limit: float = 5.0
+
+
 # ═══════════════════════════════════════════════════════════
 # VERSION HISTORY (camada ADITIVA — não altera project_data)
 # ═══════════════════════════════════════════════════════════
@@ -97,32 +111,28 @@ def _save_petri_version(
                 (project_id,),
             )
             new_version = int(cursor.fetchone()[0])
-            cursor.execute(
-                "INSERT INTO petri_net_version_history "
-                "(project_id, version, petri_net_json, created_by, change_type, "
-                " change_description, doc_size, "
-                " agents_yaml_session_id, agents_yaml_version, "
-                " tasks_yaml_session_id, tasks_yaml_version, "
-                " task_execution_flow_session_id, task_execution_flow_version) "
-                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
-                (
-                    project_id,
-                    new_version,
-                    petri_json,
-                    user_id,
-                    change_type,
-                    change_description,
-                    doc_size,
-                    s.get("agents_yaml_session_id"),
-                    s.get("agents_yaml_version"),
-                    s.get("tasks_yaml_session_id"),
-                    s.get("tasks_yaml_version"),
-                    s.get("task_execution_flow_session_id"),
-                    s.get("task_execution_flow_version"),
-                ),
+            cursor.close()
+            # keyframe ou delta contra a versão anterior (ver app/versioning.py)
+            save_version(
+                PETRI_NET_VERSIONS,
+                conn,
+                project_id,
+                new_version,
+                {"petri_net_json": petri_json},
+                extra={
+                    "created_by": user_id,
+                    "change_type": change_type,
+                    "change_description": change_description,
+                    "doc_size": doc_size,
+                    "agents_yaml_session_id": s.get("agents_yaml_session_id"),
+                    "agents_yaml_version": s.get("agents_yaml_version"),
+                    "tasks_yaml_session_id": s.get("tasks_yaml_session_id"),
+                    "tasks_yaml_version": s.get("tasks_yaml_version"),
+                    "task_execution_flow_session_id": s.get("task_execution_flow_session_id"),
+                    "task_execution_flow_version": s.get("task_execution_flow_version"),
+                },
             )
             conn.commit()
-            cursor.close()
         return new_version
     except Exception as exc:  # noqa: BLE001 — versionamento nunca quebra o fluxo principal
         print(f"⚠️  Falha ao salvar versão da Rede de Petri (ignorada): {exc}")
@@ -349,6 +359,29 @@ def review_petri_net_ep(
     return {"suggestions": suggestions}
 
 
+@router.post("/{project_id}/analyze")
+def analyze_petri_net_ep(
+    project_id: str,
+    request: AnalyzePetriNetRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """Análise estrutural determinística (sem LLM): avisos de topologia + árvore de
+    cobertura limitada (deadlocks, limitação por lugar, transições nunca habilitadas).
+    Complementa o /review — pode rodar a cada edição no editor."""
+    from agents.langnetpetri import analyze_petri_net, behavior_warnings
+
+    net = request.petri_net if request.petri_net is not None else get_project_data(project_id)
+    if not isinstance(net, dict) or not net.get("lugares"):
+        raise HTTPException(status_code=404, detail="Não há Rede de Petri para analisar")
+    analysis = analyze_petri_net(
+        net,
+        max_states=max(1, min(request.max_states, 200_000)),
+        time_limit=max(0.1, min(request.time_limit, 60.0)),
+    )
+    analysis["behavior_warnings"] = behavior_warnings(analysis)
+    return analysis
+
+
 @router.put("/{project_id}")
 def update_petri_net(
     project_id: str,
@@ -384,17 +417,7 @@ def list_petri_versions(
     current_user: dict = Depends(get_current_user),
 ):
     """Lista as versões (snapshots) da Rede de Petri para o projeto, mais recentes primeiro."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(
-            "SELECT version, created_at, change_description, change_type, doc_size, "
-            "       is_approved_version "
-            "FROM petri_net_version_history WHERE project_id = %s "
-            "ORDER BY version DESC",
-            (project_id,),
-        )
-        rows = cursor.fetchall()
-        cursor.close()
+    rows = list_versions(PETRI_NET_VERSIONS, project_id)
     versions = [
         {
             "version": r["version"],
@@ -416,16 +439,7 @@ def get_petri_version(
     current_user: dict = Depends(get_current_user),
 ):
     """Retorna o snapshot completo de uma versão específica (petri_net parseado)."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(
-            "SELECT version, petri_net_json, change_type, change_description, created_at, "
-            "       is_approved_version "
-            "FROM petri_net_version_history WHERE project_id = %s AND version = %s LIMIT 1",
-            (project_id, version),
-        )
-        row = cursor.fetchone()
-        cursor.close()
+    row = get_version_row(PETRI_NET_VERSIONS, project_id, version)
     if not row:
         raise HTTPException(status_code=404, detail="Versão não encontrada")
     try:
@@ -450,15 +464,7 @@ def restore_petri_version(
     current_user: dict = Depends(get_current_user),
 ):
     """Restaura uma versão passada para a rede viva (project_data) e registra novo snapshot."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(
-            "SELECT petri_net_json FROM petri_net_version_history "
-            "WHERE project_id = %s AND version = %s LIMIT 1",
-            (project_id, version),
-        )
-        row = cursor.fetchone()
-        cursor.close()
+    row = load_version(PETRI_NET_VERSIONS, project_id, version)
     if not row:
         raise HTTPException(status_code=404, detail="Versão não encontrada")
     try:
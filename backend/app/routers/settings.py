@@ -19,7 +19,7 @@ from typing import Any, Dict, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
-from app.database import get_db_connection
+from app.database import bulk_insert, get_db_connection
 from app.routers.auth import get_current_user
 
 router = APIRouter(prefix="/settings", tags=["settings"])
@@ -130,25 +130,26 @@ class UpdateSettingsRequest(BaseModel):
 def update_settings(req: UpdateSettingsRequest, current_user: dict = Depends(get_current_user)):
     """Grava as configurações. Segredos só são gravados quando vem um valor não-vazio
     (campo vazio = manter o atual). Aplica em os.environ ao final."""
-    written = 0
+    rows = []
+    for section, kv in (req.settings or {}).items():
+        if section not in _SCHEMA:
+            continue
+        for key, value in (kv or {}).items():
+            if key not in _FIELD or key.endswith("_is_set"):
+                continue
+            f = _FIELD[key]
+            if f["secret"] and (value is None or str(value) == ""):
+                continue  # não sobrescreve segredo com vazio
+            rows.append((f["section"], key, str(value), 1 if f["secret"] else 0, current_user.get("id")))
+    written = len(rows)
     with get_db_connection() as conn:
         cur = conn.cursor()
-        for section, kv in (req.settings or {}).items():
-            if section not in _SCHEMA:
-                continue
-            for key, value in (kv or {}).items():
-                if key not in _FIELD or key.endswith("_is_set"):
-                    continue
-                f = _FIELD[key]
-                if f["secret"] and (value is None or str(value) == ""):
-                    continue  # não sobrescreve segredo com vazio
-                cur.execute(
-                    "INSERT INTO system_settings (section, setting_key, setting_value, is_secret, updated_by) "
-                    "VALUES (%s, %s, %s, %s, %s) "
-                    "ON DUPLICATE KEY UPDATE setting_value=VALUES(setting_value), updated_by=VALUES(updated_by)",
-                    (f["section"], key, str(value), 1 if f["secret"] else 0, current_user.get("id")),
-                )
-                written += 1
+        bulk_insert(
+            cur, "system_settings",
+            ["section", "setting_key", "setting_value", "is_secret", "updated_by"],
+            rows,
+            update_columns=["setting_value", "updated_by"],
+        )
         conn.commit()
         cur.close()
     applied = apply_settings_to_env()
@@ -15,6 +15,7 @@ from app.database import (
     save_tasks_yaml_chat_message, get_tasks_yaml_chat_messages,
     get_agent_task_spec_session  # Para buscar documento MD base
 )
+from app.database_async import get_tasks_yaml_versions_async, get_chat_page_async
 from app.routers.auth import get_current_user
 from app.llm import get_llm_response_async
 from prompts.generate_tasks_yaml import get_tasks_yaml_prompt
@@ -627,11 +628,13 @@ async def review_tasks_yaml(
 # ═══════════════════════════════════════════════════════════
 
 @router.get("/{session_id}/versions")
-async def get_versions(session_id: str):
+async def get_versions(session_id: str, include_content: bool = True):
     """
     Lista todas as versões de tasks.yaml
+
+    include_content=false devolve só os metadados (sem o YAML de cada versão)
     """
-    versions = get_tasks_yaml_versions(session_id)
+    versions = await get_tasks_yaml_versions_async(session_id, include_content)
     return {
         "versions": versions,
         "total": len(versions)
@@ -643,12 +646,20 @@ async def get_versions(session_id: str):
 # ═══════════════════════════════════════════════════════════
 
 @router.get("/{session_id}/chat-history")
-async def get_chat_history(session_id: str):
+async def get_chat_history(session_id: str, limit: int = 50, cursor: Optional[str] = None):
     """
-    Retorna histórico de chat
+    Retorna histórico de chat (as `limit` mensagens mais recentes, em ordem
+    cronológica). Para mensagens mais antigas, passe o `next_cursor` recebido.
     """
-    messages = get_tasks_yaml_chat_messages(session_id)
+    try:
+        page = await get_chat_page_async(
+            "tasks_yaml_chat_messages", session_id, limit, cursor, newest_first=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
-        "messages": messages,
-        "total": len(messages)
+        "messages": page["messages"],
+        "total": len(page["messages"]),
+        "has_more": page["has_more"],
+        "next_cursor": page["next_cursor"]
     }
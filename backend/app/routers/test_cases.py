@@ -15,9 +15,13 @@ from pydantic import BaseModel, Field
 import uuid
 import json
 import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from app.database import get_db_connection
 from app.dependencies import get_current_user
+from app.versioning import TEST_CASE_VERSIONS, get_version_row, save_version
+from app.versioning import list_versions as list_version_rows
 
 from agents.langnettest import parse_use_cases, ceg_for_uc, refine_ceg, review_test_cases
 from agents.ceg_engine import generate_test_cases
@@ -79,9 +83,72 @@ def _fetch_session(session_id: str) -> Dict[str, Any]:
             cur.close()
     if not row:
         raise HTTPException(404, "Sessão de casos de teste não encontrada")
+    return _with_partial_results(row)
+
+
+def _with_partial_results(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Geração em andamento: results_json ainda não foi montado — junta as linhas por UC."""
+    if row.get("status") == "generating":
+        partial = _fetch_uc_results(row["id"])
+        if partial is not None:
+            row["results_json"] = json.dumps({"results": partial}, ensure_ascii=False)
     return row
 
 
+def _fetch_uc_results(session_id: str) -> Optional[List[dict]]:
+    """Resultados já gerados (test_case_uc_results), na ordem da especificação.
+    None se a tabela não existe (migration 034 não aplicada)."""
+    try:
+        with get_db_connection() as conn:
+            cur = conn.cursor(dictionary=True)
+            try:
+                cur.execute(
+                    "SELECT result_json FROM test_case_uc_results WHERE session_id=%s ORDER BY position",
+                    (session_id,),
+                )
+                rows = cur.fetchall()
+            finally:
+                cur.close()
+    except Exception:
+        return None
+    return [json.loads(r["result_json"]) for r in rows]
+
+
+def _save_uc_result(session_id: str, position: int, result: dict, log: str) -> None:
+    """Persiste UM UC (linha própria) + contadores/log da sessão — custo O(1) por UC,
+    em vez de regravar o results_json inteiro."""
+    n_cases = 0 if result.get("error") else result.get("n_cases", 0)
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                """INSERT INTO test_case_uc_results (session_id, position, uc_id, result_json, n_cases)
+                   VALUES (%s,%s,%s,%s,%s)
+                   ON DUPLICATE KEY UPDATE uc_id=VALUES(uc_id), result_json=VALUES(result_json),
+                                           n_cases=VALUES(n_cases)""",
+                (session_id, position, result["uc"], json.dumps(result, ensure_ascii=False), n_cases),
+            )
+            cur.execute(
+                """UPDATE test_case_sessions
+                   SET total_ucs = total_ucs + %s, total_cases = total_cases + %s, generation_log=%s
+                   WHERE id=%s""",
+                (0 if result.get("error") else 1, n_cases, log, session_id),
+            )
+            conn.commit()
+        finally:
+            cur.close()
+
+
+def _clear_uc_results(session_id: str) -> None:
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute("DELETE FROM test_case_uc_results WHERE session_id=%s", (session_id,))
+            conn.commit()
+        finally:
+            cur.close()
+
+
 def _update_results(session_id: str, results: List[dict], status: str, log: str) -> None:
     total_cases = sum(r.get("n_cases", 0) for r in results)
     total_ucs = len([r for r in results if not r.get("error")])
@@ -184,16 +251,16 @@ def _save_version(session_id: str, results_json_str: str, validation_document: O
 
     doc_size = len(results_json_str or "")
     with get_db_connection() as conn:
+        # keyframe ou delta contra a versão anterior (ver app/versioning.py)
+        save_version(
+            TEST_CASE_VERSIONS, conn, session_id, new_version,
+            {"results_json": results_json_str, "validation_document": validation_document},
+            extra={"created_by": user_id, "change_type": change_type,
+                   "change_description": (change_description or "")[:500] or None,
+                   "doc_size": doc_size},
+        )
         cur = conn.cursor()
         try:
-            cur.execute(
-                """INSERT INTO test_case_version_history
-                   (session_id, version, results_json, validation_document, created_by,
-                    change_type, change_description, doc_size)
-                   VALUES (%s,%s,%s,%s,%s,%s,%s,%s)""",
-                (session_id, new_version, results_json_str, validation_document, user_id,
-                 change_type, (change_description or "")[:500] or None, doc_size),
-            )
             # mantém test_case_sessions.version em sincronia com o histórico
             cur.execute("UPDATE test_case_sessions SET version=%s WHERE id=%s",
                         (new_version, session_id))
@@ -230,31 +297,68 @@ def _serialize(row: Dict[str, Any], with_svg: bool = True) -> Dict[str, Any]:
 
 # ─────────────────── Background: geração progressiva ───────────────────
 
+def _ceg_workers() -> int:
+    """UCs gerados em paralelo (LANGNET_CEG_WORKERS). Default 1 no LM Studio (GPU
+    única serializa as chamadas de qualquer forma), 4 nos providers remotos."""
+    default = "1" if (os.getenv("LLM_PROVIDER") or "").lower() == "lmstudio" else "4"
+    try:
+        return max(1, int(os.getenv("LANGNET_CEG_WORKERS", default)))
+    except ValueError:
+        return 1
+
+
+def _generate_uc(uc: dict) -> tuple[dict, List[str]]:
+    """CEG + casos de teste de UM UC → (resultado, linhas de log)."""
+    log: List[str] = []
+    try:
+        ceg = ceg_for_uc(uc)
+    except Exception as e:
+        ceg = None
+        log.append(f"{uc['id']}: erro no LLM — {e}")
+    if not ceg:
+        log.append(f"{uc['id']}: CEG falhou")
+        return {"uc": uc["id"], "name": uc["name"], "error": "CEG não gerado"}, log
+    tc = generate_test_cases(ceg)
+    log.append(f"{uc['id']}: {tc['n_causes']} causas, {tc['n_effects']} efeitos, {tc['n_cases']} casos")
+    return {"uc": uc["id"], "name": uc["name"], "actor": uc.get("actor"),
+            "objetivo": uc.get("objetivo"), "ceg": ceg, **tc}, log
+
+
 def _run_generation(session_id: str, spec_doc: str, only: Optional[List[str]]) -> None:
-    """Gera o CEG + casos de cada UC, persistindo progressivamente (galeria enche
-    conforme processa)."""
+    """Gera o CEG + casos de cada UC num pool limitado, persistindo cada UC na sua
+    própria linha assim que termina (galeria enche conforme processa). O
+    results_json da sessão é gravado uma única vez, no fim, na ordem da spec."""
     ucs = parse_use_cases(spec_doc)
     if only:
         ucs = [u for u in ucs if u["id"] in only]
-    results: List[dict] = []
+    by_position: Dict[int, dict] = {}
     log: List[str] = []
-    for i, uc in enumerate(ucs, 1):
+    per_uc_rows = True
+    with ThreadPoolExecutor(max_workers=_ceg_workers(), thread_name_prefix="ceg") as pool:
+        futures = {pool.submit(_generate_uc, uc): pos for pos, uc in enumerate(ucs)}
+        for fut in as_completed(futures):
+            pos = futures[fut]
+            result, uc_log = fut.result()
+            by_position[pos] = result
+            log.extend(uc_log)
+            if per_uc_rows:
+                try:
+                    _save_uc_result(session_id, pos, result, "\n".join(log))
+                    continue
+                except Exception as e:
+                    # sem a tabela da migration 034 — volta a regravar o results_json
+                    print(f"⚠️  test_case_uc_results indisponível ({e}); gravando results_json inteiro")
+                    per_uc_rows = False
+            done = [by_position[p] for p in sorted(by_position)]
+            _update_results(session_id, done, "generating", "\n".join(log))
+
+    results = [by_position[p] for p in sorted(by_position)]
+    _update_results(session_id, results, "draft", "\n".join(log))
+    if per_uc_rows:
         try:
-            ceg = ceg_for_uc(uc)
-        except Exception as e:
-            ceg = None
-            log.append(f"{uc['id']}: erro no LLM — {e}")
-        if not ceg:
-            results.append({"uc": uc["id"], "name": uc["name"], "error": "CEG não gerado"})
-            log.append(f"{uc['id']}: CEG falhou")
-        else:
-            tc = generate_test_cases(ceg)
-            results.append({"uc": uc["id"], "name": uc["name"], "actor": uc.get("actor"),
-                            "objetivo": uc.get("objetivo"), "ceg": ceg, **tc})
-            log.append(f"{uc['id']}: {tc['n_causes']} causas, {tc['n_effects']} efeitos, {tc['n_cases']} casos")
-        # persiste a cada UC — status 'generating' até o último
-        st = "draft" if i == len(ucs) else "generating"
-        _update_results(session_id, results, st, "\n".join(log))
+            _clear_uc_results(session_id)
+        except Exception:
+            pass
     # ao concluir, gera e persiste o Documento de Validação no banco
     try:
         _regen_validation_document(session_id)
@@ -321,7 +425,7 @@ def get_latest_for_project(project_id: str, current_user=Depends(get_current_use
             cur.close()
     if not row:
         return {"session_id": None, "message": "Nenhum caso de teste gerado ainda"}
-    return _serialize(row)
+    return _serialize(_with_partial_results(row))
 
 
 @router.get("/{session_id}")
@@ -477,18 +581,7 @@ def get_validation_document(session_id: str, current_user=Depends(get_current_us
 def list_versions(session_id: str, current_user=Depends(get_current_user)):
     """Lista as versões da sessão (mais recente primeiro)."""
     _fetch_session(session_id)
-    with get_db_connection() as conn:
-        cur = conn.cursor(dictionary=True)
-        try:
-            cur.execute(
-                """SELECT version, created_at, change_description, change_type, doc_size
-                   FROM test_case_version_history WHERE session_id=%s
-                   ORDER BY version DESC""",
-                (session_id,),
-            )
-            rows = cur.fetchall()
-        finally:
-            cur.close()
+    rows = list_version_rows(TEST_CASE_VERSIONS, session_id)
     return {"versions": [
         {"version": r["version"], "created_at": str(r["created_at"]),
          "change_description": r["change_description"], "change_type": r["change_type"],
@@ -500,16 +593,7 @@ def list_versions(session_id: str, current_user=Depends(get_current_user)):
 @router.get("/{session_id}/versions/{version}")
 def get_version(session_id: str, version: int, current_user=Depends(get_current_user)):
     """Retorna o snapshot completo de uma versão: results (com svg por UC) + doc de validação."""
-    with get_db_connection() as conn:
-        cur = conn.cursor(dictionary=True)
-        try:
-            cur.execute(
-                "SELECT * FROM test_case_version_history WHERE session_id=%s AND version=%s",
-                (session_id, version),
-            )
-            row = cur.fetchone()
-        finally:
-            cur.close()
+    row = get_version_row(TEST_CASE_VERSIONS, session_id, version)
     if not row:
         raise HTTPException(404, f"Versão {version} não encontrada")
 
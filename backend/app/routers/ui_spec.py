@@ -24,6 +24,9 @@ from prompts.generate_ui_spec import find_uc_block, replace_uc_sections
 
 router = APIRouter(prefix="/api/ui-spec", tags=["ui-spec"])
 
+# Sessões que valem como "a UI Spec do projeto" (exclui geração em andamento e falha)
+USABLE_STATUS_SQL = "status NOT IN ('generating', 'failed')"
+
 
 # ─────────────────── Schemas ───────────────────
 
@@ -229,25 +232,61 @@ def _serialize(row: Dict[str, Any], include_mockups: bool = True) -> Dict[str, A
     return out
 
 
+def _update_generation(session_id: str, fields: Dict[str, Any]) -> None:
+    """UPDATE parcial da sessão durante/ao fim da geração."""
+    cols = ", ".join(f"{k}=%s" for k in fields)
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(f"UPDATE ui_spec_sessions SET {cols} WHERE id=%s",
+                        (*fields.values(), session_id))
+            conn.commit()
+        finally:
+            cur.close()
+
+
+def _delete_session(session_id: str) -> None:
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute("DELETE FROM ui_spec_sessions WHERE id=%s", (session_id,))
+            conn.commit()
+        finally:
+            cur.close()
+
+
+def mark_interrupted_generations() -> int:
+    """Sessões 'generating' de um processo que morreu no meio (reinício do backend)
+    viram 'failed' — senão ficariam para sempre como geração em andamento."""
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "UPDATE ui_spec_sessions SET status='failed', "
+                "generation_log=CONCAT(COALESCE(generation_log, ''), %s) WHERE status='generating'",
+                ("\nGeração interrompida (reinício do servidor)",),
+            )
+            conn.commit()
+            return cur.rowcount
+        finally:
+            cur.close()
+
+
 # ─────────────────── Endpoints ───────────────────
 
 @router.post("/{project_id}/generate")
 def generate_ui_spec(project_id: str, req: GenerateRequest, current_user=Depends(get_current_user)):
-    """Gera a UI Spec completa (todas as telas + mockups PNG)."""
+    """Gera a UI Spec completa (todas as telas + mockups PNG).
+
+    A sessão é criada ANTES da geração com status 'generating' e recebe as telas
+    conforme ficam prontas (geração paralela, ver execute_ui_spec_workflow) —
+    GET /{session_id} e /project/{id}/latest já mostram o progresso. Ao fim vira
+    'draft' (ou 'failed'). Enquanto isso a sessão não é "a UI Spec do projeto":
+    leitores da mais recente filtram por USABLE_STATUS_SQL."""
     spec_doc, spec_project = _fetch_spec_content(req.specification_session_id)
     schema_sql, used_dm_session_id, dm_version = _fetch_schema_sql(project_id, req.data_model_session_id)
     spec_version = _current_specification_version(req.specification_session_id)
 
-    try:
-        result = execute_ui_spec_workflow(
-            specification_document=spec_doc,
-            schema_sql=schema_sql,
-            render_png=req.render_png,
-            project_name=_project_name(project_id),
-        )
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Falha na geração: {e}")
-
     session_id = str(uuid.uuid4())
     with get_db_connection() as conn:
         cur = conn.cursor()
@@ -262,17 +301,56 @@ def generate_ui_spec(project_id: str, req: GenerateRequest, current_user=Depends
                     session_id, project_id, current_user["id"],
                     req.specification_session_id, spec_version,
                     used_dm_session_id, dm_version,
-                    1, "draft",
-                    json.dumps(result["ui_spec"], ensure_ascii=False),
-                    json.dumps(result["mockups"], ensure_ascii=False),
-                    result["screens_count"],
-                    result["generation_log"],
+                    1, "generating",
+                    json.dumps({"screens": [], "navigation": [], "action_map": {}}),
+                    json.dumps({}),
+                    0,
+                    "Gerando telas…",
                 ),
             )
             conn.commit()
         finally:
             cur.close()
 
+    progress = {"screens_count": 0}
+
+    def _persist_progress(partial: Dict[str, Any]) -> None:
+        # Best-effort: progresso que não grava só atrasa a exibição, não a geração.
+        progress["screens_count"] = partial["screens_count"]
+        try:
+            _update_generation(session_id, {
+                "ui_spec_json": json.dumps(partial["ui_spec"], ensure_ascii=False),
+                "screens_count": partial["screens_count"],
+                "generation_log": f"{partial['done']}/{partial['total']} UCs processados\n"
+                                  + partial["generation_log"],
+            })
+        except Exception as exc:  # noqa: BLE001
+            print(f"[UI-SPEC] falha ao gravar progresso (ignorada): {exc}")
+
+    try:
+        result = execute_ui_spec_workflow(
+            specification_document=spec_doc,
+            schema_sql=schema_sql,
+            render_png=req.render_png,
+            project_name=_project_name(project_id),
+            on_progress=_persist_progress,
+        )
+    except Exception as e:
+        if progress["screens_count"]:
+            # telas parciais ficam para inspeção; 'failed' nunca é lido como a spec do projeto
+            _update_generation(session_id, {"status": "failed", "generation_log": f"Falha na geração: {e}"})
+        else:
+            _delete_session(session_id)  # sessão vazia não fica no histórico do projeto
+        raise HTTPException(status_code=502, detail=f"Falha na geração: {e}")
+
+    _update_generation(session_id, {
+        "status": "draft",
+        "ui_spec_json": json.dumps(result["ui_spec"], ensure_ascii=False),
+        "mockups_json": json.dumps(result["mockups"], ensure_ascii=False),
+        "screens_count": result["screens_count"],
+        "generation_log": result["generation_log"],
+    })
+
     # ADITIVO: registra a versão 1 no histórico (mesmo padrão das demais etapas)
     _save_ui_spec_version(
         session_id,
@@ -293,19 +371,36 @@ def generate_ui_spec(project_id: str, req: GenerateRequest, current_user=Depends
 
 @router.get("/project/{project_id}/latest")
 def get_latest_for_project(project_id: str, current_user=Depends(get_current_user)):
+    """Última UI Spec utilizável do projeto. Uma geração em andamento mais nova vem em
+    `in_progress` (ou como a própria resposta, se o projeto ainda não tem nenhuma)."""
     with get_db_connection() as conn:
         cur = conn.cursor(dictionary=True)
         try:
             cur.execute(
-                "SELECT * FROM ui_spec_sessions WHERE project_id=%s ORDER BY created_at DESC LIMIT 1",
+                f"SELECT * FROM ui_spec_sessions WHERE project_id=%s AND {USABLE_STATUS_SQL} "
+                "ORDER BY created_at DESC LIMIT 1",
                 (project_id,),
             )
-            row = cur.fetchone()
+            row = next(iter(cur.fetchall()), None)  # consome o resultado antes do 2º execute
+            cur.execute(
+                "SELECT * FROM ui_spec_sessions WHERE project_id=%s AND status='generating' "
+                "ORDER BY created_at DESC LIMIT 1",
+                (project_id,),
+            )
+            running = next(iter(cur.fetchall()), None)
         finally:
             cur.close()
+    if running and row and running["created_at"] < row["created_at"]:
+        running = None
     if not row:
+        if running:
+            return _serialize(running)
         return {"session_id": None, "message": "Nenhuma UI Spec gerada ainda"}
-    return _serialize(row)
+    out = _serialize(row)
+    if running:
+        out["in_progress"] = {"session_id": running["id"], "screens_count": running.get("screens_count") or 0,
+                              "generation_log": running.get("generation_log")}
+    return out
 
 
 @router.get("/{session_id}")
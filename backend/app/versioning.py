@@ -0,0 +1,358 @@
+"""
+Histórico de versões comprimido por delta (keyframes + diffs)
+
+As tabelas *_version_history guardavam um snapshot COMPLETO por edição: uma
+especificação de 60 KB refinada 40 vezes ocupava 2,4 MB, e cada listagem puxava
+essas linhas enormes. Aqui cada versão é gravada como:
+
+- keyframe ('full'): o conteúdo inteiro, zlib, a cada KEYFRAME_INTERVAL versões;
+- delta ('delta'): diff zlib contra a versão ANTERIOR (base_version).
+
+Reconstruir a versão N = keyframe mais próximo ≤ N + deltas em sequência. Versões
+materializadas ficam num LRU em memória (o histórico é imutável), então abrir
+versões vizinhas — ou gravar a próxima, que usa a última como base — não volta
+ao banco. Linhas antigas (storage_kind='full' sem payload) continuam legíveis
+direto das colunas de conteúdo, e sem a migration 033 tudo cai para o snapshot
+completo de antes.
+
+O diff trabalha sobre tokens que terminam em quebra de linha, vírgula, chaves,
+colchetes ou "\\n" escapado — funciona tanto para Markdown/HTML quanto para JSON
+numa linha só (json.dumps) e reproduz o texto byte a byte.
+"""
+import json
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+
+KEYFRAME_INTERVAL = int(os.getenv("LANGNET_VERSION_KEYFRAME_INTERVAL", "10"))
+LRU_SIZE = int(os.getenv("LANGNET_VERSION_LRU_SIZE", "64"))
+# Delta maior que esta fração do keyframe não compensa — grava keyframe
+_MAX_DELTA_RATIO = 0.6
+
+Content = Dict[str, Optional[str]]
+
+
+class VersionChainError(Exception):
+    """Cadeia keyframe → deltas incompleta ou inconsistente."""
+
+
+@dataclass(frozen=True)
+class VersionedTable:
+    """Descrição de uma *_version_history para o store."""
+    table: str
+    owner_col: str                  # session_id | project_id
+    content_cols: Tuple[str, ...]   # colunas com o snapshot (texto)
+    meta_cols: Tuple[str, ...]      # colunas leves para a listagem
+
+
+PETRI_NET_VERSIONS = VersionedTable(
+    table="petri_net_version_history",
+    owner_col="project_id",
+    content_cols=("petri_net_json",),
+    meta_cols=("version", "created_at", "change_description", "change_type",
+               "doc_size", "is_approved_version"),
+)
+
+TEST_CASE_VERSIONS = VersionedTable(
+    table="test_case_version_history",
+    owner_col="session_id",
+    content_cols=("results_json", "validation_document"),
+    meta_cols=("version", "created_at", "change_description", "change_type", "doc_size"),
+)
+
+CODE_GENERATION_VERSIONS = VersionedTable(
+    table="code_generation_version_history",
+    owner_col="session_id",
+    content_cols=("generated_files",),
+    meta_cols=("id", "version", "change_type", "change_description", "total_files", "created_at"),
+)
+
+
+# ════════════════════════════════════════════════════════════════
+# CODEC (puro — sem banco)
+# ════════════════════════════════════════════════════════════════
+
+_TOKEN_SPLIT = re.compile(r"(?<=[\n,{}\[\]])|(?<=\\n)")
+
+
+def _tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_SPLIT.split(text) if t]
+
+
+def make_delta(base: str, new: str) -> List[Any]:
+    """Ops para reconstruir `new` a partir de `base`: [i, j] copia tokens
+    base[i:j]; str insere literal."""
+    a, b = _tokenize(base), _tokenize(new)
+    ops: List[Any] = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b).get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            literal = "".join(b[j1:j2])
+            if ops and isinstance(ops[-1], str):
+                ops[-1] += literal
+            else:
+                ops.append(literal)
+    return ops
+
+
+def apply_delta(base: str, ops: List[Any]) -> str:
+    tokens = _tokenize(base)
+    return "".join("".join(tokens[op[0]:op[1]]) if isinstance(op, list) else op for op in ops)
+
+
+def encode_full(content: Content) -> bytes:
+    return zlib.compress(json.dumps({k: {"t": v} for k, v in content.items()},
+                                    ensure_ascii=False).encode("utf-8"), 6)
+
+
+def encode_delta(base: Content, content: Content) -> bytes:
+    fields = {}
+    for key, value in content.items():
+        prev = base.get(key)
+        if value is None or prev is None:
+            fields[key] = {"t": value}
+        elif value == prev:
+            fields[key] = {"s": 1}
+        else:
+            fields[key] = {"d": make_delta(prev, value)}
+    return zlib.compress(json.dumps(fields, ensure_ascii=False).encode("utf-8"), 6)
+
+
+def decode_payload(payload: bytes, base: Optional[Content]) -> Content:
+    fields = json.loads(zlib.decompress(payload).decode("utf-8"))
+    content: Content = {}
+    for key, entry in fields.items():
+        if "t" in entry:
+            content[key] = entry["t"]
+        elif base is None or base.get(key) is None:
+            raise VersionChainError(f"delta de '{key}' sem versão base")
+        elif "s" in entry:
+            content[key] = base[key]
+        else:
+            content[key] = apply_delta(base[key], entry["d"])
+    return content
+
+
+# ════════════════════════════════════════════════════════════════
+# LRU de versões materializadas
+# ════════════════════════════════════════════════════════════════
+
+_LRU: "OrderedDict[Tuple[str, str, int], Content]" = OrderedDict()
+_LRU_LOCK = threading.Lock()
+
+
+def _lru_get(spec: VersionedTable, owner_id: str, version: int) -> Optional[Content]:
+    key = (spec.table, owner_id, int(version))
+    with _LRU_LOCK:
+        content = _LRU.get(key)
+        if content is not None:
+            _LRU.move_to_end(key)
+            return dict(content)
+    return None
+
+
+def _lru_put(spec: VersionedTable, owner_id: str, version: int, content: Content) -> None:
+    if LRU_SIZE <= 0:
+        return
+    with _LRU_LOCK:
+        _LRU[(spec.table, owner_id, int(version))] = dict(content)
+        _LRU.move_to_end((spec.table, owner_id, int(version)))
+        while len(_LRU) > LRU_SIZE:
+            _LRU.popitem(last=False)
+
+
+# ════════════════════════════════════════════════════════════════
+# STORE (MySQL)
+# ════════════════════════════════════════════════════════════════
+
+_DELTA_READY: Dict[str, bool] = {}
+
+
+def _connection():
+    from app.database import get_db_connection
+    return get_db_connection()
+
+
+def _supports_delta(spec: VersionedTable, conn) -> bool:
+    """A tabela já tem as colunas da migration 033? (cacheado por processo)"""
+    ready = _DELTA_READY.get(spec.table)
+    if ready is None:
+        cur = conn.cursor()
+        try:
+            cur.execute(f"SHOW COLUMNS FROM {spec.table} LIKE 'payload'")
+            ready = cur.fetchone() is not None
+        finally:
+            cur.close()
+        _DELTA_READY[spec.table] = ready
+        if not ready:
+            print(f"⚠️  {spec.table} sem colunas de delta (migration 033) — gravando snapshot completo")
+    return ready
+
+
+def save_version(
+    spec: VersionedTable,
+    conn,
+    owner_id: str,
+    version: int,
+    content: Content,
+    extra: Optional[Dict[str, Any]] = None,
+) -> None:
+    """INSERT da versão `version` (keyframe ou delta contra version-1).
+
+    Usa a conexão do chamador e NÃO faz commit — o chamador decide, como nos
+    INSERTs que isto substitui. `extra` = demais colunas (metadados/proveniência).
+    """
+    extra = dict(extra or {})
+    columns = [spec.owner_col, "version"] + list(extra)
+    values: List[Any] = [owner_id, version] + list(extra.values())
+
+    if not _supports_delta(spec, conn):
+        columns += list(spec.content_cols)
+        values += [content.get(c) for c in spec.content_cols]
+    else:
+        full = encode_full(content)
+        storage_kind, base_version, payload = "full", None, full
+        if version > 1 and (version - 1) % max(KEYFRAME_INTERVAL, 1) != 0:
+            try:
+                base = load_version(spec, owner_id, version - 1, conn=conn)
+            except VersionChainError:
+                base = None
+            if base is not None:
+                delta = encode_delta(base, content)
+                if len(delta) < len(full) * _MAX_DELTA_RATIO:
+                    storage_kind, base_version, payload = "delta", version - 1, delta
+        columns += ["storage_kind", "base_version", "payload"]
+        values += [storage_kind, base_version, payload]
+
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"INSERT INTO {spec.table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})",
+            tuple(values),
+        )
+    finally:
+        cur.close()
+    _lru_put(spec, owner_id, version, content)
+
+
+def _row_content(spec: VersionedTable, row: Dict[str, Any], base: Optional[Content]) -> Content:
+    kind = row.get("storage_kind") or "full"
+    payload = row.get("payload")
+    if payload is None:
+        if kind == "delta":
+            raise VersionChainError(f"{spec.table} v{row['version']}: delta sem payload")
+        return {c: row.get(c) for c in spec.content_cols}  # linha legada
+    content = decode_payload(bytes(payload), base if kind == "delta" else None)
+    for c in spec.content_cols:
+        content.setdefault(c, None)
+    return content
+
+
+def load_version(spec: VersionedTable, owner_id: str, version: int, conn=None) -> Optional[Content]:
+    """Conteúdo materializado da versão, ou None se ela não existe."""
+    cached = _lru_get(spec, owner_id, version)
+    if cached is not None:
+        return cached
+    if conn is None:
+        with _connection() as own_conn:
+            return load_version(spec, owner_id, version, conn=own_conn)
+
+    cols = ", ".join(spec.content_cols)
+    cur = conn.cursor(dictionary=True)
+    try:
+        if not _supports_delta(spec, conn):
+            cur.execute(
+                f"SELECT {cols} FROM {spec.table} WHERE {spec.owner_col} = %s AND version = %s LIMIT 1",
+                (owner_id, version),
+            )
+            row = cur.fetchone()
+            return {c: row.get(c) for c in spec.content_cols} if row else None
+
+        cur.execute(
+            f"SELECT MAX(version) AS kf FROM {spec.table} "
+            f"WHERE {spec.owner_col} = %s AND version <= %s AND storage_kind <> 'delta'",
+            (owner_id, version),
+        )
+        row = cur.fetchone()
+        keyframe = row["kf"] if row else None
+        if keyframe is None:
+            cur.execute(
+                f"SELECT 1 FROM {spec.table} WHERE {spec.owner_col} = %s AND version = %s LIMIT 1",
+                (owner_id, version),
+            )
+            if cur.fetchone() is None:
+                return None
+            raise VersionChainError(f"{spec.table} v{version}: nenhum keyframe anterior")
+
+        # Parte da versão materializada mais recente que já estiver no LRU
+        start, base = int(keyframe), None
+        for v in range(int(version) - 1, int(keyframe) - 1, -1):
+            base = _lru_get(spec, owner_id, v)
+            if base is not None:
+                start = v + 1
+                break
+
+        cur.execute(
+            f"SELECT version, storage_kind, base_version, payload, {cols} FROM {spec.table} "
+            f"WHERE {spec.owner_col} = %s AND version BETWEEN %s AND %s ORDER BY version",
+            (owner_id, start, version),
+        )
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+
+    if not rows or int(rows[-1]["version"]) != int(version):
+        return None
+    prev_version = start - 1 if base is not None else None
+    for r in rows:
+        if r.get("storage_kind") == "delta" and r.get("base_version") != prev_version:
+            raise VersionChainError(
+                f"{spec.table} v{r['version']}: base {r.get('base_version')} ≠ {prev_version}"
+            )
+        base = _row_content(spec, r, base)
+        prev_version = int(r["version"])
+        _lru_put(spec, owner_id, prev_version, base)
+    return dict(base)
+
+
+def get_version_row(spec: VersionedTable, owner_id: str, version: int) -> Optional[Dict[str, Any]]:
+    """Linha completa (metadados + conteúdo materializado) — substitui `SELECT *`."""
+    with _connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(
+                f"SELECT * FROM {spec.table} WHERE {spec.owner_col} = %s AND version = %s LIMIT 1",
+                (owner_id, version),
+            )
+            row = cur.fetchone()
+        finally:
+            cur.close()
+        if not row:
+            return None
+        content = load_version(spec, owner_id, version, conn=conn)
+    for key in ("storage_kind", "base_version", "payload"):
+        row.pop(key, None)
+    row.update(content or {})
+    return row
+
+
+def list_versions(spec: VersionedTable, owner_id: str) -> List[Dict[str, Any]]:
+    """Listagem só de metadados (nunca toca no conteúdo), mais recentes primeiro."""
+    with _connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(
+                f"SELECT {', '.join(spec.meta_cols)} FROM {spec.table} "
+                f"WHERE {spec.owner_col} = %s ORDER BY version DESC",
+                (owner_id,),
+            )
+            return cur.fetchall()
+        finally:
+            cur.close()
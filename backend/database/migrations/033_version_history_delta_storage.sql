@@ -0,0 +1,23 @@
+-- 033_version_history_delta_storage.sql
+-- Histórico de versões comprimido por delta (app/versioning.py).
+-- Cada versão nova passa a ser gravada como keyframe ('full', conteúdo inteiro zlib)
+-- ou 'delta' (diff zlib contra base_version = version-1) na coluna payload; as colunas
+-- de snapshot ficam NULL nessas linhas. Linhas antigas continuam 'full' com o conteúdo
+-- nas colunas originais (payload NULL) e são lidas como antes.
+-- Aditivo/backward-compatible: sem esta migration o app segue gravando snapshot completo.
+
+ALTER TABLE petri_net_version_history
+  MODIFY COLUMN petri_net_json LONGTEXT NULL,
+  ADD COLUMN storage_kind  VARCHAR(8)   NOT NULL DEFAULT 'full',
+  ADD COLUMN base_version  INT UNSIGNED NULL,
+  ADD COLUMN payload       LONGBLOB     NULL;
+
+ALTER TABLE test_case_version_history
+  ADD COLUMN storage_kind  VARCHAR(8)   NOT NULL DEFAULT 'full',
+  ADD COLUMN base_version  INT UNSIGNED NULL,
+  ADD COLUMN payload       LONGBLOB     NULL;
+
+ALTER TABLE code_generation_version_history
+  ADD COLUMN storage_kind  VARCHAR(8)   NOT NULL DEFAULT 'full',
+  ADD COLUMN base_version  INT UNSIGNED NULL,
+  ADD COLUMN payload       LONGBLOB     NULL;
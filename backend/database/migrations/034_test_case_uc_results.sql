@@ -0,0 +1,18 @@
+-- 034_test_case_uc_results.sql
+-- Resultado de cada UC gravado em linha própria durante a geração de casos de teste.
+-- Antes, a cada UC concluído o results_json INTEIRO da sessão era regravado (O(n²) em
+-- bytes para n UCs). Agora cada UC vira uma linha aqui assim que termina (a geração é
+-- concorrente, então a ordem de chegada não é a da spec — `position` guarda a ordem);
+-- a leitura monta o results_json sob demanda enquanto status='generating' e, ao fim,
+-- ele é gravado UMA vez na sessão e as linhas parciais são removidas.
+
+CREATE TABLE IF NOT EXISTS test_case_uc_results (
+    session_id   VARCHAR(36) NOT NULL,
+    position     INT         NOT NULL,            -- ordem do UC na especificação
+    uc_id        VARCHAR(50) NOT NULL,
+    result_json  LONGTEXT    NOT NULL,            -- {uc,name,ceg,decision_table,test_cases,...}
+    n_cases      INT         DEFAULT 0,
+    created_at   TIMESTAMP   NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (session_id, position),
+    KEY idx_tcur_session (session_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
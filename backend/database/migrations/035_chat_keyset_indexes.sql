@@ -0,0 +1,26 @@
+-- 035_chat_keyset_indexes.sql
+-- Índices compostos para a paginação por cursor (keyset) dos históricos de chat
+-- (app/database.py: get_chat_page). A página seguinte é
+--   WHERE session_id = ? AND (timestamp > ? OR (timestamp = ? AND id > ?))
+--   ORDER BY timestamp, id LIMIT n
+-- e, com (session_id, timestamp, id), vira um range scan que para após n linhas —
+-- em vez de ler e descartar as OFFSET linhas anteriores (idx_session + filesort).
+-- As listas de versões já usam a PK (session_id, version).
+
+ALTER TABLE chat_messages
+  ADD INDEX idx_chat_keyset (session_id, is_deleted, timestamp, id);
+
+ALTER TABLE specification_chat_messages
+  ADD INDEX idx_spec_chat_keyset (session_id, timestamp, id);
+
+ALTER TABLE agent_task_spec_chat_messages
+  ADD INDEX idx_ats_chat_keyset (session_id, timestamp, id);
+
+ALTER TABLE agents_yaml_chat_messages
+  ADD INDEX idx_agents_yaml_chat_keyset (session_id, timestamp, id);
+
+ALTER TABLE tasks_yaml_chat_messages
+  ADD INDEX idx_tasks_yaml_chat_keyset (session_id, timestamp, id);
+
+ALTER TABLE code_generation_chat_messages
+  ADD INDEX idx_cgcm_keyset (session_id, timestamp, id);
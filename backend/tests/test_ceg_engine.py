@@ -0,0 +1,49 @@
+"""
+Tests for the cause-effect graph decision table engine (agents/ceg_engine.py)
+"""
+from agents.ceg_engine import MAX_EXPANDED_COLUMNS, build_decision_table
+
+
+def _ceg(n_causes, rules, constraints=None):
+    causes = [f"c{i}" for i in range(1, n_causes + 1)]
+    return {
+        "uc": "UC-001",
+        "causes": [{"id": c, "desc": c} for c in causes],
+        "effects": [{"id": r["effect"], "desc": r["effect"]} for r in rules],
+        "rules": rules,
+        "constraints": constraints or [],
+    }
+
+
+class TestDecisionTable:
+    """Decision table generation"""
+
+    def test_combinations_in_enumeration_order(self):
+        """Columns follow product([True, False]) order over the involved causes"""
+        ceg = _ceg(3, [
+            {"effect": "e1", "expr": {"op": "or", "args": ["c1", "c2"]}},
+            {"effect": "e2", "expr": {"op": "not", "arg": "c1"}},
+        ], constraints=[{"type": "E", "causes": ["c1", "c2"]}])
+
+        cols = build_decision_table(ceg)
+        assert [(c["target"], c["causes"]) for c in cols] == [
+            ("e1", {"c1": True, "c2": False, "c3": "X"}),
+            ("e1", {"c1": False, "c2": True, "c3": "X"}),
+            ("e2", {"c1": False, "c2": "X", "c3": "X"}),
+        ]
+        assert cols[0]["effects"] == {"e1": True, "e2": False}
+        assert cols[1]["effects"] == {"e1": True, "e2": True}
+
+    def test_many_causes_collapse_into_cubes(self):
+        """25 involved causes: an OR collapses to one cube per cause"""
+        causes = [f"c{i}" for i in range(1, 26)]
+        ceg = _ceg(25, [
+            {"effect": "e1", "expr": {"op": "or", "args": causes}},
+            {"effect": "e2", "expr": {"op": "and", "args": causes}},
+        ])
+
+        cols = build_decision_table(ceg)
+        e1 = [c for c in cols if c["target"] == "e1"]
+        assert len(e1) == 25 < MAX_EXPANDED_COLUMNS
+        assert e1[0]["causes"]["c1"] is True and e1[0]["causes"]["c2"] == "X"
+        assert all(v is True for v in next(c for c in cols if c["target"] == "e2")["causes"].values())
@@ -0,0 +1,61 @@
+"""
+Tests for the token-aware chunker (utils/chunking.py)
+"""
+from utils.chunking import BoilerplateFilter, chunk_document, chunk_pages, register_tokenizer
+
+
+SECTIONS = ["DO OBJETO", "DA HABILITAÇÃO", "DAS PROPOSTAS", "DO JULGAMENTO", "DOS RECURSOS", "DO PAGAMENTO"]
+
+
+def _pages(n):
+    out = []
+    for p in range(1, n + 1):
+        body = f"PREFEITURA MUNICIPAL\nPágina {p} de {n}\n"
+        if p % 2:
+            body += f"{p // 2 + 1}. {SECTIONS[p // 2 % len(SECTIONS)]}\n"
+        body += f"O licitante {p} deverá apresentar a documentação exigida. " * 8
+        body += f"\n\nItem | Qtd | Valor\nA{p} | {p} | {p * 10}\n"
+        out.append((p, body))
+    return out
+
+
+class TestChunking:
+    """Token budgets, structure and metadata"""
+
+    def test_budget_and_metadata(self):
+        chunks = chunk_pages(_pages(12), max_tokens=200)
+        assert chunks and all(c.tokens <= 200 for c in chunks)
+        assert [c.index for c in chunks] == list(range(len(chunks)))
+        assert all(c.page_start <= c.page_end for c in chunks)
+        assert chunks[0].section == "1. DO OBJETO"
+
+    def test_boilerplate_removed(self):
+        text = "\n\n".join(c.text for c in chunk_pages(_pages(12), max_tokens=200))
+        assert "PREFEITURA" not in text and "Página" not in text
+        flt = BoilerplateFilter()
+        list(flt.filter(_pages(12)))
+        assert flt.removed_lines == 24
+
+    def test_offsets_point_into_unfiltered_text(self):
+        pages = _pages(12)
+        pages.insert(3, (99, ""))
+        raw = "\n\n".join(text for _, text in pages)
+        chunks = chunk_pages(pages, max_tokens=200)
+        for c in chunks:
+            first_line = c.text.split("\n")[0]
+            assert raw[c.char_start:c.char_start + len(first_line)] == first_line
+            last_line = c.text.split("\n")[-1]
+            assert raw[:c.char_end].rstrip().endswith(last_line)
+
+    def test_headings_not_orphaned_and_tables_split_by_rows(self):
+        table = "Col A | Col B | Col C\n" + "\n".join(f"{i} | x | y" for i in range(200))
+        chunks = chunk_document("INTRODUÇÃO\n\nTexto curto.\n\nANEXO I - PLANILHA\n\n" + table, max_tokens=150)
+        assert not any(c.text.rstrip().endswith("ANEXO I - PLANILHA") for c in chunks)
+        table_chunks = [c for c in chunks if "| x | y" in c.text]
+        assert len(table_chunks) > 1
+        assert all("Col A | Col B | Col C" in c.text for c in table_chunks)
+
+    def test_pluggable_tokenizer(self):
+        register_tokenizer("words", lambda t: len(t.split()))
+        chunks = chunk_document("um dois três. " * 100, max_tokens=30, tokenizer="words")
+        assert all(len(c.text.split()) <= 30 for c in chunks)
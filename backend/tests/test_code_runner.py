@@ -0,0 +1,146 @@
+"""
+Tests for the run log ring buffer and batched WS delivery (app/code_runner.py)
+"""
+import asyncio
+import os
+import threading
+from pathlib import Path
+
+from app import code_runner
+from app.code_runner import CodeRun, LineBuffer
+
+
+class TestLineBuffer:
+    """Fixed capacity, monotonic sequence numbers"""
+
+    def test_ring_buffer_keeps_sequence(self):
+        buf = LineBuffer(capacity=3)
+        for i in range(5):
+            assert buf.append(f"l{i}") == i
+        assert len(buf) == 3 and buf.first_seq == 2 and buf.next_seq == 5
+        assert buf.since(3) == (3, ["l3", "l4"])
+        assert buf.since(0) == (2, ["l2", "l3", "l4"])
+        assert buf.since(2, limit=1) == (2, ["l2"])
+        assert buf.tail(2) == ["l3", "l4"]
+
+
+class TestBatchedStreaming:
+    """Lines are coalesced into frames and resumable by sequence"""
+
+    def test_lines_batched_and_resumed(self, monkeypatch):
+        monkeypatch.setattr(code_runner, "LOG_BATCH_MAX_LINES", 1000)
+
+        async def scenario():
+            run = CodeRun(id="r", session_id="s", work_dir=Path("/tmp"))
+            run.append_line("antes")
+            q = code_runner.subscribe(run, since=0)
+            writer = threading.Thread(target=lambda: [run.append_line(f"n{i}") for i in range(300)])
+            writer.start()
+            writer.join()
+            await asyncio.sleep(code_runner.LOG_BATCH_SECONDS * 4)
+            frames = []
+            while not q.empty():
+                frames.append(q.get_nowait())
+            code_runner.unsubscribe(run, q)
+            resumed = code_runner.subscribe(run, since=299)
+            return frames, resumed.get_nowait()
+
+        frames, resumed = asyncio.run(scenario())
+        lines = [line for f in frames for line in f["data"]]
+        assert lines == ["antes"] + [f"n{i}" for i in range(300)]
+        assert len(frames) <= 3 and frames[0]["seq"] == 0
+        assert resumed == {"type": "lines", "seq": 299, "data": ["n298", "n299"]}
+
+
+class TestDepsCache:
+    """Fingerprinted requirements skip the pip dry-run on a hit"""
+
+    def _setup(self, tmp_path, monkeypatch):
+        env = tmp_path / "env"
+        (env / "lib" / "python3.11" / "site-packages").mkdir(parents=True)
+        monkeypatch.setattr(code_runner, "CONDA_ENV_PATH", env)
+        monkeypatch.setattr(code_runner, "_DEPS_CACHE_DIR", tmp_path / "cache")
+        monkeypatch.setattr(code_runner, "_DEPS_STATE_FILE", tmp_path / "cache" / "satisfied.json")
+        return env / "lib" / "python3.11" / "site-packages"
+
+    def test_fingerprint_ignores_order_and_comments(self, tmp_path, monkeypatch):
+        self._setup(tmp_path, monkeypatch)
+        a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+        a.write_text("crewai==0.80\n# comentario\nPyYAML\n")
+        b.write_text("pyyaml  \n\ncrewai==0.80  # pin\n")
+        assert code_runner.requirements_fingerprint(a) == code_runner.requirements_fingerprint(b)
+        b.write_text("pyyaml\ncrewai==0.81\n")
+        assert code_runner.requirements_fingerprint(a) != code_runner.requirements_fingerprint(b)
+
+    def test_fingerprint_keeps_case_outside_package_name(self, tmp_path, monkeypatch):
+        self._setup(tmp_path, monkeypatch)
+        a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+        a.write_text("Typing_Extensions\npkg @ https://Host/Wheels/Pkg.whl\n")
+        b.write_text("typing-extensions\npkg @ https://Host/Wheels/Pkg.whl\n")
+        assert code_runner.requirements_fingerprint(a) == code_runner.requirements_fingerprint(b)
+        b.write_text("typing-extensions\npkg @ https://host/wheels/pkg.whl\n")
+        assert code_runner.requirements_fingerprint(a) != code_runner.requirements_fingerprint(b)
+
+    def test_fingerprint_includes_referenced_files(self, tmp_path, monkeypatch):
+        self._setup(tmp_path, monkeypatch)
+        req = tmp_path / "requirements.txt"
+        req.write_text("-r base.txt\n-c constraints.txt\ncrewai\n")
+        (tmp_path / "base.txt").write_text("pyyaml\n")
+        missing = code_runner.requirements_fingerprint(req)
+        (tmp_path / "constraints.txt").write_text("pyyaml==6.0.1\n")
+        pinned = code_runner.requirements_fingerprint(req)
+        (tmp_path / "constraints.txt").write_text("pyyaml==6.0.2\n")
+        repinned = code_runner.requirements_fingerprint(req)
+        (tmp_path / "base.txt").write_text("pyyaml\nrequests\n")
+        assert len({missing, pinned, repinned, code_runner.requirements_fingerprint(req)}) == 4
+
+    def test_hit_skips_dry_run_until_env_changes(self, tmp_path, monkeypatch):
+        site = self._setup(tmp_path, monkeypatch)
+        req = tmp_path / "requirements.txt"
+        req.write_text("crewai\n")
+        dry_runs = []
+        monkeypatch.setattr(code_runner, "_check_missing_deps", lambda f, r: dry_runs.append(f) or [])
+        run = CodeRun(id="r", session_id="s", work_dir=tmp_path)
+
+        assert code_runner._ensure_deps(req, run) and code_runner._ensure_deps(req, run)
+        assert len(dry_runs) == 1
+        os.utime(site, ns=(0, 0))  # install/uninstall manual muda o site-packages
+        assert code_runner._ensure_deps(req, run)
+        assert len(dry_runs) == 2
+
+
+class TestFrontendCache:
+    """node_modules generations keyed by package.json content, LRU-evicted"""
+
+    def _fake_npm(self, tmp_path, calls):
+        npm = tmp_path / "npm"
+        npm.write_text(f"#!/bin/sh\necho x >> {calls}\nmkdir -p node_modules/react && echo 1 > node_modules/react/index.js\n")
+        npm.chmod(0o755)
+        return npm
+
+    def test_key_ignores_name_and_scripts(self):
+        a = '{"name": "app1", "scripts": {"start": "x"}, "dependencies": {"react": "^18", "axios": "1"}}'
+        b = '{"dependencies": {"axios": "1", "react": "^18"}, "name": "app2", "version": "2.0.0"}'
+        assert code_runner.frontend_cache_key(a) == code_runner.frontend_cache_key(b)
+        assert code_runner.frontend_cache_key(a) != code_runner.frontend_cache_key(a, lock_text="{}")
+
+    def test_generations_reused_and_evicted(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(code_runner, "_FRONTEND_CACHE_DIR", tmp_path / "cache")
+        monkeypatch.setattr(code_runner, "FRONTEND_CACHE_GENERATIONS", 2)
+        calls = tmp_path / "calls.log"
+        npm = self._fake_npm(tmp_path, calls)
+        run = CodeRun(id="r", session_id="s", work_dir=tmp_path)
+        pkgs = [f'{{"dependencies": {{"lib{i}": "1"}}}}' for i in range(3)]
+
+        keys = [code_runner._ensure_frontend_cache(run, pkgs[i], npm, dict(os.environ)) for i in (0, 1, 0, 1)]
+        assert keys[0] == keys[2] and keys[1] == keys[3] and len(calls.read_text().split()) == 2
+
+        front = tmp_path / "frontend"
+        front.mkdir()
+        assert code_runner._link_cache_into(front, run, keys[0])
+        assert (front / "node_modules" / "react" / "index.js").exists()
+
+        os.utime(tmp_path / "cache" / keys[1] / ".ready", (1, 1))  # geração 1 = a mais antiga
+        code_runner._ensure_frontend_cache(run, pkgs[2], npm, dict(os.environ))
+        assert not (tmp_path / "cache" / keys[1]).exists()
+        assert code_runner._generation_ready(keys[0])
@@ -0,0 +1,108 @@
+"""
+Tests for the SQL helpers in app/database.py
+"""
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from app.database import (  # noqa: E402
+    build_chat_page_query,
+    bulk_insert,
+    decode_page_cursor,
+    encode_page_cursor,
+    finish_chat_page,
+)
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, query, params=()):
+        self.statements.append((query, list(params)))
+
+
+class TestBulkInsert:
+    """Multi-row INSERT generation: placeholders, chunking and upserts"""
+
+    def test_empty_rows_execute_nothing(self):
+        cursor = RecordingCursor()
+        assert bulk_insert(cursor, "test_case_uc_results", ["id", "uc_id"], []) == 0
+        assert cursor.statements == []
+
+    def test_one_placeholder_group_per_row(self):
+        cursor = RecordingCursor()
+        rows = [("r1", "UC-01", "{}"), ("r2", "UC-02", "{}")]
+        assert bulk_insert(cursor, "test_case_uc_results", ["id", "uc_id", "result_json"], rows) == 1
+        query, params = cursor.statements[0]
+        assert query == ("INSERT INTO test_case_uc_results (id, uc_id, result_json) "
+                         "VALUES (%s, %s, %s), (%s, %s, %s)")
+        assert params == ["r1", "UC-01", "{}", "r2", "UC-02", "{}"]
+
+    def test_rows_split_by_count_and_bytes(self):
+        cursor = RecordingCursor()
+        rows = [(f"r{i}", "x") for i in range(5)]
+        assert bulk_insert(cursor, "t", ["id", "v"], rows, chunk_rows=2) == 3
+        assert [len(p) // 2 for _, p in cursor.statements] == [2, 2, 1]
+
+        cursor = RecordingCursor()
+        big = [("r1", "a" * 60), ("r2", "b" * 60), ("r3", "c")]
+        assert bulk_insert(cursor, "t", ["id", "v"], big, chunk_rows=100, max_bytes=100) == 2
+        assert [p[0::2] for _, p in cursor.statements] == [["r1"], ["r2", "r3"]]
+
+    def test_on_duplicate_key_update_lists_update_columns(self):
+        cursor = RecordingCursor()
+        bulk_insert(cursor, "t", ["id", "status", "result_json"], [("r1", "ok", "{}")],
+                    update_columns=["status", "result_json"])
+        query, _ = cursor.statements[0]
+        assert query.endswith(" ON DUPLICATE KEY UPDATE status = VALUES(status), "
+                              "result_json = VALUES(result_json)")
+        assert "id = VALUES(id)" not in query
+
+
+class TestKeysetPagination:
+    """Opaque cursors and page boundaries of the chat histories"""
+
+    def test_cursor_round_trip(self):
+        ts = datetime(2026, 3, 1, 12, 30, 5, 123456)
+        cursor = encode_page_cursor(ts, "m-42")
+        assert "=" not in cursor
+        assert decode_page_cursor(cursor) == ("2026-03-01 12:30:05.123456", "m-42")
+
+    def test_invalid_cursor_rejected(self):
+        with pytest.raises(ValueError):
+            decode_page_cursor("not-a-cursor")
+        with pytest.raises(ValueError):
+            build_chat_page_query("users", 10)
+
+    def test_cursor_continues_after_last_row(self):
+        cursor = encode_page_cursor("2026-03-01 12:00:00.000000", "m-2")
+        query, params = build_chat_page_query("chat_messages", 2, cursor, filters=" AND is_deleted = 0")
+        assert "WHERE session_id = %s AND is_deleted = 0 AND (timestamp > %s OR (timestamp = %s AND id > %s))" in query
+        assert query.endswith("ORDER BY timestamp ASC, id ASC LIMIT %s")
+        assert params == ("2026-03-01 12:00:00.000000", "2026-03-01 12:00:00.000000", "m-2")
+
+        query, _ = build_chat_page_query("chat_messages", 2, cursor, newest_first=True)
+        assert "timestamp < %s" in query and "ORDER BY timestamp DESC, id DESC" in query
+
+    def test_page_boundaries(self):
+        rows = [{"id": f"m-{i}", "timestamp": f"2026-03-01 12:00:0{i}", "metadata": None} for i in range(3)]
+
+        page = finish_chat_page([dict(r) for r in rows], limit=2)
+        assert [m["id"] for m in page["messages"]] == ["m-0", "m-1"] and page["has_more"]
+        assert decode_page_cursor(page["next_cursor"]) == ("2026-03-01 12:00:01", "m-1")
+
+        last = finish_chat_page([dict(r) for r in rows[:2]], limit=2)
+        assert last["has_more"] is False and last["next_cursor"] is None
+
+        newest = finish_chat_page([dict(r) for r in reversed(rows)], limit=2, newest_first=True)
+        assert [m["id"] for m in newest["messages"]] == ["m-1", "m-2"]
+        assert decode_page_cursor(newest["next_cursor"])[1] == "m-1"
+
+    def test_json_field_parsed_or_kept_raw(self):
+        rows = [{"id": "m-1", "timestamp": "t1", "metadata": '{"kind": "diff"}'},
+                {"id": "m-2", "timestamp": "t2", "metadata": "gerado por code_generation"}]
+        page = finish_chat_page(rows, limit=10)
+        assert [m["metadata"] for m in page["messages"]] == [{"kind": "diff"}, "gerado por code_generation"]
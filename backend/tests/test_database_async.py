@@ -0,0 +1,119 @@
+"""
+Tests for the async database layer (app/database_async.py)
+"""
+import asyncio
+import types
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from app import database, database_async  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+        self.rowcount = len(rows)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params):
+        self.executed.append((query, params))
+
+    async def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    async def fetchall(self):
+        return tuple(self.rows)
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self, rows):
+        self.cursor_obj = FakeCursor(rows)
+        self.commits = 0
+
+    def cursor(self, *args):
+        return self.cursor_obj
+
+    async def ping(self, reconnect=False):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+        self.released = []
+
+    async def acquire(self):
+        return self.conn
+
+    def release(self, conn):
+        self.released.append(conn)
+
+
+@pytest.fixture(autouse=True)
+def reset_pool(monkeypatch):
+    monkeypatch.setattr(database_async, "async_pool", None)
+    monkeypatch.setattr(database_async, "_pool_lock", None)
+    monkeypatch.setattr(database_async, "_pool_failed_at", None)
+
+
+def fake_aiomysql(create_pool):
+    return types.SimpleNamespace(DictCursor=object, create_pool=create_pool)
+
+
+class TestAsyncDatabase:
+    """Pool round trip and sync fallback when the pool cannot be created"""
+
+    def test_query_round_trip_through_pool(self, monkeypatch):
+        conn = FakeConnection([{"id": "s1", "status": "completed"}])
+        pool = FakePool(conn)
+
+        async def create_pool(**kwargs):
+            return pool
+
+        monkeypatch.setattr(database_async, "aiomysql", fake_aiomysql(create_pool))
+        row = asyncio.run(database_async.get_execution_session_status_async("s1"))
+
+        assert row == {"id": "s1", "status": "completed"}
+        assert conn.cursor_obj.executed[0][1] == ("s1",)
+        assert conn.commits == 1 and pool.released == [conn]
+
+    def test_pool_init_failure_falls_back_to_sync(self, monkeypatch):
+        attempts, sync_calls = [], []
+
+        async def create_pool(**kwargs):
+            attempts.append(kwargs)
+            raise ConnectionRefusedError("banco fora do ar")
+
+        def execute_query(query, params=None, fetch_one=False, fetch_all=False):
+            sync_calls.append(params)
+            return [{"id": "m1"}] if fetch_all else {"count": 3}
+
+        monkeypatch.setattr(database_async, "aiomysql", fake_aiomysql(create_pool))
+        monkeypatch.setattr(database, "execute_query", execute_query)
+
+        async def scenario():
+            count = await database_async.get_chat_message_count_async("s1")
+            versions = await database_async.get_agents_yaml_versions_async("s1")
+            return count, versions
+
+        assert asyncio.run(scenario()) == (3, [{"id": "m1"}])
+        assert len(attempts) == 1 and sync_calls == [("s1",), ("s1",)]
@@ -0,0 +1,138 @@
+"""
+Tests for the generated WebSocket runtime (_template_websocket_server_py in agents/langnetagents.py)
+"""
+import ast
+import asyncio
+import json
+import sys
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+
+def _template_source(ws_port=8765):
+    """Renderiza o websocket_server.py gerado sem importar langnetagents."""
+    src = (Path(__file__).resolve().parents[1] / "agents" / "langnetagents.py").read_text(encoding="utf-8")
+    node = next(n for n in ast.parse(src).body if isinstance(n, ast.FunctionDef)
+                and n.name == "_template_websocket_server_py")
+    ns = {}
+    exec(compile(ast.Module(body=[node], type_ignores=[]), "langnetagents.py", "exec"), ns)
+    return ns["_template_websocket_server_py"](ws_port)
+
+
+class FakeWS:
+    """Conexão que entrega as mensagens e segue aberta por `linger` segundos."""
+
+    def __init__(self, messages, linger=0.5):
+        self.messages = messages
+        self.linger = linger
+        self.sent = []
+
+    async def send(self, raw):
+        self.sent.append(json.loads(raw))
+
+    def __aiter__(self):
+        return self._incoming()
+
+    async def _incoming(self):
+        for msg in self.messages:
+            yield json.dumps(msg)
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(self.linger)
+
+    def of_type(self, msg_type):
+        return [m["data"] for m in self.sent if m["type"] == msg_type]
+
+
+@pytest.fixture
+def runtime(tmp_path, monkeypatch):
+    """Carrega o websocket_server.py gerado com crewai/websockets/tools/adapters falsos."""
+    pytest.importorskip("dotenv")
+    persisted, kickoffs = [], []
+
+    class Agent:
+        built = 0
+
+        def __init__(self, **kwargs):
+            Agent.built += 1
+
+    class Crew:
+        def __init__(self, **kwargs):
+            pass
+
+        def kickoff(self):
+            start = time.perf_counter()
+            time.sleep(0.2)
+            kickoffs.append((start, time.perf_counter()))
+            return types.SimpleNamespace(raw='{"nivel_urgencia": "alta"}')
+
+    crewai = types.ModuleType("crewai")
+    crewai.Agent, crewai.Crew = Agent, Crew
+    crewai.Task = crewai.LLM = lambda *a, **k: object()
+    crewai.Process = types.SimpleNamespace(sequential="sequential")
+    websockets = types.ModuleType("websockets")
+    websockets.ConnectionClosed = type("ConnectionClosed", (Exception,), {})
+    tools = types.ModuleType("tools")
+    tools.TOOL_REGISTRY = {}
+    adapters = types.ModuleType("adapters")
+    adapters.triagem_deterministic = lambda payload: persisted.append(payload) or {"id": "t1"}
+    for name, mod in {"crewai": crewai, "websockets": websockets, "tools": tools, "adapters": adapters}.items():
+        monkeypatch.setitem(sys.modules, name, mod)
+
+    (tmp_path / "agents.yaml").write_text(json.dumps({"triador": {"role": "Triador"}}))
+    (tmp_path / "tasks.yaml").write_text(json.dumps({"triagem": {"agent": "triador", "description": "Triar"}}))
+    monkeypatch.chdir(tmp_path)
+    module = types.ModuleType("websocket_server")
+    exec(compile(_template_source(), "websocket_server.py", "exec"), module.__dict__)
+    module.persisted, module.kickoffs, module.Agent = persisted, kickoffs, Agent
+    yield module
+    module._EXECUTOR.shutdown(wait=True)
+
+
+def _execute(request_id):
+    return {"type": "execute_task", "data": {"task_name": "triagem", "request_id": request_id,
+                                             "input_data": {"id_atendimento": "a1"}}}
+
+
+class TestGeneratedWebSocketRuntime:
+    """Per-connection concurrency and cancellation"""
+
+    def test_template_compiles(self):
+        compile(_template_source(9000), "websocket_server.py", "exec")
+
+    def test_requests_on_one_connection_run_concurrently(self, runtime):
+        ws = FakeWS([_execute("r1"), _execute("r2")])
+        asyncio.run(runtime._handle_client(ws))
+
+        done = ws.of_type("task_completed")
+        assert sorted(d["request_id"] for d in done) == ["r1", "r2"]
+        (start1, end1), (start2, end2) = sorted(runtime.kickoffs)
+        assert start2 < end1  # o 2º kickoff começou antes do 1º terminar
+        assert runtime._INFLIGHT == 0
+
+    def test_cancel_during_kickoff_skips_persistence(self, runtime):
+        ws = FakeWS([_execute("r1"), {"type": "cancel_task", "data": {"request_id": "r1"}}])
+        asyncio.run(runtime._handle_client(ws))
+
+        assert ws.of_type("task_cancelled") == [{"task_name": "triagem", "request_id": "r1"}]
+        assert ws.of_type("task_completed") == [] and runtime.persisted == []
+        assert runtime._INFLIGHT == 0
+
+
+class TestGeneratedAgentCache:
+    """Agents reused from the per-agent pool and timing stats"""
+
+    def test_agents_reused_across_requests(self, runtime):
+        asyncio.run(runtime._handle_client(FakeWS([_execute("r1")])))
+        ws = FakeWS([_execute("r2")])
+        asyncio.run(runtime._handle_client(ws))
+
+        assert [d["request_id"] for d in ws.of_type("task_completed")] == ["r2"]
+        assert runtime.Agent.built == 1 and runtime.STATS["agent_reuses"] == 1
+        assert len(runtime.persisted) == 2
+        info = FakeWS([{"type": "get_task_info"}], linger=0)
+        asyncio.run(runtime._handle_client(info))
+        stats = info.of_type("task_info")[0]["stats"]
+        assert stats["pooled_agents"] == {"triador": 1} and stats["llm_ms"] >= 400
@@ -545,6 +545,135 @@ class TestLangNetAPI:
         assert "backstory" in agent
 
 
+# ============================================================================
+# LLM RESPONSE CACHE TESTS
+# ============================================================================
+
+class TestLLMResponseCache:
+    """Test content-addressed LLM response cache"""
+
+    def test_key_depends_on_every_field(self):
+        """Any change in provider/model/persona/prompt/temperature changes the key"""
+        from agents.langnetcache import make_cache_key
+
+        base = ("lmstudio", "qwen", "persona", "desc", "out", 0.2)
+        key = make_cache_key(*base)
+        assert key == make_cache_key(*base)
+        for i, alt in enumerate(["openai", "gpt", "other", "desc2", "out2", 0.3]):
+            changed = list(base)
+            changed[i] = alt
+            assert make_cache_key(*changed) != key
+
+    def test_hit_miss_and_ttl(self, tmp_path):
+        """Stored responses are returned until they expire"""
+        from agents.langnetcache import LLMResponseCache
+
+        cache = LLMResponseCache(path=tmp_path / "c.sqlite3", ttl_seconds=3600)
+        assert cache.get("k1") is None
+        cache.put("k1", "response text", task_name="analyze_document")
+        assert cache.get("k1") == "response text"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+
+        expired = LLMResponseCache(path=tmp_path / "c.sqlite3", ttl_seconds=1)
+        with patch("agents.langnetcache.time.time", return_value=10**12):
+            assert expired.get("k1") is None
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        """Least recently used entries are evicted when over the size budget"""
+        from agents.langnetcache import LLMResponseCache
+
+        cache = LLMResponseCache(path=tmp_path / "c.sqlite3", max_bytes=250)
+        cache.put("a", "a" * 100)
+        cache.put("b", "b" * 100)
+        assert cache.get("a") is not None  # "a" becomes most recently used
+        cache.put("c", "c" * 100)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["evictions"] == 1
+
+
+# ============================================================================
+# CHECKPOINT TESTS
+# ============================================================================
+
+class TestPipelineCheckpoints:
+    """Test checkpoint persistence used to resume the full pipeline"""
+
+    def test_save_and_resume_point(self, tmp_path, sample_state):
+        """The manifest points at the first task not yet completed"""
+        from agents import langnetcheckpoint as ck
+
+        with patch.object(ck, "CHECKPOINT_ROOT", tmp_path):
+            ck.start_checkpointing("exec-1", ["analyze_document", "extract_requirements", "suggest_agents"])
+            ck.save_checkpoint("exec-1", "analyze_document", sample_state)
+            ck.save_checkpoint("exec-1", "extract_requirements", {**sample_state, "marker": 2})
+
+            info = ck.get_checkpoint_info("exec-1")
+            assert info["completed"] == ["analyze_document", "extract_requirements"]
+            assert info["next_task"] == "suggest_agents"
+            assert ck.load_checkpoint("exec-1")["marker"] == 2
+            assert "marker" not in ck.load_checkpoint("exec-1", "analyze_document")
+
+            assert ck.delete_checkpoints("exec-1")
+            assert ck.get_checkpoint_info("exec-1") == {}
+
+    def test_rejects_unsafe_execution_id(self):
+        """Execution ids cannot escape the checkpoint directory"""
+        from agents.langnetcheckpoint import load_checkpoint
+
+        with pytest.raises(ValueError):
+            load_checkpoint("../etc")
+
+
+# ============================================================================
+# DAG SCHEDULER TESTS
+# ============================================================================
+
+class TestTaskScheduler:
+    """Test dependency-aware task scheduling"""
+
+    REGISTRY = {
+        "a": {"requires": [], "produces": ["x"]},
+        "b": {"requires": ["x"], "produces": ["y"]},
+        "c": {"requires": ["x"], "produces": ["z"]},
+        "d": {"requires": ["y", "z"], "produces": ["w"]},
+    }
+
+    @staticmethod
+    def _fake_execute(task_name, state, verbose_callback=None):
+        state["execution_log"].append({"task": task_name, "status": "completed"})
+        produced = TestTaskScheduler.REGISTRY[task_name]["produces"][0]
+        inputs = [state.get(k) for k in TestTaskScheduler.REGISTRY[task_name]["requires"]]
+        return {**state, produced: f"{task_name}({','.join(map(str, inputs))})",
+                "completed_tasks": state.get("completed_tasks", 0) + 1}
+
+    def test_plan_waves_groups_independent_tasks(self):
+        """Tasks reading disjoint keys share a wave"""
+        from agents.langnetscheduler import plan_waves
+
+        assert plan_waves(["a", "b", "c", "d"], self.REGISTRY) == [["a"], ["b", "c"], ["d"]]
+
+    def test_parallel_matches_sequential(self):
+        """Parallel execution merges to the same state as sequential execution"""
+        from agents.langnetscheduler import execute_task_dag
+
+        def run(workers):
+            state = {"execution_log": [], "errors": [], "completed_tasks": 0, "total_tasks": 4}
+            return execute_task_dag(["a", "b", "c", "d"], state, self._fake_execute,
+                                    self.REGISTRY, max_workers=workers)
+
+        sequential, parallel = run(1), run(4)
+        assert parallel["w"] == sequential["w"] == "d(b(a()),c(a()))"
+        assert parallel["completed_tasks"] == 4
+        assert [e["task"] for e in parallel["execution_log"]] == ["a", "b", "c", "d"]
+
+
 # ============================================================================
 # INTEGRATION TESTS
 # ============================================================================
@@ -0,0 +1,28 @@
+"""
+Tests for the content-addressed LLM response cache (agents/langnetcache.py)
+"""
+from agents.langnetcache import LLMResponseCache, is_cacheable_response, make_cache_key
+
+
+class TestLLMResponseCache:
+    """Round trip and cache eligibility of task outputs"""
+
+    def test_put_get_round_trip(self, tmp_path):
+        cache = LLMResponseCache(path=tmp_path / "responses.sqlite3")
+        key = make_cache_key("openai", "gpt-4o", "persona", "descrição", "JSON object", 0.2)
+        cache.put(key, '{"structure": {"sections": []}}', task_name="analyze_document")
+        assert cache.get(key) == '{"structure": {"sections": []}}'
+
+    def test_json_task_accepts_fenced_json_and_rejects_unparseable(self):
+        expected = "JSON object with analysis from BOTH documents"
+        assert is_cacheable_response('{"structure": {}, "metadata": {}}', expected)
+        assert is_cacheable_response('```json\n{"structure": {}, "metadata": {}}\n```', expected)
+        assert is_cacheable_response('```\n{"structure": {}, "metadata": {}}\n```\n', expected)
+        assert not is_cacheable_response("Aqui está a análise: {structure: ...", expected)
+        assert not is_cacheable_response('```json\n{"structure": {"sections": [\n```', expected)
+
+    def test_markdown_task_accepts_prose(self):
+        expected = "Complete Markdown document following IEEE 830"
+        assert is_cacheable_response("# Especificação\n\n## 1. Introdução", expected)
+        assert not is_cacheable_response("   curta  ", expected)
+        assert not is_cacheable_response(None, expected)
@@ -0,0 +1,60 @@
+"""
+Tests for map-reduce splitting and merging (agents/langnetmapreduce.py)
+"""
+import json
+
+from agents.langnetmapreduce import merge_requirements, reduce_results, split_document_groups
+
+
+def _content(docs):
+    out = ""
+    for name, chunks in docs:
+        out += f"\n\n{'=' * 80}\nDOCUMENT: {name} (type: pdf)\n{'=' * 80}\n\n"
+        out += "\n\n---CHUNK---\n\n".join(chunks)
+    return out
+
+
+class TestSplit:
+    """Groups respect document/chunk boundaries and the token budget"""
+
+    def test_small_content_is_not_split(self):
+        assert split_document_groups(_content([("a.pdf", ["curto"])]), group_tokens=100, min_tokens=1000) == []
+
+    def test_groups_keep_document_names(self):
+        chunks = [f"Cláusula {i}. " + "texto do edital " * 40 for i in range(10)]
+        content = _content([("edital.pdf", chunks), ("anexo.pdf", chunks[:2])])
+        groups = split_document_groups(content, group_tokens=500, min_tokens=100)
+        assert len(groups) > 2
+        assert all(g.count("DOCUMENT: ") >= 1 for g in groups)
+        assert "DOCUMENT: anexo.pdf" in groups[-1]
+        joined = "".join(groups)
+        assert all(f"Cláusula {i}." in joined for i in range(10))
+
+
+class TestReduce:
+    """Requirements are deduplicated by id/similarity and renumbered"""
+
+    def test_merge_dedupes_and_renumbers(self):
+        a = {"functional_requirements": [
+                {"id": "FR-001", "description": "Agente de IA para captura dos certames", "priority": "medium",
+                 "evidence": "trecho 1"},
+                {"id": "FR-002", "description": "Cadastro inteligente do portfólio", "priority": "high"}],
+             "business_context": {"geographic_scope": ["Bahia"], "industry": "Not specified"},
+             "web_research_queries": ["licitações bahia", "Lei 14.133 requisitos"]}
+        b = {"functional_requirements": [
+                {"id": "FR-001", "description": "Agente de IA para a captura dos certames", "priority": "high",
+                 "evidence": "trecho 2"},
+                {"id": "FR-002", "description": "Emissão de relatórios de desempenho", "priority": "low"}],
+             "business_context": {"geographic_scope": ["Sergipe", "Bahia"], "industry": "Saúde"},
+             "web_research_queries": ["Bahia licitações"]}
+        merged = merge_requirements([a, b])
+        frs = merged["functional_requirements"]
+        assert [f["id"] for f in frs] == ["FR-001", "FR-002", "FR-003"]
+        assert frs[0]["priority"] == "high" and frs[0]["evidence"] == "trecho 1 | trecho 2"
+        assert merged["business_context"] == {"geographic_scope": ["Bahia", "Sergipe"], "industry": "Saúde"}
+        assert merged["web_research_queries"] == ["licitações bahia", "Lei 14.133 requisitos"]
+
+    def test_reduce_reports_unparseable_groups(self):
+        ok = "```json\n" + json.dumps({"functional_requirements": [{"id": "FR-001", "description": "x"}]}) + "\n```"
+        merged, failed = reduce_results("requirements", [ok, "resposta truncada {", ""])
+        assert failed == [2, 3] and len(merged["functional_requirements"]) == 1
@@ -0,0 +1,151 @@
+"""
+Tests for the MCP session pool and tool-catalog cache (app/mcp_sessions.py)
+"""
+import ast
+import asyncio
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from app import mcp_sessions
+from app.mcp_sessions import MCPSessionPool
+
+
+class FakeSession:
+    def __init__(self, log):
+        self.log = log
+
+    async def list_tools(self):
+        self.log.append("list")
+        return SimpleNamespace(tools=[SimpleNamespace(name="fetch", description="Busca URL", inputSchema={})])
+
+    async def send_ping(self):
+        self.log.append("ping")
+
+
+def fake_opener(log):
+    @contextlib.asynccontextmanager
+    async def _open(transport, url, headers, command=None):
+        log.append("open")
+        try:
+            yield FakeSession(log)
+        finally:
+            log.append("close")
+    return _open
+
+
+class TestMCPSessionPool:
+    """Warm sessions, versioned catalog cache and idle eviction"""
+
+    def test_session_reused_and_catalog_cached(self, monkeypatch):
+        log = []
+        monkeypatch.setattr(mcp_sessions, "open_client_session", fake_opener(log))
+
+        async def scenario():
+            pool = MCPSessionPool(health_seconds=3600)
+            first = await pool.list_tools("stdio", None, None, "uvx mcp-server-fetch")
+            await pool.list_tools("stdio", None, None, "uvx mcp-server-fetch")
+            await pool.list_tools("stdio", None, None, "uvx mcp-server-fetch", force=True)
+            stats = pool.stats()
+            await pool.close()
+            return first, stats
+
+        tools, stats = asyncio.run(scenario())
+        assert tools == [{"name": "fetch", "description": "Busca URL", "input_schema": {}}]
+        assert log == ["open", "list", "list", "close"]
+        assert stats["connects"] == 1 and stats["catalog_hits"] == 1
+
+    def test_invalidate_bumps_version_and_generation(self, monkeypatch):
+        log = []
+        monkeypatch.setattr(mcp_sessions, "open_client_session", fake_opener(log))
+
+        async def scenario():
+            pool = MCPSessionPool(health_seconds=3600)
+            await pool.list_tools("sse", "http://mcp/sse", {"k": "v"})
+            gen = mcp_sessions.catalog_generation()
+            await pool.invalidate("sse", "http://mcp/sse", {"k": "v"}, close=True)
+            assert mcp_sessions.catalog_generation() == gen + 1
+            await pool.list_tools("sse", "http://mcp/sse", {"k": "v"})
+            await pool.close()
+
+        asyncio.run(scenario())
+        assert log == ["open", "list", "close", "open", "list", "close"]
+
+    def test_idle_sessions_evicted(self, monkeypatch):
+        log = []
+        monkeypatch.setattr(mcp_sessions, "open_client_session", fake_opener(log))
+
+        async def scenario():
+            pool = MCPSessionPool(idle_seconds=0, health_seconds=3600)
+            await pool.list_tools("sse", "http://mcp/sse", None)
+            await asyncio.sleep(0.01)
+            evicted = await pool.evict_idle()
+            await pool.close()
+            return evicted, pool.stats()["open_sessions"]
+
+        assert asyncio.run(scenario()) == (1, 0)
+        assert log[-1] == "close"
+
+
+def _generated_runtime():
+    """Executa o _MCP_SESSION_RUNTIME emitido em mcp_tools.py sem importar langnetagents."""
+    src = (Path(__file__).resolve().parents[1] / "agents" / "langnetagents.py").read_text(encoding="utf-8")
+    node = next(n for n in ast.parse(src).body if isinstance(n, ast.Assign)
+                and getattr(n.targets[0], "id", None) == "_MCP_SESSION_RUNTIME")
+    ns = {"os": os, "json": json, "asyncio": asyncio, "threading": threading, "time": time}
+    exec(ast.literal_eval(node.value), ns)
+    return ns
+
+
+class TestGeneratedMCPRuntime:
+    """Retry/eviction of the generated runtime only for dead sessions"""
+
+    def _install(self, ns, errors):
+        opened = []
+
+        class Session:
+            def __init__(self):
+                self.calls = 0
+
+            async def call_tool(self, tool, args):
+                self.calls += 1
+                if errors:
+                    raise errors.pop(0)
+                return SimpleNamespace(content=[SimpleNamespace(text="ok")])
+
+        async def _open(url, transport, headers):
+            entry = {"session": Session(), "closing": asyncio.Event(),
+                     "task": asyncio.get_running_loop().create_future(), "last": time.monotonic()}
+            opened.append(entry)
+            return entry
+
+        ns["_open"] = _open
+        return opened
+
+    def test_tool_error_not_retried_and_session_kept(self):
+        ns = _generated_runtime()
+        opened = self._install(ns, [ValueError("tool falhou")])
+
+        async def scenario():
+            try:
+                await ns["_call_async"]("http://mcp/sse", "sse", None, "write", {})
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("erro da tool deveria subir")
+            return await ns["_call_async"]("http://mcp/sse", "sse", None, "write", {})
+
+        assert asyncio.run(scenario()) == "ok"
+        assert len(opened) == 1 and opened[0]["session"].calls == 2
+        assert not opened[0]["closing"].is_set()
+
+    def test_dead_session_evicted_and_retried(self):
+        ns = _generated_runtime()
+        opened = self._install(ns, [ConnectionResetError("conexão caiu")])
+
+        assert asyncio.run(ns["_call_async"]("http://mcp/sse", "sse", None, "read", {})) == "ok"
+        assert len(opened) == 2 and opened[0]["closing"].is_set()
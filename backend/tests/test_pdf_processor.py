@@ -0,0 +1,26 @@
+"""
+Tests for incremental chunking in utils/pdf_processor.py
+"""
+import random
+
+from utils.pdf_processor import IncrementalChunker, chunk_text, iter_text_chunks
+
+
+class TestIncrementalChunker:
+    """Streaming chunker must match chunk_text over the concatenated text"""
+
+    def test_matches_chunk_text_for_random_splits(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            text = "".join(rng.choice("ab \n") for _ in range(rng.randint(0, 3000)))
+            size = rng.randint(1, 400)
+            overlap = rng.randint(-5, size + 5)
+            cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, 8)))
+            pieces = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+            assert list(iter_text_chunks(pieces, size, overlap)) == chunk_text(text, size, overlap)
+
+    def test_buffer_stays_bounded(self):
+        chunker = IncrementalChunker(max_chunk_size=1000, overlap=200)
+        for _ in range(500):
+            chunker.feed("x" * 3000)
+            assert len(chunker._buffer) <= 1000
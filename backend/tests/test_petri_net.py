@@ -0,0 +1,55 @@
+"""
+Tests for the indexed Petri net model and state-space analysis (agents/langnetpetri.py)
+"""
+from agents.langnetpetri import PetriNet, analyze_petri_net, behavior_warnings
+
+
+def _net(places, transitions, arcs):
+    return {
+        "lugares": [{"id": p, "tokens": t} for p, t in places],
+        "transicoes": [{"id": t, "guard": g} for t, g in transitions],
+        "arcos": [{"origem": a, "destino": b, "peso": w} for a, b, w in arcs],
+    }
+
+
+class TestTopology:
+    """Linear-time topology checks"""
+
+    def test_warning_categories(self):
+        net = _net(
+            [("P0", 1), ("P1", 0), ("P2", 0), ("P_orphan", 0)],
+            [("T1", ""), ("T2", ""), ("T_dead", "")],
+            [("P0", "T1", 1), ("P0", "T2", 1), ("T1", "P1", 1), ("T2", "P2", 1)],
+        )
+        warnings = PetriNet.from_dict(net).topology_warnings()
+        assert [w.split(":")[0] for w in warnings] == [
+            "dead_transition", "branch_no_guards", "orphan_place",
+        ]
+
+
+class TestReachability:
+    """Coverability exploration"""
+
+    def test_deadlock_vs_terminal(self):
+        # T1 precisa de P0 e P1, mas P1 nunca recebe token → deadlock em P0
+        stuck = _net([("P0", 1), ("P1", 0), ("P_end", 0)], [("T1", "")],
+                     [("P0", "T1", 1), ("P1", "T1", 1), ("T1", "P_end", 1)])
+        r = analyze_petri_net(stuck)["reachability"]
+        assert r["deadlocks"] == [{"P0": 1}]
+        assert r["dead_transitions"] == ["T1"]
+
+        flow = _net([("P0", 1), ("P_end", 0)], [("T1", "")],
+                    [("P0", "T1", 1), ("T1", "P_end", 1)])
+        r = analyze_petri_net(flow)["reachability"]
+        assert r["deadlocks"] == [] and r["terminal_markings"] == [{"P_end": 1}]
+        assert r["bounded"] and r["safe"]
+
+    def test_unbounded_place_gets_omega(self):
+        # T1 devolve o token a P0 e acumula em P1
+        net = _net([("P0", 1), ("P1", 0)], [("T1", "")],
+                   [("P0", "T1", 1), ("T1", "P0", 1), ("T1", "P1", 1)])
+        analysis = analyze_petri_net(net, max_states=100)
+        r = analysis["reachability"]
+        assert not r["truncated"] and r["bounded"] is False
+        assert r["place_bounds"] == {"P0": 1, "P1": "ω"}
+        assert any(w.startswith("unbounded_place") for w in behavior_warnings(analysis))
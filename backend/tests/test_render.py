@@ -0,0 +1,65 @@
+"""
+Tests for the shared mockup renderer (agents/langnetrender.py)
+"""
+import pytest
+
+from agents.langnetrender import MockupRenderer, mockup_cache_key
+
+
+class TestMockupRenderer:
+    """Content-hash PNG cache and batched rendering"""
+
+    def test_cached_png_skips_browser(self, tmp_path):
+        renderer = MockupRenderer(cache_dir=tmp_path)
+        html = "<html><body>Tela</body></html>"
+        renderer.cache_put(mockup_cache_key(html, 960), b"\x89PNG-fake")
+        uri = renderer.render(html)
+        assert uri.startswith("data:image/png;base64,")
+        assert renderer.stats()["cache_hits"] == 1 and renderer._loop is None
+
+    def test_render_many_dedupes_identical_html(self, tmp_path, monkeypatch):
+        renderer = MockupRenderer(cache_dir=tmp_path)
+        calls = []
+
+        async def fake_render(html, width):
+            calls.append(html)
+            return b"png:" + html.encode()
+
+        monkeypatch.setattr(renderer, "_render_async", fake_render)
+        out = renderer.render_many({"a": "<p>1</p>", "b": "<p>1</p>", "c": "<p>2</p>", "d": ""})
+        assert sorted(out) == ["a", "b", "c"] and sorted(calls) == ["<p>1</p>", "<p>2</p>"]
+        assert len(list(tmp_path.glob("*.png"))) == 2
+        renderer.render_many({"a": "<p>1</p>"})
+        assert len(calls) == 2
+
+    def test_failed_launch_stops_playwright(self, tmp_path, monkeypatch):
+        import asyncio
+        import sys
+        import types
+
+        stopped = []
+
+        class FakeChromium:
+            async def launch(self, **kwargs):
+                raise RuntimeError("chromium ausente")
+
+        class FakePlaywright:
+            chromium = FakeChromium()
+
+            async def stop(self):
+                stopped.append(True)
+
+        class FakeStarter:
+            async def start(self):
+                return FakePlaywright()
+
+        fake = types.ModuleType("playwright.async_api")
+        fake.async_playwright = FakeStarter
+        monkeypatch.setitem(sys.modules, "playwright", types.ModuleType("playwright"))
+        monkeypatch.setitem(sys.modules, "playwright.async_api", fake)
+
+        renderer = MockupRenderer(cache_dir=tmp_path)
+        with pytest.raises(RuntimeError):
+            asyncio.run(renderer._render_async("<p>x</p>", 960))
+        assert stopped == [True] and renderer._playwright is None
+        assert renderer._active == 0
@@ -0,0 +1,118 @@
+"""
+Tests for the shared web-search client and fan-out (agents/langnetsearch.py)
+"""
+import asyncio
+
+from agents import langnetsearch
+from agents.langnetsearch import merge_results, multi_search, normalize_url
+
+
+class TestMerge:
+    """URL normalization and deduplication"""
+
+    def test_normalize_url(self):
+        assert normalize_url("https://www.Example.com/a/#top") == normalize_url("http://example.com/a")
+
+    def test_first_occurrence_wins_and_sources_accumulate(self):
+        merged = merge_results([
+            ("serper", {"success": True, "query": "q", "results": [
+                {"title": "A", "link": "https://a.com/x", "snippet": "sa"}]}),
+            ("tavily", {"success": True, "query": "q", "results": [
+                {"title": "A2", "url": "https://www.a.com/x/", "content": "ca"},
+                {"title": "B", "url": "https://b.com", "content": "cb"}]}),
+            ("serpapi", {"success": False, "error": "boom"}),
+        ])
+        assert [(m["title"], m["sources"]) for m in merged] == [
+            ("A", ["serper", "tavily"]), ("B", ["tavily"]),
+        ]
+
+
+class TestFanOut:
+    """multi_search issues every query × engine concurrently"""
+
+    def test_requests_overlap(self, monkeypatch):
+        in_flight, peak = 0, 0
+
+        async def fake_search(engine, query, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"success": True, "query": query,
+                    "results": [{"title": query, "link": f"https://{query}.com"}]}
+
+        monkeypatch.setattr(langnetsearch, "search_async", fake_search)
+        out = asyncio.run(multi_search(["q1", "q2"], engines=["serper", "tavily"]))
+        assert peak == 4
+        assert out["total_results"] == 2 and out["errors"] == []
+
+
+class TestSearchCache:
+    """Normalized persistent result cache"""
+
+    def test_normalized_query_variants_share_key(self):
+        from agents.langnetsearchcache import make_search_key, normalize_query
+
+        assert normalize_query("Requisitos da LGPD") == normalize_query("lgpd  requisitos!")
+        assert normalize_query("Autenticação em Node.js") == "autenticacao node.js"
+        k = make_search_key("serper", "Requisitos da LGPD", {"num_results": 10})
+        assert k == make_search_key("serper", "lgpd requisitos", {"num_results": 10})
+        assert k != make_search_key("serper", "lgpd requisitos", {"num_results": 5})
+        assert k != make_search_key("tavily", "lgpd requisitos", {"num_results": 10})
+
+    def test_fresh_stale_and_revalidate(self, tmp_path, monkeypatch):
+        import threading
+        from unittest.mock import patch
+        from agents.langnetsearchcache import SearchResultCache
+
+        cache = SearchResultCache(path=tmp_path / "s.sqlite3", ttls={"serper": 100}, stale_seconds=100)
+        monkeypatch.setattr("agents.langnetsearchcache.get_search_cache", lambda: cache)
+        calls = []
+        refreshed = threading.Event()
+
+        def fake_fetch(engine, query, **kwargs):
+            calls.append(query)
+            refreshed.set()
+            return {"success": True, "query": query, "results": [{"link": f"https://x/{len(calls)}"}]}
+
+        monkeypatch.setattr(langnetsearch, "_fetch_sync", fake_fetch)
+        first = langnetsearch.search_sync("serper", "LGPD requisitos")
+        again = langnetsearch.search_sync("serper", "requisitos lgpd", num_results=10)
+        assert calls == ["LGPD requisitos"] and "cache" not in first
+        assert again["cache"] == "hit" and again["query"] == "requisitos lgpd"
+
+        now = __import__("time").time()
+        refreshed.clear()
+        with patch("agents.langnetsearchcache.time.time", return_value=now + 150):
+            stale = langnetsearch.search_sync("serper", "lgpd requisitos")
+            assert stale["cache"] == "stale" and stale["results"] == first["results"]
+            assert refreshed.wait(2)
+        with patch("agents.langnetsearchcache.time.time", return_value=now + 500):
+            assert cache.lookup("serper", "missing")[1] == "miss"
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["stale_hits"] == 1 and stats["refreshes"] == 1
+
+    def test_reads_result_files_from_before_the_shared_store(self, tmp_path):
+        import sqlite3
+
+        from agents.langnetsearchcache import SearchResultCache
+
+        path = tmp_path / "old.sqlite3"
+        conn = sqlite3.connect(str(path))
+        conn.execute(
+            "CREATE TABLE search_results (key TEXT PRIMARY KEY, engine TEXT NOT NULL,"
+            " normalized_query TEXT NOT NULL, response TEXT NOT NULL,"
+            " created_at REAL NOT NULL, hit_count INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.execute(
+            "INSERT INTO search_results VALUES ('k', 'serper', 'lgpd', '{\"success\": true}',"
+            " strftime('%s','now'), 0)"
+        )
+        conn.commit()
+        conn.close()
+
+        cache = SearchResultCache(path=path)
+        assert cache.lookup("serper", "k") == ({"success": True}, "hit")
+        cache.put("tavily", "LGPD", "k2", {"success": True, "results": []})
+        assert cache.stats()["entries_per_engine"] == {"serper": 1, "tavily": 1}
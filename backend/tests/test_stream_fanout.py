@@ -0,0 +1,33 @@
+"""
+Tests for the LLM delta fan-out sink (api/langnetwebsocket.py)
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from agents.langnetstream import GenerationAborted  # noqa: E402
+from api.langnetwebsocket import LLMStreamFanout  # noqa: E402
+
+
+class TestLLMStreamFanout:
+    """Abort requests apply only to the generation in progress"""
+
+    def test_abort_interrupts_current_generation(self):
+        fanout = LLMStreamFanout("exec-1", asyncio.new_event_loop())
+        fanout.delta("analyze_document", "{")
+        fanout.abort()
+        with pytest.raises(GenerationAborted):
+            fanout.delta("analyze_document", "\"structure\"")
+        fanout.delta("analyze_document", "retomada")
+
+    def test_stale_abort_expires_on_done_and_task_start(self):
+        fanout = LLMStreamFanout("exec-1", asyncio.new_event_loop())
+        fanout.abort()
+        fanout.done("analyze_document", "{}")
+        fanout.delta("extract_requirements", "{")
+
+        fanout.abort()
+        fanout.event({"type": "task_started", "task": "research_additional_info"})
+        fanout.delta("research_additional_info", "{")
@@ -0,0 +1,49 @@
+"""
+Tests for the task lifecycle events published by execute_task_with_context (agents/langnetagents.py)
+"""
+import ast
+from datetime import datetime
+from pathlib import Path
+
+from agents.langnetstream import notify_event, register_stream_sink, unregister_stream_sink
+
+
+def _publish_task_outcome():
+    """Compila _publish_task_outcome de langnetagents.py sem importar o módulo inteiro."""
+    src = (Path(__file__).resolve().parents[1] / "agents" / "langnetagents.py").read_text(encoding="utf-8")
+    node = next(n for n in ast.parse(src).body if isinstance(n, ast.FunctionDef)
+                and n.name == "_publish_task_outcome")
+    ns = {"notify_event": notify_event, "datetime": datetime, "LangNetFullState": dict}
+    exec(compile(ast.Module(body=[node], type_ignores=[]), "langnetagents.py", "exec"), ns)
+    return ns["_publish_task_outcome"]
+
+
+class Sink:
+    def __init__(self):
+        self.events = []
+
+    def event(self, message):
+        self.events.append(message)
+
+
+class TestTaskOutcomeEvents:
+    """task_completed keeps the payload the frontend consumes"""
+
+    def test_completed_event_carries_output_preview(self):
+        sink = Sink()
+        register_stream_sink("exec-1", sink)
+        try:
+            state = {
+                "stream_channel": "exec-1",
+                "errors": [],
+                "execution_log": [
+                    {"task": "analyze_document", "status": "started"},
+                    {"task": "analyze_document", "status": "completed", "output_preview": '{"structure"'},
+                ],
+            }
+            _publish_task_outcome()("analyze_document", state, 0)
+        finally:
+            unregister_stream_sink("exec-1")
+        completed, progress = sink.events
+        assert completed["type"] == "task_completed" and completed["output_preview"] == '{"structure"'
+        assert progress["type"] == "progress" and progress["current_task"] == "analyze_document"
@@ -0,0 +1,80 @@
+"""
+Tests for progressive test-case results in app/routers/test_cases.py
+"""
+import contextlib
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("mysql.connector")
+
+from app.routers import test_cases  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, tables):
+        self.tables = tables
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        table = "test_case_uc_results" if "test_case_uc_results" in sql else "test_case_sessions"
+        self._rows = [dict(r) for r in self.tables[table]]
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+def fake_connection(tables):
+    @contextlib.contextmanager
+    def _conn():
+        class _C:
+            def cursor(self, dictionary=False):
+                return FakeCursor(tables)
+        yield _C()
+    return _conn
+
+
+class TestLatestWhileGenerating:
+    """/latest merges per-UC rows while the session is still generating"""
+
+    def test_latest_returns_partial_results(self, monkeypatch):
+        tables = {
+            "test_case_sessions": [{
+                "id": "s1", "project_id": "p1", "specification_session_id": "spec",
+                "status": "generating", "version": 1, "total_ucs": 1, "total_cases": 2,
+                "results_json": json.dumps({"results": []}), "generation_log": "1/3",
+            }],
+            "test_case_uc_results": [
+                {"result_json": json.dumps({"uc_id": "UC-001", "n_cases": 2})},
+            ],
+        }
+        monkeypatch.setattr(test_cases, "get_db_connection", fake_connection(tables))
+        out = test_cases.get_latest_for_project("p1", current_user={"id": "u"})
+        assert out["status"] == "generating"
+        assert [r["uc_id"] for r in out["results"]] == ["UC-001"]
+
+
+class TestVersionsEndpoint:
+    """/{session_id}/versions lists the session's version history"""
+
+    def test_versions_listed_for_session(self, monkeypatch):
+        tables = {"test_case_sessions": [{"id": "s1", "status": "draft"}], "test_case_uc_results": []}
+        calls = []
+
+        def fake_rows(spec, owner_id):
+            calls.append((spec, owner_id))
+            return [{"version": 2, "created_at": "2026-03-01 10:00:00", "change_description": "chat",
+                     "change_type": "chat_refinement", "doc_size": 10}]
+
+        monkeypatch.setattr(test_cases, "get_db_connection", fake_connection(tables))
+        monkeypatch.setattr(test_cases, "list_version_rows", fake_rows)
+        out = test_cases.list_versions("s1", current_user={"id": "u"})
+        assert calls == [(test_cases.TEST_CASE_VERSIONS, "s1")]
+        assert [v["version"] for v in out["versions"]] == [2]
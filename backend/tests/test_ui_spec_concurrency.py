@@ -0,0 +1,68 @@
+"""
+Tests for concurrent per-UC screen generation (agents/langnetui.py)
+"""
+import threading
+import time
+
+from agents import langnetui
+
+SPEC = "\n\n".join(
+    f"**UC-00{i}: Consultar Relatorio {i}**\n| Campo | Detalhe |\n| **Ator Principal** | Gestor |\n"
+    for i in range(1, 5)
+)
+
+
+def fake_generator(active, peak, fail_first=()):
+    lock = threading.Lock()
+    calls = {}
+
+    def _gen(uc, sub_schema, project_name="Sistema", nav_items=None):
+        uc_id = uc["id"]
+        with lock:
+            calls[uc_id] = calls.get(uc_id, 0) + 1
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            attempt = calls[uc_id]
+        # UCs do fim terminam primeiro: força conclusão fora de ordem
+        time.sleep(0.05 * (5 - int(uc_id[-1])))
+        with lock:
+            active[0] -= 1
+        if uc_id in fail_first and attempt == 1:
+            raise RuntimeError("429 rate limit")
+        return {"id": f"scr_{uc_id}", "name": uc_id, "components": [],
+                "actions": [{"kind": "task", "target": f"task_{uc_id}"}]}
+    return _gen, calls
+
+
+class TestConcurrentUISpec:
+    """Bounded concurrency, ordered reassembly, retries and progress callback"""
+
+    def test_screens_reassembled_in_uc_order(self, monkeypatch):
+        active, peak = [0], [0]
+        gen, calls = fake_generator(active, peak, fail_first=("UC-002",))
+        monkeypatch.setattr(langnetui, "_generate_one_screen", gen)
+        monkeypatch.setenv("LANGNET_UI_SPEC_RETRY_BACKOFF", "0")
+        progress = []
+
+        result = langnetui.execute_ui_spec_workflow(
+            SPEC, render_png=False, max_concurrency=2, max_attempts=2,
+            on_progress=lambda p: progress.append((p["done"], p["screens_count"])),
+        )
+
+        ids = [s["id"] for s in result["ui_spec"]["screens"]]
+        assert ids == ["scr_UC-001", "scr_UC-002", "scr_UC-003", "scr_UC-004"]
+        assert peak[0] <= 2 and calls["UC-002"] == 2
+        assert progress == [(1, 1), (2, 2), (3, 3), (4, 4)]
+        assert result["ui_spec"]["action_map"]["task_UC-003"]["screen"] == "scr_UC-003"
+
+    def test_failed_screen_does_not_abort_workflow(self, monkeypatch):
+        def gen(uc, sub_schema, project_name="Sistema", nav_items=None):
+            if uc["id"] == "UC-003":
+                raise RuntimeError("timeout")
+            return {"id": f"scr_{uc['id']}", "name": uc["id"], "components": []}
+
+        monkeypatch.setattr(langnetui, "_generate_one_screen", gen)
+        monkeypatch.setenv("LANGNET_UI_SPEC_RETRY_BACKOFF", "0")
+        result = langnetui.execute_ui_spec_workflow(SPEC, render_png=False, max_attempts=2)
+        assert result["screens_count"] == 3
+        assert "UC-003 FALHOU (timeout)" in result["generation_log"]
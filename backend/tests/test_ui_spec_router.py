@@ -0,0 +1,78 @@
+"""
+Tests for in-progress UI Spec sessions in app/routers/ui_spec.py
+"""
+import contextlib
+import json
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("mysql.connector")
+
+from app.routers import ui_spec  # noqa: E402
+
+
+def _row(session_id, status, minute):
+    return {"id": session_id, "project_id": "p1", "status": status, "version": 1,
+            "screens_count": 1, "ui_spec_json": json.dumps({"screens": [{"id": session_id}]}),
+            "mockups_json": "{}", "generation_log": "", "created_at": datetime(2026, 3, 1, 10, minute)}
+
+
+def fake_connection(rows, statements):
+    class FakeCursor:
+        def execute(self, sql, params=()):
+            statements.append(sql)
+            if "status='generating'" in sql:
+                self._rows = [r for r in rows if r["status"] == "generating"]
+            elif ui_spec.USABLE_STATUS_SQL in sql:
+                self._rows = [r for r in rows if r["status"] not in ("generating", "failed")]
+            else:
+                self._rows = []
+            self._rows.sort(key=lambda r: r["created_at"], reverse=True)
+
+        def fetchall(self):
+            return self._rows
+
+        def close(self):
+            pass
+
+    @contextlib.contextmanager
+    def _conn():
+        class _C:
+            def cursor(self, dictionary=False):
+                return FakeCursor()
+
+            def commit(self):
+                pass
+        yield _C()
+    return _conn
+
+
+class TestUISpecInProgress:
+    """Generating/failed sessions never replace the project's UI Spec"""
+
+    def test_latest_skips_generating_and_failed(self, monkeypatch):
+        rows = [_row("ok", "draft", 0), _row("bad", "failed", 5), _row("run", "generating", 9)]
+        monkeypatch.setattr(ui_spec, "get_db_connection", fake_connection(rows, []))
+        out = ui_spec.get_latest_for_project("p1", current_user={"id": "u"})
+        assert out["session_id"] == "ok"
+        assert out["in_progress"]["session_id"] == "run"
+
+    def test_failed_generation_without_screens_is_deleted(self, monkeypatch):
+        statements = []
+        monkeypatch.setattr(ui_spec, "get_db_connection", fake_connection([], statements))
+        monkeypatch.setattr(ui_spec, "_fetch_spec_content", lambda sid: ("spec", "p1"))
+        monkeypatch.setattr(ui_spec, "_fetch_schema_sql", lambda pid, dm: ("", None, None))
+        monkeypatch.setattr(ui_spec, "_current_specification_version", lambda sid: 1)
+        monkeypatch.setattr(ui_spec, "_project_name", lambda pid: "Projeto")
+
+        def boom(**kwargs):
+            raise RuntimeError("LLM fora do ar")
+
+        monkeypatch.setattr(ui_spec, "execute_ui_spec_workflow", boom)
+        with pytest.raises(ui_spec.HTTPException):
+            ui_spec.generate_ui_spec("p1", ui_spec.GenerateRequest(specification_session_id="s"),
+                                     current_user={"id": "u"})
+        assert statements[0].strip().startswith("INSERT INTO ui_spec_sessions")
+        assert statements[-1].startswith("DELETE FROM ui_spec_sessions")
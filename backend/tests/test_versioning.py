@@ -0,0 +1,62 @@
+"""
+Tests for the delta-compressed version history store (app/versioning.py)
+
+Only the codec and LRU are exercised here — no database required
+"""
+import json
+
+import pytest
+
+from app import versioning as vs
+
+
+SPEC_MD = "\n".join(f"## UC-{i:03d}\nO ator executa o passo {i}, valida e confirma." for i in range(200))
+
+
+class TestVersionCodec:
+    """Keyframe/delta encoding round-trips"""
+
+    def test_markdown_delta_round_trip(self):
+        """A small edit to a large Markdown document yields a small delta"""
+        edited = SPEC_MD.replace("passo 120,", "passo 120 revisado,")
+        base = {"doc": SPEC_MD}
+        delta = vs.encode_delta(base, {"doc": edited})
+
+        assert vs.decode_payload(delta, base) == {"doc": edited}
+        assert len(delta) < len(vs.encode_full({"doc": edited})) * 0.2
+
+    def test_single_line_json_round_trip(self):
+        """json.dumps output (one line, escaped newlines) is reproduced byte for byte"""
+        files = [{"path": f"src/m{i}.py", "content": "def f():\n    return %d\n" % i} for i in range(50)]
+        old = json.dumps(files, ensure_ascii=False)
+        files[17]["content"] = "def f():\n    return 'changed'\n"
+        new = json.dumps(files, ensure_ascii=False)
+
+        ops = vs.make_delta(old, new)
+        assert vs.apply_delta(old, ops) == new
+        assert sum(len(op) for op in ops if isinstance(op, str)) < 100
+
+    def test_chain_and_missing_base(self):
+        """Deltas apply in sequence; a delta without its base is rejected"""
+        v1 = {"a": "x,y,z", "b": None}
+        v2 = {"a": "x,y,z,w", "b": "<h1>doc</h1>"}
+        v3 = {"a": "x,z,w", "b": "<h1>doc</h1>"}
+        p2 = vs.encode_delta(v1, v2)
+        p3 = vs.encode_delta(v2, v3)
+
+        assert vs.decode_payload(p3, vs.decode_payload(p2, v1)) == v3
+        with pytest.raises(vs.VersionChainError):
+            vs.decode_payload(p3, None)
+
+    def test_lru_returns_copies(self, monkeypatch):
+        """Materialized versions are cached and bounded"""
+        monkeypatch.setattr(vs, "LRU_SIZE", 2)
+        monkeypatch.setattr(vs, "_LRU", vs.OrderedDict())
+
+        for v in (1, 2, 3):
+            vs._lru_put(vs.TEST_CASE_VERSIONS, "s1", v, {"results_json": str(v)})
+        assert vs._lru_get(vs.TEST_CASE_VERSIONS, "s1", 1) is None
+
+        hit = vs._lru_get(vs.TEST_CASE_VERSIONS, "s1", 3)
+        hit["results_json"] = "mutated"
+        assert vs._lru_get(vs.TEST_CASE_VERSIONS, "s1", 3) == {"results_json": "3"}
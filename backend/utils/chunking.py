@@ -0,0 +1,360 @@
+"""
+Token-aware, structure-preserving chunking.
+
+chunk_text (utils/pdf_processor.py) slices by characters with a fixed overlap,
+cutting headings, clauses and tables in half and repeating ~10% of the text in
+every prompt. This module:
+
+  - measures size in model tokens through a pluggable counter
+    (LANGNET_TOKENIZER: "approx" heuristic by default, "tiktoken[:encoding]"
+    when tiktoken is installed, or any counter added with register_tokenizer);
+  - splits text into blocks (heading / paragraph / table) and packs whole blocks,
+    starting a new chunk at headings and never leaving a heading orphaned at the
+    end of a chunk; only blocks larger than the budget are split (sentences,
+    then words; tables by rows, repeating the header row);
+  - drops boilerplate repeated across pages (headers, footers, "Página 3 de 200")
+    learned from the first pages of the document;
+  - returns Chunk objects with page range, section, char offsets and token count,
+    usable for retrieval; format_chunk renders them for prompts. Offsets index
+    the UNFILTERED text, pages joined by "\n\n" (pdf_processor's raw_text):
+    boilerplate is blanked in place, never shifting positions.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_MAX_TOKENS = int(os.getenv("LANGNET_CHUNK_MAX_TOKENS", "1000"))
+CHARS_PER_TOKEN = float(os.getenv("LANGNET_CHARS_PER_TOKEN", "3.5"))
+
+TokenCounter = Callable[[str], int]
+
+
+# ── Tokenizers ──────────────────────────────────────────────────────────
+
+def approx_token_count(text: str) -> int:
+    """Dependency-free estimate (~3.5 chars/token for Portuguese prose)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+_TOKENIZERS: Dict[str, TokenCounter] = {"approx": approx_token_count}
+
+
+def register_tokenizer(name: str, counter: TokenCounter) -> None:
+    """Make a token counter available to get_token_counter(name)."""
+    _TOKENIZERS[name] = counter
+    get_token_counter.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(name: Optional[str] = None) -> TokenCounter:
+    """
+    Resolve a token counter by name (default: LANGNET_TOKENIZER or "approx").
+
+    "tiktoken" / "tiktoken:<encoding>" use tiktoken (cl100k_base by default);
+    falls back to the heuristic when tiktoken is not installed.
+    """
+    name = name or os.getenv("LANGNET_TOKENIZER", "approx")
+    if name in _TOKENIZERS:
+        return _TOKENIZERS[name]
+    if name.startswith("tiktoken"):
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding(name.partition(":")[2] or "cl100k_base")
+            return lambda text: len(encoding.encode(text, disallowed_special=()))
+        except ImportError:
+            print("Warning: tiktoken not installed, using approximate token counts")
+            return approx_token_count
+    raise ValueError(f"Unknown tokenizer: {name}")
+
+
+# ── Data ────────────────────────────────────────────────────────────────
+
+@dataclass
+class Chunk:
+    """A chunk of document text plus the metadata needed to cite/retrieve it.
+
+    char_start/char_end delimit the chunk's source span in the pages joined by
+    "\n\n" (before boilerplate removal); a block split to fit the budget keeps
+    the span of the whole block."""
+    index: int
+    text: str
+    tokens: int
+    page_start: Optional[int]
+    page_end: Optional[int]
+    section: Optional[str]
+    char_start: int
+    char_end: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class _Block:
+    kind: str  # heading | paragraph | table
+    text: str
+    page: Optional[int]
+    section: Optional[str]
+    char_start: int
+    char_end: int
+    tokens: int = 0
+
+
+# ── Boilerplate ─────────────────────────────────────────────────────────
+
+def _line_signature(line: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"\d+", "#", line.strip().lower()))
+
+
+class BoilerplateFilter:
+    """
+    Remove lines repeated on most pages (running headers/footers, page numbers).
+
+    The first sample_pages pages are buffered to learn which line signatures
+    (digits normalized, so "Página 3 de 200" ≡ "Página 4 de 200") appear on at
+    least min_ratio of them; those lines are then blanked on every page (replaced
+    by spaces of the same length, so character offsets into the original page
+    still hold). Table rows are never treated as boilerplate (header rows repeat
+    legitimately).
+    """
+
+    def __init__(self, sample_pages: int = 20, min_ratio: float = 0.5, min_pages: int = 3):
+        self.sample_pages = sample_pages
+        self.min_ratio = min_ratio
+        self.min_pages = min_pages
+        self.signatures: set = set()
+        self.removed_lines = 0
+
+    def _learn(self, sample: List[Tuple[int, str]]) -> None:
+        counts = Counter()
+        for _, text in sample:
+            counts.update({_line_signature(l) for l in text.split("\n")
+                           if l.strip() and len(l) <= 150 and not _is_table_row(l)})
+        threshold = max(self.min_pages, math.ceil(self.min_ratio * len(sample)))
+        self.signatures = {sig for sig, n in counts.items() if n >= threshold}
+
+    def _clean(self, text: str) -> str:
+        if not self.signatures:
+            return text
+        kept = []
+        for line in text.split("\n"):
+            if line.strip() and _line_signature(line) in self.signatures:
+                self.removed_lines += 1
+                line = " " * len(line)
+            kept.append(line)
+        return "\n".join(kept)
+
+    def filter(self, pages: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+        pages = iter(pages)
+        sample = []
+        for page in pages:
+            sample.append(page)
+            if len(sample) >= self.sample_pages:
+                break
+        self._learn(sample)
+        for page_no, text in sample:
+            yield page_no, self._clean(text)
+        for page_no, text in pages:
+            yield page_no, self._clean(text)
+
+
+# ── Blocks ──────────────────────────────────────────────────────────────
+
+_HEADING = re.compile(
+    r"^(?:#{1,6}\s+\S"
+    r"|(?:CAP[IÍ]TULO|SE[CÇ][AÃ]O|CL[AÁ]USULA|ANEXO|T[IÍ]TULO|PARTE|CHAPTER|SECTION|APPENDIX)\b"
+    r"|\d+(?:\.\d+)*\.?\s+[A-ZÁÉÍÓÚÂÊÔÃÕÇ])"
+)
+
+
+def _is_heading(line: str) -> bool:
+    line = line.strip()
+    if not line or len(line) > 100 or line[-1] in ".;,":
+        return False
+    if _HEADING.match(line):
+        return True
+    letters = [c for c in line if c.isalpha()]
+    return len(letters) >= 4 and all(c.isupper() for c in letters)
+
+
+def _is_table_row(line: str) -> bool:
+    return line.count("|") >= 2 or line.count("\t") >= 2
+
+
+def _page_blocks(text: str, page: Optional[int], offset: int, section: Optional[str],
+                 count: TokenCounter) -> Tuple[List[_Block], Optional[str]]:
+    """Split one page into heading/paragraph/table blocks; returns the last section seen."""
+    blocks: List[_Block] = []
+    kind, lines, start = None, [], 0
+
+    def flush(end: int):
+        if lines:
+            body = "\n".join(lines)
+            blocks.append(_Block(kind, body, page, section, offset + start, offset + end, count(body)))
+            lines.clear()
+
+    pos = 0
+    for line in text.split("\n"):
+        line_start, pos = pos, pos + len(line) + 1
+        stripped = line.strip()
+        if not stripped:
+            flush(line_start)
+            kind = None
+            continue
+        if _is_heading(stripped) and not _is_table_row(stripped):
+            flush(line_start)
+            section = stripped
+            kind, start = "heading", line_start
+            lines.append(stripped)
+            flush(line_start + len(line))
+            kind = None
+            continue
+        line_kind = "table" if _is_table_row(stripped) else "paragraph"
+        if kind != line_kind:
+            flush(line_start)
+            kind, start = line_kind, line_start
+        lines.append(stripped)
+    flush(len(text))
+    return blocks, section
+
+
+def _split_block(block: _Block, max_tokens: int, count: TokenCounter) -> List[_Block]:
+    """Split a block larger than max_tokens: tables by rows (header repeated), prose by
+    sentences and, for a single huge sentence, by words."""
+    if block.kind == "table":
+        rows = block.text.split("\n")
+        header, units, sep = rows[0], rows[1:], "\n"
+    else:
+        header, sep = None, " "
+        units = []
+        for sentence in re.split(r"(?<=[.!?;:])\s+", block.text):
+            if count(sentence) <= max_tokens:
+                units.append(sentence)
+            else:
+                words, part = sentence.split(), []
+                for word in words:
+                    if part and count(" ".join(part + [word])) > max_tokens:
+                        units.append(" ".join(part))
+                        part = []
+                    part.append(word)
+                if part:
+                    units.append(" ".join(part))
+
+    pieces, current = [], [header] if header else []
+    for unit in units:
+        candidate = sep.join(current + [unit])
+        if len(current) > (1 if header else 0) and count(candidate) > max_tokens:
+            pieces.append(sep.join(current))
+            current = [header] if header else []
+        current.append(unit)
+    if len(current) > (1 if header else 0) or not pieces:
+        pieces.append(sep.join(current))
+    return [_Block(block.kind, p, block.page, block.section, block.char_start, block.char_end, count(p))
+            for p in pieces if p.strip()]
+
+
+# ── Packing ─────────────────────────────────────────────────────────────
+
+def _iter_blocks(pages: Iterable[Tuple[Optional[int], str]], count: TokenCounter) -> Iterator[_Block]:
+    offset, section = 0, None
+    for page_no, text in pages:
+        if text.strip():
+            blocks, section = _page_blocks(text, page_no, offset, section, count)
+            yield from blocks
+        offset += len(text) + 2  # página vazia também ocupa espaço no texto unido
+
+
+def iter_chunks(
+    pages: Iterable[Tuple[Optional[int], str]],
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap_tokens: int = 0,
+    tokenizer: Optional[str] = None,
+    dedupe_boilerplate: bool = True,
+) -> Iterator[Chunk]:
+    """
+    Stream Chunks from (page_number, text) pairs (e.g. pdf_processor.iter_pdf_pages).
+
+    Args:
+        pages: Iterable of (page_number, text); page_number may be None
+        max_tokens: Token budget per chunk
+        overlap_tokens: Trailing blocks (up to this many tokens) repeated at the
+            start of the next chunk; 0 when chunks are concatenated into one prompt
+        tokenizer: Token counter name (see get_token_counter)
+        dedupe_boilerplate: Drop lines repeated across pages
+    """
+    count = get_token_counter(tokenizer)
+    if dedupe_boilerplate:
+        pages = BoilerplateFilter().filter(pages)
+
+    current: List[_Block] = []
+    tokens = 0
+    index = 0
+
+    def emit(blocks: List[_Block]) -> Chunk:
+        nonlocal index
+        text = "\n\n".join(b.text for b in blocks)
+        pages_ = [b.page for b in blocks if b.page is not None]
+        sections = [b.section for b in blocks if b.section]
+        chunk = Chunk(
+            index=index, text=text, tokens=count(text),
+            page_start=min(pages_) if pages_ else None, page_end=max(pages_) if pages_ else None,
+            section=sections[0] if sections else None,
+            char_start=min(b.char_start for b in blocks), char_end=max(b.char_end for b in blocks),
+        )
+        index += 1
+        return chunk
+
+    def tail(blocks: List[_Block]) -> List[_Block]:
+        kept, total = [], 0
+        for b in reversed(blocks):
+            if b.kind == "heading" or total + b.tokens > overlap_tokens:
+                break
+            kept.insert(0, b)
+            total += b.tokens
+        return kept
+
+    for block in _iter_blocks(pages, count):
+        pieces = [block] if block.tokens <= max_tokens else _split_block(block, max_tokens, count)
+        for piece in pieces:
+            starts_section = piece.kind == "heading" and tokens >= max_tokens // 2
+            if current and (tokens + piece.tokens > max_tokens or starts_section):
+                carry = []
+                while current and current[-1].kind == "heading":
+                    carry.insert(0, current.pop())  # heading fica com o seu conteúdo
+                if current:
+                    yield emit(current)
+                    carry = tail(current) + carry
+                current = carry
+                tokens = sum(b.tokens for b in current)
+            current.append(piece)
+            tokens += piece.tokens
+    if current:
+        yield emit(current)
+
+
+def chunk_pages(pages: Iterable[Tuple[Optional[int], str]], **kwargs) -> List[Chunk]:
+    """List version of iter_chunks."""
+    return list(iter_chunks(pages, **kwargs))
+
+
+def chunk_document(text: str, **kwargs) -> List[Chunk]:
+    """Chunk a plain (unpaged) text; boilerplate dedup is off since there are no pages."""
+    kwargs.setdefault("dedupe_boilerplate", False)
+    return chunk_pages([(None, text)], **kwargs)
+
+
+def format_chunk(document_name: str, chunk: Chunk) -> str:
+    """Render a chunk for a prompt: [DOCUMENTO: name | p. 3–4 | section]\\ntext."""
+    header = [f"DOCUMENTO: {document_name}"]
+    if chunk.page_start is not None:
+        pages = (f"p. {chunk.page_start}" if chunk.page_start == chunk.page_end
+                 else f"p. {chunk.page_start}–{chunk.page_end}")
+        header.append(pages)
+    if chunk.section:
+        header.append(chunk.section[:80])
+    return f"[{' | '.join(header)}]\n{chunk.text}"
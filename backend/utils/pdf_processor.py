@@ -2,28 +2,43 @@
 PDF Processing Utilities
 Handles PDF text extraction and chunking for agent processing.
 
+Pages are streamed (iter_pdf_pages) and large PDFs are extracted in a process
+pool by page ranges; chunking is incremental (IncrementalChunker), so there is
+no page cap and memory stays bounded for 200–400 page documents.
+
 Based on content-automation-system implementation.
 """
 
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Tuple
 
+# Páginas por tarefa do pool de processos e a partir de quantas páginas vale paralelizar.
+PAGES_PER_BATCH = int(os.getenv("LANGNET_PDF_BATCH_PAGES", "25"))
+PARALLEL_MIN_PAGES = int(os.getenv("LANGNET_PDF_PARALLEL_MIN_PAGES", "40"))
 
-def extract_pdf_text(pdf_path: str, max_pages: int = 50) -> str:
-    """
-    Extract text from a PDF file.
 
-    Args:
-        pdf_path: Path to the PDF file
-        max_pages: Maximum number of pages to process (default: 50)
+def _pdf_workers() -> int:
+    default = min(4, os.cpu_count() or 1)
+    return max(1, int(os.getenv("LANGNET_PDF_WORKERS", str(default))))
 
-    Returns:
-        Extracted text as a string
 
-    Raises:
-        Exception: If PDF cannot be read
-    """
+def _reader_class():
+    """PdfReader do pypdf (preferido) ou do PyPDF2."""
+    try:
+        from pypdf import PdfReader
+        return PdfReader
+    except ImportError:
+        try:
+            from PyPDF2 import PdfReader
+            return PdfReader
+        except ImportError:
+            raise ImportError("Neither pypdf nor PyPDF2 is installed. Install with: pip install pypdf")
+
+
+def _check_pdf_path(pdf_path: str) -> Path:
     path = Path(pdf_path)
 
     if not path.exists():
@@ -32,55 +47,92 @@ def extract_pdf_text(pdf_path: str, max_pages: int = 50) -> str:
     if not path.suffix.lower() == '.pdf':
         raise ValueError(f"File is not a PDF: {pdf_path}")
 
-    text = ''
+    return path
 
-    # Try pypdf first (modern library)
-    try:
-        from pypdf import PdfReader
-        reader = PdfReader(str(path))
-        parts = []
 
-        # Limit to max_pages
-        pages_to_process = min(len(reader.pages), max_pages)
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """
+    Extract pages [start, end) from a PDF. Runs inside the process pool, so it
+    opens its own reader and returns only the cleaned, non-empty pages.
+    """
+    reader = _reader_class()(pdf_path)
+    pages = []
+    for i in range(start, min(end, len(reader.pages))):
+        try:
+            page_text = reader.pages[i].extract_text() or ''
+        except Exception as e:
+            print(f"Warning: Failed to extract page {i+1}: {e}")
+            continue
+        if page_text.strip():
+            pages.append((i + 1, clean_text(page_text)))
+    return pages
 
-        for i in range(pages_to_process):
-            try:
-                page_text = reader.pages[i].extract_text() or ''
-                if page_text.strip():
-                    parts.append(page_text)
-            except Exception as e:
-                print(f"Warning: Failed to extract page {i+1}: {e}")
-                continue
 
-        text = "\n\n".join(parts)
+def count_pdf_pages(pdf_path: str) -> int:
+    """Number of pages in a PDF (reads only the page tree)."""
+    path = _check_pdf_path(pdf_path)
+    return len(_reader_class()(str(path)).pages)
 
-    except ImportError:
-        # Fallback to PyPDF2 if pypdf not available
-        try:
-            from PyPDF2 import PdfReader as PyPDF2Reader
-            reader = PyPDF2Reader(str(path))
-            parts = []
 
-            pages_to_process = min(len(reader.pages), max_pages)
+def iter_pdf_pages(
+    pdf_path: str,
+    max_pages: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Iterator[Tuple[int, str]]:
+    """
+    Stream (page_number, text) for every non-empty page, in page order.
 
-            for i in range(pages_to_process):
-                try:
-                    page_text = reader.pages[i].extract_text() or ''
-                    if page_text.strip():
-                        parts.append(page_text)
-                except Exception as e:
-                    print(f"Warning: Failed to extract page {i+1}: {e}")
-                    continue
+    Small PDFs are read serially. From PARALLEL_MIN_PAGES pages on, ranges of
+    PAGES_PER_BATCH pages are extracted in a process pool; at most 2 × workers
+    ranges are in flight, so memory stays bounded regardless of document size.
 
-            text = "\n\n".join(parts)
+    Args:
+        pdf_path: Path to the PDF file
+        max_pages: Optional page limit (default: all pages)
+        workers: Process count (default: LANGNET_PDF_WORKERS or min(4, CPUs))
+    """
+    path = _check_pdf_path(pdf_path)
+    reader = _reader_class()(str(path))
+    total = len(reader.pages)
+    if max_pages:
+        total = min(total, max_pages)
+    workers = workers or _pdf_workers()
+
+    if workers <= 1 or total < PARALLEL_MIN_PAGES:
+        for start in range(0, total, PAGES_PER_BATCH):
+            yield from _extract_page_range(str(path), start, min(start + PAGES_PER_BATCH, total))
+        return
+
+    del reader  # cada processo abre o seu
+    ranges = [(s, min(s + PAGES_PER_BATCH, total)) for s in range(0, total, PAGES_PER_BATCH)]
+    window = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = [pool.submit(_extract_page_range, str(path), s, e) for s, e in ranges[:window]]
+        next_range = len(pending)
+        while pending:
+            pages = pending.pop(0).result()
+            if next_range < len(ranges):
+                s, e = ranges[next_range]
+                pending.append(pool.submit(_extract_page_range, str(path), s, e))
+                next_range += 1
+            yield from pages
+
+
+def extract_pdf_text(pdf_path: str, max_pages: Optional[int] = None) -> str:
+    """
+    Extract text from a PDF file.
 
-        except ImportError:
-            raise ImportError("Neither pypdf nor PyPDF2 is installed. Install with: pip install pypdf")
+    Args:
+        pdf_path: Path to the PDF file
+        max_pages: Maximum number of pages to process (default: all pages)
 
-    # Clean up the text
-    text = clean_text(text)
+    Returns:
+        Extracted text as a string
 
-    return text
+    Raises:
+        Exception: If PDF cannot be read
+    """
+    return "\n\n".join(text for _, text in iter_pdf_pages(pdf_path, max_pages=max_pages))
 
 
 def clean_text(text: str) -> str:
@@ -160,6 +212,61 @@ def chunk_text(text: str, max_chunk_size: int = 1000, overlap: int = 200) -> Lis
     return chunks
 
 
+class IncrementalChunker:
+    """
+    Streaming version of chunk_text: feed text pieces as they arrive and get
+    back the chunks that are already complete. The concatenation of the fed
+    pieces yields exactly the chunks chunk_text would produce for the whole
+    string, but only the tail not yet chunked is kept in memory.
+
+    Example:
+        >>> chunker = IncrementalChunker(max_chunk_size=1000, overlap=200)
+        >>> chunks = chunker.feed("A" * 1500) + chunker.feed("A" * 1000) + chunker.finish()
+        >>> chunks == chunk_text("A" * 2500, max_chunk_size=1000, overlap=200)
+        True
+    """
+
+    def __init__(self, max_chunk_size: int = 1000, overlap: int = 200):
+        self.max_chunk_size = max_chunk_size
+        self.step = max(1, max_chunk_size - max(0, overlap))
+        self._buffer = ''
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        chunks = []
+        i = 0
+        # Só emite janelas que NÃO terminam no fim do que já chegou: se o
+        # texto acabasse ali, chunk_text pararia nessa janela (ver finish()).
+        while i + self.max_chunk_size < len(self._buffer):
+            chunk = self._buffer[i:i + self.max_chunk_size]
+            if chunk.strip():
+                chunks.append(chunk)
+            i += self.step
+        self._buffer = self._buffer[i:]
+        return chunks
+
+    def finish(self) -> List[str]:
+        if not self._buffer.strip():
+            self._buffer = ''
+            return []
+        chunks = chunk_text(self._buffer, max_chunk_size=self.max_chunk_size,
+                            overlap=self.max_chunk_size - self.step)
+        self._buffer = ''
+        return chunks
+
+
+def iter_text_chunks(
+    pieces: Iterable[str],
+    max_chunk_size: int = 1000,
+    overlap: int = 200
+) -> Iterator[str]:
+    """Chunk a stream of text pieces incrementally (see IncrementalChunker)."""
+    chunker = IncrementalChunker(max_chunk_size=max_chunk_size, overlap=overlap)
+    for piece in pieces:
+        yield from chunker.feed(piece)
+    yield from chunker.finish()
+
+
 def format_document_chunks(
     document_name: str,
     chunks: List[str],
@@ -195,27 +302,41 @@ def format_document_chunks(
 
 def process_pdf_for_agent(
     pdf_path: str,
-    max_pages: int = 50,
+    max_pages: Optional[int] = None,
     chunk_size: int = 1000,
     chunk_overlap: int = 200,
-    max_chunks: Optional[int] = 60
+    max_chunks: Optional[int] = 60,
+    keep_raw_text: bool = True,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: int = 0
 ) -> dict:
     """
     Complete PDF processing pipeline: extract, chunk, and format.
 
+    Pages are streamed from iter_pdf_pages straight into an IncrementalChunker,
+    so the full document text is only materialized when keep_raw_text is set.
+    With max_tokens, the token-aware, structure-preserving chunker
+    (utils/chunking.py) replaces the character windows: chunk_size/chunk_overlap
+    are ignored, repeated headers/footers are dropped and each formatted chunk
+    carries its page range and section.
+
     Args:
         pdf_path: Path to PDF file
-        max_pages: Maximum pages to extract (default: 50)
+        max_pages: Maximum pages to extract (default: all pages)
         chunk_size: Size of each chunk in characters (default: 1000)
         chunk_overlap: Overlap between chunks (default: 200)
         max_chunks: Maximum chunks to return (default: 60)
+        keep_raw_text: Keep the full extracted text in 'raw_text' (default: True)
+        max_tokens: Token budget per chunk; enables the token-aware chunker
+        overlap_tokens: Token overlap between token-aware chunks (default: 0)
 
     Returns:
         Dictionary with:
             - 'document_name': Name of the PDF file
-            - 'raw_text': Full extracted text
+            - 'raw_text': Full extracted text ('' when keep_raw_text=False)
             - 'chunks': List of text chunks (unformatted)
             - 'formatted_chunks': List of formatted chunks with document header
+            - 'chunk_metadata': Page/section/offsets/tokens per chunk (token-aware only)
             - 'stats': Statistics about processing
 
     Example:
@@ -228,43 +349,84 @@ def process_pdf_for_agent(
     path = Path(pdf_path)
     document_name = path.name
 
-    # Extract text
-    print(f"📄 Extracting text from {document_name}...")
-    raw_text = extract_pdf_text(pdf_path, max_pages=max_pages)
+    print(f"📄 Extracting and chunking {document_name} (size={chunk_size}, overlap={chunk_overlap})...")
+    raw_parts: List[str] = []
+    text_length = 0
+    word_count = 0
+    num_pages = 0
+
+    def _pieces():
+        nonlocal text_length, word_count, num_pages
+        for _, page_text in iter_pdf_pages(pdf_path, max_pages=max_pages):
+            piece = page_text if num_pages == 0 else "\n\n" + page_text
+            num_pages += 1
+            text_length += len(piece)
+            word_count += len(page_text.split())
+            if keep_raw_text:
+                raw_parts.append(piece)
+            yield piece
+
+    chunk_metadata: List[dict] = []
+    if max_tokens:
+        from utils.chunking import format_chunk, iter_chunks
+
+        def _pages():
+            nonlocal text_length, word_count, num_pages
+            for page in iter_pdf_pages(pdf_path, max_pages=max_pages):
+                num_pages += 1
+                text_length += len(page[1]) + (2 if num_pages > 1 else 0)
+                word_count += len(page[1].split())
+                if keep_raw_text:
+                    raw_parts.append(page[1] if num_pages == 1 else "\n\n" + page[1])
+                yield page
+
+        token_chunks = list(iter_chunks(_pages(), max_tokens=max_tokens, overlap_tokens=overlap_tokens))
+        chunks = [c.text for c in token_chunks]
+        chunk_metadata = [c.to_dict() for c in token_chunks]
+        for meta in chunk_metadata:
+            del meta["text"]
+    else:
+        chunks = list(iter_text_chunks(_pieces(), max_chunk_size=chunk_size, overlap=chunk_overlap))
 
-    if not raw_text or not raw_text.strip():
+    if not text_length:
         raise ValueError(f"No text could be extracted from {document_name}")
 
-    # Chunk text
-    print(f"✂️  Chunking text (size={chunk_size}, overlap={chunk_overlap})...")
-    chunks = chunk_text(raw_text, max_chunk_size=chunk_size, overlap=chunk_overlap)
+    raw_text = "".join(raw_parts)
 
     # Format chunks
     print(f"📝 Formatting {len(chunks)} chunks...")
-    formatted_chunks = format_document_chunks(document_name, chunks, max_chunks=max_chunks)
+    if max_tokens:
+        kept = token_chunks[:max_chunks] if max_chunks else token_chunks
+        formatted_chunks = [format_chunk(document_name, c) for c in kept]
+    else:
+        formatted_chunks = format_document_chunks(document_name, chunks, max_chunks=max_chunks)
 
     # Calculate statistics
     stats = {
         'document_name': document_name,
         'document_path': str(path),
-        'raw_text_length': len(raw_text),
-        'raw_text_words': len(raw_text.split()),
+        'num_pages': num_pages,
+        'raw_text_length': text_length,
+        'raw_text_words': word_count,
         'num_chunks': len(chunks),
         'num_formatted_chunks': len(formatted_chunks),
         'avg_chunk_size': sum(len(c) for c in chunks) / len(chunks) if chunks else 0,
+        'total_chunk_tokens': sum(m['tokens'] for m in chunk_metadata),
+        'max_tokens_config': max_tokens,
         'chunk_size_config': chunk_size,
         'overlap_config': chunk_overlap,
         'max_chunks_config': max_chunks
     }
 
     print(f"✅ Processed {document_name}: {stats['num_formatted_chunks']} chunks, "
-          f"{stats['raw_text_words']} words")
+          f"{stats['raw_text_words']} words, {num_pages} pages")
 
     return {
         'document_name': document_name,
         'raw_text': raw_text,
         'chunks': chunks,
         'formatted_chunks': formatted_chunks,
+        'chunk_metadata': chunk_metadata,
         'stats': stats
     }
 
@@ -14,6 +14,7 @@ export interface RunState {
   exit_code?: number | null;
   work_dir?: string;
   total_lines?: number;
+  next_seq?: number;
 }
 
 const getAuthHeaders = (): Record<string, string> => {
@@ -40,6 +41,9 @@ export function useCodeRun(sessionId: string | undefined): UseCodeRunResult {
   const [isStarting, setIsStarting] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
+  // seq da próxima linha esperada — reconexão retoma daqui (?since=)
+  const nextSeqRef = useRef<number | null>(null);
+  const finishedRef = useRef(false);
 
   const teardownWs = useCallback(() => {
     if (wsRef.current) {
@@ -51,23 +55,39 @@ export function useCodeRun(sessionId: string | undefined): UseCodeRunResult {
   const attachWs = useCallback((runId: string) => {
     teardownWs();
     const token = localStorage.getItem('accessToken') || localStorage.getItem('token') || '';
-    const url = `${WS_BASE}/code-generation/run/${runId}/ws?token=${encodeURIComponent(token)}`;
+    const since = nextSeqRef.current !== null ? `&since=${nextSeqRef.current}` : '';
+    const url = `${WS_BASE}/code-generation/run/${runId}/ws?token=${encodeURIComponent(token)}${since}`;
     const ws = new WebSocket(url);
     wsRef.current = ws;
     ws.onmessage = (e) => {
       try {
         const payload = JSON.parse(e.data);
-        if (payload.type === 'line') {
-          setLines((prev) => [...prev, payload.data]);
+        if (payload.type === 'lines') {
+          // frame em lote: {seq, data: [...], dropped?}
+          const batch: string[] = payload.dropped
+            ? [`[runner] … ${payload.dropped} linha(s) descartada(s) do buffer`, ...payload.data]
+            : payload.data;
+          nextSeqRef.current = payload.seq + payload.data.length;
+          setLines((prev) => prev.concat(batch));
         } else if (payload.type === 'status') {
-          setRun(payload.data as RunState);
+          const state = payload.data as RunState;
+          finishedRef.current = state.status === 'stopped' || state.status === 'crashed';
+          setRun(state);
         }
       } catch {
         setLines((prev) => [...prev, String(e.data)]);
       }
     };
     ws.onerror = () => setError('Erro na conexão WebSocket');
-    ws.onclose = () => { if (wsRef.current === ws) wsRef.current = null; };
+    ws.onclose = (ev) => {
+      if (wsRef.current !== ws) return;
+      wsRef.current = null;
+      // queda de conexão com o run vivo: reconecta retomando do último seq
+      // (1003 = run não existe mais, 1008 = token inválido → não insiste)
+      if (!finishedRef.current && ev.code !== 1003 && ev.code !== 1008) {
+        setTimeout(() => { if (!wsRef.current && !finishedRef.current) attachWs(runId); }, 2000);
+      }
+    };
   }, [teardownWs]);
 
   const start = useCallback(async () => {
@@ -75,6 +95,8 @@ export function useCodeRun(sessionId: string | undefined): UseCodeRunResult {
     setIsStarting(true);
     setError(null);
     setLines([]);
+    nextSeqRef.current = null;
+    finishedRef.current = false;
     try {
       const res = await fetch(`${API_BASE}/code-generation/${sessionId}/run`, {
         method: 'POST',
@@ -107,7 +129,9 @@ export function useCodeRun(sessionId: string | undefined): UseCodeRunResult {
   }, [run?.run_id]);
 
   const clear = useCallback(() => {
+    finishedRef.current = true;
     teardownWs();
+    nextSeqRef.current = null;
     setRun(null);
     setLines([]);
     setError(null);
@@ -229,7 +229,14 @@ const UISpecPage: React.FC = () => {
         return;
       }
       const body = JSON.stringify({ specification_session_id: specId, render_png: true });
-      const r = await fetch(`${API_BASE}/ui-spec/${effectiveProjectId}/generate`, { method: "POST", headers, body });
+      // A sessão recebe as telas conforme ficam prontas: mostra o progresso enquanto gera.
+      const poll = setInterval(() => { loadLatest(); }, 5000);
+      let r: Response;
+      try {
+        r = await fetch(`${API_BASE}/ui-spec/${effectiveProjectId}/generate`, { method: "POST", headers, body });
+      } finally {
+        clearInterval(poll);
+      }
       if (!r.ok) throw new Error(`HTTP ${r.status}`);
       toast.success("UI Spec gerada!");
       await loadLatest();